@@ -0,0 +1,49 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.data.binaryfile
+"""
+
+import pytest
+import numpy as np
+
+from tpDcc.dccs.maya.data import binaryfile
+
+
+class _TestFile(binaryfile.BinaryDataFile, object):
+    MAGIC = b'TPTEST01'
+    DESCRIPTION = 'test'
+
+
+def test_layout_alignment():
+    layout = binaryfile.BinaryDataLayout()
+
+    assert layout.add(np.zeros(3, dtype=np.uint8)) == 0
+    assert layout.add(np.zeros(2, dtype='<f8')) == binaryfile.ALIGNMENT
+    assert layout.size == binaryfile.ALIGNMENT + 16
+
+
+def test_write_read_round_trip(tmp_path):
+    ids = np.array([4, 1, 7], dtype='<i4')
+    values = np.arange(12, dtype='<f8').reshape(4, 3)
+    layout = binaryfile.BinaryDataLayout()
+    header = {'ids': layout.add(ids), 'values': layout.add(values), 'name': 'test'}
+    file_path = str(tmp_path / 'data.bin')
+
+    data_file = _TestFile._write_file(file_path, header, layout)
+    data_file = _TestFile(data_file.file_path)
+
+    assert data_file.header['name'] == 'test'
+    assert data_file.header['version'] == _TestFile.VERSION
+    assert np.array_equal(data_file._map_array(data_file.header['ids'], np.dtype('<i4'), 3), ids)
+    assert np.array_equal(data_file._map_array(data_file.header['values'], np.dtype('<f8'), (4, 3)), values)
+    assert data_file._map_array(0, np.dtype('<f8'), (0, 3)).shape == (0, 3)
+
+
+def test_invalid_file(tmp_path):
+    file_path = tmp_path / 'data.bin'
+    file_path.write_bytes(b'NOTVALID' + b'\0' * 16)
+
+    with pytest.raises(IOError):
+        _TestFile(str(file_path)).header
@@ -0,0 +1,66 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.data.blendshapedeltas
+"""
+
+import pytest
+import numpy as np
+
+# tpDcc.dccs.maya.data.blendshapedeltas module imports Maya modules
+pytest.importorskip('maya')
+
+from tpDcc.dccs.maya.data import blendshapedeltas  # noqa: E402
+
+
+def _get_items():
+    random = np.random.RandomState(0)
+    items = list()
+    for alias, index, item_index, count in (('smile', 0, 6000, 5), ('smile', 0, 5500, 3), ('blink', 1, 6000, 0)):
+        items.append({
+            'alias': alias, 'index': index, 'item_index': item_index,
+            'ids': np.sort(random.choice(100, count, replace=False)), 'deltas': random.uniform(size=(count, 3))})
+
+    return items
+
+
+def test_write_read_round_trip(tmp_path):
+    items = _get_items()
+    file_path = str(tmp_path / 'deltas.bsdelta')
+
+    blendshapedeltas.BlendShapeDeltasFile.write(file_path, items, values_dtype='float64', blendshape='face_bs')
+    deltas_file = blendshapedeltas.BlendShapeDeltasFile(file_path)
+    read_items = deltas_file.read()
+
+    assert deltas_file.targets == ['smile', 'blink']
+    assert deltas_file.header['blendshape'] == 'face_bs'
+    assert len(read_items) == len(items)
+    for item, read_item in zip(items, read_items):
+        for key in ('alias', 'index', 'item_index'):
+            assert read_item[key] == item[key]
+        assert np.array_equal(read_item['ids'], item['ids'])
+        assert np.array_equal(read_item['deltas'], item['deltas'])
+
+
+def test_read_targets(tmp_path):
+    items = _get_items()
+    file_path = str(tmp_path / 'deltas.bsdelta')
+    blendshapedeltas.BlendShapeDeltasFile.write(file_path, items)
+    deltas_file = blendshapedeltas.BlendShapeDeltasFile(file_path)
+
+    read_items = deltas_file.read(targets=['blink'])
+
+    assert [item['alias'] for item in read_items] == ['blink']
+    assert read_items[0]['deltas'].shape == (0, 3)
+    assert np.allclose(deltas_file.read(targets=['smile'])[0]['deltas'], items[0]['deltas'].astype(np.float32))
+    with pytest.raises(ValueError):
+        deltas_file.read(targets=['frown'])
+
+
+def test_invalid_file(tmp_path):
+    file_path = tmp_path / 'deltas.bsdelta'
+    file_path.write_bytes(b'NOTDELTA' + b'\0' * 16)
+
+    with pytest.raises(IOError):
+        blendshapedeltas.BlendShapeDeltasFile(str(file_path)).header
@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.data.deformer
+"""
+
+import pytest
+import numpy as np
+
+# tpDcc.dccs.maya.data.deformer module imports Maya modules
+pytest.importorskip('maya')
+
+from tpDcc.dccs.maya.data import deformer  # noqa: E402
+
+
+def _get_deformer_data(name, geometries, seed=0):
+    random = np.random.RandomState(seed)
+    deformer_data = deformer.MayaDeformerData()
+    data = deformer_data.data
+    data['name'] = name
+    data['type'] = 'cluster'
+    data['affectedGeometry'] = list(geometries)
+    data['attrValueDict'] = {'envelope': 0.5}
+    for index, (geo, components_count) in enumerate(geometries.items()):
+        membership = random.uniform(size=components_count) < 0.5
+        data['geometries'][geo] = {
+            'index': index, 'geometryType': 'mesh', 'componentsCount': components_count, 'topologyHash': 'abc',
+            'membership': np.packbits(membership),
+            'weights': random.uniform(size=np.count_nonzero(membership)).astype(np.float32)}
+
+    return deformer_data
+
+
+def test_write_read_round_trip(tmp_path):
+    deformers_data = [
+        _get_deformer_data('cluster1', {'body': 21, 'head': 5}, seed=0),
+        _get_deformer_data('cluster2', {'body': 21}, seed=1)]
+    file_path = str(tmp_path / 'stack.defstack')
+
+    deformer.DeformerStackFile.write(file_path, deformers_data, geometry='body')
+    stack_file = deformer.DeformerStackFile(file_path)
+
+    assert stack_file.deformers == ['cluster1', 'cluster2']
+    assert stack_file.header['geometry'] == 'body'
+    for deformer_data in deformers_data:
+        read_data = stack_file.read(deformer_data.name)
+        assert read_data.type == 'cluster'
+        assert read_data.data['affectedGeometry'] == deformer_data.data['affectedGeometry']
+        assert read_data.data['attrValueDict'] == {'envelope': 0.5}
+        for geo in deformer_data.data['affectedGeometry']:
+            components_count = deformer_data.data['geometries'][geo]['componentsCount']
+            assert read_data.data['geometries'][geo]['componentsCount'] == components_count
+            assert np.array_equal(read_data.get_membership_mask(geo), deformer_data.get_membership_mask(geo))
+            assert np.array_equal(read_data.get_weights(geo), deformer_data.get_weights(geo))
+
+
+def test_no_weights_deformer(tmp_path):
+    deformer_data = _get_deformer_data('skinCluster1', {'body': 8})
+    deformer_data.data['type'] = 'skinCluster'
+    deformer_data.data['geometries']['body'].update({'membership': None, 'weights': None})
+    file_path = str(tmp_path / 'stack.defstack')
+
+    deformer.DeformerStackFile.write(file_path, [deformer_data])
+    read_data = deformer.DeformerStackFile(file_path).read('skinCluster1')
+
+    assert read_data.get_membership_mask('body') is None
+    assert read_data.get_weights('body') is None
+    with pytest.raises(ValueError):
+        deformer.DeformerStackFile(file_path).read('cluster1')
+
+
+def test_invalid_file(tmp_path):
+    file_path = tmp_path / 'stack.defstack'
+    file_path.write_bytes(b'NOTSTACK' + b'\0' * 16)
+
+    with pytest.raises(IOError):
+        deformer.DeformerStackFile(str(file_path)).header
@@ -0,0 +1,105 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.core.meshgraph
+"""
+
+import numpy as np
+
+from tpDcc.dccs.maya.core import meshgraph
+
+
+def _get_topology(columns=4, rows=3):
+    """
+    Returns the topology of a grid of quads followed by a separate triangle shell
+    """
+
+    poly_connects = list()
+    for row in range(rows - 1):
+        for column in range(columns - 1):
+            vertex = row * columns + column
+            poly_connects.extend((vertex, vertex + 1, vertex + columns + 1, vertex + columns))
+    poly_counts = [4] * (len(poly_connects) // 4) + [3]
+    vertices_count = columns * rows
+    poly_connects.extend((vertices_count, vertices_count + 1, vertices_count + 2))
+
+    return np.array(poly_counts), np.array(poly_connects)
+
+
+def _get_adjacency():
+    return meshgraph.get_adjacency(*_get_topology())
+
+
+def test_get_adjacency():
+    offsets, neighbours = _get_adjacency()
+
+    assert len(offsets) == 16
+    assert list(neighbours[offsets[0]:offsets[1]]) == [1, 4]
+    assert list(neighbours[offsets[5]:offsets[6]]) == [1, 4, 6, 9]
+    assert list(neighbours[offsets[12]:offsets[13]]) == [13, 14]
+
+
+def test_get_connected_components():
+    offsets, neighbours = _get_adjacency()
+
+    assert list(meshgraph.get_shell_ids(offsets, neighbours)) == [0] * 12 + [1] * 3
+
+    components = meshgraph.get_connected_components(offsets, neighbours, vertices_ids=[13, 0, 1, 3, 7, 14])
+    assert list(components) == [0, 0, -1, 1, -1, -1, -1, 1, -1, -1, -1, -1, -1, 2, 2]
+
+
+def test_grow_shrink_vertices():
+    offsets, neighbours = _get_adjacency()
+
+    assert list(meshgraph.grow_vertices(offsets, neighbours, [0])) == [0, 1, 4]
+    assert list(meshgraph.grow_vertices(offsets, neighbours, [0], rings=2)) == [0, 1, 2, 4, 5, 8]
+    assert list(meshgraph.grow_vertices(offsets, neighbours, [12], rings=5)) == [12, 13, 14]
+    assert list(meshgraph.shrink_vertices(offsets, neighbours, [0, 1, 2, 4, 5, 8])) == [0, 1, 4]
+    assert list(meshgraph.shrink_vertices(offsets, neighbours, [0, 1, 2, 4, 5, 8], rings=2)) == [0]
+    assert list(meshgraph.shrink_vertices(offsets, neighbours, [0, 1, 2, 4, 5, 8], rings=3)) == []
+    assert list(meshgraph.shrink_vertices(offsets, neighbours, range(12))) == list(range(12))
+
+
+def test_shortest_distances():
+    offsets, neighbours = _get_adjacency()
+
+    distances, predecessors = meshgraph.get_shortest_distances(offsets, neighbours, 0)
+
+    assert distances[11] == 5.0
+    assert distances[5] == 2.0
+    assert np.all(np.isinf(distances[12:]))
+    assert predecessors[0] == -1
+    assert len(meshgraph.get_path_from_predecessors(predecessors, 11)) == 6
+
+    distances, _ = meshgraph.get_shortest_distances(offsets, neighbours, [0, 3], max_distance=1.0)
+    assert list(np.flatnonzero(np.isfinite(distances))) == [0, 1, 2, 3, 4, 7]
+
+
+def test_shortest_path_edge_lengths():
+    offsets, neighbours = _get_adjacency()
+    edge_lengths = np.ones(len(neighbours))
+    # Edges that go through vertex 1 are much longer, so the path from 0 to 2 goes around it
+    edge_lengths[neighbours == 1] = 10.0
+    edge_lengths[offsets[1]:offsets[2]] = 10.0
+
+    path = meshgraph.get_shortest_path(offsets, neighbours, 0, 2, edge_lengths=edge_lengths)
+
+    assert list(path) == [0, 4, 5, 6, 2]
+    assert len(meshgraph.get_shortest_path(offsets, neighbours, 0, 13)) == 0
+
+    paths = meshgraph.get_shortest_paths(offsets, neighbours, [(0, 2), (0, 0), (0, 12)], edge_lengths=edge_lengths)
+    assert [list(path) for path in paths] == [[0, 4, 5, 6, 2], [0], []]
+
+
+def test_shortest_path_a_star():
+    offsets, neighbours = _get_adjacency()
+    points = np.column_stack((np.tile(np.arange(4.0), 3), np.repeat(np.arange(3.0), 4), np.zeros(12)))
+    points = np.concatenate((points, [[10.0, 0.0, 0.0], [11.0, 0.0, 0.0], [10.0, 1.0, 0.0]]))
+    edge_lengths = meshgraph.get_edge_lengths(points, offsets, neighbours)
+
+    path = meshgraph.get_shortest_path(offsets, neighbours, 0, 11, edge_lengths=edge_lengths, points=points)
+
+    assert path[0] == 0 and path[-1] == 11
+    assert len(path) == 6
+    assert np.allclose(np.linalg.norm(np.diff(points[path], axis=0), axis=1), 1.0)
@@ -0,0 +1,59 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.api.skinsnapshot
+"""
+
+import pytest
+import numpy as np
+
+# tpDcc.dccs.maya.api package imports Maya modules
+pytest.importorskip('maya')
+
+from tpDcc.dccs.maya.api import skinsnapshot  # noqa: E402
+
+
+def _get_weights(seed, shape=(50, 4)):
+    weights = np.random.RandomState(seed).uniform(size=shape)
+
+    return weights / weights.sum(axis=1)[:, None]
+
+
+def test_snapshot_stores_only_changes():
+    old_weights = _get_weights(0)
+    new_weights = old_weights.copy()
+    new_weights[[3, 10, 49], [0, 2, 3]] = 0.5
+
+    snapshot = skinsnapshot.SkinWeightsSnapshot(old_weights, new_weights)
+    vertex_ids, influence_ids, values = snapshot.get_changes()
+
+    assert snapshot.shape == (50, 4)
+    assert snapshot.count == 3
+    assert list(vertex_ids) == [3, 10, 49]
+    assert list(influence_ids) == [0, 2, 3]
+    assert np.array_equal(values, old_weights[[3, 10, 49], [0, 2, 3]])
+
+
+def test_snapshot_restore():
+    old_weights = _get_weights(1)
+    new_weights = _get_weights(2)
+
+    snapshot = skinsnapshot.SkinWeightsSnapshot(old_weights, new_weights)
+
+    assert np.array_equal(snapshot.restore(new_weights.copy()), old_weights)
+
+
+def test_store_evicts_oldest_snapshots():
+    store = skinsnapshot.SkinWeightsSnapshotStore(memory_budget=1)
+    first_id = store.add(_get_weights(3), _get_weights(4))
+    second_id = store.add(_get_weights(5), _get_weights(6))
+
+    assert first_id not in store
+    assert second_id in store
+    assert not store.restore(first_id, _get_weights(4))
+    assert store.total_bytes == store.get_size(second_id)
+
+    store.remove(second_id)
+    assert len(store) == 0
+    assert store.total_bytes == 0
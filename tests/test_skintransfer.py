@@ -0,0 +1,126 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.core.skintransfer
+"""
+
+import numpy as np
+
+from tpDcc.dccs.maya.core import spatial, skintransfer
+
+
+def _get_sampler(triangles_points, uvs=None):
+    points = np.asarray(triangles_points, dtype=np.float64).reshape(-1, 3)
+    triangles_count = len(points) // 3
+    poly_counts = np.full(triangles_count, 3, dtype=np.int64)
+    poly_connects = np.arange(len(points))
+    uv_ids = poly_connects if uvs is not None else None
+
+    return skintransfer.MeshSampler(points, poly_counts, poly_connects, uvs=uvs, uv_ids=uv_ids)
+
+
+def _get_mixed_triangles():
+    """
+    Returns one large triangle and a cluster of small triangles far from the large triangle centroid
+    """
+
+    triangles = [[[0.0, 0.0, 0.0], [100.0, 0.0, 0.0], [0.0, 100.0, 0.0]]]
+    for i in range(50):
+        x, y = 80.0 + (i % 10), 80.0 + (i // 10)
+        triangles.append([[x, y, 5.0], [x + 0.5, y, 5.0], [x, y + 0.5, 5.0]])
+
+    return np.array(triangles, dtype=np.float64)
+
+
+def _brute_force_closest(triangles, points):
+    count = len(points)
+    repeated_points = np.repeat(points, len(triangles), axis=0)
+    tiled = np.tile(triangles, (count, 1, 1))
+    closest, _ = spatial.closest_points_on_triangles(repeated_points, tiled[:, 0], tiled[:, 1], tiled[:, 2])
+
+    return np.sqrt(((closest - repeated_points) ** 2).sum(axis=1)).reshape(count, len(triangles)).min(axis=1)
+
+
+def _get_distances(sampler, triangles, points, triangle_ids, barycentric):
+    positions = sampler.interpolate(triangles.reshape(-1, 3), triangle_ids, barycentric)
+
+    return np.sqrt(((positions - points) ** 2).sum(axis=1))
+
+
+def test_closest_point_mixed_triangle_sizes():
+    triangles = _get_mixed_triangles()
+    sampler = _get_sampler(triangles)
+    points = np.array([[49.0, 49.0, 0.5]])
+
+    triangle_ids, barycentric = sampler.sample_closest_point(points)
+
+    assert triangle_ids[0] == 0
+    assert np.isclose(_get_distances(sampler, triangles, points, triangle_ids, barycentric)[0], 0.5)
+
+
+def test_closest_point_matches_brute_force():
+    random = np.random.RandomState(0)
+    centers = random.uniform(-10.0, 10.0, (300, 1, 3))
+    sizes = random.choice([0.05, 0.5, 8.0], (300, 1, 1))
+    triangles = centers + random.uniform(-1.0, 1.0, (300, 3, 3)) * sizes
+    sampler = _get_sampler(triangles)
+    points = random.uniform(-12.0, 12.0, (500, 3))
+
+    triangle_ids, barycentric = sampler.sample_closest_point(points, candidates=2)
+    distances = _get_distances(sampler, triangles, points, triangle_ids, barycentric)
+
+    assert np.allclose(distances, _brute_force_closest(triangles, points))
+
+
+def test_ray_cast_finds_far_hits():
+    # Many small triangles around the ray origin that the ray does not hit, and a single hit far along the ray
+    triangles = [[[-50.0, -50.0, 100.0], [50.0, -50.0, 100.0], [0.0, 50.0, 100.0]]]
+    for i in range(100):
+        x, y = 2.0 + (i % 10), 2.0 + (i // 10)
+        triangles.append([[x, y, 0.0], [x + 0.5, y, 0.0], [x, y + 0.5, 0.0]])
+    triangles = np.array(triangles, dtype=np.float64)
+    sampler = _get_sampler(triangles)
+    points = np.array([[0.0, 0.0, 0.0]])
+
+    triangle_ids, barycentric = sampler.sample_ray_cast(points, np.array([[0.0, 0.0, 1.0]]))
+    assert triangle_ids[0] == 0
+    assert np.isclose(_get_distances(sampler, triangles, points, triangle_ids, barycentric)[0], 100.0)
+
+    # Hits beyond the maximum distance fall back to the closest point
+    triangle_ids, _ = sampler.sample_ray_cast(points, np.array([[0.0, 0.0, 1.0]]), max_distance=10.0)
+    assert triangle_ids[0] != 0
+
+
+def test_ray_cast_matches_brute_force():
+    random = np.random.RandomState(1)
+    centers = random.uniform(-10.0, 10.0, (200, 1, 3))
+    triangles = centers + random.uniform(-1.0, 1.0, (200, 3, 3)) * random.choice([0.2, 4.0], (200, 1, 1))
+    bvh = spatial.TriangleBVH(triangles[:, 0], triangles[:, 1], triangles[:, 2])
+    origins = random.uniform(-12.0, 12.0, (300, 3))
+    directions = random.normal(size=(300, 3))
+
+    triangle_ids, _, distances = bvh.intersect_rays(origins, directions)
+
+    repeated = len(triangles)
+    hits, all_distances, _ = spatial.intersect_rays_triangles(
+        np.repeat(origins, repeated, axis=0), np.repeat(directions, repeated, axis=0),
+        np.tile(triangles[:, 0], (300, 1)), np.tile(triangles[:, 1], (300, 1)), np.tile(triangles[:, 2], (300, 1)))
+    expected = np.where(hits, np.abs(all_distances), np.inf).reshape(300, repeated).min(axis=1)
+
+    assert np.array_equal(triangle_ids < 0, np.isinf(expected))
+    assert np.allclose(distances[~np.isinf(expected)], expected[~np.isinf(expected)])
+
+
+def test_sample_uv_outside_triangles():
+    triangles = np.array([
+        [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+        [[5.0, 5.0, 0.0], [5.5, 5.0, 0.0], [5.0, 5.5, 0.0]]])
+    uvs = triangles.reshape(-1, 3)[:, :2]
+    sampler = _get_sampler(triangles, uvs=uvs)
+
+    triangle_ids, barycentric = sampler.sample_uv(np.array([[0.25, 0.25], [2.0, -1.0]]))
+
+    assert list(triangle_ids) == [0, 0]
+    assert np.allclose(barycentric[0], [0.5, 0.25, 0.25])
+    assert np.allclose(barycentric[1], [0.0, 1.0, 0.0])
@@ -0,0 +1,84 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.data.skinweights
+"""
+
+import pytest
+import numpy as np
+
+# tpDcc.dccs.maya.data.skinweights module imports Maya modules
+pytest.importorskip('maya')
+
+from tpDcc.dccs.maya.data import skinweights  # noqa: E402
+
+
+def _get_sparse_weights(vertices_count=25, influences_count=5, seed=0):
+    random = np.random.RandomState(seed)
+    weights = random.uniform(size=(vertices_count, influences_count))
+    weights[weights < 0.6] = 0.0
+    weights[:, 0] += 0.1
+    rows, influence_ids = np.nonzero(weights)
+    offsets = np.zeros(vertices_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=vertices_count), out=offsets[1:])
+
+    return weights, offsets, influence_ids, weights[rows, influence_ids]
+
+
+def _to_dense(offsets, influence_ids, values, influences_count):
+    weights = np.zeros((len(offsets) - 1, influences_count))
+    weights[np.repeat(np.arange(len(offsets) - 1), np.diff(offsets)), influence_ids] = values
+
+    return weights
+
+
+def test_write_read_round_trip(tmp_path):
+    weights, offsets, influence_ids, values = _get_sparse_weights()
+    influences = ['joint{}'.format(i) for i in range(weights.shape[1])]
+    file_path = str(tmp_path / 'weights.skin')
+
+    skinweights.SkinWeightsFile.write(
+        file_path, influences, offsets, influence_ids, values, topology_hash='abc', block_size=4, mesh='body')
+    weights_file = skinweights.SkinWeightsFile(file_path)
+
+    assert weights_file.influences == influences
+    assert weights_file.vertices_count == len(weights)
+    assert weights_file.topology_hash == 'abc'
+    assert weights_file.header['mesh'] == 'body'
+    assert np.array_equal(_to_dense(*weights_file.read(), influences_count=len(influences)), weights)
+
+
+def test_partial_read(tmp_path):
+    weights, offsets, influence_ids, values = _get_sparse_weights(seed=1)
+    influences = ['joint{}'.format(i) for i in range(weights.shape[1])]
+    file_path = str(tmp_path / 'weights.skin')
+    skinweights.SkinWeightsFile.write(file_path, influences, offsets, influence_ids, values, block_size=4)
+
+    vertices_ids = np.array([21, 3, 9, 3])
+    read_weights = _to_dense(
+        *skinweights.SkinWeightsFile(file_path).read(influences=['joint0', 'joint3'], vertices_ids=vertices_ids),
+        influences_count=len(influences))
+
+    expected = np.zeros((len(vertices_ids), len(influences)))
+    expected[:, [0, 3]] = weights[vertices_ids][:, [0, 3]]
+    assert np.array_equal(read_weights, expected)
+
+
+def test_float32_values(tmp_path):
+    weights, offsets, influence_ids, values = _get_sparse_weights(seed=2)
+    file_path = str(tmp_path / 'weights.skin')
+    skinweights.SkinWeightsFile.write(
+        file_path, ['a', 'b', 'c', 'd', 'e'], offsets, influence_ids, values, values_dtype='float32')
+
+    _, _, read_values = skinweights.SkinWeightsFile(file_path).read()
+
+    assert np.allclose(read_values, values.astype(np.float32))
+
+
+def test_invalid_file(tmp_path):
+    file_path = tmp_path / 'weights.skin'
+    file_path.write_bytes(b'NOTSKINW' + b'\0' * 16)
+
+    with pytest.raises(IOError):
+        skinweights.SkinWeightsFile(str(file_path)).header
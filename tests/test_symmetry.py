@@ -0,0 +1,113 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc.dccs.maya.core.symmetry
+"""
+
+import pytest
+import numpy as np
+
+# tpDcc.dccs.maya.core.symmetry module imports Maya modules
+pytest.importorskip('maya')
+
+from tpDcc.dccs.maya.core import symmetry  # noqa: E402
+
+
+def _get_grid(columns=5, rows=4):
+    """
+    Returns the points and the CSR adjacency of a grid that is symmetric across the X = 0 plane
+    """
+
+    xs, ys = np.meshgrid(np.arange(columns) - (columns - 1) / 2.0, np.arange(rows))
+    points = np.column_stack((xs.ravel(), ys.ravel(), np.zeros(columns * rows)))
+    edges = list()
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns:
+                edges.append((vertex, vertex + 1))
+            if row + 1 < rows:
+                edges.append((vertex, vertex + columns))
+    edges = np.array(edges)
+    edges = np.concatenate((edges, edges[:, ::-1]))
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    offsets = np.zeros(len(points) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges[:, 0], minlength=len(points)), out=offsets[1:])
+
+    return points, (offsets, edges[:, 1])
+
+
+def _get_expected_table(points):
+    mirrored = points * [-1.0, 1.0, 1.0]
+
+    return np.array([np.flatnonzero(np.all(np.isclose(points, point), axis=1))[0] for point in mirrored])
+
+
+def test_build_symmetry_arrays():
+    points, _ = _get_grid()
+    order = np.random.RandomState(0).permutation(len(points))
+    points = points[order]
+
+    sym_table = symmetry.build_symmetry_arrays(points)
+
+    assert np.array_equal(sym_table, _get_expected_table(points))
+    middle = np.flatnonzero(points[:, 0] == 0.0)
+    assert np.array_equal(sym_table[middle], middle)
+
+
+def test_build_symmetry_arrays_mid():
+    points, _ = _get_grid()
+    points[:, 0] += 10.0
+
+    sym_table = symmetry.build_symmetry_arrays(points, mid=10.0)
+
+    assert np.all(sym_table >= 0)
+    assert np.allclose(points[sym_table, 0], 20.0 - points[:, 0])
+
+
+def test_build_symmetry_arrays_topology_fallback():
+    points, adjacency = _get_grid()
+    expected = _get_expected_table(points)
+    points[6] += [0.05, 0.02, 0.0]
+
+    spatial_table = symmetry.build_symmetry_arrays(points)
+    topology_table = symmetry.build_symmetry_arrays(points, adjacency=adjacency)
+
+    assert spatial_table[6] == -1
+    assert spatial_table[expected[6]] == -1
+    assert np.array_equal(topology_table, expected)
+
+
+def test_mirror_points():
+    points, _ = _get_grid()
+    sym_table = _get_expected_table(points)
+    points[0] = [-2.0, 0.0, 3.0]
+    points[2, 0] = 0.0005
+
+    new_points, modified_ids = symmetry.mirror_points(points, sym_table, neg_to_pos=True)
+
+    assert np.allclose(new_points[sym_table[0]], [2.0, 0.0, 3.0])
+    assert new_points[2, 0] == 0.0
+    assert np.allclose(new_points[points[:, 0] < 0], points[points[:, 0] < 0])
+    assert 0 not in modified_ids
+    assert sym_table[0] in modified_ids
+
+
+def test_mirror_points_flip():
+    points, _ = _get_grid()
+    sym_table = _get_expected_table(points)
+    points[0, 2] = 1.0
+
+    new_points, _ = symmetry.mirror_points(points, sym_table, flip=True)
+
+    assert new_points[0, 2] == 0.0
+    assert new_points[sym_table[0], 2] == 1.0
+
+
+def test_symmetry_table_key():
+    key = symmetry.get_symmetry_table_key('abc', tolerance=0.001)
+
+    assert key == symmetry.get_symmetry_table_key('abc', tolerance=0.001, mid_offset=0.0002)
+    assert key != symmetry.get_symmetry_table_key('abc', tolerance=0.001, mid_offset=0.5)
+    assert key != symmetry.get_symmetry_table_key('abc', axis=1, tolerance=0.001)
@@ -0,0 +1,482 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to read and write blendShape weights and target deltas as NumPy arrays and a cache of
+blendShape target alias lookups
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+import logging
+import threading
+
+import numpy as np
+
+import maya.cmds
+import maya.api.OpenMaya
+
+from tpDcc.libs.python import python
+from tpDcc.dccs.maya.api import deformer as api_deformer
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+_WEIGHT_ALIAS_REGEX = re.compile(r'^(?:weight|w)\[(\d+)\]$')
+
+
+class BlendShapeTargetMap(object):
+    """
+    Stores the weight aliases of a blendShape node and provides constant time lookups between target aliases and
+    target indices (logical index of the blendShape weight plug)
+    """
+
+    def __init__(self, blendshape_fn):
+        """
+        :param blendshape_fn: MFnDependencyNode
+        """
+
+        self._index_by_alias = dict()
+        self._alias_by_index = dict()
+        for alias, plug_name in blendshape_fn.getAliasList():
+            match = _WEIGHT_ALIAS_REGEX.match(plug_name)
+            if not match:
+                continue
+            self._index_by_alias[alias] = int(match.group(1))
+            self._alias_by_index[int(match.group(1))] = alias
+
+        self._indices = np.array(sorted(self._alias_by_index.keys()), dtype=np.int32)
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __contains__(self, alias):
+        return alias in self._index_by_alias
+
+    @property
+    def indices(self):
+        return self._indices
+
+    @property
+    def aliases(self):
+        return [self._alias_by_index[int(index)] for index in self._indices]
+
+    def get_index(self, alias):
+        """
+        Returns the target index of the target with the given alias
+        :param alias: str, target weight alias
+        :return: int or None
+        """
+
+        return self._index_by_alias.get(alias)
+
+    def get_alias(self, index):
+        """
+        Returns the alias of the target with the given index
+        :param index: int, target index
+        :return: str or None
+        """
+
+        return self._alias_by_index.get(int(index))
+
+    def get_alias_to_index(self):
+        """
+        Returns a copy of the alias to target index map
+        :return: dict(str, int)
+        """
+
+        return dict(self._index_by_alias)
+
+    def get_index_to_alias(self):
+        """
+        Returns a copy of the target index to alias map
+        :return: dict(int, str)
+        """
+
+        return dict(self._alias_by_index)
+
+
+class BlendShapeTargetMapCache(object):
+    """
+    Keeps one target map per blendShape node, keyed by the blendShape MObjectHandle
+    Maps are invalidated when a weight plug is added or removed, when an attribute alias changes or when the
+    blendShape node is deleted
+    """
+
+    def __init__(self):
+        self._maps = dict()
+        self._stale_callbacks = list()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._maps)
+
+    def get(self, blendshape):
+        """
+        Returns the target map of the given blendShape, building it if necessary
+        :param blendshape: str or MObject or MFnDependencyNode
+        :return: BlendShapeTargetMap
+        """
+
+        blendshape_obj = get_blendshape_object(blendshape)
+        handle = maya.api.OpenMaya.MObjectHandle(blendshape_obj)
+        key = handle.hashCode()
+
+        with self._lock:
+            self._remove_stale_callbacks()
+            cached = self._maps.get(key)
+            if cached and cached[0].isValid() and cached[0] == handle:
+                return cached[1]
+            if cached:
+                self._remove(key)
+
+        target_map = BlendShapeTargetMap(maya.api.OpenMaya.MFnDependencyNode(blendshape_obj))
+        callback_ids = self._add_callbacks(key, blendshape_obj)
+
+        with self._lock:
+            if key in self._maps:
+                self._remove(key)
+            self._maps[key] = (handle, target_map, callback_ids)
+
+        return target_map
+
+    def invalidate(self, blendshape):
+        """
+        Removes the cached target map of the given blendShape
+        :param blendshape: str or MObject or MFnDependencyNode
+        """
+
+        key = maya.api.OpenMaya.MObjectHandle(get_blendshape_object(blendshape)).hashCode()
+        with self._lock:
+            self._remove(key)
+            self._remove_stale_callbacks()
+
+    def clear(self):
+        """
+        Removes all cached target maps and their callbacks
+        """
+
+        with self._lock:
+            for key in list(self._maps.keys()):
+                self._remove(key)
+            self._remove_stale_callbacks()
+
+    def _add_callbacks(self, key, blendshape_obj):
+        """
+        Internal function that registers the callbacks that invalidate the target map with the given key
+        """
+
+        callback_ids = maya.api.OpenMaya.MCallbackIdArray()
+        callback_ids.append(maya.api.OpenMaya.MNodeMessage.addAttributeChangedCallback(
+            blendshape_obj, self._on_attribute_changed, key))
+        callback_ids.append(maya.api.OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+            blendshape_obj, self._on_invalidate, key))
+
+        return callback_ids
+
+    def _on_attribute_changed(self, msg, plug, other_plug, key):
+        """
+        Internal callback function that invalidates a target map when a weight plug is added, removed or renamed
+        """
+
+        if msg & maya.api.OpenMaya.MNodeMessage.kAttributeRenamed:
+            self._on_invalidate(key)
+            return
+
+        array_msg = maya.api.OpenMaya.MNodeMessage.kAttributeArrayAdded | \
+            maya.api.OpenMaya.MNodeMessage.kAttributeArrayRemoved
+        if not msg & array_msg:
+            return
+
+        if maya.api.OpenMaya.MFnAttribute(plug.attribute()).name != 'weight':
+            return
+
+        self._on_invalidate(key)
+
+    def _on_invalidate(self, *args):
+        """
+        Internal callback function that invalidates a target map. Key is always received as the last argument
+        Callbacks are not removed while they are being executed, they are removed the next time the cache is used
+        """
+
+        key = args[-1]
+        with self._lock:
+            cached = self._maps.pop(key, None)
+            if cached:
+                self._stale_callbacks.append(cached[2])
+
+    def _remove(self, key):
+        """
+        Internal function that removes the target map with the given key. Lock must be held by the caller
+        """
+
+        cached = self._maps.pop(key, None)
+        if cached:
+            self._stale_callbacks.append(cached[2])
+
+    def _remove_stale_callbacks(self):
+        """
+        Internal function that removes the callbacks of the invalidated target maps. Lock must be held by the caller
+        """
+
+        while self._stale_callbacks:
+            try:
+                maya.api.OpenMaya.MMessage.removeCallbacks(self._stale_callbacks.pop())
+            except RuntimeError:
+                pass
+
+
+TARGET_MAP_CACHE = BlendShapeTargetMapCache()
+
+
+def get_blendshape_object(blendshape):
+    """
+    Returns the MObject of the given blendShape node
+    :param blendshape: str or MObject or MFnDependencyNode
+    :return: MObject
+    """
+
+    if isinstance(blendshape, maya.api.OpenMaya.MObject):
+        return blendshape
+    if isinstance(blendshape, maya.api.OpenMaya.MFnDependencyNode):
+        return blendshape.object()
+
+    return maya.api.OpenMaya.MGlobal.getSelectionListByName(blendshape).getDependNode(0)
+
+
+def get_target_map(blendshape):
+    """
+    Returns the cached target map of the given blendShape
+    :param blendshape: str or MObject or MFnDependencyNode
+    :return: BlendShapeTargetMap
+    """
+
+    return TARGET_MAP_CACHE.get(blendshape)
+
+
+def invalidate_target_map(blendshape):
+    """
+    Removes the cached target map of the given blendShape
+    :param blendshape: str or MObject or MFnDependencyNode
+    """
+
+    TARGET_MAP_CACHE.invalidate(blendshape)
+
+
+def clear_target_maps():
+    """
+    Removes all cached target maps
+    """
+
+    TARGET_MAP_CACHE.clear()
+
+
+def get_target_index(blendshape, target):
+    """
+    Returns the target index of the given blendShape target
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int, target alias or target index
+    :return: int
+    """
+
+    if not python.is_string(target):
+        return int(target)
+
+    target_index = get_target_map(blendshape).get_index(target)
+    if target_index is None:
+        raise ValueError('BlendShape "{}" has no target "{}"!'.format(blendshape, target))
+
+    return target_index
+
+
+def get_geometry_components_count(blendshape, geometry_index=0):
+    """
+    Returns the number of components (vertices or CVs) of the geometry deformed by the given blendShape
+    :param blendshape: str, name of the blendShape node
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: int
+    """
+
+    return api_deformer.get_components_count(get_blendshape_object(blendshape), geometry_index=geometry_index)
+
+
+def get_weights_attribute(blendshape, target=None, geometry_index=0):
+    """
+    Returns the name of the per-vertex weights multi attribute of the given target or of the base weights
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int or None, target alias or target index. If None, base weights attribute is returned
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: str
+    """
+
+    input_target_attr = '{}.inputTarget[{}]'.format(blendshape, geometry_index)
+    if target is None:
+        return '{}.baseWeights'.format(input_target_attr)
+
+    return '{}.inputTargetGroup[{}].targetWeights'.format(input_target_attr, get_target_index(blendshape, target))
+
+
+def get_weights_array(blendshape, target=None, geometry_index=0, components_count=None):
+    """
+    Returns the per-vertex weights of the given blendShape target, or the base weights, as a dense array
+    Values are read with a single getAttr call. Elements that do not exist yet use the default weight (1.0)
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int or None, target alias or target index. If None, base weights are returned
+    :param geometry_index: int, logical index of the deformed geometry
+    :param components_count: int or None, number of components of the deformed geometry. If None, it is queried
+    :return: np.ndarray, float64 array of shape (components_count,)
+    """
+
+    if components_count is None:
+        components_count = get_geometry_components_count(blendshape, geometry_index=geometry_index)
+
+    return api_deformer.get_multi_array(
+        get_weights_attribute(blendshape, target=target, geometry_index=geometry_index), components_count)
+
+
+def set_weights_array(blendshape, weights, target=None, geometry_index=0):
+    """
+    Sets the per-vertex weights of the given blendShape target, or the base weights, with a single setAttr call
+    :param blendshape: str, name of the blendShape node
+    :param weights: np.ndarray or list(float), per-vertex weights
+    :param target: str or int or None, target alias or target index. If None, base weights are set
+    :param geometry_index: int, logical index of the deformed geometry
+    """
+
+    api_deformer.set_multi_array(
+        get_weights_attribute(blendshape, target=target, geometry_index=geometry_index), weights)
+
+
+def get_targets_weights_array(blendshape, targets=None, geometry_index=0):
+    """
+    Returns the per-vertex weights of multiple blendShape targets
+    :param blendshape: str, name of the blendShape node
+    :param targets: list(str or int) or None, target aliases or indices. If None, all targets are returned
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: tuple(np.ndarray, np.ndarray), target indices and weights array of shape (targets_count, components_count)
+    """
+
+    if targets is None:
+        target_indices = get_target_map(blendshape).indices
+    else:
+        target_indices = np.array([get_target_index(blendshape, target) for target in targets], dtype=np.int32)
+
+    components_count = get_geometry_components_count(blendshape, geometry_index=geometry_index)
+    weights = np.empty((len(target_indices), components_count), dtype=np.float64)
+    for i, target_index in enumerate(target_indices):
+        weights[i] = get_weights_array(
+            blendshape, target=int(target_index), geometry_index=geometry_index, components_count=components_count)
+
+    return target_indices, weights
+
+
+def set_targets_weights_array(blendshape, targets, weights, geometry_index=0):
+    """
+    Sets the per-vertex weights of multiple blendShape targets
+    :param blendshape: str, name of the blendShape node
+    :param targets: list(str or int), target aliases or indices
+    :param weights: np.ndarray, weights array of shape (targets_count, components_count)
+    :param geometry_index: int, logical index of the deformed geometry
+    """
+
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 2 or len(weights) != len(targets):
+        raise ValueError('Weights shape {} does not match {} targets'.format(weights.shape, len(targets)))
+
+    for target, target_weights in zip(targets, weights):
+        set_weights_array(blendshape, target_weights, target=target, geometry_index=geometry_index)
+
+
+def get_target_item_attribute(blendshape, target, geometry_index=0, item_index=6000):
+    """
+    Returns the name of the inputTargetItem attribute of the given blendShape target
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int, target alias or target index
+    :param geometry_index: int, logical index of the deformed geometry
+    :param item_index: int, logical index of the target item (6000 + 1000 * weight, 6000 is the full target)
+    :return: str
+    """
+
+    return '{}.inputTarget[{}].inputTargetGroup[{}].inputTargetItem[{}]'.format(
+        blendshape, geometry_index, get_target_index(blendshape, target), item_index)
+
+
+def get_target_item_indices(blendshape, target, geometry_index=0):
+    """
+    Returns the logical indices of the existing target items (full target and in-betweens) of the given target
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int, target alias or target index
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: list(int)
+    """
+
+    attribute = '{}.inputTarget[{}].inputTargetGroup[{}].inputTargetItem'.format(
+        blendshape, geometry_index, get_target_index(blendshape, target))
+
+    return maya.cmds.getAttr(attribute, multiIndices=True) or list()
+
+
+def get_target_deltas(blendshape, target, geometry_index=0, item_index=6000, tolerance=None):
+    """
+    Returns the sparse deltas stored in the inputPointsTarget/inputComponentsTarget attributes of the given target
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int, target alias or target index
+    :param geometry_index: int, logical index of the deformed geometry
+    :param item_index: int, logical index of the target item (6000 + 1000 * weight, 6000 is the full target)
+    :param tolerance: float or None, if given, deltas with a length lower or equal than this value are discarded
+    :return: tuple(np.ndarray, np.ndarray), int32 component ids and float64 deltas array of shape (ids_count, 3)
+    """
+
+    item_attribute = get_target_item_attribute(
+        blendshape, target, geometry_index=geometry_index, item_index=item_index)
+    ids = api_deformer.components_to_ids(maya.cmds.getAttr('{}.inputComponentsTarget'.format(item_attribute)))
+    points = maya.cmds.getAttr('{}.inputPointsTarget'.format(item_attribute)) or list()
+    deltas = np.asarray(points, dtype=np.float64).reshape(len(points), -1)[:, :3]
+    if len(deltas) != len(ids):
+        raise RuntimeError('Target "{}" of blendShape "{}" stores {} deltas for {} components!'.format(
+            target, blendshape, len(deltas), len(ids)))
+
+    order = np.argsort(ids, kind='mergesort')
+    ids = ids[order]
+    deltas = deltas[order]
+    if tolerance is not None:
+        keep = (deltas ** 2).sum(axis=1) > tolerance ** 2
+        ids = ids[keep]
+        deltas = deltas[keep]
+
+    return ids, deltas
+
+
+def set_target_deltas(blendshape, target, ids, deltas, geometry_index=0, item_index=6000, component_type=None):
+    """
+    Stores the given sparse deltas in the inputPointsTarget/inputComponentsTarget attributes of the given target
+    :param blendshape: str, name of the blendShape node
+    :param target: str or int, target alias or target index
+    :param ids: np.ndarray or list(int), component ids
+    :param deltas: np.ndarray, deltas array of shape (ids_count, 3)
+    :param geometry_index: int, logical index of the deformed geometry
+    :param item_index: int, logical index of the target item (6000 + 1000 * weight, 6000 is the full target)
+    :param component_type: str or None, component type prefix ("vtx" for meshes, "cv" for curves, "pt" for
+        particles). If None, it is retrieved from the deformed geometry
+    """
+
+    ids = np.asarray(ids, dtype=np.int64).ravel()
+    deltas = np.asarray(deltas, dtype=np.float64).reshape(-1, 3)
+    if len(ids) != len(deltas):
+        raise ValueError('{} deltas given for {} components!'.format(len(deltas), len(ids)))
+
+    order = np.argsort(ids, kind='mergesort')
+    ids = ids[order]
+    points = np.column_stack((deltas[order], np.ones(len(ids))))
+    if component_type is None:
+        component_type = api_deformer.get_component_type(
+            api_deformer.get_geometry_path(get_blendshape_object(blendshape), geometry_index=geometry_index))
+    components = api_deformer.ids_to_components(ids, component_type=component_type)
+
+    item_attribute = get_target_item_attribute(
+        blendshape, target, geometry_index=geometry_index, item_index=item_index)
+    maya.cmds.setAttr(
+        '{}.inputPointsTarget'.format(item_attribute), len(points), *[tuple(point) for point in points.tolist()],
+        type='pointArray')
+    maya.cmds.setAttr(
+        '{}.inputComponentsTarget'.format(item_attribute), len(components), *components, type='componentList')
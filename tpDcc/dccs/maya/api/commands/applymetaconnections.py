@@ -0,0 +1,45 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains undoable command to apply the message attributes and connections queued in a meta network
+connection builder
+"""
+
+import logging
+
+from tpDcc.core import command
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+
+class ApplyMetaConnections(command.DccCommand, object):
+    """
+    Applies all the operations queued in a MetaConnectionBuilder with its MDGModifier
+    The modifier keeps track of the applied operations, so they are undone and redone as a single undo entry
+    """
+
+    id = 'tpDcc-dccs-maya-commands-applyMetaConnections'
+    creator = 'Tomas Poveda'
+    is_undoable = True
+
+    _modifier = None
+    _connections_count = 0
+
+    def run(self, builder=None):
+
+        # Command is run again when it is redone. Queued operations are only applied the first time
+        if self._modifier is not None:
+            self._modifier.doIt()
+            return self._connections_count
+
+        self._modifier = builder.modifier
+        self._connections_count = builder.apply_modifier()
+
+        return self._connections_count
+
+    def undo(self):
+        if self._modifier is None:
+            return
+
+        self._modifier.undoIt()
@@ -0,0 +1,55 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains undoable command to set mesh vertex positions
+"""
+
+import logging
+
+import numpy as np
+
+from tpDcc.core import command
+from tpDcc.dccs.maya.api import mesh as api_mesh
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+
+class SetMeshPoints(command.DccCommand, object):
+    """
+    Sets all the vertex positions of a mesh with a single MFnMesh.setPoints call
+    Only the positions that change are stored to undo the command
+    """
+
+    id = 'tpDcc-dccs-maya-commands-setMeshPoints'
+    creator = 'Tomas Poveda'
+    is_undoable = True
+
+    _mesh_name = None
+    _world_space = False
+    _changed_ids = None
+    _old_points = None
+
+    def run(self, mesh_name=None, points=None, world_space=False):
+
+        self._mesh_name = mesh_name
+        self._world_space = world_space
+
+        old_points = api_mesh.get_mesh_points(mesh_name, world_space=world_space)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if points.shape != old_points.shape:
+            raise ValueError('Points shape {} does not match mesh points shape {}'.format(
+                points.shape, old_points.shape))
+
+        self._changed_ids = np.flatnonzero(np.any(old_points != points, axis=1))
+        self._old_points = old_points[self._changed_ids]
+
+        api_mesh.set_mesh_points(mesh_name, points, world_space=world_space)
+
+    def undo(self):
+        if self._changed_ids is None or not len(self._changed_ids):
+            return
+
+        points = api_mesh.get_mesh_points(self._mesh_name, world_space=self._world_space)
+        points[self._changed_ids] = self._old_points
+        api_mesh.set_mesh_points(self._mesh_name, points, world_space=self._world_space)
@@ -5,9 +5,12 @@
 Module that contains commands for tpRigToolkit-rigtoolbox for Maya
 """
 
-import maya.api.OpenMaya
+import logging
 
 from tpDcc.core import command
+from tpDcc.dccs.maya.api import skin as api_skin, skinsnapshot
+
+logger = logging.getLogger('tpDcc-dccs-maya')
 
 
 class SetSkinWeights(command.DccCommand, object):
@@ -23,7 +26,10 @@ class SetSkinWeights(command.DccCommand, object):
     _mesh_path = None
     _mesh_components = None
     _influences_array = None
-    _old_weights = None
+    _snapshot_id = None
+
+    # Snapshot store where old weights are kept. If None, skin snapshot module default store is used
+    snapshot_store = None
 
     def run(self, skin_cluster=None, mesh_path=None, mesh_components=None, influences_array=None, weights_array=None):
 
@@ -32,20 +38,53 @@ class SetSkinWeights(command.DccCommand, object):
         self._mesh_components = mesh_components
         self._influences_array = influences_array
 
-        skin_weights = self._get_skin_weights(skin_cluster, mesh_path, mesh_components, influences_array)
-        self._old_weights = str(list(skin_weights))
+        # Command is run again when it is redone. Its snapshot is reused, unless it was evicted from the store
+        snapshot_store = self._get_snapshot_store()
+        if self._snapshot_id is None or self._snapshot_id not in snapshot_store:
+            influences_count = len(influences_array)
+            old_weights = api_skin.weights_to_array(
+                self._get_skin_weights(skin_cluster, mesh_path, mesh_components, influences_array), influences_count)
+            new_weights = api_skin.weights_to_array(weights_array, influences_count)
+            self._snapshot_id = snapshot_store.add(old_weights, new_weights)
 
         skin_cluster.setWeights(mesh_path, mesh_components, influences_array, weights_array, False)
 
     def undo(self):
-        if self._old_weights and self._skin_cluster:
-            weights_array = maya.api.OpenMaya.MDoubleArray()
-            for i in self._old_weights[1:-1].split(','):
-                weights_array.append(float(i))
-            self._skin_cluster.setWeights(
-                self._mesh_path, self._mesh_components, self._influences_array, weights_array, False)
+        if self._snapshot_id is None or not self._skin_cluster:
+            return
+
+        snapshot_store = self._get_snapshot_store()
+        current_weights = api_skin.weights_to_array(
+            self._get_skin_weights(self._skin_cluster, self._mesh_path, self._mesh_components, self._influences_array),
+            len(self._influences_array))
+        if not snapshot_store.restore(self._snapshot_id, current_weights):
+            logger.warning(
+                'Impossible to undo set skin weights. Undo snapshot was evicted from memory, '
+                'increase skin snapshot store memory budget!')
+            return
+
+        self._skin_cluster.setWeights(
+            self._mesh_path, self._mesh_components, self._influences_array,
+            api_skin.array_to_weights(current_weights), False)
+
+    def get_undo_size(self):
+        """
+        Returns the number of bytes used to store the undo information of this command
+        :return: int
+        """
+
+        if self._snapshot_id is None:
+            return 0
+
+        return self._get_snapshot_store().get_size(self._snapshot_id)
 
     def _get_skin_weights(self, skin_cluster, mesh_path, mesh_components, influences_array):
         weights = skin_cluster.getWeights(mesh_path, mesh_components, influences_array)
 
         return weights
+
+    def _get_snapshot_store(self):
+        if self.snapshot_store is not None:
+            return self.snapshot_store
+
+        return skinsnapshot.get_snapshot_store()
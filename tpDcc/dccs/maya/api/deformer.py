@@ -0,0 +1,351 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to read and write geometryFilter deformer weights and membership as NumPy arrays
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+import logging
+
+import numpy as np
+
+import maya.cmds
+import maya.api.OpenMaya
+import maya.api.OpenMayaAnim
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+_COMPONENT_RANGE_REGEX = re.compile(r'^[^\[\]]*\[(\d+)(?::(\d+))?\]$')
+
+# Component names of geometry types whose components are indexed with a single index
+SINGLE_INDEXED_COMPONENTS = {
+    'mesh': 'vtx',
+    'nurbsCurve': 'cv',
+    'particle': 'pt',
+    'nParticle': 'pt'
+}
+
+
+def get_deformer_object(deformer):
+    """
+    Returns the MObject of the given deformer
+    :param deformer: str or MObject or MFnDependencyNode
+    :return: MObject
+    """
+
+    if isinstance(deformer, maya.api.OpenMaya.MObject):
+        return deformer
+    if isinstance(deformer, maya.api.OpenMaya.MFnDependencyNode):
+        return deformer.object()
+
+    return maya.api.OpenMaya.MGlobal.getSelectionListByName(deformer).getDependNode(0)
+
+
+def get_geometry_path(deformer, geometry_index=0):
+    """
+    Returns the MDagPath of the geometry deformed by the given deformer at the given index
+    :param deformer: str or MObject, deformer node
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: MDagPath
+    """
+
+    return maya.api.OpenMayaAnim.MFnGeometryFilter(get_deformer_object(deformer)).getPathAtIndex(geometry_index)
+
+
+def get_components_count(deformer, geometry_index=0):
+    """
+    Returns the number of components (vertices, CVs or points) of the geometry deformed by the given deformer
+    :param deformer: str or MObject, deformer node
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: int
+    """
+
+    return maya.api.OpenMaya.MItGeometry(get_geometry_path(deformer, geometry_index=geometry_index)).count()
+
+
+def components_to_ids(components):
+    """
+    Returns the component indices of the given single indexed component names (such as "vtx[2]" or "vtx[4:10]")
+    Multi indexed component names (such as lattice "pt[0:1][0:1][0:1]") are not supported and raise an error
+    :param components: list(str), component names, as stored in componentList data
+    :return: np.ndarray, int32 component indices, in the same order they are listed
+    """
+
+    if not components:
+        return np.zeros(0, dtype=np.int32)
+
+    ranges = np.zeros((len(components), 2), dtype=np.int64)
+    for i, component_name in enumerate(components):
+        match = _COMPONENT_RANGE_REGEX.match(component_name)
+        if not match:
+            raise ValueError('Component "{}" is not a single indexed component!'.format(component_name))
+        start = int(match.group(1))
+        ranges[i] = start, int(match.group(2)) if match.group(2) is not None else start
+
+    counts = ranges[:, 1] - ranges[:, 0] + 1
+    starts = np.cumsum(counts) - counts
+
+    return (np.repeat(ranges[:, 0] - starts, counts) + np.arange(counts.sum())).astype(np.int32)
+
+
+def ids_to_components(ids, component_type='vtx'):
+    """
+    Returns the component names, with consecutive indices merged into ranges, of the given component indices
+    :param ids: np.ndarray or list(int), sorted component indices
+    :param component_type: str, component type prefix ("vtx" for meshes, "cv" for curves, "pt" for particles)
+    :return: list(str)
+    """
+
+    ids = np.asarray(ids, dtype=np.int64)
+    if not len(ids):
+        return list()
+
+    breaks = np.flatnonzero(ids[1:] != ids[:-1] + 1) + 1
+    starts = ids[np.concatenate(([0], breaks))]
+    ends = ids[np.concatenate((breaks - 1, [len(ids) - 1]))]
+
+    return ['{}[{}]'.format(component_type, start) if start == end else '{}[{}:{}]'.format(
+        component_type, start, end) for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def get_weights_attribute(deformer, geometry_index=0):
+    """
+    Returns the name of the per-component weights multi attribute of the given deformer
+    :param deformer: str, name of the deformer
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: str
+    """
+
+    return '{}.weightList[{}].weights'.format(deformer, geometry_index)
+
+
+def get_multi_array(attribute, count, default=1.0):
+    """
+    Returns the values of the given numeric multi attribute as a dense array, using a single getAttr call
+    :param attribute: str, name of the multi attribute
+    :param count: int, size of the returned array
+    :param default: float, value used by elements that do not exist
+    :return: np.ndarray, float64 array of shape (count,)
+    """
+
+    values = np.full(count, default, dtype=np.float64)
+    indices = maya.cmds.getAttr(attribute, multiIndices=True)
+    if not indices:
+        return values
+
+    indices = np.asarray(indices, dtype=np.int64)
+    stored_values = np.asarray(maya.cmds.getAttr(attribute), dtype=np.float64).ravel()
+    if len(stored_values) != len(indices):
+        raise RuntimeError('Unable to read values from "{}": {} values found for {} indices'.format(
+            attribute, len(stored_values), len(indices)))
+
+    valid = indices < count
+    values[indices[valid]] = stored_values[valid]
+
+    return values
+
+
+def set_multi_array(attribute, values):
+    """
+    Sets all the values of the given numeric multi attribute with a single setAttr call
+    :param attribute: str, name of the multi attribute
+    :param values: np.ndarray or list(float), values of the elements 0 to len(values) - 1
+    """
+
+    values = np.asarray(values, dtype=np.float64).ravel()
+    if not len(values):
+        return
+
+    maya.cmds.setAttr('{}[0:{}]'.format(attribute, len(values) - 1), *values.tolist())
+
+
+def get_weights_array(deformer, geometry_index=0, components_count=None):
+    """
+    Returns the per-component weights of the given deformer as a dense array
+    Components that have no stored weight use the default weight (1.0)
+    :param deformer: str, name of the deformer
+    :param geometry_index: int, logical index of the deformed geometry
+    :param components_count: int or None, number of components of the deformed geometry. If None, it is queried
+    :return: np.ndarray, float64 array of shape (components_count,)
+    """
+
+    if components_count is None:
+        components_count = get_components_count(deformer, geometry_index=geometry_index)
+
+    return get_multi_array(get_weights_attribute(deformer, geometry_index=geometry_index), components_count)
+
+
+def set_weights_array(deformer, weights, geometry_index=0, ids=None):
+    """
+    Sets the per-component weights of the given deformer with a single setAttr call
+    :param deformer: str, name of the deformer
+    :param weights: np.ndarray or list(float), per-component weights. If ids are given, weight of each one of the ids
+    :param geometry_index: int, logical index of the deformed geometry
+    :param ids: np.ndarray or list(int) or None, component ids the weights belong to. If None, weights are dense
+    """
+
+    weights = np.asarray(weights, dtype=np.float64).ravel()
+    if ids is not None:
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        if len(ids) != len(weights):
+            raise ValueError('{} weights given for {} components!'.format(len(weights), len(ids)))
+        dense_weights = get_weights_array(deformer, geometry_index=geometry_index)
+        dense_weights[ids] = weights
+        weights = dense_weights
+
+    set_multi_array(get_weights_attribute(deformer, geometry_index=geometry_index), weights)
+
+
+def get_deformer_set_name(deformer):
+    """
+    Returns the name of the deformer set of the given deformer
+    :param deformer: str or MObject, deformer node
+    :return: str or None, None if the deformer has no deformer set (component tags deformation)
+    """
+
+    try:
+        set_obj = maya.api.OpenMayaAnim.MFnGeometryFilter(get_deformer_object(deformer)).deformerSet()
+    except RuntimeError:
+        return None
+    if set_obj.isNull():
+        return None
+
+    return maya.api.OpenMaya.MFnDependencyNode(set_obj).name()
+
+
+def get_membership_ids(deformer, geometry_index=0):
+    """
+    Returns the ids of the components of the given geometry that are members of the deformer set of the deformer
+    If the deformer has no deformer set, all the components are considered members
+    :param deformer: str, name of the deformer
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: np.ndarray, sorted int32 component ids
+    """
+
+    geometry_path = get_geometry_path(deformer, geometry_index=geometry_index)
+    deformer_set = get_deformer_set_name(deformer)
+    if not deformer_set:
+        return np.arange(maya.api.OpenMaya.MItGeometry(geometry_path).count(), dtype=np.int32)
+
+    set_fn = maya.api.OpenMaya.MFnSet(maya.api.OpenMaya.MGlobal.getSelectionListByName(deformer_set).getDependNode(0))
+    members = set_fn.getMembers(True)
+    ids = list()
+    for i in range(members.length()):
+        member_path, member_component = members.getComponent(i)
+        if member_path.node() != geometry_path.node():
+            continue
+        if member_component.isNull():
+            ids.append(np.arange(maya.api.OpenMaya.MItGeometry(member_path).count(), dtype=np.int32))
+        elif member_component.hasFn(maya.api.OpenMaya.MFn.kSingleIndexedComponent):
+            ids.append(np.array(
+                maya.api.OpenMaya.MFnSingleIndexedComponent(member_component).getElements(), dtype=np.int32))
+        else:
+            geometry_it = maya.api.OpenMaya.MItGeometry(member_path, member_component)
+            component_ids = list()
+            while not geometry_it.isDone():
+                component_ids.append(geometry_it.index())
+                geometry_it.next()
+            ids.append(np.array(component_ids, dtype=np.int32))
+
+    if not ids:
+        return np.zeros(0, dtype=np.int32)
+
+    return np.unique(np.concatenate(ids)).astype(np.int32)
+
+
+def get_membership_mask(deformer, geometry_index=0, components_count=None):
+    """
+    Returns a boolean mask with the components of the given geometry that are members of the deformer
+    :param deformer: str, name of the deformer
+    :param geometry_index: int, logical index of the deformed geometry
+    :param components_count: int or None, number of components of the deformed geometry. If None, it is queried
+    :return: np.ndarray
+    """
+
+    if components_count is None:
+        components_count = get_components_count(deformer, geometry_index=geometry_index)
+
+    mask = np.zeros(components_count, dtype=bool)
+    mask[get_membership_ids(deformer, geometry_index=geometry_index)] = True
+
+    return mask
+
+
+def get_component_type(geometry_path):
+    """
+    Returns the single indexed component type prefix of the given geometry
+    :param geometry_path: MDagPath, path of the geometry
+    :return: str, component type prefix ("vtx" for meshes, "cv" for curves, "pt" for particles)
+    """
+
+    geometry_type = maya.api.OpenMaya.MFnDependencyNode(geometry_path.node()).typeName
+    component_type = SINGLE_INDEXED_COMPONENTS.get(geometry_type)
+    if not component_type:
+        raise ValueError('Geometry "{}" of type "{}" has no single indexed components!'.format(
+            geometry_path.partialPathName(), geometry_type))
+
+    return component_type
+
+
+def get_components_names(deformer, ids, geometry_index=0):
+    """
+    Returns the component names, with consecutive ids merged into ranges, of the given deformed geometry components
+    :param deformer: str, name of the deformer
+    :param ids: np.ndarray or list(int), sorted component ids
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: list(str)
+    """
+
+    geometry_path = get_geometry_path(deformer, geometry_index=geometry_index)
+    component_type = get_component_type(geometry_path)
+
+    return ['{}.{}'.format(geometry_path.partialPathName(), component) for component in ids_to_components(
+        np.unique(np.asarray(ids, dtype=np.int64)), component_type=component_type)]
+
+
+def remove_membership(deformer, ids, geometry_index=0):
+    """
+    Removes the given components from the deformer set of the given deformer with a single sets call
+    :param deformer: str, name of the deformer
+    :param ids: np.ndarray or list(int), component ids to remove
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: list(str), removed component names
+    """
+
+    return _edit_membership(deformer, ids, geometry_index=geometry_index, add=False)
+
+
+def add_membership(deformer, ids, geometry_index=0):
+    """
+    Adds the given components to the deformer set of the given deformer with a single sets call
+    :param deformer: str, name of the deformer
+    :param ids: np.ndarray or list(int), component ids to add
+    :param geometry_index: int, logical index of the deformed geometry
+    :return: list(str), added component names
+    """
+
+    return _edit_membership(deformer, ids, geometry_index=geometry_index, add=True)
+
+
+def _edit_membership(deformer, ids, geometry_index=0, add=True):
+    """
+    Internal function that adds or removes the given components from the deformer set of the given deformer
+    """
+
+    if not len(ids):
+        return list()
+
+    deformer_set = get_deformer_set_name(deformer)
+    if not deformer_set:
+        raise RuntimeError('Deformer "{}" has no deformer set to edit!'.format(deformer))
+
+    components = get_components_names(deformer, ids, geometry_index=geometry_index)
+    if add:
+        maya.cmds.sets(components, add=deformer_set)
+    else:
+        maya.cmds.sets(components, remove=deformer_set)
+
+    return components
@@ -0,0 +1,302 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a cache of skin cluster influence lookups
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+import threading
+
+import numpy as np
+
+import maya.api.OpenMaya
+import maya.api.OpenMayaAnim
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+
+class SkinInfluenceMap(object):
+    """
+    Stores the influences of a skin cluster and provides constant time lookups between influence names,
+    logical indices (skin cluster matrix plug index) and physical indices (influence objects order, which is also
+    the order of the columns of the weights returned by MFnSkinCluster.getWeights)
+    """
+
+    def __init__(self, skin_cluster):
+        """
+        :param skin_cluster: MFnSkinCluster
+        """
+
+        influence_paths = skin_cluster.influenceObjects()
+        influences_count = len(influence_paths)
+
+        self._full_names = [influence_paths[i].fullPathName() for i in range(influences_count)]
+        self._short_names = [influence_paths[i].partialPathName() for i in range(influences_count)]
+        self._logical_ids = np.fromiter(
+            (skin_cluster.indexForInfluenceObject(influence_paths[i]) for i in range(influences_count)),
+            dtype=np.int32, count=influences_count)
+        self._influence_handles = [
+            maya.api.OpenMaya.MObjectHandle(influence_paths[i].node()) for i in range(influences_count)]
+
+        self._physical_by_name = dict()
+        for i in range(influences_count):
+            self._physical_by_name[self._full_names[i]] = i
+            self._physical_by_name.setdefault(self._short_names[i], i)
+        self._physical_by_logical = dict((int(logical_id), i) for i, logical_id in enumerate(self._logical_ids))
+
+    def __len__(self):
+        return len(self._logical_ids)
+
+    def __contains__(self, influence_name):
+        return influence_name in self._physical_by_name
+
+    @property
+    def full_names(self):
+        return list(self._full_names)
+
+    @property
+    def short_names(self):
+        return list(self._short_names)
+
+    @property
+    def logical_ids(self):
+        return self._logical_ids
+
+    @property
+    def influence_handles(self):
+        return self._influence_handles
+
+    def get_names(self, short_name=False):
+        """
+        Returns the names of the influences, in physical index order
+        :param short_name: bool, Whether to return partial path names or full path names
+        :return: list(str)
+        """
+
+        return self.short_names if short_name else self.full_names
+
+    def get_physical_index(self, influence_name):
+        """
+        Returns the physical index of the influence with the given name
+        :param influence_name: str, full or partial path name of the influence
+        :return: int or None
+        """
+
+        return self._physical_by_name.get(influence_name)
+
+    def get_logical_index(self, influence_name):
+        """
+        Returns the logical index of the influence with the given name
+        :param influence_name: str, full or partial path name of the influence
+        :return: int or None
+        """
+
+        physical_index = self._physical_by_name.get(influence_name)
+        if physical_index is None:
+            return None
+
+        return int(self._logical_ids[physical_index])
+
+    def get_physical_from_logical(self, logical_index):
+        """
+        Returns the physical index of the influence connected to the given logical index
+        :param logical_index: int
+        :return: int or None
+        """
+
+        return self._physical_by_logical.get(int(logical_index))
+
+    def get_name(self, logical_index, short_name=False):
+        """
+        Returns the name of the influence connected to the given logical index
+        :param logical_index: int
+        :param short_name: bool, Whether to return partial path name or full path name
+        :return: str or None
+        """
+
+        physical_index = self._physical_by_logical.get(int(logical_index))
+        if physical_index is None:
+            return None
+
+        return self._short_names[physical_index] if short_name else self._full_names[physical_index]
+
+
+class SkinInfluenceMapCache(object):
+    """
+    Keeps one influence map per skin cluster, keyed by the skin cluster MObjectHandle
+    Maps are invalidated when a matrix plug of the skin cluster is connected or disconnected, when an influence
+    is renamed or when the skin cluster is deleted
+    """
+
+    def __init__(self):
+        self._maps = dict()
+        self._stale_callbacks = list()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._maps)
+
+    def get(self, skin_cluster):
+        """
+        Returns the influence map of the given skin cluster, building it if necessary
+        :param skin_cluster: str or MObject or MFnSkinCluster
+        :return: SkinInfluenceMap
+        """
+
+        skin_obj = get_skin_cluster_object(skin_cluster)
+        handle = maya.api.OpenMaya.MObjectHandle(skin_obj)
+        key = handle.hashCode()
+
+        with self._lock:
+            self._remove_stale_callbacks()
+            cached = self._maps.get(key)
+            if cached and cached[0].isValid() and cached[0] == handle:
+                return cached[1]
+            if cached:
+                self._remove(key)
+
+        skin_fn = skin_cluster if isinstance(
+            skin_cluster, maya.api.OpenMayaAnim.MFnSkinCluster) else maya.api.OpenMayaAnim.MFnSkinCluster(skin_obj)
+        influence_map = SkinInfluenceMap(skin_fn)
+        callback_ids = self._add_callbacks(key, skin_obj, influence_map)
+
+        with self._lock:
+            if key in self._maps:
+                self._remove(key)
+            self._maps[key] = (handle, influence_map, callback_ids)
+
+        return influence_map
+
+    def invalidate(self, skin_cluster):
+        """
+        Removes the cached influence map of the given skin cluster
+        :param skin_cluster: str or MObject or MFnSkinCluster
+        """
+
+        key = maya.api.OpenMaya.MObjectHandle(get_skin_cluster_object(skin_cluster)).hashCode()
+        with self._lock:
+            self._remove(key)
+            self._remove_stale_callbacks()
+
+    def clear(self):
+        """
+        Removes all cached influence maps and their callbacks
+        """
+
+        with self._lock:
+            for key in list(self._maps.keys()):
+                self._remove(key)
+            self._remove_stale_callbacks()
+
+    def _add_callbacks(self, key, skin_obj, influence_map):
+        """
+        Internal function that registers the callbacks that invalidate the influence map with the given key
+        """
+
+        callback_ids = maya.api.OpenMaya.MCallbackIdArray()
+        callback_ids.append(maya.api.OpenMaya.MNodeMessage.addAttributeChangedCallback(
+            skin_obj, self._on_attribute_changed, key))
+        callback_ids.append(maya.api.OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+            skin_obj, self._on_invalidate, key))
+        for influence_handle in influence_map.influence_handles:
+            if not influence_handle.isValid():
+                continue
+            callback_ids.append(maya.api.OpenMaya.MNodeMessage.addNameChangedCallback(
+                influence_handle.object(), self._on_invalidate, key))
+
+        return callback_ids
+
+    def _on_attribute_changed(self, msg, plug, other_plug, key):
+        """
+        Internal callback function that invalidates an influence map when an influence matrix connection changes
+        """
+
+        connection_msg = maya.api.OpenMaya.MNodeMessage.kConnectionMade | \
+            maya.api.OpenMaya.MNodeMessage.kConnectionBroken
+        if not msg & connection_msg:
+            return
+
+        if maya.api.OpenMaya.MFnAttribute(plug.attribute()).name != 'matrix':
+            return
+
+        self._on_invalidate(key)
+
+    def _on_invalidate(self, *args):
+        """
+        Internal callback function that invalidates an influence map. Key is always received as the last argument
+        Callbacks are not removed while they are being executed, they are removed the next time the cache is used
+        """
+
+        key = args[-1]
+        with self._lock:
+            cached = self._maps.pop(key, None)
+            if cached:
+                self._stale_callbacks.append(cached[2])
+
+    def _remove(self, key):
+        """
+        Internal function that removes the influence map with the given key. Lock must be held by the caller
+        """
+
+        cached = self._maps.pop(key, None)
+        if cached:
+            self._stale_callbacks.append(cached[2])
+
+    def _remove_stale_callbacks(self):
+        """
+        Internal function that removes the callbacks of the invalidated influence maps. Lock must be held by the caller
+        """
+
+        while self._stale_callbacks:
+            try:
+                maya.api.OpenMaya.MMessage.removeCallbacks(self._stale_callbacks.pop())
+            except RuntimeError:
+                pass
+
+
+INFLUENCE_MAP_CACHE = SkinInfluenceMapCache()
+
+
+def get_skin_cluster_object(skin_cluster):
+    """
+    Returns the MObject of the given skin cluster
+    :param skin_cluster: str or MObject or MFnSkinCluster
+    :return: MObject
+    """
+
+    if isinstance(skin_cluster, maya.api.OpenMaya.MObject):
+        return skin_cluster
+    if isinstance(skin_cluster, maya.api.OpenMayaAnim.MFnSkinCluster):
+        return skin_cluster.object()
+
+    return maya.api.OpenMaya.MGlobal.getSelectionListByName(skin_cluster).getDependNode(0)
+
+
+def get_influence_map(skin_cluster):
+    """
+    Returns the cached influence map of the given skin cluster
+    :param skin_cluster: str or MObject or MFnSkinCluster
+    :return: SkinInfluenceMap
+    """
+
+    return INFLUENCE_MAP_CACHE.get(skin_cluster)
+
+
+def invalidate_influence_map(skin_cluster):
+    """
+    Removes the cached influence map of the given skin cluster
+    :param skin_cluster: str or MObject or MFnSkinCluster
+    """
+
+    INFLUENCE_MAP_CACHE.invalidate(skin_cluster)
+
+
+def clear_influence_maps():
+    """
+    Removes all cached influence maps
+    """
+
+    INFLUENCE_MAP_CACHE.clear()
@@ -7,8 +7,14 @@ Module that contains functions related with Maya meshes
 
 from __future__ import print_function, division, absolute_import
 
+import hashlib
+
+import numpy as np
+
 import maya.api.OpenMaya
 
+from tpDcc.core import command
+
 
 def get_mesh_path_and_components(mesh_name):
     """
@@ -21,3 +27,207 @@ def get_mesh_path_and_components(mesh_name):
     mesh_path, mesh_components = selection_list.getComponent(0)
 
     return mesh_path, mesh_components
+
+
+def get_vertices_component(vertices_ids=None, vertices_count=None):
+    """
+    Returns a mesh vertex component that contains the given vertices
+    :param vertices_ids: list(int) or np.ndarray or None, vertices indices to add to the component
+    :param vertices_count: int or None, if no vertices indices are given, component will contain this number of vertices
+    :return: MObject
+    """
+
+    component_fn = maya.api.OpenMaya.MFnSingleIndexedComponent()
+    component = component_fn.create(maya.api.OpenMaya.MFn.kMeshVertComponent)
+    if vertices_ids is None:
+        component_fn.setCompleteData(int(vertices_count or 0))
+    else:
+        component_fn.addElements([int(vertex_id) for vertex_id in vertices_ids])
+
+    return component
+
+
+def get_mesh_topology(mesh_name):
+    """
+    Returns the polygon vertex counts and polygon vertex indices of the given mesh
+    :param mesh_name: str or MDagPath or MFnMesh
+    :return: tuple(np.ndarray, np.ndarray), polygon counts and polygon connects arrays
+    """
+
+    mesh_fn = get_mesh_fn(mesh_name)
+    poly_counts, poly_connects = mesh_fn.getVertices()
+
+    return np.array(poly_counts, dtype=np.int32), np.array(poly_connects, dtype=np.int32)
+
+
+def get_topology_hash(poly_counts, poly_connects):
+    """
+    Returns a stable hash of the given mesh topology
+    :param poly_counts: np.ndarray, number of vertices of each polygon
+    :param poly_connects: np.ndarray, vertex indices of each polygon
+    :return: str
+    """
+
+    topology_hash = hashlib.sha1()
+    topology_hash.update(np.asarray(poly_counts, dtype='<i4').tobytes())
+    topology_hash.update(np.asarray(poly_connects, dtype='<i4').tobytes())
+
+    return topology_hash.hexdigest()
+
+
+def get_mesh_topology_hash(mesh_name):
+    """
+    Returns a stable hash of the topology of the given mesh
+    :param mesh_name: str or MDagPath or MFnMesh
+    :return: str
+    """
+
+    return get_topology_hash(*get_mesh_topology(mesh_name))
+
+
+def get_mesh_fn(mesh_name):
+    """
+    Returns MFnMesh of the given mesh
+    :param mesh_name: str or MDagPath or MFnMesh
+    :return: MFnMesh
+    """
+
+    if isinstance(mesh_name, maya.api.OpenMaya.MFnMesh):
+        return mesh_name
+    if isinstance(mesh_name, maya.api.OpenMaya.MDagPath):
+        return maya.api.OpenMaya.MFnMesh(mesh_name)
+
+    selection_list = maya.api.OpenMaya.MGlobal.getSelectionListByName(mesh_name)
+
+    return maya.api.OpenMaya.MFnMesh(selection_list.getDagPath(0))
+
+
+def get_mesh_points(mesh_name, world_space=False):
+    """
+    Returns the vertex positions of the given mesh
+    :param mesh_name: str or MDagPath or MFnMesh
+    :param world_space: bool, Whether to return positions in world space or object space
+    :return: np.ndarray, float64 array of shape (vertices_count, 3)
+    """
+
+    mesh_fn = get_mesh_fn(mesh_name)
+    space = maya.api.OpenMaya.MSpace.kWorld if world_space else maya.api.OpenMaya.MSpace.kObject
+    points = np.array(mesh_fn.getPoints(space), dtype=np.float64).reshape(-1, 4)
+
+    return points[:, :3]
+
+
+def set_mesh_points(mesh_name, points, world_space=False, undoable=False):
+    """
+    Sets the vertex positions of the given mesh with a single MFnMesh.setPoints call
+    :param mesh_name: str or MDagPath or MFnMesh
+    :param points: np.ndarray, array of shape (vertices_count, 3)
+    :param world_space: bool, Whether given positions are in world space or object space
+    :param undoable: bool, Whether to set the positions through an undoable command. Mesh must be given by name
+    """
+
+    if undoable:
+        runner = command.CommandRunner()
+        runner.run(
+            'tpDcc-dccs-maya-commands-setMeshPoints', mesh_name=mesh_name, points=points, world_space=world_space)
+        return
+
+    mesh_fn = get_mesh_fn(mesh_name)
+    space = maya.api.OpenMaya.MSpace.kWorld if world_space else maya.api.OpenMaya.MSpace.kObject
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    homogeneous = np.ones((len(points), 4), dtype=np.float64)
+    homogeneous[:, :3] = points
+    mesh_fn.setPoints(maya.api.OpenMaya.MPointArray(homogeneous.tolist()), space)
+
+
+def get_mesh_normals(mesh_name, world_space=False, angle_weighted=False):
+    """
+    Returns the vertex normals of the given mesh
+    :param mesh_name: str or MDagPath or MFnMesh
+    :param world_space: bool, Whether to return normals in world space or object space
+    :param angle_weighted: bool, Whether normals are weighted by the angle subtended by each face at the vertex
+    :return: np.ndarray, float64 array of shape (vertices_count, 3)
+    """
+
+    mesh_fn = get_mesh_fn(mesh_name)
+    space = maya.api.OpenMaya.MSpace.kWorld if world_space else maya.api.OpenMaya.MSpace.kObject
+
+    return np.array(mesh_fn.getVertexNormals(angle_weighted, space), dtype=np.float64).reshape(-1, 3)
+
+
+def get_mesh_uvs(mesh_name, uv_set=None):
+    """
+    Returns the UV coordinates of the given mesh and the UV index of each polygon vertex
+    :param mesh_name: str or MDagPath or MFnMesh
+    :param uv_set: str or None, UV set to get UVs from. If None, current UV set is used
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray), UVs array of shape (uvs_count, 2), number of UVs of each
+        polygon and UV index of each polygon vertex
+    """
+
+    mesh_fn = get_mesh_fn(mesh_name)
+    if uv_set:
+        u_array, v_array = mesh_fn.getUVs(uv_set)
+        uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+    else:
+        u_array, v_array = mesh_fn.getUVs()
+        uv_counts, uv_ids = mesh_fn.getAssignedUVs()
+
+    uvs = np.column_stack((np.array(u_array, dtype=np.float64), np.array(v_array, dtype=np.float64)))
+
+    return uvs, np.array(uv_counts, dtype=np.int32), np.array(uv_ids, dtype=np.int32)
+
+
+def get_vertex_uvs(mesh_name, uv_set=None):
+    """
+    Returns one UV coordinate per vertex of the given mesh
+    When a vertex has several UVs (UV seams), the UV of its last polygon vertex is used
+    :param mesh_name: str or MDagPath or MFnMesh
+    :param uv_set: str or None, UV set to get UVs from. If None, current UV set is used
+    :return: tuple(np.ndarray, np.ndarray), UVs array of shape (vertices_count, 2) and boolean array with the
+        vertices that have UVs
+    """
+
+    mesh_fn = get_mesh_fn(mesh_name)
+    poly_counts, poly_connects = get_mesh_topology(mesh_fn)
+    uvs, uv_counts, uv_ids = get_mesh_uvs(mesh_fn, uv_set=uv_set)
+
+    vertex_uvs = np.zeros((mesh_fn.numVertices, 2), dtype=np.float64)
+    mapped = np.zeros(mesh_fn.numVertices, dtype=bool)
+    mapped_face_vertices = np.repeat(uv_counts > 0, poly_counts)
+    vertex_ids = poly_connects[mapped_face_vertices]
+    if len(vertex_ids) == len(uv_ids):
+        vertex_uvs[vertex_ids] = uvs[uv_ids]
+        mapped[vertex_ids] = True
+
+    return vertex_uvs, mapped
+
+
+def get_components_vertices_ids(components):
+    """
+    Returns the mesh and the vertex indices of the given vertex components
+    :param components: list(str), vertex components (such as 'pSphere1.vtx[0:120]') that belong to the same mesh
+    :return: tuple(MDagPath, np.ndarray), mesh path and unique vertex indices
+    """
+
+    selection_list = maya.api.OpenMaya.MSelectionList()
+    for component in components:
+        selection_list.add(component)
+
+    mesh_path = None
+    vertices_ids = list()
+    for i in range(selection_list.length()):
+        component_path, component = selection_list.getComponent(i)
+        if component.isNull() or not component.hasFn(maya.api.OpenMaya.MFn.kMeshVertComponent):
+            continue
+        if mesh_path is None:
+            mesh_path = component_path
+        elif not (component_path == mesh_path):
+            raise ValueError('Vertices must belong to the same mesh: {}, {}'.format(
+                mesh_path.partialPathName(), component_path.partialPathName()))
+        vertices_ids.append(np.array(
+            maya.api.OpenMaya.MFnSingleIndexedComponent(component).getElements(), dtype=np.int64))
+
+    if not vertices_ids:
+        return mesh_path, np.zeros(0, dtype=np.int64)
+
+    return mesh_path, np.unique(np.concatenate(vertices_ids))
@@ -0,0 +1,321 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a cache of mesh topology fingerprints used to compare the topology of many meshes
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+import maya.api.OpenMaya
+
+from tpDcc.dccs.maya.api import mesh as api_mesh
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+
+class MeshTopologyFingerprint(object):
+    """
+    Stores a stable hash of the topology of a mesh (polygon vertex counts and connects) and its components counts
+    """
+
+    __slots__ = ('topology_hash', 'vertices_count', 'edges_count', 'faces_count', 'first_face')
+
+    def __init__(self, mesh_fn):
+        """
+        :param mesh_fn: MFnMesh
+        """
+
+        poly_counts, poly_connects = api_mesh.get_mesh_topology(mesh_fn)
+        self.topology_hash = api_mesh.get_topology_hash(poly_counts, poly_connects)
+        self.vertices_count = mesh_fn.numVertices
+        self.edges_count = mesh_fn.numEdges
+        self.faces_count = mesh_fn.numPolygons
+        self.first_face = tuple(poly_connects[:poly_counts[0]].tolist()) if len(poly_counts) else tuple()
+
+    def __eq__(self, other):
+        return isinstance(other, MeshTopologyFingerprint) and self.topology_hash == other.topology_hash
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.topology_hash)
+
+    @property
+    def counts(self):
+        return self.vertices_count, self.edges_count, self.faces_count
+
+    def matches(self, mesh_fn):
+        """
+        Returns whether the components counts and first face of the given mesh match this fingerprint
+        This is a cheap check that does not read the full topology of the mesh
+        :param mesh_fn: MFnMesh
+        :return: bool
+        """
+
+        counts = mesh_fn.numVertices, mesh_fn.numEdges, mesh_fn.numPolygons
+        if counts != self.counts:
+            return False
+
+        return not self.faces_count or tuple(mesh_fn.getPolygonVertices(0)) == self.first_face
+
+
+class MeshTopologyCache(object):
+    """
+    Keeps one topology fingerprint per mesh shape, keyed by the mesh MObjectHandle
+    Fingerprints are flagged as dirty when the topology of the mesh changes (also when it is edited without history) or
+    its input mesh connection changes, and are recomputed the next time they are requested if they are dirty or the
+    mesh components counts no longer match. Point changes, such as the ones done by deformers, do not invalidate
+    fingerprints. Fingerprints are removed when the mesh is deleted.
+    """
+
+    def __init__(self):
+        self._fingerprints = dict()
+        self._stale_callbacks = list()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def get(self, mesh):
+        """
+        Returns the topology fingerprint of the given mesh, computing it if necessary
+        :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+        :return: MeshTopologyFingerprint
+        """
+
+        mesh_path = get_mesh_shape_path(mesh)
+        mesh_obj = mesh_path.node()
+        handle = maya.api.OpenMaya.MObjectHandle(mesh_obj)
+        key = handle.hashCode()
+
+        with self._lock:
+            self._remove_stale_callbacks()
+            cached = self._fingerprints.get(key)
+            if cached and cached[0].isValid() and cached[0] == handle:
+                mesh_fn = maya.api.OpenMaya.MFnMesh(mesh_path)
+                if not cached[3][0] and cached[1].matches(mesh_fn):
+                    return cached[1]
+                cached[3][0] = False
+                fingerprint = MeshTopologyFingerprint(mesh_fn)
+                self._fingerprints[key] = (cached[0], fingerprint, cached[2], cached[3])
+                return fingerprint
+            if cached:
+                self._remove(key)
+
+        fingerprint = MeshTopologyFingerprint(maya.api.OpenMaya.MFnMesh(mesh_path))
+        dirty = [False]
+        callback_ids = self._add_callbacks(key, mesh_obj, dirty)
+
+        with self._lock:
+            if key in self._fingerprints:
+                self._remove(key)
+            self._fingerprints[key] = (handle, fingerprint, callback_ids, dirty)
+
+        return fingerprint
+
+    def invalidate(self, mesh):
+        """
+        Removes the cached fingerprint of the given mesh
+        :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+        """
+
+        key = maya.api.OpenMaya.MObjectHandle(get_mesh_shape_path(mesh).node()).hashCode()
+        with self._lock:
+            self._remove(key)
+            self._remove_stale_callbacks()
+
+    def clear(self):
+        """
+        Removes all cached fingerprints and their callbacks
+        """
+
+        with self._lock:
+            for key in list(self._fingerprints.keys()):
+                self._remove(key)
+            self._remove_stale_callbacks()
+
+    def _add_callbacks(self, key, mesh_obj, dirty):
+        """
+        Internal function that registers the callbacks that flag or remove the fingerprint with the given key
+        """
+
+        connection_msg = maya.api.OpenMaya.MNodeMessage.kConnectionMade | \
+            maya.api.OpenMaya.MNodeMessage.kConnectionBroken
+
+        def _on_attribute_changed(msg, plug, *args):
+            if msg & connection_msg and maya.api.OpenMaya.MFnAttribute(plug.attribute()).name == 'inMesh':
+                dirty[0] = True
+
+        def _on_topology_changed(*args):
+            dirty[0] = True
+
+        callback_ids = maya.api.OpenMaya.MCallbackIdArray()
+        callback_ids.append(maya.api.OpenMaya.MNodeMessage.addAttributeChangedCallback(
+            mesh_obj, _on_attribute_changed))
+        callback_ids.append(maya.api.OpenMaya.MPolyMessage.addPolyTopologyChangedCallback(
+            mesh_obj, _on_topology_changed))
+        callback_ids.append(maya.api.OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+            mesh_obj, self._on_invalidate, key))
+
+        return callback_ids
+
+    def _on_invalidate(self, *args):
+        """
+        Internal callback function that removes a fingerprint. Key is always received as the last argument
+        Callbacks are not removed while they are being executed, they are removed the next time the cache is used
+        """
+
+        key = args[-1]
+        with self._lock:
+            cached = self._fingerprints.pop(key, None)
+            if cached:
+                self._stale_callbacks.append(cached[2])
+
+    def _remove(self, key):
+        """
+        Internal function that removes the fingerprint with the given key. Lock must be held by the caller
+        """
+
+        cached = self._fingerprints.pop(key, None)
+        if cached:
+            self._stale_callbacks.append(cached[2])
+
+    def _remove_stale_callbacks(self):
+        """
+        Internal function that removes the callbacks of the removed fingerprints. Lock must be held by the caller
+        """
+
+        while self._stale_callbacks:
+            try:
+                maya.api.OpenMaya.MMessage.removeCallbacks(self._stale_callbacks.pop())
+            except RuntimeError:
+                pass
+
+
+TOPOLOGY_CACHE = MeshTopologyCache()
+
+
+def get_mesh_shape_path(mesh):
+    """
+    Returns the MDagPath of the mesh shape of the given mesh
+    :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+    :return: MDagPath
+    """
+
+    if isinstance(mesh, maya.api.OpenMaya.MDagPath):
+        mesh_path = maya.api.OpenMaya.MDagPath(mesh)
+    elif isinstance(mesh, maya.api.OpenMaya.MObject):
+        mesh_path = maya.api.OpenMaya.MDagPath.getAPathTo(mesh)
+    else:
+        mesh_path = maya.api.OpenMaya.MGlobal.getSelectionListByName(mesh).getDagPath(0)
+    if mesh_path.node().hasFn(maya.api.OpenMaya.MFn.kMesh):
+        return mesh_path
+
+    for i in range(mesh_path.childCount()):
+        child = mesh_path.child(i)
+        if child.hasFn(maya.api.OpenMaya.MFn.kMesh) and not maya.api.OpenMaya.MFnDagNode(child).isIntermediateObject:
+            mesh_path.push(child)
+            return mesh_path
+
+    raise ValueError('Node "{}" has no mesh shape!'.format(mesh_path.fullPathName()))
+
+
+def get_fingerprint(mesh):
+    """
+    Returns the cached topology fingerprint of the given mesh
+    :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+    :return: MeshTopologyFingerprint
+    """
+
+    return TOPOLOGY_CACHE.get(mesh)
+
+
+def invalidate_fingerprint(mesh):
+    """
+    Removes the cached topology fingerprint of the given mesh
+    :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+    """
+
+    TOPOLOGY_CACHE.invalidate(mesh)
+
+
+def clear_fingerprints():
+    """
+    Removes all cached topology fingerprints
+    """
+
+    TOPOLOGY_CACHE.clear()
+
+
+def group_by_topology(meshes):
+    """
+    Groups the given meshes by topology using a single hash lookup per mesh
+    :param meshes: list(str), mesh shapes or mesh transforms
+    :return: dict(str, list(str)), topology hash and meshes that share that topology, in given order
+    """
+
+    groups = dict()
+    for mesh in meshes:
+        groups.setdefault(get_fingerprint(mesh).topology_hash, list()).append(mesh)
+
+    return groups
+
+
+def get_matching_topology(mesh, meshes):
+    """
+    Returns the meshes that have the same topology as the given one
+    :param mesh: str, mesh shape or mesh transform used as reference
+    :param meshes: list(str), mesh shapes or mesh transforms to check
+    :return: list(str)
+    """
+
+    topology_hash = get_fingerprint(mesh).topology_hash
+
+    return [other_mesh for other_mesh in meshes if get_fingerprint(other_mesh).topology_hash == topology_hash]
+
+
+def check_topology(mesh, meshes, threads=None):
+    """
+    Compares face by face the topology of the given meshes with the topology of the reference mesh
+    Topology arrays are extracted in the caller thread and compared in a thread pool. Meshes whose fingerprint
+    already differs are not compared.
+    :param mesh: str, mesh shape or mesh transform used as reference
+    :param meshes: list(str), mesh shapes or mesh transforms to check
+    :param threads: int or None, number of worker threads. If None, the number of CPUs is used
+    :return: list(bool), whether each one of the given meshes has exactly the same topology as the reference mesh
+    """
+
+    reference_fingerprint = get_fingerprint(mesh)
+    reference_topology = api_mesh.get_mesh_topology(get_mesh_shape_path(mesh))
+
+    results = [False] * len(meshes)
+    candidates = list()
+    for i, other_mesh in enumerate(meshes):
+        if get_fingerprint(other_mesh).counts != reference_fingerprint.counts:
+            continue
+        candidates.append((i, api_mesh.get_mesh_topology(get_mesh_shape_path(other_mesh))))
+    if not candidates:
+        return results
+
+    def _compare(candidate):
+        poly_counts, poly_connects = candidate[1]
+        return candidate[0], bool(
+            np.array_equal(poly_counts, reference_topology[0]) and np.array_equal(poly_connects, reference_topology[1]))
+
+    pool = ThreadPool(threads)
+    try:
+        for i, result in pool.imap_unordered(_compare, candidates):
+            results[i] = result
+    finally:
+        pool.close()
+        pool.join()
+
+    return results
@@ -7,6 +7,8 @@ Module that contains functions related with Maya Skin Cluster node
 
 from __future__ import print_function, division, absolute_import
 
+import numpy as np
+
 import maya.cmds
 import maya.api.OpenMaya
 import maya.api.OpenMayaAnim
@@ -14,7 +16,7 @@ import maya.api.OpenMayaAnim
 from tpDcc.libs.python import python
 from tpDcc.core import command
 from tpDcc.dccs.maya import api
-from tpDcc.dccs.maya.api import mesh
+from tpDcc.dccs.maya.api import mesh, influencemap
 
 
 def get_skin_cluster(dag_path=None):
@@ -44,6 +46,45 @@ def get_skin_cluster(dag_path=None):
     return skin_node, skin_name
 
 
+def get_influence_indices(skin_cluster):
+    """
+    Returns the logical indices of all the influences connected to the given skin cluster
+    :param skin_cluster: MFnSkinCluster
+    :return: MIntArray
+    """
+
+    return maya.api.OpenMaya.MIntArray(influencemap.get_influence_map(skin_cluster).logical_ids.tolist())
+
+
+def weights_to_array(weights, influences_count):
+    """
+    Converts given flat weights array into a (vertices x influences) ndarray
+    Values are copied in a single pass, without creating intermediate Python lists
+    :param weights: MDoubleArray, flat weights in component order (all influences of first component first)
+    :param influences_count: int, number of influences stored per component
+    :return: np.ndarray, float64 array of shape (vertices_count, influences_count)
+    """
+
+    weights_count = len(weights)
+    weights_array = np.fromiter(weights, dtype=np.float64, count=weights_count)
+    if not influences_count:
+        return weights_array.reshape(0, 0)
+
+    return weights_array.reshape(-1, influences_count)
+
+
+def array_to_weights(weights_array):
+    """
+    Converts given weights ndarray into a flat MDoubleArray that can be passed to MFnSkinCluster.setWeights
+    :param weights_array: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :return: MDoubleArray
+    """
+
+    weights_array = np.ascontiguousarray(weights_array, dtype=np.float64).ravel()
+
+    return maya.api.OpenMaya.MDoubleArray(weights_array.tolist())
+
+
 def get_skin_weights(skin_cluster, mesh_shape_name):
     """
     Returns the skin weights of the given skin cluster in the given mesh
@@ -61,38 +102,58 @@ def get_skin_weights(skin_cluster, mesh_shape_name):
     if not mesh_path or not mesh_components:
         return None
 
-    influences_array = maya.api.OpenMaya.MIntArray()
-    path_array = skin_cluster.influenceObjects()
-    influences_count = len(path_array)
-    for i in range(influences_count):
-        influences_array.append(skin_cluster.indexForInfluenceObject(path_array[i]))
+    influences_array = get_influence_indices(skin_cluster)
 
     weights = skin_cluster.getWeights(mesh_path, mesh_components, influences_array)
 
     return weights
 
 
-def set_skin_weights(skin_cluster, mesh_shape_name, skin_data):
+def get_skin_weights_array(skin_cluster, mesh_shape_name):
+    """
+    Returns the skin weights of the given skin cluster in the given mesh as a 2D array
+    :param skin_cluster: str or MFnSkinCluster
+    :param mesh_shape_name: str
+    :return: np.ndarray or None, float64 array of shape (vertices_count, influences_count)
+    """
+
     if python.is_string(skin_cluster):
         skin_cluster, _ = get_skin_cluster(skin_cluster)
     if not skin_cluster:
         return None
 
-    skin_data = str(list(skin_data))
-
     mesh_path, mesh_components = mesh.get_mesh_path_and_components(mesh_shape_name)
     if not mesh_path or not mesh_components:
         return None
 
-    influences_array = maya.api.OpenMaya.MIntArray()
-    path_array = skin_cluster.influenceObjects()
-    influences_count = len(path_array)
-    for i in range(influences_count):
-        influences_array.append(skin_cluster.indexForInfluenceObject(path_array[i]))
+    influences_array = get_influence_indices(skin_cluster)
+    weights = skin_cluster.getWeights(mesh_path, mesh_components, influences_array)
+
+    return weights_to_array(weights, len(influences_array))
+
+
+def set_skin_weights(skin_cluster, mesh_shape_name, skin_data):
+    """
+    Sets the skin weights of the given skin cluster in the given mesh
+    :param skin_cluster: str or MFnSkinCluster
+    :param mesh_shape_name: str
+    :param skin_data: list(float) or MDoubleArray, flat weights in component order
+    """
+
+    if python.is_string(skin_cluster):
+        skin_cluster, _ = get_skin_cluster(skin_cluster)
+    if not skin_cluster:
+        return None
+
+    mesh_path, mesh_components = mesh.get_mesh_path_and_components(mesh_shape_name)
+    if not mesh_path or not mesh_components:
+        return None
 
-    weights_array = maya.api.OpenMaya.MDoubleArray()
-    for i in skin_data[1:-1].split(','):
-        weights_array.append(float(i))
+    influences_array = get_influence_indices(skin_cluster)
+    if isinstance(skin_data, maya.api.OpenMaya.MDoubleArray):
+        weights_array = skin_data
+    else:
+        weights_array = array_to_weights(np.asarray(skin_data, dtype=np.float64))
 
     runner = command.CommandRunner()
 
@@ -102,3 +163,432 @@ def set_skin_weights(skin_cluster, mesh_shape_name, skin_data):
         influences_array=influences_array, weights_array=weights_array)
 
     # skin_cluster.setWeights(mesh_path, mesh_components, influences_array, weights_array, False)
+
+
+def set_skin_weights_array(skin_cluster, mesh_shape_name, weights_array):
+    """
+    Sets the skin weights of the given skin cluster in the given mesh from a 2D array
+    :param skin_cluster: str or MFnSkinCluster
+    :param mesh_shape_name: str
+    :param weights_array: np.ndarray, weights array of shape (vertices_count, influences_count)
+    """
+
+    if python.is_string(skin_cluster):
+        skin_cluster, _ = get_skin_cluster(skin_cluster)
+    if not skin_cluster:
+        return None
+
+    mesh_path, mesh_components = mesh.get_mesh_path_and_components(mesh_shape_name)
+    if not mesh_path or not mesh_components:
+        return None
+
+    influences_array = get_influence_indices(skin_cluster)
+    weights_array = np.asarray(weights_array, dtype=np.float64)
+    vertices_count = maya.api.OpenMaya.MFnSingleIndexedComponent(mesh_components).elementCount
+    if weights_array.shape != (vertices_count, len(influences_array)):
+        raise ValueError('Weights array shape {} does not match skin cluster shape {}'.format(
+            weights_array.shape, (vertices_count, len(influences_array))))
+
+    runner = command.CommandRunner()
+
+    runner.run(
+        'tpDcc-dccs-maya-commands-setSkinWeights',
+        skin_cluster=skin_cluster, mesh_path=mesh_path, mesh_components=mesh_components,
+        influences_array=influences_array, weights_array=array_to_weights(weights_array))
+
+
+def get_skin_cluster_geometry_path(skin_cluster, index=0):
+    """
+    Returns the DAG path of the geometry deformed by the given skin cluster
+    :param skin_cluster: MFnSkinCluster
+    :param index: int, index of the output geometry
+    :return: MDagPath or None
+    """
+
+    output_geometry = skin_cluster.getOutputGeometry()
+    if index >= len(output_geometry):
+        return None
+
+    return maya.api.OpenMaya.MDagPath.getAPathTo(output_geometry[index])
+
+
+# Function set used to build the components of each indexed component type
+_COMPONENT_FNS = (
+    (maya.api.OpenMaya.MFn.kSingleIndexedComponent, maya.api.OpenMaya.MFnSingleIndexedComponent),
+    (maya.api.OpenMaya.MFn.kDoubleIndexedComponent, maya.api.OpenMaya.MFnDoubleIndexedComponent),
+    (maya.api.OpenMaya.MFn.kTripleIndexedComponent, maya.api.OpenMaya.MFnTripleIndexedComponent)
+)
+
+
+def get_geometry_component(geometry_path, points_ids=None):
+    """
+    Returns a component, matching the type of the given geometry, that contains the given points
+    Mesh vertex components are built directly. Components of other geometry types (NURBS curves, NURBS surfaces and
+    lattices) are built from the points MItGeometry iterates, so their point indices match the skin cluster ones
+    :param geometry_path: MDagPath, skinned geometry
+    :param points_ids: list(int) or np.ndarray or None, points to add to the component. If None, all points are used
+    :return: tuple(MObject, np.ndarray), component and indices of the points it contains, in component order
+    """
+
+    if geometry_path.node().hasFn(maya.api.OpenMaya.MFn.kMesh):
+        if points_ids is None:
+            vertices_count = maya.api.OpenMaya.MItGeometry(geometry_path).count()
+            return mesh.get_vertices_component(vertices_count=vertices_count), np.arange(vertices_count)
+        points_ids = np.asarray(points_ids, dtype=np.int64)
+        return mesh.get_vertices_component(points_ids), points_ids
+
+    points_set = None if points_ids is None else set(int(point_id) for point_id in points_ids)
+    component_fn = None
+    element_getter = None
+    component_ids = list()
+    geometry_it = maya.api.OpenMaya.MItGeometry(geometry_path)
+    while not geometry_it.isDone():
+        point_id = geometry_it.index()
+        if points_set is None or point_id in points_set:
+            item = geometry_it.currentItem()
+            if component_fn is None:
+                component_fn, element_getter = _create_component_fn(item)
+            element = element_getter(item)
+            if isinstance(element, tuple):
+                component_fn.addElement(*element)
+            else:
+                component_fn.addElement(element)
+            component_ids.append(point_id)
+        geometry_it.next()
+
+    if component_fn is None:
+        raise ValueError('Geometry "{}" has none of the given points!'.format(geometry_path.fullPathName()))
+
+    return component_fn.object(), np.array(component_ids, dtype=np.int64)
+
+
+def get_rows_order(rows_ids, points_ids):
+    """
+    Returns the position of each one of the given points indices within the given rows indices
+    :param rows_ids: np.ndarray, point index of each row of a weights array
+    :param points_ids: np.ndarray, point indices to look for
+    :return: np.ndarray
+    """
+
+    rows_ids = np.asarray(rows_ids, dtype=np.int64)
+    points_ids = np.asarray(points_ids, dtype=np.int64)
+    if not len(points_ids):
+        return np.zeros(0, dtype=np.int64)
+    if not len(rows_ids):
+        raise ValueError('Points are not available: {}'.format(np.unique(points_ids)))
+
+    sorter = np.argsort(rows_ids)
+    rows = sorter[np.minimum(np.searchsorted(rows_ids, points_ids, sorter=sorter), len(rows_ids) - 1)]
+    invalid = rows_ids[rows] != points_ids
+    if np.any(invalid):
+        raise ValueError('Points are not available: {}'.format(np.unique(points_ids[invalid])))
+
+    return rows
+
+
+def _create_component_fn(item):
+    """
+    Internal function that creates an empty component of the same type as the given component item
+    Returns the component function set and a function that returns the element of a component item
+    """
+
+    for component_type, component_fn_class in _COMPONENT_FNS:
+        if not item.hasFn(component_type):
+            continue
+        component_fn = component_fn_class()
+        component_fn.create(item.apiType())
+        if component_fn_class is maya.api.OpenMaya.MFnSingleIndexedComponent:
+            return component_fn, lambda component: component_fn_class(component).element(0)
+        return component_fn, lambda component: tuple(component_fn_class(component).getElement(0))
+
+    raise ValueError('Component type "{}" is not supported!'.format(item.apiTypeStr))
+
+
+def dense_to_sparse(weights, influence_ids=None, tolerance=0.0):
+    """
+    Converts a dense weights array into CSR-style sparse arrays
+    :param weights: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :param influence_ids: np.ndarray or None, influence logical index of each column of the weights array
+    :param tolerance: float, weights lower or equal than this value are not stored
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray), vertex offsets, influence ids and values.
+        Weights of vertex i are stored between offsets[i] and offsets[i + 1]
+    """
+
+    weights = np.asarray(weights, dtype=np.float64)
+    mask = np.abs(weights) > tolerance
+    rows, columns = np.nonzero(mask)
+
+    offsets = np.zeros(weights.shape[0] + 1, dtype=np.int64)
+    np.cumsum(mask.sum(axis=1), out=offsets[1:])
+    if influence_ids is None:
+        influence_ids = np.arange(weights.shape[1], dtype=np.int32)
+
+    return offsets, np.asarray(influence_ids, dtype=np.int32)[columns], weights[rows, columns]
+
+
+def get_influence_columns(columns_ids, influence_ids):
+    """
+    Returns the position of each one of the given influence logical indices within the given columns indices
+    :param columns_ids: np.ndarray, influence logical index of each column of a weights array
+    :param influence_ids: np.ndarray, influence logical indices to look for
+    :return: np.ndarray
+    """
+
+    columns_ids = np.asarray(columns_ids)
+    influence_ids = np.asarray(influence_ids)
+    if not len(influence_ids):
+        return np.zeros(0, dtype=np.int64)
+    if not len(columns_ids):
+        raise ValueError('Influences are not available: {}'.format(np.unique(influence_ids)))
+
+    sorter = np.argsort(columns_ids)
+    positions = np.minimum(np.searchsorted(columns_ids, influence_ids, sorter=sorter), len(columns_ids) - 1)
+    columns = sorter[positions]
+    invalid = columns_ids[columns] != influence_ids
+    if np.any(invalid):
+        raise ValueError('Influences are not available: {}'.format(np.unique(influence_ids[invalid])))
+
+    return columns
+
+
+def sparse_to_dense(offsets, influence_ids, values, columns_ids):
+    """
+    Converts CSR-style sparse weights arrays into a dense weights array
+    :param offsets: np.ndarray, vertex offsets array
+    :param influence_ids: np.ndarray, influence logical index of each stored value
+    :param values: np.ndarray, weight values
+    :param columns_ids: np.ndarray, influence logical index of each column of the returned array
+    :return: np.ndarray, weights array of shape (vertices_count, len(columns_ids))
+    """
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    influence_ids = np.asarray(influence_ids)
+    columns_ids = np.asarray(columns_ids)
+
+    columns = get_influence_columns(columns_ids, influence_ids)
+
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    weights = np.zeros((len(offsets) - 1, len(columns_ids)), dtype=np.float64)
+    weights[rows, columns] = values
+
+    return weights
+
+
+def get_locked_mask(locked_influences, influences_count):
+    """
+    Returns a boolean mask with the locked columns of a weights array
+    :param locked_influences: np.ndarray or list(int) or None, boolean mask or column indices of the locked influences
+    :param influences_count: int, number of columns of the weights array
+    :return: np.ndarray
+    """
+
+    locked_mask = np.zeros(influences_count, dtype=bool)
+    if locked_influences is None:
+        return locked_mask
+
+    locked_influences = np.asarray(locked_influences)
+    if locked_influences.dtype == bool:
+        if len(locked_influences) != influences_count:
+            raise ValueError('Locked influences mask size {} does not match influences count {}'.format(
+                len(locked_influences), influences_count))
+        locked_mask[:] = locked_influences
+    else:
+        locked_mask[locked_influences.astype(np.int64)] = True
+
+    return locked_mask
+
+
+def prune_weights(weights, threshold, locked_influences=None):
+    """
+    Sets to zero the weights lower than the given threshold
+    Locked influences and the largest weight of each vertex are never pruned
+    :param weights: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :param threshold: float, weights lower than this value are pruned
+    :param locked_influences: np.ndarray or list(int) or None, boolean mask or column indices of the locked influences
+    :return: np.ndarray, new pruned weights array
+    """
+
+    weights = np.array(weights, dtype=np.float64)
+    if not weights.size:
+        return weights
+
+    prune_mask = weights < threshold
+    prune_mask[:, get_locked_mask(locked_influences, weights.shape[1])] = False
+    prune_mask[np.arange(weights.shape[0]), np.argmax(weights, axis=1)] = False
+    weights[prune_mask] = 0.0
+
+    return weights
+
+
+def limit_weights(weights, max_influences, locked_influences=None):
+    """
+    Keeps only the given number of largest weights of each vertex
+    Non zero locked influences are never removed and count towards the maximum number of influences
+    :param weights: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :param max_influences: int, maximum number of non zero weights of each vertex
+    :param locked_influences: np.ndarray or list(int) or None, boolean mask or column indices of the locked influences
+    :return: np.ndarray, new limited weights array
+    """
+
+    weights = np.array(weights, dtype=np.float64)
+    vertices_count, influences_count = weights.shape
+    max_influences = max(int(max_influences), 1)
+    if max_influences >= influences_count:
+        return weights
+
+    # Non zero locked weights are ranked first so they are always part of the kept influences
+    locked_mask = get_locked_mask(locked_influences, influences_count)
+    ranking = weights.copy()
+    ranking[:, locked_mask] = np.where(weights[:, locked_mask] != 0.0, np.inf, -np.inf)
+    kept = np.argpartition(-ranking, max_influences - 1, axis=1)[:, :max_influences]
+
+    remove_mask = np.ones(weights.shape, dtype=bool)
+    remove_mask[np.arange(vertices_count)[:, None], kept] = False
+    remove_mask[:, locked_mask] = False
+    weights[remove_mask] = 0.0
+
+    return weights
+
+
+def normalize_weights(weights, locked_influences=None):
+    """
+    Scales the weights of each vertex so they sum 1
+    Locked influences are not modified, unlocked weights are scaled to fill the remaining weight
+    Vertices without unlocked weights are not modified
+    :param weights: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :param locked_influences: np.ndarray or list(int) or None, boolean mask or column indices of the locked influences
+    :return: np.ndarray, new normalized weights array
+    """
+
+    weights = np.array(weights, dtype=np.float64)
+    if not weights.size:
+        return weights
+
+    locked_mask = get_locked_mask(locked_influences, weights.shape[1])
+    unlocked_weights = weights[:, ~locked_mask]
+    remaining = np.maximum(1.0 - weights[:, locked_mask].sum(axis=1), 0.0)
+    totals = unlocked_weights.sum(axis=1)
+    valid = totals > 0.0
+    scales = np.ones(len(weights), dtype=np.float64)
+    scales[valid] = remaining[valid] / totals[valid]
+    weights[:, ~locked_mask] = unlocked_weights * scales[:, None]
+
+    return weights
+
+
+def process_weights(weights, prune_threshold=None, max_influences=None, normalize=True, locked_influences=None):
+    """
+    Runs the prune, influences limit and normalization steps over the given weights array
+    :param weights: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :param prune_threshold: float or None, weights lower than this value are pruned. If None, weights are not pruned
+    :param max_influences: int or None, maximum number of non zero weights of each vertex. If None, no limit is applied
+    :param normalize: bool, Whether weights of each vertex should be normalized
+    :param locked_influences: np.ndarray or list(int) or None, boolean mask or column indices of the locked influences
+    :return: np.ndarray, new processed weights array
+    """
+
+    weights = np.array(weights, dtype=np.float64)
+    if prune_threshold is not None:
+        weights = prune_weights(weights, prune_threshold, locked_influences=locked_influences)
+    if max_influences is not None:
+        weights = limit_weights(weights, max_influences, locked_influences=locked_influences)
+    if normalize:
+        weights = normalize_weights(weights, locked_influences=locked_influences)
+
+    return weights
+
+
+def get_weighted_vertices(weights, columns=None, threshold=0.0):
+    """
+    Returns the vertices weighted above the given threshold for each one of the given weights array columns
+    :param weights: np.ndarray, weights array of shape (vertices_count, influences_count)
+    :param columns: list(int) or np.ndarray or None, columns to get vertices of. If None, all columns are used
+    :param threshold: float, only vertices with weights greater than this value are returned
+    :return: list(np.ndarray), sorted vertex indices array of each column
+    """
+
+    weights = np.asarray(weights, dtype=np.float64)
+    if columns is None:
+        columns = np.arange(weights.shape[1])
+    columns = np.asarray(columns, dtype=np.int64)
+
+    column_ids, vertex_ids = np.nonzero(weights[:, columns].T > threshold)
+    splits = np.cumsum(np.bincount(column_ids, minlength=len(columns)))[:-1]
+
+    return np.split(vertex_ids, splits)
+
+
+def get_skin_weights_sparse(skin_cluster, vertices_ids=None, tolerance=0.0):
+    """
+    Returns the skin weights of the given skin cluster as CSR-style sparse arrays
+    All the weights are gathered with a single MFnSkinCluster.getWeights call
+    :param skin_cluster: str or MFnSkinCluster
+    :param vertices_ids: list(int) or np.ndarray or None, vertices to get weights of. If None, all vertices are used
+    :param tolerance: float, weights lower or equal than this value are not returned
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray) or None, vertex offsets, influence ids and values.
+        Weights of vertex i (of the given vertices) are stored between offsets[i] and offsets[i + 1]
+    """
+
+    if python.is_string(skin_cluster):
+        skin_cluster, _ = get_skin_cluster(skin_cluster)
+    if not skin_cluster:
+        return None
+
+    geometry_path = get_skin_cluster_geometry_path(skin_cluster)
+    if not geometry_path:
+        return None
+
+    components, components_ids = get_geometry_component(geometry_path, vertices_ids)
+    influences_array = get_influence_indices(skin_cluster)
+    weights = weights_to_array(
+        skin_cluster.getWeights(geometry_path, components, influences_array), len(influences_array))
+    if vertices_ids is not None and not np.array_equal(components_ids, vertices_ids):
+        weights = weights[get_rows_order(components_ids, vertices_ids)]
+
+    return dense_to_sparse(weights, np.array(influences_array, dtype=np.int32), tolerance=tolerance)
+
+
+def set_skin_weights_sparse(skin_cluster, offsets, influence_ids, values, vertices_ids=None, influences=None):
+    """
+    Sets the skin weights of the given skin cluster from CSR-style sparse arrays
+    All the weights are written with a single undoable MFnSkinCluster.setWeights call
+    :param skin_cluster: str or MFnSkinCluster
+    :param offsets: np.ndarray, vertex offsets array
+    :param influence_ids: np.ndarray, influence logical index of each stored value
+    :param values: np.ndarray, weight values
+    :param vertices_ids: list(int) or np.ndarray or None, vertices the sparse rows belong to. If None, sparse rows
+        must match all the vertices of the skinned geometry
+    :param influences: list(int) or np.ndarray or None, influences logical indices to write. Weights of other
+        influences are not modified. If None, all skin cluster influences are written.
+    """
+
+    if python.is_string(skin_cluster):
+        skin_cluster, _ = get_skin_cluster(skin_cluster)
+    if not skin_cluster:
+        return None
+
+    geometry_path = get_skin_cluster_geometry_path(skin_cluster)
+    if not geometry_path:
+        return None
+
+    vertices_count = maya.api.OpenMaya.MItGeometry(geometry_path).count()
+    rows_count = len(offsets) - 1
+    expected_count = vertices_count if vertices_ids is None else len(vertices_ids)
+    if rows_count != expected_count:
+        raise ValueError('Sparse weights contain {} vertices but {} were expected'.format(rows_count, expected_count))
+
+    components, components_ids = get_geometry_component(geometry_path, vertices_ids)
+    if influences is None:
+        influences_array = get_influence_indices(skin_cluster)
+    else:
+        influences_array = maya.api.OpenMaya.MIntArray([int(influence_id) for influence_id in influences])
+    weights = sparse_to_dense(offsets, influence_ids, values, np.array(influences_array, dtype=np.int32))
+    if vertices_ids is not None and not np.array_equal(components_ids, vertices_ids):
+        weights = weights[get_rows_order(vertices_ids, components_ids)]
+
+    runner = command.CommandRunner()
+
+    runner.run(
+        'tpDcc-dccs-maya-commands-setSkinWeights',
+        skin_cluster=skin_cluster, mesh_path=geometry_path, mesh_components=components,
+        influences_array=influences_array, weights_array=array_to_weights(weights))
@@ -0,0 +1,259 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains classes to store sparse and compressed skin weights undo snapshots
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import zlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+# Default memory budget used by skin weights snapshot stores (in bytes)
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class SkinWeightsSnapshot(object):
+    """
+    Stores the old values of the skin weights that changed during an edit as (vertex, influence, old value) triples
+    Cell indices are delta encoded and both indices and values are zlib compressed
+    """
+
+    __slots__ = ('_shape', '_count', '_indices', '_values')
+
+    def __init__(self, old_weights, new_weights, compression_level=1):
+        old_weights = np.asarray(old_weights, dtype=np.float64)
+        new_weights = np.asarray(new_weights, dtype=np.float64)
+        if old_weights.shape != new_weights.shape:
+            raise ValueError('Old weights shape {} does not match new weights shape {}'.format(
+                old_weights.shape, new_weights.shape))
+
+        flat_indices = np.flatnonzero(old_weights != new_weights)
+        deltas = np.diff(np.concatenate(([0], flat_indices))).astype(np.int64)
+
+        self._shape = old_weights.shape
+        self._count = len(flat_indices)
+        self._indices = zlib.compress(deltas.tobytes(), compression_level)
+        self._values = zlib.compress(old_weights.ravel()[flat_indices].tobytes(), compression_level)
+
+    @property
+    def shape(self):
+        """
+        Returns the (vertices, influences) shape of the weights this snapshot was taken from
+        :return: tuple(int, int)
+        """
+
+        return self._shape
+
+    @property
+    def count(self):
+        """
+        Returns the number of weights that changed
+        :return: int
+        """
+
+        return self._count
+
+    @property
+    def nbytes(self):
+        """
+        Returns the number of bytes used by this snapshot
+        :return: int
+        """
+
+        return len(self._indices) + len(self._values)
+
+    def get_changes(self):
+        """
+        Returns the decompressed (vertex ids, influence ids, old values) triples of this snapshot
+        :return: tuple(np.ndarray, np.ndarray, np.ndarray)
+        """
+
+        flat_indices = np.cumsum(np.frombuffer(zlib.decompress(self._indices), dtype=np.int64))
+        values = np.frombuffer(zlib.decompress(self._values), dtype=np.float64)
+        influences_count = max(self._shape[1], 1)
+        vertex_ids = flat_indices // influences_count
+        influence_ids = flat_indices % influences_count
+
+        return vertex_ids, influence_ids, values
+
+    def restore(self, weights):
+        """
+        Writes the old values stored in this snapshot into the given weights array
+        :param weights: np.ndarray, current weights array, it is modified in place
+        :return: np.ndarray
+        """
+
+        if weights.shape != self._shape:
+            raise ValueError('Weights shape {} does not match snapshot shape {}'.format(weights.shape, self._shape))
+
+        vertex_ids, influence_ids, values = self.get_changes()
+        weights[vertex_ids, influence_ids] = values
+
+        return weights
+
+
+class SkinWeightsSnapshotStore(object):
+    """
+    Keeps skin weights undo snapshots within a memory budget
+    When the budget is exceeded the oldest snapshots are evicted. The most recent snapshot is always kept.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, compression_level=1):
+        self._memory_budget = int(memory_budget)
+        self._compression_level = compression_level
+        self._snapshots = OrderedDict()
+        self._total_bytes = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __contains__(self, snapshot_id):
+        return snapshot_id in self._snapshots
+
+    @property
+    def memory_budget(self):
+        """
+        Returns the maximum number of bytes the store can use
+        :return: int
+        """
+
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, value):
+        with self._lock:
+            self._memory_budget = int(value)
+            self._evict()
+
+    @property
+    def total_bytes(self):
+        """
+        Returns the number of bytes used by all the stored snapshots
+        :return: int
+        """
+
+        return self._total_bytes
+
+    def add(self, old_weights, new_weights):
+        """
+        Stores the weights that differ between given old and new weights arrays
+        :param old_weights: np.ndarray, weights before the edit
+        :param new_weights: np.ndarray, weights after the edit
+        :return: int, snapshot ID that can be used to restore the old weights
+        """
+
+        snapshot = SkinWeightsSnapshot(old_weights, new_weights, compression_level=self._compression_level)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = snapshot
+            self._total_bytes += snapshot.nbytes
+            self._evict()
+
+        return snapshot_id
+
+    def get(self, snapshot_id):
+        """
+        Returns snapshot with given ID
+        :param snapshot_id: int
+        :return: SkinWeightsSnapshot or None, None if the snapshot was evicted
+        """
+
+        return self._snapshots.get(snapshot_id)
+
+    def restore(self, snapshot_id, weights):
+        """
+        Writes the old values of the snapshot with the given ID into the given weights array
+        :param snapshot_id: int
+        :param weights: np.ndarray, current weights array, it is modified in place
+        :return: bool, False if the snapshot is not available anymore
+        """
+
+        snapshot = self.get(snapshot_id)
+        if snapshot is None:
+            return False
+
+        snapshot.restore(weights)
+
+        return True
+
+    def remove(self, snapshot_id):
+        """
+        Removes the snapshot with given ID from the store
+        :param snapshot_id: int
+        """
+
+        with self._lock:
+            snapshot = self._snapshots.pop(snapshot_id, None)
+            if snapshot is not None:
+                self._total_bytes -= snapshot.nbytes
+
+    def clear(self):
+        """
+        Removes all stored snapshots
+        """
+
+        with self._lock:
+            self._snapshots.clear()
+            self._total_bytes = 0
+
+    def get_size(self, snapshot_id):
+        """
+        Returns the number of bytes used by the undo snapshot with given ID
+        :param snapshot_id: int
+        :return: int, 0 if the snapshot is not available anymore
+        """
+
+        snapshot = self.get(snapshot_id)
+
+        return snapshot.nbytes if snapshot is not None else 0
+
+    def get_sizes(self):
+        """
+        Returns the number of bytes used by each one of the stored undo snapshots, from oldest to newest
+        :return: OrderedDict(int, int)
+        """
+
+        with self._lock:
+            return OrderedDict((snapshot_id, snapshot.nbytes) for snapshot_id, snapshot in self._snapshots.items())
+
+    def _evict(self):
+        """
+        Internal function that removes oldest snapshots until the store fits within its memory budget
+        """
+
+        while self._total_bytes > self._memory_budget and len(self._snapshots) > 1:
+            snapshot_id, snapshot = self._snapshots.popitem(last=False)
+            self._total_bytes -= snapshot.nbytes
+            logger.debug('Skin weights undo snapshot {} evicted ({} bytes)'.format(snapshot_id, snapshot.nbytes))
+
+
+SNAPSHOT_STORE = SkinWeightsSnapshotStore()
+
+
+def get_snapshot_store():
+    """
+    Returns the snapshot store used by skin weights undoable commands
+    :return: SkinWeightsSnapshotStore
+    """
+
+    return SNAPSHOT_STORE
+
+
+def set_memory_budget(memory_budget):
+    """
+    Sets the memory budget (in bytes) of the snapshot store used by skin weights undoable commands
+    :param memory_budget: int
+    """
+
+    SNAPSHOT_STORE.memory_budget = memory_budget
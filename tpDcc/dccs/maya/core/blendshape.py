@@ -7,14 +7,16 @@ This module include data class for blendshapes
 
 from __future__ import print_function, division, absolute_import
 
-import string
 import logging
 
+import numpy as np
+
 import maya.cmds
 
-from tpDcc.libs.python import python, name as core_name
+from tpDcc.libs.python import python
 from tpDcc.dccs.maya.core import exceptions, deformer, shape, component, name as name_utils, attribute as attr_utils
 from tpDcc.dccs.maya.core import geometry as geo_utils
+from tpDcc.dccs.maya.api import blendshape as api_blendshape
 
 LOGGER = logging.getLogger('tpDcc-dccs-maya')
 
@@ -189,28 +191,26 @@ class BlendShape(object):
         return self._targets_list
 
     def get_weights(self, target_name=None, mesh_index=0):
-        weights = list()
+        """
+        Returns the vertex weights of the wrapped blendShape node. If no target name is given, base weights are returned
+        :param target_name: str, name of the target. If not given, base weights will be returned.
+        :param mesh_index: int, the index of the mesh in the wrapped blendShape node.
+        :return: list(float)
+        """
 
         if not self._meshes:
             self._store_meshes()
         if not self._meshes:
-            return weights
+            return list()
 
-        mesh = self._meshes[mesh_index]
-        vertex_count = component.get_component_count(mesh)
+        if target_name and not self.is_target(target_name):
+            return list()
 
-        if target_name is None:
-            for i in range(vertex_count):
-                weight_attr = self._get_input_target_base_weights_attribute(mesh_index)
-                weight = maya.cmds.getAttr('{}[{}]'.format(weight_attr, i))
-                weights.append(weight)
-        else:
-            for i in range(vertex_count):
-                weight_attr = self._get_input_target_group_weights_attribute(mesh_index)
-                weight = maya.cmds.getAttr('{}[{}]'.format(weight_attr, i))
-                weights.append(weight)
+        vertex_count = component.get_component_count(self._meshes[mesh_index])
+        weights = api_blendshape.get_weights_array(
+            self._blendshape, target=target_name or None, geometry_index=mesh_index, components_count=vertex_count)
 
-        return weights
+        return weights.tolist()
 
     def set_weights(self, weights, target_name=None, mesh_index=0):
         """
@@ -222,9 +222,8 @@ class BlendShape(object):
         """
 
         weights = python.force_list(weights)
-        weight_count = len(weights)
 
-        if weight_count == 1:
+        if len(weights) == 1:
             if not self._meshes:
                 self._store_meshes()
             if not self._meshes:
@@ -233,30 +232,17 @@ class BlendShape(object):
             vertex_count = component.get_component_count(mesh)
             weights = weights * vertex_count
 
-        if target_name:
-            attribute = self._get_input_target_group_weights_attribute(target_name, mesh_index=mesh_index)
-        else:
-            attribute = self._get_input_target_base_weights_attribute(mesh_index=mesh_index)
-
-        # TODO: Check whether this can be done faster using Maya API
-        """
-        plug = api.get_plug(attribute)
-        for i in range(weight_count):
-            plug.elementByLogicalIndex(inc).setFloat(weights[inc])
-        """
+        if target_name and not self.is_target(target_name):
+            return False
 
-        try:
-            maya.cmds.setAttr(attribute + '[*}', *weights)
-        except Exception:
-            for i in range(weight_count):
-                attribute_name = attribute + '[{}]'.format(i)
-                maya.cmds.setAttr(attribute_name, weights[i])
+        api_blendshape.set_weights_array(
+            self._blendshape, weights, target=target_name or None, geometry_index=mesh_index)
 
         return True
 
     def _get_input_target(self, mesh_index=0):
         attribute = [self._blendshape, 'inputTarget[{}]'.format(mesh_index)]
-        attribute = string.join(attribute, '.')
+        attribute = '.'.join(attribute)
 
         return attribute
 
@@ -269,21 +255,21 @@ class BlendShape(object):
         target_index = self._targets[name].index
         input_attribute = self._get_input_target(mesh_index)
         attribute = [input_attribute, 'inputTargetGroup[{}]'.format(target_index)]
-        attribute = string.join(attribute, '.')
+        attribute = '.'.join(attribute)
 
         return attribute
 
     def _get_input_target_base_weights_attribute(self, mesh_index=0):
         input_attribute = self._get_input_target(mesh_index)
         attribute = [input_attribute, 'baseWeights']
-        attribute = string.join(attribute, '.')
+        attribute = '.'.join(attribute)
 
         return attribute
 
     def _get_input_target_group_weights_attribute(self, name, mesh_index=0):
         input_attribute = self._get_input_target_group(name, mesh_index=mesh_index)
         attribute = [input_attribute, 'targetWeights']
-        attribute = string.join(attribute, '.')
+        attribute = '.'.join(attribute)
 
         return attribute
 
@@ -308,7 +294,10 @@ class BlendShape(object):
         if not alias_index_map:
             return
 
-        for index, alias in alias_index_map.items():
+        self._targets = dict()
+        self._targets_list = list()
+        self._weight_indices = list()
+        for alias, index in alias_index_map.items():
             self._store_target(alias, index)
 
     def _store_meshes(self):
@@ -437,15 +426,10 @@ def get_target_index(blend_shape, target):
     """
 
     check_blendshape(blend_shape)
-    if not maya.cmds.objExists(blend_shape + '.' + target):
+    target_index = api_blendshape.get_target_map(blend_shape).get_index(target)
+    if target_index is None:
         raise Exception('BlendShape "{}" has no target "{}"!'.format(blend_shape, target))
 
-    alias_list = maya.cmds.aliasAttr(blend_shape, query=True)
-    alias_index = alias_list.index(target)
-    alias_attr = alias_list[alias_index + 1]
-
-    target_index = int(alias_attr.split('[')[-1].split(']')[0])
-
     return target_index
 
 
@@ -594,6 +578,7 @@ def add_empty_target(blend_shape, target_alias='', input_target_items=None):
                         blend_shape, i, next_index, iti), type='pointArray', *[0])
     maya.cmds.setAttr('{}.w[{}]'.format(blend_shape, next_index), 0.0)
     maya.cmds.aliasAttr(target_name, '{}.w[{}]'.format(blend_shape, next_index))
+    api_blendshape.invalidate_target_map(blend_shape)
     maya.cmds.refresh()
 
     return blend_shape + '.' + target_name
@@ -629,6 +614,7 @@ def add_target(blend_shape, target, base='', target_index=-1, target_alias='', t
     if target_alias:
         target_index = get_target_index(blend_shape, target_name)
         maya.cmds.aliasAttr(target_alias, blend_shape + '.weight[' + str(target_index) + ']')
+        api_blendshape.invalidate_target_map(blend_shape)
         target_name = target_alias
 
     if target_weight:
@@ -723,17 +709,13 @@ def get_target_weights(blend_shape, target, geometry=''):
     if geometry and not maya.cmds.objExists(geometry):
         raise Exception('Object "{}" does not exists!'.format(geometry))
 
-    alias_list = maya.cmds.aliasAttr(blend_shape, query=True)
-    alias_target = alias_list[(alias_list.index(target) + 1)]
-    target_index = int(alias_target.split('[')[-1].split(']')[0])
+    target_index = get_target_index(blend_shape, target)
 
     geo_index = 0
     if geometry:
         geo_index = deformer.get_geo_index(geometry, blend_shape)
 
-    wt = maya.cmds.getAttr(blend_shape + '.it[' + str(geo_index) + '].itg[' + str(target_index) + '].tw')[0]
-
-    return list(wt)
+    return api_blendshape.get_weights_array(blend_shape, target=target_index, geometry_index=geo_index).tolist()
 
 
 def set_target_weights(blend_shape, target, wt, geometry=''):
@@ -753,19 +735,91 @@ def set_target_weights(blend_shape, target, wt, geometry=''):
     if geometry and not maya.cmds.objExists(geometry):
         raise Exception('Object "{}" does not exists!'.format(geometry))
 
-    alias_list = maya.cmds.aliasAttr(blend_shape, query=True)
-    alias_target = alias_list[(alias_list.index(target) + 1)]
-    target_index = int(alias_target.split('[')[-1].split(']')[0])
+    target_index = get_target_index(blend_shape, target)
 
     geo_index = 0
     if geometry:
         geo_index = deformer.get_geo_index(geometry, blend_shape)
 
     comp_count = component.get_component_count(geometry)
+    wt = np.asarray(wt, dtype=np.float64).ravel()
+    if len(wt) != comp_count:
+        raise Exception('Weights count {} does not match "{}" components count {}!'.format(
+            len(wt), geometry, comp_count))
+
+    api_blendshape.set_weights_array(blend_shape, wt, target=target_index, geometry_index=geo_index)
+
+
+def get_target_deltas(blend_shape, target, base_geo='', item_index=6000, tolerance=None):
+    """
+    Returns the sparse deltas stored in the given blendshape target, without the need of any target geometry
+    :param blend_shape: str, name of blendshape to get target deltas from
+    :param target: str, name of blendshape target to get deltas of
+    :param base_geo: str, blendshape base geometry name. If empty, use base geometry at index 0
+    :param item_index: int, target item index (6000 + 1000 * weight). 6000 is the full target
+    :param tolerance: float or None, if given, deltas with a length lower or equal than this value are discarded
+    :return: tuple(np.ndarray, np.ndarray), component ids and deltas array of shape (ids_count, 3)
+    """
+
+    target_index = get_target_index(blend_shape, target)
+    geo_index = deformer.get_geo_index(base_geo, blend_shape) if base_geo else 0
+
+    return api_blendshape.get_target_deltas(
+        blend_shape, target_index, geometry_index=geo_index, item_index=item_index, tolerance=tolerance)
+
+
+def set_target_deltas(blend_shape, target, ids, deltas, base_geo='', item_index=6000, create=False):
+    """
+    Stores the given sparse deltas in the given blendshape target, without the need of any target geometry
+    :param blend_shape: str, name of blendshape to set target deltas on
+    :param target: str, name of blendshape target to set deltas of
+    :param ids: np.ndarray or list(int), component ids
+    :param deltas: np.ndarray, deltas array of shape (ids_count, 3)
+    :param base_geo: str, blendshape base geometry name. If empty, use base geometry at index 0
+    :param item_index: int, target item index (6000 + 1000 * weight). 6000 is the full target
+    :param create: bool, Whether to create the target if it does not exist yet
+    :return: str
+    """
+
+    check_blendshape(blend_shape)
+    if not has_target(blend_shape, target):
+        if not create:
+            raise exceptions.BlendShapeTargetException(blend_shape, target)
+        target_index = next_available_target_index(blend_shape)
+        maya.cmds.setAttr('{}.weight[{}]'.format(blend_shape, target_index), 0.0)
+        maya.cmds.aliasAttr(target, '{}.weight[{}]'.format(blend_shape, target_index))
+        api_blendshape.invalidate_target_map(blend_shape)
+    else:
+        target_index = get_target_index(blend_shape, target)
+
+    geo_index = deformer.get_geo_index(base_geo, blend_shape) if base_geo else 0
+    api_blendshape.set_target_deltas(
+        blend_shape, target_index, ids, deltas, geometry_index=geo_index, item_index=item_index)
+
+    return blend_shape + '.' + target
+
+
+def add_target_from_deltas(blend_shape, target_alias, ids, deltas, base_geo='', target_weight=0.0):
+    """
+    Adds a new target to the given blendShape from sparse deltas, without creating any target geometry
+    :param blend_shape: str, name of the blendShape to add target to
+    :param target_alias: str, blendShape target alias
+    :param ids: np.ndarray or list(int), component ids
+    :param deltas: np.ndarray, deltas array of shape (ids_count, 3)
+    :param base_geo: str, blendshape base geometry name. If empty, use base geometry at index 0
+    :param target_weight: float, set the target weight value
+    :return: str
+    """
+
+    check_blendshape(blend_shape)
+    if has_target(blend_shape, target_alias):
+        raise Exception('BlendShape "{}" already has a target "{}"!'.format(blend_shape, target_alias))
+
+    target_attr = set_target_deltas(blend_shape, target_alias, ids, deltas, base_geo=base_geo, create=True)
+    if target_weight:
+        maya.cmds.setAttr(target_attr, target_weight)
 
-    maya.cmds.setAttr(
-        blend_shape + '.it[' + str(geo_index) + '].itg[' + str(target_index) + '].tw[0:' + str(comp_count - 1) + ']',
-        *wt)
+    return target_attr
 
 
 def connect_to_target(blend_shape, target_geo, target_name, base_geo, weight=1.0, force=False):
@@ -833,6 +887,7 @@ def rename_target(blend_shape, target, new_name):
         raise exceptions.BlendShapeTargetException(blend_shape, target)
 
     maya.cmds.aliasAttr(new_name, blend_shape + '.' + target)
+    api_blendshape.invalidate_target_map(blend_shape)
 
     return new_name
 
@@ -896,19 +951,7 @@ def map_blend_target_alias_to_index(blendshape_node):
     :return: dict(str, index), dict[alias] = target index
     """
 
-    alias_map = dict()
-
-    aliases = maya.cmds.aliasAttr(blendshape_node, query=True)
-    if not aliases:
-        return alias_map
-
-    for i in range(0, len(aliases), 2):
-        alias = aliases[i]
-        weight = aliases[i + 1]
-        target_index = core_name.get_end_number(weight)
-        alias_map[alias] = target_index
-
-    return alias_map
+    return api_blendshape.get_target_map(blendshape_node).get_alias_to_index()
 
 
 def map_blend_to_target_alias(blendshape_node):
@@ -918,19 +961,7 @@ def map_blend_to_target_alias(blendshape_node):
     :return: dict(int, str), dict[target_index] = weight alias
     """
 
-    alias_map = dict()
-
-    aliases = maya.cmds.aliasAttr(blendshape_node, query=True)
-    if not aliases:
-        return alias_map
-
-    for i in range(0, len(aliases), 2):
-        alias = aliases[i]
-        weight = aliases[i + 1]
-        target_index = core_name.get_end_number(weight)
-        alias_map[target_index] = alias
-
-    return alias_map
+    return api_blendshape.get_target_map(blendshape_node).get_index_to_alias()
 
 
 def get_index_at_alias(alias, blendshape_node):
@@ -941,11 +972,7 @@ def get_index_at_alias(alias, blendshape_node):
     :return: int, corresponding target index to the alias
     """
 
-    map_dict = map_blend_target_alias_to_index(blendshape_node)
-    if not map_dict:
-        return
-
-    return map_dict.get(alias, None)
+    return api_blendshape.get_target_map(blendshape_node).get_index(alias)
 
 
 def is_mesh_blendshape_compatible(base, target):
@@ -10,6 +10,8 @@ from __future__ import print_function, division, absolute_import
 import re
 import logging
 
+import numpy as np
+
 import maya.cmds
 import maya.OpenMaya
 import maya.api.OpenMaya
@@ -17,7 +19,7 @@ import maya.api.OpenMayaAnim
 
 from tpDcc.libs.python import python
 from tpDcc.dccs.maya.core import node, attribute, exceptions
-from tpDcc.dccs.maya.core import geometry as geo_utils
+from tpDcc.dccs.maya.api import deformer as api_deformer
 
 LOGGER = logging.getLogger('tpDcc-dccs-maya')
 
@@ -376,61 +378,60 @@ def rename_deformer_set(deformer, deformer_set_name=''):
 
 def get_weights(deformer, geometry=None):
     """
-    Get the weights for the given deformer. Weights returned as a Python list object
+    Get the weights of the deformer set members of the given deformer. Weights returned as a Python list object
     :param deformer: str, deformer to get weights for
     :param geometry: str, target geometry to get weights from
     :return: list<float>
     """
 
-    # TODO: Make sure dependant functions return objects as OpenMaya1 objects
-    # NOTE: 'get_weights function is dependant of MFnWeightGeometryFilter which is not available in OpenMaya 2.0 yet!
-
-    check_deformer(deformer)
-
-    if not geometry:
-        geometry = get_affected_geometry(deformer=deformer).keys()[0]
-
-    geo_shape = geometry
-    if geometry and maya.cmds.objectType(geo_shape) == 'transform':
-        geo_shape = maya.cmds.listRelatives(geometry, s=True, ni=True)[0]
-
-    deformer_fn = get_deformer_fn(deformer)
-    deformer_set_mem = get_deformer_set_members(deformer=deformer, geometry=geo_shape)
-
-    weight_list = maya.api.OpenMaya.MFloatArray()
-    deformer_fn.getWeights(deformer_set_mem[0], deformer_set_mem[1], weight_list)
+    ids, weights = get_weights_array(deformer, geometry=geometry)
 
-    return list(weight_list)
+    return weights[ids].tolist()
 
 
 def set_weights(deformer, weights, geometry=None):
     """
-    Set the weights for the give ndeformer using the input value list
+    Set the weights of the deformer set members of the given deformer using the input value list
     :param deformer: str, deformer to set weights for
-    :param weights: list<float>, input weight value list
+    :param weights: list<float>, input weight value list, one value per deformer set member
     :param geometry: str, target geometry to apply weights to. If None, use first affected geometry
     """
 
-    # TODO: Make sure dependant functions return objects as OpenMaya1 objects
-    # set_weights function is dependant of MFnWeightGeometryFilter which is not available in OpenMaya 2.0 yet!
+    check_deformer(deformer)
+
+    geo_index = _get_geometry_index(deformer, geometry)
+    member_ids = api_deformer.get_membership_ids(deformer, geometry_index=geo_index)
+    api_deformer.set_weights_array(deformer, weights, geometry_index=geo_index, ids=member_ids)
+
+
+def get_weights_array(deformer, geometry=None):
+    """
+    Returns the weights of all the components of the given deformer geometry, read with a single call
+    :param deformer: str, deformer to get weights for
+    :param geometry: str, target geometry to get weights from. If None, use first affected geometry
+    :return: tuple(np.ndarray, np.ndarray), deformer set member ids and weights of all the geometry components
+    """
 
     check_deformer(deformer)
 
-    if not geometry:
-        geometry = get_affected_geometry(deformer).keys()[0]
+    geo_index = _get_geometry_index(deformer, geometry)
+    member_ids = api_deformer.get_membership_ids(deformer, geometry_index=geo_index)
+    weights = api_deformer.get_weights_array(deformer, geometry_index=geo_index)
 
-    geo_shape = geometry
-    geo_obj = node.get_mobject(geometry)
-    if geometry and geo_obj.hasFn(maya.api.OpenMaya.MFn.kTransform):
-        geo_shape = maya.cmds.listRelatives(geometry, s=True, ni=True)[0]
+    return member_ids, weights
 
-    deformer_fn = get_deformer_fn(deformer)
-    deformer_set_mem = get_deformer_set_members(deformer=deformer, geometry=geo_shape)
 
-    weights_list = maya.api.OpenMaya.MFloatArray()
-    [weights_list.append(i) for i in weights]
+def set_weights_array(deformer, weights, geometry=None):
+    """
+    Sets the weights of all the components of the given deformer geometry with a single call
+    :param deformer: str, deformer to set weights for
+    :param weights: np.ndarray, weights of all the geometry components
+    :param geometry: str, target geometry to apply weights to. If None, use first affected geometry
+    """
 
-    deformer_fn.setWeight(deformer_set_mem[0], deformer_set_mem[1], weights_list)
+    check_deformer(deformer)
+
+    api_deformer.set_weights_array(deformer, weights, geometry_index=_get_geometry_index(deformer, geometry))
 
 
 def bind_pre_matrix(deformer, bind_pre_matrix='', parent=True):
@@ -481,19 +482,15 @@ def prune_weights(deformer, geo_list=None, threshold=0.001):
 
     check_deformer(deformer)
 
-    geo_list = [] if geo_list is None else python.force_list(geo_list)
-    if not geo_list:
-        geo_list = maya.cmds.deformer(deformer, q=True, g=True)
-    if not geo_list:
-        raise Exception('No geometry to prune weights for!')
-    for geo in geo_list:
-        if not maya.cmds.objExists(geo):
-            raise exceptions.GeometryExistsException(geo)
-
-    for geo in geo_list:
-        weight_list = get_weights(deformer=deformer, geometry=geo)
-        weight_list = [wt if wt > threshold else 0.0 for wt in weight_list]
-        set_weights(deformer=deformer, weights=weight_list, geometry=geo)
+    for geo in _get_geometry_list(deformer, geo_list):
+        member_ids, weights = get_weights_array(deformer=deformer, geometry=geo)
+        prune_mask = np.zeros(len(weights), dtype=bool)
+        prune_mask[member_ids] = True
+        prune_mask &= (weights <= threshold) & (weights != 0.0)
+        if not prune_mask.any():
+            continue
+        weights[prune_mask] = 0.0
+        set_weights_array(deformer=deformer, weights=weights, geometry=geo)
 
 
 def prune_membership_by_weights(deformer, geo_list=None, threshold=0.001):
@@ -502,42 +499,18 @@ def prune_membership_by_weights(deformer, geo_list=None, threshold=0.001):
     :param deformer: str, name of the deformer to removed components from
     :param geo_list: list<str>, geometry objects whose components are checked for weight pruning
     :param threshold: float, weight threshold for removal
+    :return: list<str>, removed components
     """
 
-    # TODO: Make sure dependant functions return objects as OpenMaya1 objects
-    # prune_membership_by_weights function is dependant of MFnWeightGeometryFilter which is not available in OpenMaya2
-
     check_deformer(deformer)
 
-    geo_list = [] if geo_list is None else python.force_list(geo_list)
-    if not geo_list:
-        geo_list = maya.cmds.deformer(deformer, q=True, g=True)
-    if not geo_list:
-        raise Exception('No geometry to prune weights for!')
-    for geo in geo_list:
-        if not maya.cmds.objExists(geo):
-            raise exceptions.GeometryExistsException(geo)
-
-    deformer_set = get_deformer_set(deformer)
     all_prune_list = list()
-
-    for geo in geo_list:
-        geo_type = geo_utils.component_type(geo)
-        member_index_list = get_deformer_set_member_indices(deformer=deformer, geometry=geo)
-        weight_list = get_weights(deformer=deformer, geometry=geo)
-
-        prune_list = [member_index_list[i] for i in range(len(member_index_list)) if weight_list[i] <= threshold]
-        for i in range(len(prune_list)):
-            if type(prune_list[i]) == str or type(prune_list[i]) == unicode or type(prune_list[i]) == int:
-                prune_list[i] = '[{}]'.format(str(prune_list[i]))
-            elif type(prune_list[i]) == list:
-                prune_list[i] = [str(p) for p in prune_list[i]]
-                prune_list[i] = '[' + ']['.join(prune_list[i]) + ']'
-            prune_list[i] = geo + '.' + geo_type + str(prune_list[i])
-        all_prune_list.extend(prune_list)
-
-        if prune_list:
-            maya.cmds.sets(prune_list, rm=deformer_set)
+    for geo in _get_geometry_list(deformer, geo_list):
+        geo_index = get_geo_index(geo, deformer)
+        member_ids = api_deformer.get_membership_ids(deformer, geometry_index=geo_index)
+        weights = api_deformer.get_weights_array(deformer, geometry_index=geo_index)
+        prune_ids = member_ids[weights[member_ids] <= threshold]
+        all_prune_list.extend(api_deformer.remove_membership(deformer, prune_ids, geometry_index=geo_index))
 
     return all_prune_list
 
@@ -658,3 +631,32 @@ def find_deformer_by_type(geo_obj, deformer_type, return_all=False):
         return None
 
     return found
+
+
+def _get_geometry_index(deformer, geometry=None):
+    """
+    Internal function that returns the geometry index of the given geometry. If None, first affected geometry is used
+    """
+
+    if not geometry:
+        return min(get_affected_geometry(deformer=deformer).values())
+
+    return get_geo_index(geometry, deformer)
+
+
+def _get_geometry_list(deformer, geo_list=None):
+    """
+    Internal function that returns the given geometry list, or the deformer geometry if none is given, making sure
+    that all geometries exist
+    """
+
+    geo_list = [] if geo_list is None else python.force_list(geo_list)
+    if not geo_list:
+        geo_list = maya.cmds.deformer(deformer, q=True, g=True)
+    if not geo_list:
+        raise Exception('No geometry to prune weights for!')
+    for geo in geo_list:
+        if not maya.cmds.objExists(geo):
+            raise exceptions.GeometryExistsException(geo)
+
+    return geo_list
@@ -16,6 +16,7 @@ import maya.api.OpenMaya
 from tpDcc.libs.python import python
 from tpDcc.libs.math.core import vec3, octree, dijkstra
 from tpDcc.dccs.maya import api
+from tpDcc.dccs.maya.api import meshtopology
 from tpDcc.dccs.maya.core import helpers, exceptions, shape, transform as xform_utils, name as name_utils
 from tpDcc.dccs.maya.core import scene, joint as joint_utils, component as cmp_utils, shape as shape_utils
 
@@ -229,15 +230,53 @@ def is_mesh_compatible(mesh1, mesh2):
     :return: bool
     """
 
-    check = MeshTopologyCheck(mesh1, mesh2)
+    fingerprint1 = meshtopology.get_fingerprint(mesh1)
+    fingerprint2 = meshtopology.get_fingerprint(mesh2)
+    if fingerprint1 == fingerprint2:
+        return True
 
-    check_value = check.check_vert_edge_face_count()
-    if not check_value:
+    if fingerprint1.counts != fingerprint2.counts:
         return False
 
-    check_value = check.check_first_face_verts()
+    return sorted(fingerprint1.first_face) == sorted(fingerprint2.first_face)
+
+
+def get_mesh_topology_fingerprint(mesh):
+    """
+    Returns the cached topology hash of the given mesh. Hash is only recomputed if the mesh changed since last query
+    :param mesh: str, mesh shape or mesh transform
+    :return: str
+    """
+
+    return meshtopology.get_fingerprint(mesh).topology_hash
+
+
+def group_meshes_by_topology(meshes):
+    """
+    Groups the given meshes by topology comparing their cached topology hashes
+    :param meshes: list(str), mesh shapes or mesh transforms
+    :return: dict(str, list(str)), topology hash and meshes that share that topology
+    """
+
+    return meshtopology.group_by_topology(meshes)
+
+
+def get_topology_compatible_meshes(mesh, meshes, full_check=False, threads=None):
+    """
+    Returns the meshes that have the same topology as the given one
+    :param mesh: str, mesh shape or mesh transform used as reference
+    :param meshes: list(str), mesh shapes or mesh transforms to check
+    :param full_check: bool, Whether to compare topology arrays face by face instead of comparing topology hashes
+    :param threads: int or None, number of worker threads used by the full check. If None, the number of CPUs is used
+    :return: list(str)
+    """
+
+    if not full_check:
+        return meshtopology.get_matching_topology(mesh, meshes)
+
+    results = meshtopology.check_topology(mesh, meshes, threads=threads)
 
-    return bool(check_value)
+    return [other_mesh for other_mesh, result in zip(meshes, results) if result]
 
 
 def replace(source_geometry, target_geometry):
@@ -10,13 +10,16 @@ from __future__ import print_function, division, absolute_import
 import logging
 from collections import defaultdict
 
+import numpy as np
+
 import maya.cmds
 import maya.mel
 import maya.api.OpenMaya
 
 from tpDcc.dccs.maya import api
 from tpDcc.libs.python import python
-from tpDcc.dccs.maya.core import helpers, exceptions, node
+from tpDcc.dccs.maya.api import mesh as api_mesh, meshtopology
+from tpDcc.dccs.maya.core import helpers, exceptions, node, meshgraph
 
 LOGGER = logging.getLogger('tpDcc-dccs-maya')
 
@@ -347,61 +350,96 @@ def get_assigned_uvs(mesh, uv_set=None):
     return list(uv_count), list(uv_ids)
 
 
+def get_mesh_adjacency(mesh):
+    """
+    Returns the cached vertex adjacency of the given mesh
+    Adjacency is only built once per topology and it is shared by all the tools that need it (selection, weights
+    smoothing, symmetry, ...). It is rebuilt automatically if the topology of the mesh changes.
+    :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+    :return: tuple(np.ndarray, np.ndarray), vertex offsets and neighbour vertex indices.
+        Neighbours of vertex i are stored between offsets[i] and offsets[i + 1]
+    """
+
+    mesh_path = meshtopology.get_mesh_shape_path(mesh)
+    fingerprint = meshtopology.get_fingerprint(mesh_path)
+
+    return meshgraph.get_cached_adjacency(
+        (fingerprint.topology_hash, fingerprint.vertices_count), lambda: api_mesh.get_mesh_topology(mesh_path),
+        vertices_count=fingerprint.vertices_count)
+
+
 def get_connected_vertices(mesh, vertex_selection_set):
     """
     Get list of connected vertices in groups
     :param mesh: str, name of the mesh to get vertices from
-    :param vertex_selection_set: list<str>, list with vertices indices to get connected vertices of
-    :return:
+    :param vertex_selection_set: list<int>, list with vertices indices to get connected vertices of
+    :return: dict(int, set(int)), vertex indices of each group of connected vertices. Groups are numbered in the
+        order their first vertex appears in the given vertices
     """
 
-    # TODO: We need to rewrite this function to make it compatible with Maya API 1 and 2
+    district_dict = defaultdict(list)
+    vertices_ids = np.asarray(list(vertex_selection_set), dtype=np.int64)
+    if not len(vertices_ids):
+        return district_dict
 
-    def get_neighbour_vertices(curr_vert_iter, vert_index):
-        """
-        Get neighbour of given vertex index
-        :param curr_vert_iter: MItMeshVertex, iterator used to loop through all mesh vertices
-        :param vert_index: int, current vertex index being processed
-        :return: set<int>
-        """
+    offsets, neighbours = get_mesh_adjacency(mesh)
+    components = meshgraph.get_connected_components(offsets, neighbours, vertices_ids=vertices_ids)[vertices_ids]
+    _, first_ids = np.unique(components, return_index=True)
+    for district_number, component in enumerate(components[np.sort(first_ids)].tolist()):
+        district_dict[district_number] = set(vertices_ids[components == component].tolist())
 
-        curr_vert_iter.setIndex(vert_index, maya.api.OpenMaya.MScriptUtil().asIntPtr())
-        int_array = maya.api.OpenMaya.MIntArray()
-        curr_vert_iter.getConnectedVertices(int_array)
+    return district_dict
 
-        return set(int(x) for x in int_array)
 
-    # Set (non repeated elements) of already visited vertices
-    visited_neighbours = set()
-    district_dict = defaultdict(list)
-    district_number = 0
+def get_shell_ids(mesh):
+    """
+    Returns the shell (connected piece of geometry) each vertex of the given mesh belongs to
+    :param mesh: str, mesh shape or mesh transform
+    :return: np.ndarray, int64 shell id of each vertex
+    """
 
-    dep_node = node.get_depend_node(node=mesh)
+    return meshgraph.get_shell_ids(*get_mesh_adjacency(mesh))
 
-    vert_iter = maya.api.OpenMaya.MItMeshVertex(dep_node)
-    for index in vertex_selection_set:
-        district_houses = set()
-        if index not in visited_neighbours:
-            district_houses.add(index)
-            current_neighbours = get_neighbour_vertices(vert_iter, index)
 
-            while current_neighbours:
-                new_neighbours = set()
-                for neighbour in current_neighbours:
-                    if neighbour in vertex_selection_set and neighbour not in visited_neighbours:
-                        visited_neighbours.add(neighbour)
-                        district_houses.add(neighbour)
-                        new_neighbours = new_neighbours.union(get_neighbour_vertices(vert_iter, neighbour))
+def get_shells_vertices(mesh):
+    """
+    Returns the vertices of each one of the shells of the given mesh
+    :param mesh: str, mesh shape or mesh transform
+    :return: list(np.ndarray), sorted vertex indices of each shell
+    """
 
-                current_neighbours = new_neighbours
+    shell_ids = get_shell_ids(mesh)
+    order = np.argsort(shell_ids, kind='stable')
 
-            district_dict[district_number] = district_houses
-            district_number += 1
+    return np.split(order, np.flatnonzero(np.diff(shell_ids[order])) + 1)
 
-        vert_iter.setIndex(index, maya.api.OpenMaya.MScriptUtil().asIntPtr())
-        vert_iter.next()
 
-    return district_dict
+def grow_vertices(mesh, vertices_ids, rings=1):
+    """
+    Grows the given mesh vertices region by the given number of rings of neighbour vertices
+    :param mesh: str, mesh shape or mesh transform
+    :param vertices_ids: list(int) or np.ndarray, region vertex indices
+    :param rings: int, number of rings to grow
+    :return: np.ndarray, sorted vertex indices of the grown region
+    """
+
+    offsets, neighbours = get_mesh_adjacency(mesh)
+
+    return meshgraph.grow_vertices(offsets, neighbours, vertices_ids, rings=rings)
+
+
+def shrink_vertices(mesh, vertices_ids, rings=1):
+    """
+    Shrinks the given mesh vertices region by the given number of rings of border vertices
+    :param mesh: str, mesh shape or mesh transform
+    :param vertices_ids: list(int) or np.ndarray, region vertex indices
+    :param rings: int, number of rings to shrink
+    :return: np.ndarray, sorted vertex indices of the shrunk region
+    """
+
+    offsets, neighbours = get_mesh_adjacency(mesh)
+
+    return meshgraph.shrink_vertices(offsets, neighbours, vertices_ids, rings=rings)
 
 
 def convert_to_vertices(obj):
@@ -609,77 +647,116 @@ def get_closest_uv_on_mesh(mesh, value_list):
     return closest_uv
 
 
+def get_mesh_graph(mesh):
+    """
+    Returns the cached vertex adjacency of the given mesh together with the current length of its edges
+    :param mesh: str or MDagPath or MObject, mesh shape or mesh transform
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray, np.ndarray), vertex offsets, neighbour vertex indices, length
+        of each adjacency entry and object space vertex positions
+    """
+
+    mesh_path = meshtopology.get_mesh_shape_path(mesh)
+    offsets, neighbours = get_mesh_adjacency(mesh_path)
+    points = api_mesh.get_mesh_points(mesh_path)
+
+    return offsets, neighbours, meshgraph.get_edge_lengths(points, offsets, neighbours), points
+
+
+def get_shortest_vertices_path(mesh, start_id, end_id, use_distance=True):
+    """
+    Returns the shortest path along mesh edges between two vertices of the given mesh
+    :param mesh: str, mesh shape or mesh transform
+    :param start_id: int, start vertex index
+    :param end_id: int, end vertex index
+    :param use_distance: bool, Whether to use edge lengths (A*) or the number of edges (Dijkstra) as path cost
+    :return: np.ndarray, int64 vertex indices from start to end (both included). Empty if vertices are not connected
+    """
+
+    if not use_distance:
+        offsets, neighbours = get_mesh_adjacency(mesh)
+        return meshgraph.get_shortest_path(offsets, neighbours, start_id, end_id)
+
+    offsets, neighbours, edge_lengths, points = get_mesh_graph(mesh)
+
+    return meshgraph.get_shortest_path(offsets, neighbours, start_id, end_id, edge_lengths=edge_lengths, points=points)
+
+
+def get_shortest_vertices_paths(mesh, pairs, use_distance=True):
+    """
+    Returns the shortest paths along mesh edges between the given pairs of vertices of the given mesh
+    Mesh adjacency and edge lengths are only computed once for all the paths and a single search is done per
+    different start vertex
+    :param mesh: str, mesh shape or mesh transform
+    :param pairs: list(tuple(int, int)), start and end vertex indices of each path
+    :param use_distance: bool, Whether to use edge lengths or the number of edges as path cost
+    :return: list(np.ndarray), int64 vertex indices of each path, in the same order as the given pairs
+    """
+
+    if not use_distance:
+        offsets, neighbours = get_mesh_adjacency(mesh)
+        return meshgraph.get_shortest_paths(offsets, neighbours, pairs)
+
+    offsets, neighbours, edge_lengths, _ = get_mesh_graph(mesh)
+
+    return meshgraph.get_shortest_paths(offsets, neighbours, pairs, edge_lengths=edge_lengths)
+
+
+def get_vertices_geodesic_distances(mesh, vertices_ids, max_distance=None):
+    """
+    Returns the distance along mesh edges from the given vertices to every vertex of the given mesh
+    :param mesh: str, mesh shape or mesh transform
+    :param vertices_ids: list(int) or np.ndarray, source vertex indices
+    :param max_distance: float or None, if given, vertices further than this distance are not reached
+    :return: tuple(np.ndarray, np.ndarray), float64 distance of each vertex to its closest source vertex (inf if not
+        reached) and previous vertex of each vertex in its shortest path (-1 for sources and not reached vertices)
+    """
+
+    offsets, neighbours, edge_lengths, _ = get_mesh_graph(mesh)
+
+    return meshgraph.get_shortest_distances(
+        offsets, neighbours, vertices_ids, edge_lengths=edge_lengths, max_distance=max_distance)
+
+
 def find_shortest_vertices_path_between_vertices(vertices_list):
+    """
+    Returns the shortest path along mesh edges between the first and the last given vertices
+    :param vertices_list: list(str), vertices names. Only first and last ones are used
+    :return: list(str) or None, names of the path vertices from the one after the first vertex to the last vertex
+        (included) or None if vertices are not part of the same poly shell
+    """
 
-    start = vertices_list[0]
-    end = vertices_list[-1]
-    start = start[1:] if start.startswith('|') else start
-    end = end[1:] if end.startswith('|') else end
-    mesh = start.split('.')[0]
-
-    obj_type = maya.cmds.objectType(mesh)
-    if obj_type != 'mesh':
-        return None
-
-    first_extended_edges = maya.cmds.polyListComponentConversion(start, toEdge=True)
-    first_extended = maya.cmds.filterExpand(first_extended_edges, selectionMask=helpers.SelectionMasks.PolygonEdges)
-    second_extended_edges = maya.cmds.polyListComponentConversion(end, toEdge=True)
-    second_extended = maya.cmds.filterExpand(second_extended_edges, selectionMask=helpers.SelectionMasks.PolygonEdges)
-
-    found = list()
-    for e1 in first_extended:
-        for e2 in second_extended:
-            e1_num = int(e1.split('.e[')[-1].split(']')[0])
-            e2_num = int(e2.split('.e[')[-1].split(']')[0])
-            edge_sel = maya.cmds.polySelect(mesh, edgeLoopPath=[e1_num, e2_num], noSelection=True)
-            if edge_sel is None:
+    return find_shortest_vertices_paths_between_vertices([vertices_list])[0]
+
+
+def find_shortest_vertices_paths_between_vertices(vertices_lists):
+    """
+    Returns the shortest paths along mesh edges between the first and the last vertices of each given vertices list
+    Paths of the same mesh are solved together, so mesh adjacency and edge lengths are only computed once per mesh
+    :param vertices_lists: list(list(str)), vertices names of each path. Only first and last ones are used
+    :return: list(list(str) or None), names of the vertices of each path from the one after its first vertex to its
+        last vertex (included) or None if its vertices are not part of the same poly shell
+    """
+
+    paths = [None] * len(vertices_lists)
+    mesh_pairs = dict()
+    for i, vertices_list in enumerate(vertices_lists):
+        start = vertices_list[0]
+        end = vertices_list[-1]
+        start = start[1:] if start.startswith('|') else start
+        end = end[1:] if end.startswith('|') else end
+        mesh_pairs.setdefault(start.split('.')[0], list()).append((i, convert_to_indices([start, end])))
+
+    for mesh, pairs in mesh_pairs.items():
+        if not is_mesh(mesh):
+            continue
+        mesh_paths = get_shortest_vertices_paths(mesh, [pair[1] for pair in pairs])
+        for (i, _), path in zip(pairs, mesh_paths):
+            if not len(path):
+                LOGGER.error('Selected vertices are not part of the same polyShell!')
                 continue
-            found.append(edge_sel)
-
-    total_found = len(found)
-    if total_found != 0:
-        edge_selection = found[0]
-        if total_found != 1:
-            for sep_list in found:
-                if not len(sep_list) < len(edge_selection):
-                    continue
-                edge_selection = sep_list
-    else:
-        vtx_num1 = int(start.split('vtx[')[-1].split(']')[0])
-        vtx_num2 = int(end.split('vtx[')[-1].split(']')[0])
-        edge_selection = maya.cmds.polySelect(mesh, shortestEdgePath=[vtx_num1, vtx_num2])
-        if edge_selection is None:
-            LOGGER.error('Selected vertices are not part of the same polyShell!')
-            return None
-
-    all_edges = list()
-    new_vertex_selection = list()
-    for edge in edge_selection:
-        all_edges.append('{}.e[{}]'.format(mesh, edge))
-        mid_expand = convert_to_vertices('{}.e[{}]'.format(mesh, edge))
-        new_vertex_selection.append(mid_expand)
-
-    reverse = False if start in new_vertex_selection[0] else True
-    in_order = list()
-    last_vertex = None
-    for list_vertices in new_vertex_selection:
-        if start in list_vertices:
-            list_vertices.remove(start)
-        if last_vertex is not None and last_vertex in list_vertices:
-            list_vertices.remove(last_vertex)
-        if end in list_vertices:
-            list_vertices.remove(end)
-        if len(list_vertices) != 0:
-            last_vertex = list_vertices[0]
-            in_order.append(last_vertex)
-
-    if end not in in_order:
-        in_order.insert(0, end)
-
-    if reverse:
-        in_order.reverse()
-
-    return in_order
+            paths[i] = convert_indices_to_vertices(path[1:].tolist(), mesh)
+
+    return paths
 
 
 def fix_mesh_components_selection_visualization(mesh):
@@ -0,0 +1,446 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains mesh connectivity graph functions that work on NumPy topology arrays
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+# Maximum number of mesh adjacencies kept in memory
+ADJACENCY_CACHE_SIZE = 16
+
+_ADJACENCY_CACHE = OrderedDict()
+
+
+def get_edges(poly_counts, poly_connects):
+    """
+    Returns the unique edges of the given polygons topology
+    :param poly_counts: np.ndarray, number of vertices of each polygon
+    :param poly_connects: np.ndarray, vertex indices of each polygon
+    :return: np.ndarray, int64 array of shape (edges_count, 2) with the lower vertex index first
+    """
+
+    poly_counts = np.asarray(poly_counts, dtype=np.int64)
+    poly_connects = np.asarray(poly_connects, dtype=np.int64)
+    if not len(poly_connects):
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # Each polygon vertex is connected with the next one, last polygon vertex is connected with the first one
+    face_ends = np.cumsum(poly_counts)[poly_counts > 0] - 1
+    face_vertex_ids = np.arange(len(poly_connects))
+    next_ids = face_vertex_ids + 1
+    next_ids[face_ends] = face_ends - poly_counts[poly_counts > 0] + 1
+    start_vertices = poly_connects[face_vertex_ids]
+    end_vertices = poly_connects[next_ids]
+
+    edges = np.column_stack((np.minimum(start_vertices, end_vertices), np.maximum(start_vertices, end_vertices)))
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    vertices_count = int(poly_connects.max()) + 1
+    keys = np.unique(edges[:, 0] * vertices_count + edges[:, 1])
+
+    return np.column_stack((keys // vertices_count, keys % vertices_count))
+
+
+def get_adjacency(poly_counts, poly_connects, vertices_count=None):
+    """
+    Returns the vertex adjacency of the given polygons topology as CSR-style arrays
+    :param poly_counts: np.ndarray, number of vertices of each polygon
+    :param poly_connects: np.ndarray, vertex indices of each polygon
+    :param vertices_count: int or None, number of vertices of the mesh. If None, it is computed from the topology
+    :return: tuple(np.ndarray, np.ndarray), vertex offsets and neighbour vertex indices.
+        Neighbours of vertex i are stored between offsets[i] and offsets[i + 1]
+    """
+
+    edges = get_edges(poly_counts, poly_connects)
+    if vertices_count is None:
+        vertices_count = int(np.max(poly_connects)) + 1 if len(poly_connects) else 0
+
+    rows = np.concatenate((edges[:, 0], edges[:, 1]))
+    columns = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.lexsort((columns, rows))
+    offsets = np.zeros(vertices_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=vertices_count), out=offsets[1:])
+
+    return offsets, columns[order]
+
+
+def get_edge_lengths(points, offsets, neighbours):
+    """
+    Returns the length of each one of the adjacency edges
+    :param points: np.ndarray, vertex positions array of shape (vertices_count, 3)
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :return: np.ndarray, length of each adjacency entry
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+    return np.sqrt(((points[neighbours] - points[rows]) ** 2).sum(axis=1))
+
+
+def smooth_values(values, offsets, neighbours, vertices_ids=None, iterations=1, strength=1.0, edge_weights=None):
+    """
+    Diffuses per-vertex values over the adjacency graph
+    Each iteration blends the values of each smoothed vertex with the weighted average of its neighbours.
+    Vertices that are not smoothed keep their values and act as boundary conditions.
+    :param values: np.ndarray, per-vertex values array of shape (vertices_count, ...)
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param vertices_ids: list(int) or np.ndarray or None, vertices to smooth. If None, all vertices are smoothed
+    :param iterations: int, number of smoothing iterations
+    :param strength: float, blend factor (0.0 to 1.0) between current values and neighbours average
+    :param edge_weights: np.ndarray or None, weight of each adjacency entry. If None, all neighbours weight the same
+    :return: np.ndarray, new smoothed values array
+    """
+
+    values = np.array(values, dtype=np.float64)
+    vertices_count = len(offsets) - 1
+    if vertices_ids is None:
+        vertices_ids = np.arange(vertices_count)
+    vertices_ids = np.unique(np.asarray(vertices_ids, dtype=np.int64))
+
+    # Only smoothed vertices that have neighbours are updated
+    counts = offsets[vertices_ids + 1] - offsets[vertices_ids]
+    vertices_ids = vertices_ids[counts > 0]
+    counts = counts[counts > 0]
+    if not len(vertices_ids) or iterations < 1 or strength <= 0.0:
+        return values
+
+    starts = offsets[vertices_ids]
+    gather = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    region_neighbours = neighbours[gather]
+    reduce_starts = np.cumsum(counts) - counts
+
+    if edge_weights is None:
+        region_weights = np.ones(len(gather), dtype=np.float64)
+    else:
+        region_weights = np.asarray(edge_weights, dtype=np.float64)[gather]
+    totals = np.add.reduceat(region_weights, reduce_starts)
+    region_weights /= np.repeat(np.where(totals > 0.0, totals, 1.0), counts)
+
+    shape = (len(gather),) + (1,) * (values.ndim - 1)
+    region_weights = region_weights.reshape(shape)
+    for _ in range(int(iterations)):
+        average = np.add.reduceat(values[region_neighbours] * region_weights, reduce_starts, axis=0)
+        values[vertices_ids] += strength * (average - values[vertices_ids])
+
+    return values
+
+
+def get_cached_adjacency(key, topology_getter, vertices_count=None):
+    """
+    Returns the cached adjacency of the topology with the given key, building it if necessary
+    Adjacency only depends on topology, so meshes that share topology (and tools that work on the same mesh) share it
+    :param key: str, unique identifier of the topology (usually its topology hash)
+    :param topology_getter: callable, returns the (poly_counts, poly_connects) arrays of the topology. It is only
+        called if the adjacency is not cached yet
+    :param vertices_count: int or None, number of vertices of the mesh. If None, it is computed from the topology
+    :return: tuple(np.ndarray, np.ndarray), vertex offsets and neighbour vertex indices
+    """
+
+    cached = _ADJACENCY_CACHE.pop(key, None)
+    if cached is None:
+        poly_counts, poly_connects = topology_getter()
+        cached = get_adjacency(poly_counts, poly_connects, vertices_count=vertices_count)
+    _ADJACENCY_CACHE[key] = cached
+    while len(_ADJACENCY_CACHE) > ADJACENCY_CACHE_SIZE:
+        _ADJACENCY_CACHE.popitem(last=False)
+
+    return cached
+
+
+def clear_adjacency_cache():
+    """
+    Removes all cached adjacencies
+    """
+
+    _ADJACENCY_CACHE.clear()
+
+
+def get_connected_components(offsets, neighbours, vertices_ids=None):
+    """
+    Returns the connected component of each vertex, using only the edges between the given vertices
+    Components are found with a vectorized union-find: each pass hooks the root of every edge end to the smallest
+    root and then compresses all the paths with pointer jumping
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param vertices_ids: list(int) or np.ndarray or None, vertices to group. If None, all vertices are grouped
+    :return: np.ndarray, int64 component id of each vertex (-1 for vertices that are not grouped). Component ids are
+        consecutive and sorted by the lowest vertex index of each component
+    """
+
+    vertices_count = len(offsets) - 1
+    mask = np.ones(vertices_count, dtype=bool)
+    if vertices_ids is not None:
+        mask[:] = False
+        mask[np.asarray(vertices_ids, dtype=np.int64)] = True
+
+    rows = np.repeat(np.arange(vertices_count), np.diff(offsets))
+    columns = np.asarray(neighbours, dtype=np.int64)
+    valid_edges = mask[rows] & mask[columns] & (rows < columns)
+    rows = rows[valid_edges]
+    columns = columns[valid_edges]
+
+    labels = np.arange(vertices_count)
+    while len(rows):
+        row_labels = labels[rows]
+        column_labels = labels[columns]
+        different = row_labels != column_labels
+        if not different.any():
+            break
+        rows = rows[different]
+        columns = columns[different]
+        row_labels = row_labels[different]
+        column_labels = column_labels[different]
+        np.minimum.at(labels, np.maximum(row_labels, column_labels), np.minimum(row_labels, column_labels))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+    components = np.full(vertices_count, -1, dtype=np.int64)
+    _, components[mask] = np.unique(labels[mask], return_inverse=True)
+
+    return components
+
+
+def get_shell_ids(offsets, neighbours):
+    """
+    Returns the shell (connected piece of geometry) each vertex belongs to
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :return: np.ndarray, int64 shell id of each vertex
+    """
+
+    return get_connected_components(offsets, neighbours)
+
+
+def get_neighbours(offsets, neighbours, vertices_ids):
+    """
+    Returns the neighbours of the given vertices
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param vertices_ids: list(int) or np.ndarray, vertices to get neighbours of
+    :return: np.ndarray, unique neighbour vertex indices (may include given vertices)
+    """
+
+    vertices_ids = np.asarray(vertices_ids, dtype=np.int64)
+    counts = offsets[vertices_ids + 1] - offsets[vertices_ids]
+    gather = np.repeat(offsets[vertices_ids] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+
+    return np.unique(neighbours[gather])
+
+
+def grow_vertices(offsets, neighbours, vertices_ids, rings=1):
+    """
+    Grows the given vertices region by the given number of rings of neighbour vertices
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param vertices_ids: list(int) or np.ndarray, region vertices
+    :param rings: int, number of rings to grow
+    :return: np.ndarray, sorted vertex indices of the grown region
+    """
+
+    mask = np.zeros(len(offsets) - 1, dtype=bool)
+    frontier = np.unique(np.asarray(vertices_ids, dtype=np.int64))
+    mask[frontier] = True
+    for _ in range(int(rings)):
+        if not len(frontier):
+            break
+        frontier = get_neighbours(offsets, neighbours, frontier)
+        frontier = frontier[~mask[frontier]]
+        mask[frontier] = True
+
+    return np.flatnonzero(mask)
+
+
+def shrink_vertices(offsets, neighbours, vertices_ids, rings=1):
+    """
+    Shrinks the given vertices region removing the given number of rings of border vertices. Border vertices are the
+    ones with at least one neighbour outside the region
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param vertices_ids: list(int) or np.ndarray, region vertices
+    :param rings: int, number of rings to shrink
+    :return: np.ndarray, sorted vertex indices of the shrunk region
+    """
+
+    mask = np.zeros(len(offsets) - 1, dtype=bool)
+    mask[np.asarray(vertices_ids, dtype=np.int64)] = True
+    for _ in range(int(rings)):
+        region_ids = np.flatnonzero(mask)
+        if not len(region_ids):
+            break
+        counts = offsets[region_ids + 1] - offsets[region_ids]
+        gather = np.repeat(offsets[region_ids] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        outside = ~mask[neighbours[gather]]
+        mask[np.repeat(region_ids, counts)[outside]] = False
+
+    return np.flatnonzero(mask)
+
+
+def get_shortest_distances(offsets, neighbours, sources, edge_lengths=None, targets=None, max_distance=None):
+    """
+    Returns the shortest path distance from the given source vertices to every vertex using Dijkstra
+    With several sources, the distance of each vertex is the distance to its closest source
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param sources: int or list(int) or np.ndarray, source vertex indices
+    :param edge_lengths: np.ndarray or None, length of each adjacency entry. If None, all edges have length 1
+    :param targets: list(int) or np.ndarray or None, if given, search stops once all these vertices are reached
+    :param max_distance: float or None, if given, vertices further than this distance are not reached
+    :return: tuple(np.ndarray, np.ndarray), float64 distance of each vertex (inf if not reached) and previous vertex
+        of each vertex in its shortest path (-1 for sources and not reached vertices)
+    """
+
+    vertices_count = len(offsets) - 1
+    distances = np.full(vertices_count, np.inf)
+    predecessors = np.full(vertices_count, -1, dtype=np.int64)
+    sources = np.unique(np.atleast_1d(np.asarray(sources, dtype=np.int64)))
+    if not len(sources):
+        return distances, predecessors
+
+    # Plain lists are much faster than NumPy arrays for the per element access done by the search
+    offsets_list = np.asarray(offsets).tolist()
+    neighbours_list = np.asarray(neighbours).tolist()
+    lengths_list = np.asarray(edge_lengths, dtype=np.float64).tolist() if edge_lengths is not None else None
+    distances_list = distances.tolist()
+    predecessors_list = predecessors.tolist()
+    visited = bytearray(vertices_count)
+    remaining = set(np.atleast_1d(targets).tolist()) if targets is not None else None
+    max_distance = float('inf') if max_distance is None else max_distance
+
+    heap = [(0.0, vertex_id) for vertex_id in sources.tolist()]
+    for vertex_id in sources.tolist():
+        distances_list[vertex_id] = 0.0
+    while heap:
+        distance, vertex_id = heapq.heappop(heap)
+        if visited[vertex_id]:
+            continue
+        visited[vertex_id] = 1
+        if remaining is not None:
+            remaining.discard(vertex_id)
+            if not remaining:
+                break
+        for i in range(offsets_list[vertex_id], offsets_list[vertex_id + 1]):
+            neighbour_id = neighbours_list[i]
+            if visited[neighbour_id]:
+                continue
+            neighbour_distance = distance + (lengths_list[i] if lengths_list is not None else 1.0)
+            if neighbour_distance < distances_list[neighbour_id] and neighbour_distance <= max_distance:
+                distances_list[neighbour_id] = neighbour_distance
+                predecessors_list[neighbour_id] = vertex_id
+                heapq.heappush(heap, (neighbour_distance, neighbour_id))
+
+    return np.array(distances_list, dtype=np.float64), np.array(predecessors_list, dtype=np.int64)
+
+
+def get_path_from_predecessors(predecessors, target):
+    """
+    Returns the path from the source of a shortest paths search to the given target vertex
+    :param predecessors: np.ndarray, previous vertex of each vertex as returned by get_shortest_distances
+    :param target: int, vertex index to get path to
+    :return: np.ndarray, int64 vertex indices from the source to the target (both included)
+    """
+
+    path = [int(target)]
+    previous_id = predecessors[target]
+    while previous_id >= 0:
+        path.append(int(previous_id))
+        previous_id = predecessors[previous_id]
+
+    return np.array(path[::-1], dtype=np.int64)
+
+
+def get_shortest_path(offsets, neighbours, source, target, edge_lengths=None, points=None):
+    """
+    Returns the shortest path between two vertices
+    If points are given, A* is used with the straight distance to the target as heuristic, which visits far less
+    vertices than Dijkstra when edge lengths are the distances between points
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param source: int, start vertex index
+    :param target: int, end vertex index
+    :param edge_lengths: np.ndarray or None, length of each adjacency entry. If None, all edges have length 1
+    :param points: np.ndarray or None, vertex positions array of shape (vertices_count, 3). Only used as heuristic
+        and only if edge_lengths are given
+    :return: np.ndarray, int64 vertex indices from source to target (both included). Empty if target is not reachable
+    """
+
+    source = int(source)
+    target = int(target)
+    if source == target:
+        return np.array([source], dtype=np.int64)
+    if points is None or edge_lengths is None:
+        predecessors = get_shortest_distances(
+            offsets, neighbours, source, edge_lengths=edge_lengths, targets=[target])[1]
+        if predecessors[target] < 0:
+            return np.zeros(0, dtype=np.int64)
+        return get_path_from_predecessors(predecessors, target)
+
+    heuristics = np.sqrt(((np.asarray(points, dtype=np.float64) - points[target]) ** 2).sum(axis=1)).tolist()
+    offsets_list = np.asarray(offsets).tolist()
+    neighbours_list = np.asarray(neighbours).tolist()
+    lengths_list = np.asarray(edge_lengths, dtype=np.float64).tolist()
+    distances = {source: 0.0}
+    predecessors = {source: -1}
+    visited = set()
+
+    heap = [(heuristics[source], 0.0, source)]
+    while heap:
+        _, distance, vertex_id = heapq.heappop(heap)
+        if vertex_id in visited:
+            continue
+        if vertex_id == target:
+            path = [target]
+            while predecessors[path[-1]] >= 0:
+                path.append(predecessors[path[-1]])
+            return np.array(path[::-1], dtype=np.int64)
+        visited.add(vertex_id)
+        for i in range(offsets_list[vertex_id], offsets_list[vertex_id + 1]):
+            neighbour_id = neighbours_list[i]
+            if neighbour_id in visited:
+                continue
+            neighbour_distance = distance + lengths_list[i]
+            if neighbour_distance < distances.get(neighbour_id, float('inf')):
+                distances[neighbour_id] = neighbour_distance
+                predecessors[neighbour_id] = vertex_id
+                heapq.heappush(heap, (neighbour_distance + heuristics[neighbour_id], neighbour_distance, neighbour_id))
+
+    return np.zeros(0, dtype=np.int64)
+
+
+def get_shortest_paths(offsets, neighbours, pairs, edge_lengths=None):
+    """
+    Returns the shortest paths between the given pairs of vertices
+    Pairs are grouped by source vertex, so a single Dijkstra search is done per different source vertex
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param pairs: list(tuple(int, int)) or np.ndarray, source and target vertex indices of each path
+    :param edge_lengths: np.ndarray or None, length of each adjacency entry. If None, all edges have length 1
+    :return: list(np.ndarray), int64 vertex indices of each path, in the same order as the given pairs. Paths whose
+        target is not reachable are empty
+    """
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    paths = [None] * len(pairs)
+    for source in np.unique(pairs[:, 0]).tolist():
+        pair_ids = np.flatnonzero(pairs[:, 0] == source)
+        predecessors = get_shortest_distances(
+            offsets, neighbours, source, edge_lengths=edge_lengths, targets=pairs[pair_ids, 1])[1]
+        for pair_id in pair_ids.tolist():
+            target = int(pairs[pair_id, 1])
+            if target != source and predecessors[target] < 0:
+                paths[pair_id] = np.zeros(0, dtype=np.int64)
+            else:
+                paths[pair_id] = get_path_from_predecessors(predecessors, target)
+
+    return paths
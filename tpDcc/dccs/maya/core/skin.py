@@ -15,24 +15,21 @@ try:
 except ImportError:
     import io as StringIO
 
+import numpy as np
+
 import maya.cmds
 import maya.mel
 import maya.api.OpenMaya
 import maya.api.OpenMayaAnim
 
-PYMEL_AVAILABLE = True
-try:
-    from pymel.core.general import PyNode
-except ImportError:
-    PYMEL_AVAILABLE = False
-
 from tpDcc import dcc
 from tpDcc.dccs.maya import api
 from tpDcc.libs.python import python
 from tpDcc.libs.math.core import vec3, kdtree
-from tpDcc.dccs.maya.api import mathlib as api_mathlib, skin as api_skin
+from tpDcc.dccs.maya.api import mathlib as api_mathlib, skin as api_skin, mesh as api_mesh, influencemap
 from tpDcc.dccs.maya.core import decorators, exceptions, deformer, attribute, node as node_utils, mesh as mesh_utils
 from tpDcc.dccs.maya.core import joint as jnt_utils, transform as xform_utils, shape as shape_utils, name as name_utils
+from tpDcc.dccs.maya.core import skintransfer, meshgraph
 
 logger = logging.getLogger('tpDcc-dccs-maya')
 
@@ -240,7 +237,8 @@ class StoreSkinWeight(object):
     def get_node_weight_dict(self):
         """
         Returns dictionary of weights that belongs to the stored skin info
-        :return: dict
+        Each value is a weights array with shape (vertices_count, influences_count)
+        :return: dict(str, np.ndarray)
         """
 
         if not self._do_run:
@@ -248,6 +246,47 @@ class StoreSkinWeight(object):
 
         return self._node_weight_dict
 
+    def get_node_influence_ids_dict(self):
+        """
+        Returns dictionary of influence logical indices arrays that belongs to the stored skin info
+        Each array matches the columns of the mesh weights array
+        :return: dict(str, np.ndarray)
+        """
+
+        if not self._do_run:
+            return
+
+        return self._node_influence_ids_dict
+
+    def get_mesh_weights(self, mesh_path_name):
+        """
+        Returns the weights array of the given mesh
+        :param mesh_path_name: str, full path of the mesh transform
+        :return: np.ndarray or None, view of the stored weights with shape (vertices_count, influences_count)
+        """
+
+        if not self._do_run:
+            return None
+
+        return self._node_weight_dict.get(mesh_path_name)
+
+    def get_influence_weights(self, mesh_path_name, influence_ids):
+        """
+        Returns the weights of the given influences in the given mesh
+        :param mesh_path_name: str, full path of the mesh transform
+        :param influence_ids: int or list(int) or np.ndarray, influences logical indices
+        :return: np.ndarray or None, weights with shape (vertices_count, len(influence_ids))
+        """
+
+        weights = self.get_mesh_weights(mesh_path_name)
+        if weights is None:
+            return None
+
+        columns = api_skin.get_influence_columns(
+            self._node_influence_ids_dict[mesh_path_name], np.atleast_1d(influence_ids))
+
+        return weights[:, columns]
+
     def get_node_skinfn_dict(self):
         """
         Returns dictionary of skinfn objects that belongs to the stored skin info
@@ -403,6 +442,7 @@ class StoreSkinWeight(object):
 
         self._node_weight_dict = dict()
         self._node_vertices_dict = dict()
+        self._node_influence_ids_dict = dict()
         self._influences_id_list = list()
         self._influences_dict = dict()
         self._all_influences = list()
@@ -426,25 +466,25 @@ class StoreSkinWeight(object):
             single_id_comp.add_elements(vertex_array)
 
             api_skin_fn = api.SkinCluster(skin_fn)
-            influence_dags = api_skin_fn.influence_objects()
-            influence_indices = api.IntArray(len(influence_dags), 0)
-            for i in range(len(influence_dags)):
-                influence_indices[i] = int(api_skin_fn.index_for_influence_object(influence_dags[i]))
+            influence_map = influencemap.get_influence_map(skin_name)
+            influences_count = len(influence_map)
+            influence_indices = influence_map.logical_ids.copy()
 
             try:
-                weights = api_skin_fn.get_weights(mesh_path, vertex_component)
+                weights, _ = api_skin_fn.get_weights(mesh_path, vertex_component)
             except Exception as e:
-                logger.error('Get Skin Weight error : {}'.format(e.message))
+                logger.error('Get Skin Weight error : {}'.format(e))
                 continue
 
-            weights = self._convert_shape_weights(len(influence_indices), weights)
+            weights = self._convert_shape_weights(influences_count, weights.get_api_object())
 
-            influence_list = [api.DagPath(influence_dags[i]).full_path_name() for i in range(len(influence_indices))]
+            influence_list = influence_map.full_names
 
             self._node_vertices_dict[mesh_path_name] = vertex_array
             self._all_skin_clusters[mesh_path_name] = skin_name
             self._mesh_node_list.append(mesh_path_name)
             self._influences_id_list.append(influence_indices)
+            self._node_influence_ids_dict[mesh_path_name] = influence_indices
             self._node_weight_dict[mesh_path_name] = weights
             self._influences_dict[mesh_path_name] = influence_list
             self._all_influences += influence_list
@@ -492,12 +532,12 @@ class StoreSkinWeight(object):
     def _convert_shape_weights(self, shape, weights):
         """
         Converts given shape weights into a 2D array of vertices
-        :param shape:
-        :param weights:
-        :return:
+        :param shape: int, number of influences
+        :param weights: MDoubleArray, flat weights in component order
+        :return: np.ndarray, weights array with shape (vertices_count, influences_count)
         """
 
-        return [[weights[i + j * shape] for i in range(shape)] for j in range(int(len(weights) / shape))]
+        return api_skin.weights_to_array(weights, shape)
 
 
 class SkinJointObject(object):
@@ -1057,10 +1097,11 @@ def average_vertices_weights(selection, use_distance):
                 base_list = mesh_utils.edges_to_smooth(edges_list=selection)
 
             percentage = 99.0 / len(base_list)
+            orders = mesh_utils.find_shortest_vertices_paths_between_vertices(base_list)
             for i, vert_list in enumerate(base_list):
                 start = vert_list[0]
                 end = vert_list[-1]
-                order = mesh_utils.find_shortest_vertices_path_between_vertices(vert_list)
+                order = orders[i]
                 if order:
                     order = order[:-1]      # we are not interested in the last vertex
                     amount = len(order) + 1
@@ -1160,6 +1201,64 @@ def average_vertices_weights(selection, use_distance):
     return succeeded
 
 
+@decorators.undo
+def smooth_skin_weights(
+        vertices=None, iterations=1, strength=1.0, use_distance=False, locked_influences=None,
+        use_locked_attribute=True):
+    """
+    Smooths the skin weights of the given vertices by diffusing them over the mesh connectivity graph
+    Mesh connectivity and weights are read once and smoothed weights are written back with a single bulk call,
+    so it can be used interactively on large vertex regions
+    :param vertices: list(str) or None, mesh components to smooth. If None, current selection is used
+    :param iterations: int, number of smoothing iterations
+    :param strength: float, blend factor (0.0 to 1.0) between current weights and neighbours average weights
+    :param use_distance: bool, Whether neighbours are weighted by their inverse distance or all weight the same
+    :param locked_influences: list(str) or None, influences whose weights are not modified
+    :param use_locked_attribute: bool, Whether influences with lockInfluenceWeights enabled are also locked
+    :return: bool
+    """
+
+    vertices = python.force_list(vertices or maya.cmds.ls(sl=True))
+    vertices = maya.cmds.polyListComponentConversion(vertices, toVertex=True) if vertices else None
+    if not vertices:
+        logger.warning('No vertices to smooth skin weights of!')
+        return False
+
+    mesh_path, vertices_ids = api_mesh.get_components_vertices_ids(vertices)
+    if mesh_path is None or not len(vertices_ids):
+        logger.warning('No vertices to smooth skin weights of!')
+        return False
+
+    mesh_name = mesh_path.fullPathName()
+    skin_cluster = find_related_skin_cluster(mesh_name)
+    if not skin_cluster:
+        logger.warning('{} has no skin. No skin weights to smooth!'.format(mesh_name))
+        return False
+
+    edge_weights = None
+    if use_distance:
+        offsets, neighbours, edge_lengths, _ = mesh_utils.get_mesh_graph(mesh_path)
+        edge_weights = 1.0 / np.maximum(edge_lengths, 1e-8)
+    else:
+        offsets, neighbours = mesh_utils.get_mesh_adjacency(mesh_path)
+
+    weights = api_skin.get_skin_weights_array(skin_cluster, mesh_name)
+    locked_mask = get_locked_influences_mask(
+        skin_cluster, locked_influences=locked_influences, use_locked_attribute=use_locked_attribute)
+    smooth_weights = meshgraph.smooth_values(
+        weights, offsets, neighbours, vertices_ids=vertices_ids, iterations=iterations, strength=strength,
+        edge_weights=edge_weights)
+    smooth_weights[:, locked_mask] = weights[:, locked_mask]
+    smooth_weights = api_skin.normalize_weights(smooth_weights[vertices_ids], locked_influences=locked_mask)
+
+    influence_ids = np.array(get_skin_influence_indices(skin_cluster), dtype=np.int32)
+    offsets, sparse_influences, values = api_skin.dense_to_sparse(smooth_weights, influence_ids=influence_ids)
+    api_skin.set_skin_weights_sparse(
+        skin_cluster, offsets, sparse_influences, values, vertices_ids=vertices_ids, influences=influence_ids)
+
+    return True
+
+
 @decorators.undo
 def apply_smooth_bind(geo=None, show_options=False):
     """
@@ -1531,8 +1630,110 @@ def transfer_skinning(source_mesh, target_meshes, in_place=True, component_assoc
         return True
 
 
+def transfer_skin_weights(
+        source_mesh, target_meshes, mode=skintransfer.TransferModes.ClosestPoint, include_influences=None,
+        exclude_influences=None, uv_set=None, max_distance=None, normalize=True):
+    """
+    Transfers skinning from one skinned mesh to other meshes sampling the source mesh surface with NumPy
+    Source mesh spatial index is cached, so consecutive transfers from the same source mesh do not rebuild it.
+    Target meshes without a skinCluster are skinned with the transferred influences. Target meshes with a skinCluster
+    keep the weights of the influences that are not transferred.
+    :param source_mesh: str, skinned mesh to copy skinning information from
+    :param target_meshes: list(str), meshes that will receive the skin weights of the source mesh
+    :param mode: str, skintransfer.TransferModes value (closestPoint, uvSpace or rayCast)
+    :param include_influences: list(str) or None, if given, only these influences are transferred
+    :param exclude_influences: list(str) or None, influences that are not transferred
+    :param uv_set: str or None, UV set used by UV space mode. If None, current UV set is used
+    :param max_distance: float or None, maximum ray distance used by ray cast mode
+    :param normalize: bool, Whether weights of each vertex should be normalized. In target meshes with a skinCluster,
+        only the weights of the influences that are not transferred are scaled
+    :return: list(str), target skinClusters
+    """
+
+    target_meshes = python.force_list(target_meshes)
+
+    source_skin_cluster = find_related_skin_cluster(source_mesh)
+    if not source_skin_cluster:
+        logger.warning('{} has no skin. No skinning to transfer!'.format(source_mesh))
+        return list()
+
+    source_influences = get_skin_influence_names(source_skin_cluster, short_name=True)
+    influences_mask = skintransfer.get_influences_mask(
+        source_influences, include_influences=include_influences, exclude_influences=exclude_influences)
+    influences = [influence for influence, valid in zip(source_influences, influences_mask) if valid]
+    if not influences:
+        logger.warning('No influences to transfer from {}!'.format(source_mesh))
+        return list()
+
+    source_weights = api_skin.get_skin_weights_array(source_skin_cluster, source_mesh)[:, influences_mask]
+    source_fn = api_mesh.get_mesh_fn(source_mesh)
+    poly_counts, poly_connects = api_mesh.get_mesh_topology(source_fn)
+    uvs = uv_ids = None
+    if mode == skintransfer.TransferModes.UVSpace:
+        uvs, _, uv_ids = api_mesh.get_mesh_uvs(source_fn, uv_set=uv_set)
+    sampler = skintransfer.get_mesh_sampler(
+        '{}|{}'.format(source_fn.fullPathName(), uv_set or ''), api_mesh.get_mesh_points(source_fn, world_space=True),
+        poly_counts, poly_connects, uvs=uvs, uv_ids=uv_ids)
+
+    target_skin_clusters = list()
+    for target_mesh in target_meshes:
+        target_skin_cluster = find_related_skin_cluster(target_mesh)
+        is_skinned = bool(target_skin_cluster)
+        if not is_skinned:
+            skin_name = name_utils.get_basename(target_mesh)
+            target_skin_cluster = maya.cmds.skinCluster(
+                influences, target_mesh, tsb=True, n=name_utils.find_unique_name('skin_{}'.format(skin_name)))[0]
+        else:
+            current_influences = get_skin_influence_names(target_skin_cluster, short_name=True)
+            for influence in influences:
+                if influence not in current_influences:
+                    maya.cmds.skinCluster(target_skin_cluster, edit=True, addInfluence=influence, weight=0.0)
+
+        target_fn = api_mesh.get_mesh_fn(target_mesh)
+        target_points = api_mesh.get_mesh_points(target_fn, world_space=True)
+        target_uvs = target_normals = unmapped = None
+        if mode == skintransfer.TransferModes.UVSpace:
+            target_uvs, mapped = api_mesh.get_vertex_uvs(target_fn, uv_set=uv_set)
+            unmapped = np.flatnonzero(~mapped)
+        elif mode == skintransfer.TransferModes.RayCast:
+            target_normals = api_mesh.get_mesh_normals(target_fn, world_space=True)
+
+        # Transferred weights of already skinned meshes are kept as they are sampled and the weights of the other
+        # influences are scaled to fill the remaining weight
+        normalize_transferred = normalize and not is_skinned
+        weights = skintransfer.transfer_weights(
+            sampler, source_weights, target_points, mode=mode, target_uvs=target_uvs, target_normals=target_normals,
+            normalize=normalize_transferred, max_distance=max_distance)
+        if unmapped is not None and len(unmapped):
+            logger.warning('{} vertices of {} have no UVs. Using closest point ...'.format(len(unmapped), target_mesh))
+            weights[unmapped] = skintransfer.transfer_weights(
+                sampler, source_weights, target_points[unmapped], normalize=normalize_transferred)
+
+        target_influences = get_skin_influence_names(target_skin_cluster, short_name=True)
+        columns = [target_influences.index(influence) for influence in influences]
+        if is_skinned:
+            target_weights = api_skin.get_skin_weights_array(target_skin_cluster, target_mesh)
+        else:
+            target_weights = np.zeros((len(target_points), len(target_influences)), dtype=np.float64)
+        target_weights[:, columns] = weights
+        if normalize and is_skinned:
+            target_weights = api_skin.normalize_weights(target_weights, locked_influences=columns)
+        api_skin.set_skin_weights_array(target_skin_cluster, target_mesh, target_weights)
+        target_skin_clusters.append(target_skin_cluster)
+
+    return target_skin_clusters
+
+
 @decorators.undo
-def prune_skin_weights(geo=None, show_options=False):
+def prune_skin_weights(geo=None, show_options=False, threshold=0.01):
+    """
+    Prunes the skin weights lower than the given threshold of the given skinned geometries
+    :param geo: list(str) or None, skinned geometries. If None, selected geometries are used
+    :param show_options: bool, Whether to open Maya Prune Small Weights options dialog instead
+    :param threshold: float, weights lower than this value are pruned
+    :return: bool
+    """
+
     geo = geo or maya.cmds.ls(sl=True)
     geo = python.force_list(geo)
 
@@ -1541,11 +1742,72 @@ def prune_skin_weights(geo=None, show_options=False):
     else:
         if not geo:
             return False
-        raise NotImplementedError('Prune Weights with no options not implemented yet!')
+        process_skin_weights(geo, prune_threshold=threshold, normalize=True)
 
     return True
 
 
+def get_locked_influences_mask(skin_deformer, locked_influences=None, use_locked_attribute=True):
+    """
+    Returns a boolean mask with the locked influences of the given skinCluster, in influence objects order
+    :param skin_deformer: str, name of a skinCluster
+    :param locked_influences: list(str) or None, names of the influences that should be locked
+    :param use_locked_attribute: bool, Whether influences with lockInfluenceWeights enabled are also locked
+    :return: np.ndarray
+    """
+
+    locked_influences = python.force_list(locked_influences)
+    influences = get_skin_influence_names(skin_deformer)
+    locked_mask = np.zeros(len(influences), dtype=bool)
+    for i, influence in enumerate(influences):
+        if influence in locked_influences or name_utils.get_basename(influence) in locked_influences:
+            locked_mask[i] = True
+        elif use_locked_attribute and maya.cmds.attributeQuery('liw', node=influence, exists=True):
+            locked_mask[i] = maya.cmds.getAttr('{}.liw'.format(influence))
+
+    return locked_mask
+
+
+@decorators.undo
+def process_skin_weights(
+        geo=None, prune_threshold=None, max_influences=None, normalize=True, locked_influences=None,
+        use_locked_attribute=True):
+    """
+    Prunes, limits the number of influences per vertex and normalizes the skin weights of the given geometries
+    Weights of each geometry are read and written with a single bulk call
+    :param geo: list(str) or None, skinned geometries. If None, selected geometries are used
+    :param prune_threshold: float or None, weights lower than this value are pruned. If None, weights are not pruned
+    :param max_influences: int or None, maximum number of influences per vertex. If None, no limit is applied
+    :param normalize: bool, Whether weights of each vertex should be normalized
+    :param locked_influences: list(str) or None, influences whose weights are not modified
+    :param use_locked_attribute: bool, Whether influences with lockInfluenceWeights enabled are also locked
+    :return: dict(str, str), dictionary containing each processed geometry and its skinCluster
+    """
+
+    geo = python.force_list(geo or maya.cmds.ls(sl=True))
+
+    processed = dict()
+    for geo_name in geo:
+        skin_cluster = find_related_skin_cluster(geo_name)
+        if not skin_cluster:
+            logger.warning('{} has no skin. Skipping skin weights processing ...'.format(geo_name))
+            continue
+
+        locked_mask = get_locked_influences_mask(
+            skin_cluster, locked_influences=locked_influences, use_locked_attribute=use_locked_attribute)
+        weights = api_skin.get_skin_weights_array(skin_cluster, geo_name)
+        if weights is None:
+            continue
+        new_weights = api_skin.process_weights(
+            weights, prune_threshold=prune_threshold, max_influences=max_influences, normalize=normalize,
+            locked_influences=locked_mask)
+        if not np.array_equal(weights, new_weights):
+            api_skin.set_skin_weights_array(skin_cluster, geo_name, new_weights)
+        processed[geo_name] = skin_cluster
+
+    return processed
+
+
 @decorators.undo
 def transfer_uvs_to_skinned_geometry(source_mesh=None, target_mesh=None, use_intermediate_shape=False, **kwargs):
     """
@@ -1718,50 +1980,56 @@ def get_influence_vertices(joint_nodes, mesh_name):
     if not joint_nodes or not mesh_name:
         return False
     joint_nodes = python.force_list(joint_nodes)
-    joint_nodes_short = [dcc.node_short_name(joint_node) for joint_node in joint_nodes]
 
     skin_cluster_name = find_related_skin_cluster(mesh_name)
     if not skin_cluster_name:
         logger.warning('Given mesh "{}" has no skin cluster attached to it!'.format(mesh_name))
         return False
 
+    vertices_ids = get_influences_vertices_ids(joint_nodes, mesh_name)
+
     selection = list()
-    percentage = 100.0 / len(joint_nodes)
-    progress_value = 0.0
+    for joint_node in joint_nodes:
+        selection.extend('{}.vtx[{}]'.format(mesh_name, vertex_id) for vertex_id in vertices_ids.get(joint_node, []))
 
-    for i, joint in enumerate(joint_nodes):
-        if PYMEL_AVAILABLE:
-            joints_attached = maya.cmds.skinCluster(skin_cluster_name, query=True, inf=True)
-            if joint_nodes_short[i] not in joints_attached:
-                continue
-            skin_node = PyNode(skin_cluster_name)
-            vertices_list, values = skin_node.getPointsAffectedByInfluence(joint)
-            found_vertices = vertices_list.getSelectionStrings()
-            if len(found_vertices) == 0:
-                continue
-            selected_vertices = mesh_utils.convert_to_vertices(found_vertices)
-        else:
-            maya.cmds.select(clear=True)
-            maya.cmds.skinCluster(mesh_name, edit=True, normalizeWeights=True)
-            maya.cmds.select(joint, deselect=True)
-            mesh_utils.fix_mesh_components_selection_visualization(mesh_name)
-            maya.cmds.select(clear=True)
-            maya.cmds.skinCluster(skin_cluster_name, edit=True, selectInfluenceVerts=True)
-            selected_vertices = maya.cmds.ls(sl=True, flatten=True)
+    return selection
 
-        if not selected_vertices:
-            continue
 
-        for selected_vertex in selected_vertices:
-            if '.' not in selected_vertex:
-                continue
-            selection.append(selected_vertex)
+def get_influences_vertices_ids(influences, mesh_name, threshold=0.0):
+    """
+    Returns the vertices of the given mesh that are weighted to each one of the given influences
+    Skin weights are read once and the current selection is not modified
+    :param influences: str or list(str), names of the influences we want to retrieve influenced vertices of
+    :param mesh_name: str, name of the mesh that has the skin cluster attached
+    :param threshold: float, only vertices with weights greater than this value are returned
+    :return: dict(str, np.ndarray), sorted vertex indices array of each influence found in the skin cluster
+    """
 
-        progress_value += (percentage * i)
+    influences = python.force_list(influences)
+    skin_cluster_name = find_related_skin_cluster(mesh_name)
+    if not skin_cluster_name:
+        logger.warning('Given mesh "{}" has no skin cluster attached to it!'.format(mesh_name))
+        return dict()
+
+    influence_map = influencemap.get_influence_map(skin_cluster_name)
+    found_influences = list()
+    columns = list()
+    for influence in influences:
+        physical_index = influence_map.get_physical_index(influence)
+        if physical_index is None and maya.cmds.objExists(influence):
+            physical_index = influence_map.get_physical_index(maya.cmds.ls(influence, long=True)[0])
+        if physical_index is None:
+            logger.warning('Influence "{}" is not attached to "{}"'.format(influence, skin_cluster_name))
+            continue
+        found_influences.append(influence)
+        columns.append(physical_index)
+    if not columns:
+        return dict()
 
-    mesh_utils.fix_mesh_components_selection_visualization(mesh_name)
+    weights = api_skin.get_skin_weights_array(skin_cluster_name, mesh_name)
+    vertices_ids = api_skin.get_weighted_vertices(weights, columns=columns, threshold=threshold)
 
-    return selection
+    return dict(zip(found_influences, vertices_ids))
 
 
 @decorators.undo
@@ -2107,40 +2375,53 @@ def get_skin_weights(skin_deformer, vertices_ids=None):
     value is the list of weights of the influence
     """
 
-    mobj = node_utils.get_mobject(skin_deformer)
+    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(node_utils.get_mobject(skin_deformer))
+    geometry_path = api_skin.get_skin_cluster_geometry_path(mf_skin)
+    if not geometry_path:
+        return dict()
 
-    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(mobj)
+    vertices_count = maya.api.OpenMaya.MItGeometry(geometry_path).count()
+    if vertices_ids is None:
+        vertices_ids = np.arange(vertices_count)
+    vertices_ids = np.asarray(vertices_ids, dtype=np.int64)
 
-    weight_list_plug = mf_skin.findPlug('weightList', 0)
-    weights_plug = mf_skin.findPlug('weights', 0)
-    weight_list_attr = weight_list_plug.attribute()
-    weights_attr = weights_plug.attribute()
+    offsets, influence_ids, values = api_skin.get_skin_weights_sparse(mf_skin, vertices_ids=vertices_ids)
+    influences, columns = np.unique(influence_ids, return_inverse=True)
+    weights_array = np.zeros((vertices_count, len(influences)), dtype=np.float64)
+    weights_array[np.repeat(vertices_ids, np.diff(offsets)), columns] = values
 
-    weights = dict()
+    return {int(influence_id): weights_array[:, i].tolist() for i, influence_id in enumerate(influences)}
 
-    vertices_count = weight_list_plug.numElements()
-    if not vertices_ids:
-        vertices_ids = list(range(vertices_count))
 
-    for vertex_id in vertices_ids:
-        weights_plug.selectAncestorLogicalIndex(vertex_id, weight_list_attr)
+def get_skin_weights_sparse(skin_deformer, vertices_ids=None, tolerance=0.0):
+    """
+    Returns the skin weights of the given skinCluster deformer as CSR-style sparse arrays
+    :param skin_deformer: str, name of a skin deformer
+    :param vertices_ids: list(int) or np.ndarray or None, vertices to get weights of. If None, all vertices are used
+    :param tolerance: float, weights lower or equal than this value are not returned
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray), vertex offsets, influence ids and values.
+        Weights of vertex i (of the given vertices) are stored between offsets[i] and offsets[i + 1]
+    """
 
-        weight_influence_ids = weights_plug.getExistingArrayAttributeIndices()
+    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(node_utils.get_mobject(skin_deformer))
 
-        influence_plug = maya.api.OpenMaya.MPlug(weights_plug)
-        for influence_id in weight_influence_ids:
-            influence_plug.selectAncestorLogicalIndex(influence_id, weights_attr)
-            if influence_id not in weights:
-                weights[influence_id] = [0] * vertices_count
+    return api_skin.get_skin_weights_sparse(mf_skin, vertices_ids=vertices_ids, tolerance=tolerance)
 
-            try:
-                value = influence_plug.asDouble()
-                weights[influence_id][vertex_id] = value
-            except KeyError:
-                # Assumes a removed influence
-                pass
 
-    return weights
+def set_skin_weights_sparse(skin_deformer, offsets, influence_ids, values, vertices_ids=None):
+    """
+    Sets the skin weights of the given skinCluster deformer from CSR-style sparse arrays
+    :param skin_deformer: str, name of a skin deformer
+    :param offsets: np.ndarray, vertex offsets array
+    :param influence_ids: np.ndarray, influence logical index of each stored value
+    :param values: np.ndarray, weight values
+    :param vertices_ids: list(int) or np.ndarray or None, vertices the sparse rows belong to. If None, sparse rows
+        must match all the vertices of the skinned geometry
+    """
+
+    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(node_utils.get_mobject(skin_deformer))
+
+    return api_skin.set_skin_weights_sparse(mf_skin, offsets, influence_ids, values, vertices_ids=vertices_ids)
 
 
 def get_skin_envelope(geo_obj):
@@ -2202,25 +2483,10 @@ def get_index_at_skin_influence(influence, skin_deformer):
     :return: int, index of the influence
     """
 
-    connections = maya.cmds.listConnections('{}.worldMatrix'.format(influence), p=True, s=True)
-    if not connections:
-        return
-
-    good_connection = None
-    for cnt in connections:
-        if cnt.startswith(skin_deformer):
-            good_connection = cnt
-            break
-
-    if good_connection is None:
-        return
-
-    search = name_utils.search_last_number(good_connection)
-    found_string = search.group()
-
-    index = None
-    if found_string:
-        index = int(found_string)
+    influence_map = influencemap.get_influence_map(skin_deformer)
+    index = influence_map.get_logical_index(influence)
+    if index is None and maya.cmds.objExists(influence):
+        index = influence_map.get_logical_index(maya.cmds.ls(influence, long=True)[0])
 
     return index
 
@@ -2233,13 +2499,7 @@ def get_skin_influence_at_index(index, skin_deformer):
     :return: str, name of the influence at the given index
     """
 
-    influence_slot = '{}.matrix[{}]'.format(skin_deformer, index)
-    connection = attribute.get_attribute_input(influence_slot)
-    if connection:
-        connection = connection.split('.')
-        return connection[0]
-
-    return None
+    return influencemap.get_influence_map(skin_deformer).get_name(index, short_name=True)
 
 
 def get_skin_influence_names(skin_deformer, short_name=False):
@@ -2250,19 +2510,7 @@ def get_skin_influence_names(skin_deformer, short_name=False):
     :return: list<str>
     """
 
-    mobj = node_utils.get_mobject(skin_deformer)
-    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(mobj)
-    influence_dag_paths = mf_skin.influenceObjects()
-
-    influence_names = list()
-    for i in range(len(influence_dag_paths)):
-        if not short_name:
-            influence_path_name = influence_dag_paths[i].fullPathName()
-        else:
-            influence_path_name = influence_dag_paths[i].partialPathName()
-        influence_names.append(influence_path_name)
-
-    return influence_names
+    return influencemap.get_influence_map(skin_deformer).get_names(short_name=short_name)
 
 
 def get_skin_influence_indices(skin_deformer):
@@ -2274,16 +2522,7 @@ def get_skin_influence_indices(skin_deformer):
     :return: list<int>, list of indices
     """
 
-    mobj = node_utils.get_mobject(skin_deformer)
-    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(mobj)
-    influence_dag_paths = mf_skin.influenceObjects()
-
-    influence_ids = list()
-    for i in range(len(influence_dag_paths)):
-        influence_id = int(mf_skin.indexForInfluenceObject(influence_dag_paths[i]))
-        influence_ids.append(influence_id)
-
-    return influence_ids
+    return influencemap.get_influence_map(skin_deformer).logical_ids.tolist()
 
 
 def get_skin_influences(skin_deformer, short_name=True, return_dict=False):
@@ -2297,26 +2536,11 @@ def get_skin_influences(skin_deformer, short_name=True, return_dict=False):
     :return: variant<dict, list>
     """
 
-    mobj = node_utils.get_mobject(skin_deformer)
-    mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(mobj)
-
-    influence_dag_paths = mf_skin.influenceObjects()
-    total_paths = len(influence_dag_paths)
-
-    influence_ids = dict()
-    influence_names = list()
-    for i in range(total_paths):
-        influence_path = influence_dag_paths[i]
-        if not short_name:
-            influence_path_name = influence_dag_paths[i].fullPathName()
-        else:
-            influence_path_name = influence_dag_paths[i].partialPathName()
-        influence_id = int(mf_skin.indexForInfluenceObject(influence_path))
-        influence_ids[influence_path_name] = influence_id
-        influence_names.append(influence_path_name)
+    influence_map = influencemap.get_influence_map(skin_deformer)
+    influence_names = influence_map.get_names(short_name=short_name)
 
     if return_dict:
-        return influence_ids
+        return dict(zip(influence_names, influence_map.logical_ids.tolist()))
     else:
         return influence_names
 
@@ -0,0 +1,295 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a pure data engine to transfer per-vertex data (such as skin weights) between meshes
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import hashlib
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from tpDcc.dccs.maya.core import spatial
+
+logger = logging.getLogger('tpDcc-dccs-maya')
+
+
+class TransferModes(object):
+    ClosestPoint = 'closestPoint'
+    UVSpace = 'uvSpace'
+    RayCast = 'rayCast'
+
+
+# Maximum number of source mesh samplers kept in memory
+SAMPLERS_CACHE_SIZE = 8
+
+_SAMPLERS_CACHE = OrderedDict()
+
+
+class MeshSampler(object):
+    """
+    Samples barycentric interpolated per-vertex data of a triangulated source mesh
+    Triangles bounding volume hierarchies and spatial indices over the triangles centroids are built once and reused
+    by all the queries. Nearest centroids only seed the queries, results are always resolved against the hierarchies.
+    """
+
+    def __init__(self, points, poly_counts, poly_connects, uvs=None, uv_ids=None):
+        """
+        :param points: np.ndarray, source vertex positions array of shape (vertices_count, 3)
+        :param poly_counts: np.ndarray, number of vertices of each source polygon
+        :param poly_connects: np.ndarray, vertex indices of each source polygon
+        :param uvs: np.ndarray or None, source UVs array of shape (uvs_count, 2)
+        :param uv_ids: np.ndarray or None, UV index of each source polygon vertex
+        """
+
+        self._points = np.asarray(points, dtype=np.float64)
+        face_vertex_triangles, _ = spatial.fan_triangulate(poly_counts)
+        self._triangles = np.asarray(poly_connects, dtype=np.int64)[face_vertex_triangles]
+        self._triangle_points = self._points[self._triangles]
+        self._index = spatial.PointIndex(self._triangle_points.mean(axis=1))
+        self._bvh = spatial.TriangleBVH(
+            self._triangle_points[:, 0], self._triangle_points[:, 1], self._triangle_points[:, 2])
+
+        self._uv_triangle_points = None
+        self._uv_index = None
+        self._uv_bvh = None
+        if uvs is not None and uv_ids is not None and len(uv_ids) == len(poly_connects):
+            uv_triangle_points = np.asarray(uvs, dtype=np.float64)[
+                np.asarray(uv_ids, dtype=np.int64)[face_vertex_triangles]]
+            # UV triangles are stored in the z = 0 plane, so UVs outside all triangles are clamped to the closest one
+            self._uv_triangle_points = np.concatenate(
+                (uv_triangle_points, np.zeros(uv_triangle_points.shape[:2] + (1,))), axis=2)
+            self._uv_index = spatial.PointIndex(uv_triangle_points.mean(axis=1))
+            self._uv_bvh = spatial.TriangleBVH(
+                self._uv_triangle_points[:, 0], self._uv_triangle_points[:, 1], self._uv_triangle_points[:, 2])
+
+    @property
+    def triangles(self):
+        return self._triangles
+
+    @property
+    def has_uvs(self):
+        return self._uv_index is not None
+
+    def sample_closest_point(self, points, candidates=8):
+        """
+        Returns the closest source triangle and barycentric coordinates of each one of the given points
+        :param points: np.ndarray, target points array of shape (count, 3)
+        :param candidates: int, number of nearest triangles (by centroid) used to seed the search of each point
+        :return: tuple(np.ndarray, np.ndarray), triangle indices and barycentric coordinates arrays
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+        return self._sample_closest(self._index, self._bvh, self._triangle_points, points, candidates)
+
+    def sample_uv(self, uvs, candidates=8):
+        """
+        Returns the source triangle, in UV space, and barycentric coordinates of each one of the given UVs
+        UVs that fall outside all the UV triangles are projected to the closest one
+        :param uvs: np.ndarray, target UVs array of shape (count, 2)
+        :param candidates: int, number of nearest UV triangles (by centroid) used to seed the search of each UV
+        :return: tuple(np.ndarray, np.ndarray), triangle indices and barycentric coordinates arrays
+        """
+
+        if not self.has_uvs:
+            raise ValueError('Source mesh sampler has no UVs!')
+
+        uvs = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+
+        return self._sample_closest(
+            self._uv_index, self._uv_bvh, self._uv_triangle_points, np.hstack((uvs, np.zeros((len(uvs), 1)))),
+            candidates, index_dimensions=2)
+
+    def sample_ray_cast(self, points, directions, max_distance=None, candidates=8):
+        """
+        Returns the source triangle hit by rays cast from the given points along the given directions
+        Rays are cast in both directions and the nearest hit is used. Points without hit use the closest point.
+        :param points: np.ndarray, ray origins array of shape (count, 3)
+        :param directions: np.ndarray, ray directions array of shape (count, 3)
+        :param max_distance: float or None, maximum hit distance. If None, hits are not limited
+        :param candidates: int, number of nearest triangles (by centroid) used to seed the search of each ray
+        :return: tuple(np.ndarray, np.ndarray), triangle indices and barycentric coordinates arrays
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+
+        # Hits against the triangles with the nearest centroids bound the hierarchy traversal of each ray
+        candidates = max(1, min(int(candidates), len(self._triangles)))
+        _, candidate_ids = self._index.query(points, k=candidates)
+        candidate_ids = np.minimum(candidate_ids, len(self._triangles) - 1)
+        count, k = candidate_ids.shape
+        candidate_points = self._triangle_points[candidate_ids.ravel()]
+        hits, distances, barycentric = spatial.intersect_rays_triangles(
+            np.repeat(points, k, axis=0), np.repeat(directions, k, axis=0),
+            candidate_points[:, 0], candidate_points[:, 1], candidate_points[:, 2])
+        distances = np.where(hits, np.abs(distances), np.inf).reshape(count, k)
+        best = np.argmin(distances, axis=1)
+        rows = np.arange(count)
+        seed_ids = np.where(np.isinf(distances[rows, best]), -1, candidate_ids[rows, best])
+        seed_barycentric = barycentric.reshape(count, k, 3)[rows, best]
+        upper_bounds = distances[rows, best] * (1.0 + 1e-9) + 1e-12
+        if max_distance is not None:
+            seed_ids[distances[rows, best] > max_distance] = -1
+            upper_bounds = np.minimum(upper_bounds, max_distance)
+
+        triangle_ids, barycentric, _ = self._bvh.intersect_rays(points, directions, max_distance=upper_bounds)
+        missed = triangle_ids < 0
+        triangle_ids[missed] = seed_ids[missed]
+        barycentric[missed] = seed_barycentric[missed]
+        missed = np.flatnonzero(triangle_ids < 0)
+        if len(missed):
+            triangle_ids[missed], barycentric[missed] = self.sample_closest_point(points[missed])
+
+        return triangle_ids, barycentric
+
+    def interpolate(self, values, triangle_ids, barycentric):
+        """
+        Interpolates per-vertex source values at the given triangle samples
+        :param values: np.ndarray, source per-vertex values array of shape (vertices_count, ...)
+        :param triangle_ids: np.ndarray, sampled triangle indices
+        :param barycentric: np.ndarray, sampled barycentric coordinates
+        :return: np.ndarray, interpolated values array of shape (samples_count, ...)
+        """
+
+        values = np.asarray(values)
+        triangle_values = values[self._triangles[triangle_ids]]
+        shape = barycentric.shape + (1,) * (values.ndim - 1)
+
+        return (triangle_values * barycentric.reshape(shape)).sum(axis=1)
+
+    def _sample_closest(self, index, bvh, triangle_points, points, candidates, index_dimensions=3):
+        """
+        Internal function that returns the closest triangle of each one of the given points
+        Distances to the triangles with the nearest centroids are used as upper bounds of the hierarchy search, so
+        the result is exact regardless of the triangles sizes
+        """
+
+        candidates = max(1, min(int(candidates), len(self._triangles)))
+        _, candidate_ids = index.query(points[:, :index_dimensions], k=candidates)
+        candidate_ids = np.minimum(candidate_ids, len(self._triangles) - 1)
+        count, k = candidate_ids.shape
+        repeated_points = np.repeat(points, k, axis=0)
+        candidate_points = triangle_points[candidate_ids.ravel()]
+        closest, barycentric = spatial.closest_points_on_triangles(
+            repeated_points, candidate_points[:, 0], candidate_points[:, 1], candidate_points[:, 2])
+        distances = np.sqrt(((closest - repeated_points) ** 2).sum(axis=1)).reshape(count, k)
+        best = np.argmin(distances, axis=1)
+        rows = np.arange(count)
+        seed_ids = candidate_ids[rows, best]
+        seed_barycentric = barycentric.reshape(count, k, 3)[rows, best]
+
+        # Bounds are slightly enlarged so the seed triangle itself is never discarded by rounding errors
+        upper_bounds = distances[rows, best] * (1.0 + 1e-9) + 1e-12
+        triangle_ids, triangle_barycentric, _ = bvh.closest_points(points, upper_bounds=upper_bounds)
+        found = triangle_ids >= 0
+        seed_ids[found] = triangle_ids[found]
+        seed_barycentric[found] = triangle_barycentric[found]
+
+        return seed_ids, seed_barycentric
+
+
+def get_mesh_sampler(key, points, poly_counts, poly_connects, uvs=None, uv_ids=None):
+    """
+    Returns a cached mesh sampler for the given source mesh data, building it if necessary
+    Sampler is rebuilt when the source mesh points or topology change
+    :param key: str, unique identifier of the source mesh (usually its full path name)
+    :param points: np.ndarray, source vertex positions array of shape (vertices_count, 3)
+    :param poly_counts: np.ndarray, number of vertices of each source polygon
+    :param poly_connects: np.ndarray, vertex indices of each source polygon
+    :param uvs: np.ndarray or None, source UVs array of shape (uvs_count, 2)
+    :param uv_ids: np.ndarray or None, UV index of each source polygon vertex
+    :return: MeshSampler
+    """
+
+    data_hash = hashlib.sha1()
+    for array in (points, poly_counts, poly_connects, uvs, uv_ids):
+        if array is not None:
+            data_hash.update(np.ascontiguousarray(array).tobytes())
+    data_hash = data_hash.hexdigest()
+
+    cached = _SAMPLERS_CACHE.pop(key, None)
+    if cached and cached[0] == data_hash:
+        _SAMPLERS_CACHE[key] = cached
+        return cached[1]
+
+    logger.debug('Building mesh sampler for "{}"'.format(key))
+    sampler = MeshSampler(points, poly_counts, poly_connects, uvs=uvs, uv_ids=uv_ids)
+    _SAMPLERS_CACHE[key] = (data_hash, sampler)
+    while len(_SAMPLERS_CACHE) > SAMPLERS_CACHE_SIZE:
+        _SAMPLERS_CACHE.popitem(last=False)
+
+    return sampler
+
+
+def clear_samplers_cache():
+    """
+    Removes all cached mesh samplers
+    """
+
+    _SAMPLERS_CACHE.clear()
+
+
+def get_influences_mask(influences, include_influences=None, exclude_influences=None):
+    """
+    Returns a boolean mask with the influences that should be transferred
+    :param influences: list(str), influence names
+    :param include_influences: list(str) or None, if given, only these influences are transferred
+    :param exclude_influences: list(str) or None, influences that are not transferred
+    :return: np.ndarray
+    """
+
+    mask = np.ones(len(influences), dtype=bool)
+    if include_influences:
+        mask &= np.array([influence in include_influences for influence in influences], dtype=bool)
+    if exclude_influences:
+        mask &= np.array([influence not in exclude_influences for influence in influences], dtype=bool)
+
+    return mask
+
+
+def transfer_weights(
+        sampler, weights, target_points, mode=TransferModes.ClosestPoint, target_uvs=None, target_normals=None,
+        influences_mask=None, normalize=True, max_distance=None):
+    """
+    Transfers source per-vertex weights to the given target vertices in one vectorized pass
+    :param sampler: MeshSampler, sampler of the source mesh
+    :param weights: np.ndarray, source weights array of shape (source_vertices_count, influences_count)
+    :param target_points: np.ndarray, target vertex positions array of shape (target_vertices_count, 3)
+    :param mode: str, TransferModes value
+    :param target_uvs: np.ndarray or None, target vertex UVs. Required by UV space mode
+    :param target_normals: np.ndarray or None, target vertex normals. Required by ray cast mode
+    :param influences_mask: np.ndarray or None, boolean mask of the influences to transfer
+    :param normalize: bool, Whether transferred weights of each vertex should be normalized
+    :param max_distance: float or None, maximum ray distance used by ray cast mode
+    :return: np.ndarray, target weights array of shape (target_vertices_count, influences_count)
+    """
+
+    if mode == TransferModes.ClosestPoint:
+        triangle_ids, barycentric = sampler.sample_closest_point(target_points)
+    elif mode == TransferModes.UVSpace:
+        if target_uvs is None:
+            raise ValueError('Target UVs are required to transfer weights in UV space!')
+        triangle_ids, barycentric = sampler.sample_uv(target_uvs)
+    elif mode == TransferModes.RayCast:
+        if target_normals is None:
+            raise ValueError('Target normals are required to transfer weights using ray cast!')
+        triangle_ids, barycentric = sampler.sample_ray_cast(target_points, target_normals, max_distance=max_distance)
+    else:
+        raise ValueError('Transfer mode "{}" is not supported!'.format(mode))
+
+    weights = np.asarray(weights, dtype=np.float64)
+    if influences_mask is not None:
+        weights = weights * np.asarray(influences_mask, dtype=np.float64)
+
+    target_weights = sampler.interpolate(weights, triangle_ids, barycentric)
+    if normalize:
+        totals = target_weights.sum(axis=1, keepdims=True)
+        np.divide(target_weights, totals, out=target_weights, where=totals > 0)
+
+    return target_weights
@@ -0,0 +1,602 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains spatial indices and vectorized geometric queries that work on NumPy point arrays
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+SCIPY_AVAILABLE = True
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Number of query points processed at once by the pure NumPy grid index
+_QUERY_CHUNK_SIZE = 8192
+
+# Maximum number of cells searched around a query point before falling back to brute force search
+_MAX_RING = 8
+
+# Maximum number of times grid cells are subdivided to fit the expected number of points per cell
+_MAX_REFINEMENTS = 4
+
+
+class PointGrid(object):
+    """
+    Uniform grid spatial hash over a point cloud implemented with NumPy
+    Points are bucketed in cells sorted by cell key, so nearest neighbour queries only look at the cells that
+    surround each query point. Queries whose result cannot be guaranteed from those cells are solved by brute force.
+    """
+
+    def __init__(self, points, points_per_cell=2.0):
+        self._points = np.ascontiguousarray(points, dtype=np.float64)
+        if self._points.ndim != 2:
+            raise ValueError('Points array must be 2 dimensional, got shape {}'.format(self._points.shape))
+
+        points_count, dimensions = self._points.shape
+        self._dimensions = dimensions
+        self._min = self._points.min(axis=0) if points_count else np.zeros(dimensions)
+        self._cell_size = 1.0
+        self._points_per_cell = float(points_per_cell)
+
+        # Flat axes are not subdivided, so planar point clouds do not need to search cells along them
+        extents = self._points.max(axis=0) - self._min if points_count else np.zeros(dimensions)
+        self._axes = np.flatnonzero(extents > extents.max() * 1e-6) if extents.max() > 0 else np.zeros(0, dtype=int)
+        if len(self._axes):
+            cell_volume = np.prod(extents[self._axes]) * points_per_cell / points_count
+            self._cell_size = max(float(cell_volume ** (1.0 / len(self._axes))), float(extents.max()) * 1e-6)
+
+        keys = self._build_keys()
+
+        # Points usually lie on surfaces, so cells are refined until occupied cells hold the expected number of points
+        for _ in range(_MAX_REFINEMENTS):
+            occupancy = points_count / float(len(np.unique(keys))) if points_count else 0.0
+            if occupancy <= 2.0 * points_per_cell:
+                break
+            cell_size = self._cell_size
+            self._cell_size *= (points_per_cell / occupancy) ** 0.5
+            if np.prod((extents[self._axes] / self._cell_size + 2 * _MAX_RING + 4).astype(np.float64)) > 2 ** 62:
+                self._cell_size = cell_size
+                keys = self._build_keys()
+                break
+            keys = self._build_keys()
+
+        self._order = np.argsort(keys, kind='mergesort')
+        self._sorted_keys = keys[self._order]
+        self._flat_axes = np.setdiff1d(np.arange(dimensions), self._axes)
+        self._max = self._points.max(axis=0) if points_count else np.zeros(dimensions)
+
+    @property
+    def points(self):
+        return self._points
+
+    def query(self, points, k=1):
+        """
+        Returns the k nearest points of the grid for each one of the given points
+        :param points: np.ndarray, query points array of shape (points_count, dimensions)
+        :param k: int, number of neighbours to return
+        :return: tuple(np.ndarray, np.ndarray), distances and indices arrays of shape (points_count, k)
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self._dimensions)
+        k = min(int(k), len(self._points))
+        distances = np.full((len(points), k), np.inf)
+        indices = np.full((len(points), k), len(self._points), dtype=np.int64)
+        if not k:
+            return distances, indices
+
+        for start in range(0, len(points), _QUERY_CHUNK_SIZE):
+            end = min(start + _QUERY_CHUNK_SIZE, len(points))
+            distances[start:end], indices[start:end] = self._query_chunk(points[start:end], k)
+
+        return distances, indices
+
+    def _query_chunk(self, points, k):
+        """
+        Internal function that solves nearest neighbours queries of a chunk of points
+        Surrounding cells are searched in growing rings until the results can be guaranteed
+        """
+
+        distances = np.full((len(points), k), np.inf)
+        indices = np.full((len(points), k), len(self._points), dtype=np.int64)
+        unresolved = np.arange(len(points))
+
+        # Distance along the flat axes is a lower bound for the distance to any of the grid points
+        flat_points = points[:, self._flat_axes]
+        flat_distances = ((np.maximum(self._min[self._flat_axes] - flat_points, 0.0) + np.maximum(
+            flat_points - self._max[self._flat_axes], 0.0)) ** 2).sum(axis=1)
+
+        # First ring is large enough to contain k points on average
+        ring = 1
+        if len(self._axes):
+            ring_size = (k / self._points_per_cell) ** (1.0 / len(self._axes))
+            ring = int(min(max(np.ceil((ring_size - 1.0) / 2.0), 1), _MAX_RING))
+        while len(unresolved) and ring <= _MAX_RING:
+            ring_distances, ring_indices = self._query_ring(points[unresolved], k, ring)
+
+            # Results are exact when the k-th neighbour is closer than any point outside the searched cells
+            bounds = np.sqrt((ring * self._cell_size) ** 2 + flat_distances[unresolved])
+            resolved = ring_distances[:, -1] <= bounds
+            distances[unresolved[resolved]] = ring_distances[resolved]
+            indices[unresolved[resolved]] = ring_indices[resolved]
+            unresolved = unresolved[~resolved]
+            ring *= 2
+
+        if len(unresolved):
+            distances[unresolved], indices[unresolved] = _brute_force_query(self._points, points[unresolved], k)
+
+        return distances, indices
+
+    def _query_ring(self, points, k, ring):
+        """
+        Internal function that returns the k nearest points found in the cells around the given points
+        """
+
+        points_count = len(points)
+        axes_count = len(self._axes)
+        offsets = np.zeros((1, 0), dtype=np.int64)
+        if axes_count:
+            offsets = np.array(np.meshgrid(
+                *([np.arange(-ring, ring + 1)] * axes_count), indexing='ij')).reshape(axes_count, -1).T
+        cells = np.clip(self._get_cells(points), -1, self._dims - 2 * _MAX_RING - 2)
+        neighbour_keys = self._get_keys(cells[:, None, :] + offsets[None, :, :])
+        starts = np.searchsorted(self._sorted_keys, neighbour_keys, side='left').ravel()
+        ends = np.searchsorted(self._sorted_keys, neighbour_keys, side='right').ravel()
+        lengths = ends - starts
+
+        query_ids = np.repeat(np.repeat(np.arange(points_count), len(offsets)), lengths)
+        gather = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(lengths.sum())
+        candidates = self._order[gather]
+        candidate_distances = np.sqrt(((self._points[candidates] - points[query_ids]) ** 2).sum(axis=1))
+
+        # Candidates are grouped by query point, so they are laid out in a padded matrix to select the k nearest
+        counts = np.bincount(query_ids, minlength=points_count)
+        first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        columns = max(int(counts.max()) if points_count else 0, k)
+        padded_distances = np.full((points_count, columns), np.inf)
+        padded_indices = np.full((points_count, columns), len(self._points), dtype=np.int64)
+        positions = np.arange(len(query_ids)) - first[query_ids]
+        padded_distances[query_ids, positions] = candidate_distances
+        padded_indices[query_ids, positions] = candidates
+
+        if k < columns:
+            nearest = np.argpartition(padded_distances, k - 1, axis=1)[:, :k]
+            rows = np.arange(points_count)[:, None]
+            padded_distances = padded_distances[rows, nearest]
+            padded_indices = padded_indices[rows, nearest]
+        order = np.argsort(padded_distances, axis=1)
+        rows = np.arange(points_count)[:, None]
+        distances = padded_distances[rows, order]
+        indices = padded_indices[rows, order]
+
+        return distances, indices
+
+    def _build_keys(self):
+        """
+        Internal function that computes the grid dimensions and returns the cell key of each grid point
+        """
+
+        cells = self._get_cells(self._points)
+        real_dims = cells.max(axis=0) + 1 if len(cells) else np.zeros(len(self._axes), dtype=np.int64)
+        self._dims = real_dims + 2 * _MAX_RING + 3
+
+        return self._get_keys(cells)
+
+    def _get_cells(self, points):
+        return np.floor((points[:, self._axes] - self._min[self._axes]) / self._cell_size).astype(np.int64)
+
+    def _get_keys(self, cells):
+        cells = cells + _MAX_RING + 1
+        keys = np.zeros(cells.shape[:-1], dtype=np.int64)
+        for i in range(len(self._axes)):
+            keys = keys * self._dims[i] + cells[..., i]
+        return keys
+
+
+class PointIndex(object):
+    """
+    Nearest neighbour index over a point cloud
+    Uses SciPy cKDTree when available and falls back to a NumPy grid spatial hash otherwise
+    """
+
+    def __init__(self, points):
+        self._points = np.ascontiguousarray(points, dtype=np.float64)
+        if SCIPY_AVAILABLE:
+            self._index = cKDTree(self._points)
+        else:
+            self._index = PointGrid(self._points)
+
+    @property
+    def points(self):
+        return self._points
+
+    def query(self, points, k=1):
+        """
+        Returns the k nearest indexed points for each one of the given points
+        :param points: np.ndarray, query points array of shape (points_count, dimensions)
+        :param k: int, number of neighbours to return
+        :return: tuple(np.ndarray, np.ndarray), distances and indices arrays of shape (points_count, k).
+            If there are less than k indexed points, missing neighbours have infinite distance and
+            len(points) index.
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self._points.shape[1])
+        distances, indices = self._index.query(points, k=k)
+        distances = distances.reshape(len(points), -1)
+        indices = indices.reshape(len(points), -1)
+        if distances.shape[1] < k:
+            missing = k - distances.shape[1]
+            distances = np.hstack((distances, np.full((len(points), missing), np.inf)))
+            indices = np.hstack((indices, np.full((len(points), missing), len(self._points), dtype=indices.dtype)))
+
+        return distances, indices
+
+
+class TriangleBVH(object):
+    """
+    Bounding volume hierarchy over the axis aligned bounding boxes of a set of triangles implemented with NumPy
+    Queries traverse the hierarchy for all the query points at once, one level per iteration, discarding the boxes
+    that cannot contain a better result than the best one already found for each query point
+    """
+
+    def __init__(self, a, b, c, leaf_size=8):
+        """
+        :param a: np.ndarray, first vertex of each triangle, array of shape (triangles_count, 3)
+        :param b: np.ndarray, second vertex of each triangle, array of shape (triangles_count, 3)
+        :param c: np.ndarray, third vertex of each triangle, array of shape (triangles_count, 3)
+        :param leaf_size: int, maximum number of triangles stored in each leaf node
+        """
+
+        self._a = np.ascontiguousarray(a, dtype=np.float64)
+        self._b = np.ascontiguousarray(b, dtype=np.float64)
+        self._c = np.ascontiguousarray(c, dtype=np.float64)
+        self._leaf_size = max(1, int(leaf_size))
+        self._build()
+
+    def __len__(self):
+        return len(self._a)
+
+    def closest_points(self, points, upper_bounds=None):
+        """
+        Returns the closest triangle and barycentric coordinates of each one of the given points
+        :param points: np.ndarray, query points array of shape (count, 3)
+        :param upper_bounds: np.ndarray or None, known upper bound of the closest distance of each point. Seeding
+            the query with good bounds (for example, distances to the triangles with nearest centroids) allows to
+            discard most boxes from the first levels of the hierarchy
+        :return: tuple(np.ndarray, np.ndarray, np.ndarray), triangle indices (-1 if no triangle is found within
+            the upper bound), barycentric coordinates and distances arrays
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        count = len(points)
+        best_distances = np.full(count, np.inf)
+        if upper_bounds is not None:
+            best_distances = np.asarray(upper_bounds, dtype=np.float64) ** 2
+        best_ids = np.full(count, -1, dtype=np.int64)
+        best_barycentric = np.zeros((count, 3), dtype=np.float64)
+        if not len(self) or not count:
+            return best_ids, best_barycentric, np.sqrt(best_distances)
+
+        pair_points = np.arange(count)
+        pair_nodes = np.zeros(count, dtype=np.int64)
+        while len(pair_points):
+            query_points = points[pair_points]
+            below = np.maximum(self._nodes_min[pair_nodes] - query_points, 0.0)
+            above = np.maximum(query_points - self._nodes_max[pair_nodes], 0.0)
+            keep = ((below + above) ** 2).sum(axis=1) <= best_distances[pair_points]
+            pair_points, pair_nodes = pair_points[keep], pair_nodes[keep]
+
+            is_leaf = self._nodes_left[pair_nodes] < 0
+            triangle_points, triangle_ids = self._get_leaves_triangles(pair_points[is_leaf], pair_nodes[is_leaf])
+            if len(triangle_ids):
+                query_points = points[triangle_points]
+                closest, barycentric = closest_points_on_triangles(
+                    query_points, self._a[triangle_ids], self._b[triangle_ids], self._c[triangle_ids])
+                distances = ((closest - query_points) ** 2).sum(axis=1)
+                self._update_best(
+                    triangle_points, triangle_ids, distances, barycentric, best_ids, best_distances, best_barycentric)
+
+            pair_points, pair_nodes = self._get_children_pairs(pair_points[~is_leaf], pair_nodes[~is_leaf])
+
+        return best_ids, best_barycentric, np.sqrt(best_distances)
+
+    def intersect_rays(self, origins, directions, max_distance=None):
+        """
+        Returns the nearest triangle hit by each one of the given rays. Rays are intersected in both directions.
+        :param origins: np.ndarray, ray origins array of shape (count, 3)
+        :param directions: np.ndarray, ray directions array of shape (count, 3)
+        :param max_distance: float or np.ndarray or None, maximum hit distance along the rays (or along each ray).
+            If None, hits are not limited
+        :return: tuple(np.ndarray, np.ndarray, np.ndarray), hit triangle indices (-1 if the ray hits nothing),
+            barycentric coordinates and unsigned hit distances (infinite if the ray hits nothing) arrays
+        """
+
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        count = len(origins)
+        best_distances = np.full(count, np.inf)
+        if max_distance is not None:
+            best_distances[:] = max_distance
+        best_ids = np.full(count, -1, dtype=np.int64)
+        best_barycentric = np.zeros((count, 3), dtype=np.float64)
+        if not len(self) or not count:
+            return best_ids, best_barycentric, np.where(best_ids >= 0, best_distances, np.inf)
+
+        pair_rays = np.arange(count)
+        pair_nodes = np.zeros(count, dtype=np.int64)
+        while len(pair_rays):
+            near, far = _intersect_rays_boxes(
+                origins[pair_rays], directions[pair_rays], self._nodes_min[pair_nodes], self._nodes_max[pair_nodes])
+            lower_bounds = np.where((near <= 0.0) & (far >= 0.0), 0.0, np.minimum(np.abs(near), np.abs(far)))
+            keep = (near <= far) & (lower_bounds <= best_distances[pair_rays])
+            pair_rays, pair_nodes = pair_rays[keep], pair_nodes[keep]
+
+            is_leaf = self._nodes_left[pair_nodes] < 0
+            triangle_rays, triangle_ids = self._get_leaves_triangles(pair_rays[is_leaf], pair_nodes[is_leaf])
+            if len(triangle_ids):
+                hits, distances, barycentric = intersect_rays_triangles(
+                    origins[triangle_rays], directions[triangle_rays],
+                    self._a[triangle_ids], self._b[triangle_ids], self._c[triangle_ids])
+                distances = np.where(hits, np.abs(distances), np.inf)
+                self._update_best(
+                    triangle_rays, triangle_ids, distances, barycentric, best_ids, best_distances, best_barycentric)
+
+            pair_rays, pair_nodes = self._get_children_pairs(pair_rays[~is_leaf], pair_nodes[~is_leaf])
+
+        return best_ids, best_barycentric, np.where(best_ids >= 0, best_distances, np.inf)
+
+    def _build(self):
+        """
+        Internal function that builds the hierarchy splitting the triangles by the median of their centroids along
+        the longest axis of each node
+        """
+
+        triangles_min = np.minimum(np.minimum(self._a, self._b), self._c)
+        triangles_max = np.maximum(np.maximum(self._a, self._b), self._c)
+        centroids = (self._a + self._b + self._c) / 3.0
+        self._order = np.arange(len(self._a))
+
+        nodes_min, nodes_max, nodes_left, nodes_right, nodes_start, nodes_count = [], [], [], [], [], []
+
+        def _add_node(start, count):
+            ids = self._order[start:start + count]
+            nodes_min.append(triangles_min[ids].min(axis=0))
+            nodes_max.append(triangles_max[ids].max(axis=0))
+            nodes_left.append(-1)
+            nodes_right.append(-1)
+            nodes_start.append(start)
+            nodes_count.append(count)
+            return len(nodes_start) - 1
+
+        stack = [_add_node(0, len(self._a))] if len(self._a) else list()
+        while stack:
+            node = stack.pop()
+            start, count = nodes_start[node], nodes_count[node]
+            if count <= self._leaf_size:
+                continue
+            ids = self._order[start:start + count]
+            node_centroids = centroids[ids]
+            axis = int(np.argmax(node_centroids.max(axis=0) - node_centroids.min(axis=0)))
+            half = count // 2
+            self._order[start:start + count] = ids[np.argpartition(node_centroids[:, axis], half)]
+            nodes_left[node] = _add_node(start, half)
+            nodes_right[node] = _add_node(start + half, count - half)
+            stack.extend((nodes_left[node], nodes_right[node]))
+
+        # Boxes are padded so hits on the boundary of flat or tiny boxes are not discarded by rounding errors
+        padding = 1e-9 * max(1.0, float(np.abs(triangles_max).max())) if len(self._a) else 0.0
+        self._nodes_min = np.array(nodes_min, dtype=np.float64).reshape(-1, 3) - padding
+        self._nodes_max = np.array(nodes_max, dtype=np.float64).reshape(-1, 3) + padding
+        self._nodes_left = np.array(nodes_left, dtype=np.int64)
+        self._nodes_right = np.array(nodes_right, dtype=np.int64)
+        self._nodes_start = np.array(nodes_start, dtype=np.int64)
+        self._nodes_count = np.array(nodes_count, dtype=np.int64)
+
+    def _get_leaves_triangles(self, queries, nodes):
+        """
+        Internal function that expands the given query and leaf node pairs into query and triangle pairs
+        """
+
+        counts = self._nodes_count[nodes]
+        total = int(counts.sum())
+        starts = np.cumsum(counts) - counts
+        positions = np.repeat(self._nodes_start[nodes] - starts, counts) + np.arange(total)
+
+        return np.repeat(queries, counts), self._order[positions]
+
+    def _get_children_pairs(self, queries, nodes):
+        """
+        Internal function that expands the given query and internal node pairs into query and child node pairs
+        """
+
+        return np.concatenate((queries, queries)), np.concatenate((self._nodes_left[nodes], self._nodes_right[nodes]))
+
+    @staticmethod
+    def _update_best(queries, triangle_ids, distances, barycentric, best_ids, best_distances, best_barycentric):
+        """
+        Internal function that stores, for each query, the candidate triangle with the lowest distance if it is
+        lower than the best distance found so far
+        """
+
+        order = np.lexsort((distances, queries))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = queries[order[1:]] != queries[order[:-1]]
+        order = order[first]
+        better = order[distances[order] < best_distances[queries[order]]]
+        better_queries = queries[better]
+        best_ids[better_queries] = triangle_ids[better]
+        best_distances[better_queries] = distances[better]
+        best_barycentric[better_queries] = barycentric[better]
+
+
+def closest_points_on_triangles(points, a, b, c):
+    """
+    Returns the closest point of each triangle to each point, computed with Voronoi region tests
+    :param points: np.ndarray, points array of shape (count, 3)
+    :param a: np.ndarray, first vertex of each triangle, array of shape (count, 3)
+    :param b: np.ndarray, second vertex of each triangle, array of shape (count, 3)
+    :param c: np.ndarray, third vertex of each triangle, array of shape (count, 3)
+    :return: tuple(np.ndarray, np.ndarray), closest points and barycentric coordinates arrays of shape (count, 3)
+    """
+
+    ab = b - a
+    ac = c - a
+    ap = points - a
+    d1 = (ab * ap).sum(axis=-1)
+    d2 = (ac * ap).sum(axis=-1)
+    bp = points - b
+    d3 = (ab * bp).sum(axis=-1)
+    d4 = (ac * bp).sum(axis=-1)
+    cp = points - c
+    d5 = (ab * cp).sum(axis=-1)
+    d6 = (ac * cp).sum(axis=-1)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Inside face region
+        denominator = va + vb + vc
+        v = np.where(denominator != 0, vb / denominator, 0.0)
+        w = np.where(denominator != 0, vc / denominator, 0.0)
+        barycentric = np.column_stack((1.0 - v - w, v, w))
+
+        # Edge regions
+        edge_ab = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        t = np.clip(np.where(d1 - d3 != 0, d1 / (d1 - d3), 0.0), 0.0, 1.0)
+        barycentric[edge_ab] = np.column_stack((1.0 - t, t, np.zeros_like(t)))[edge_ab]
+
+        edge_ac = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        t = np.clip(np.where(d2 - d6 != 0, d2 / (d2 - d6), 0.0), 0.0, 1.0)
+        barycentric[edge_ac] = np.column_stack((1.0 - t, np.zeros_like(t), t))[edge_ac]
+
+        edge_bc = (va <= 0) & ((d4 - d3) >= 0) & ((d5 - d6) >= 0)
+        t = np.clip(np.where((d4 - d3) + (d5 - d6) != 0, (d4 - d3) / ((d4 - d3) + (d5 - d6)), 0.0), 0.0, 1.0)
+        barycentric[edge_bc] = np.column_stack((np.zeros_like(t), 1.0 - t, t))[edge_bc]
+
+    # Vertex regions
+    ones = np.eye(3)
+    barycentric[(d1 <= 0) & (d2 <= 0)] = ones[0]
+    barycentric[(d3 >= 0) & (d4 <= d3)] = ones[1]
+    barycentric[(d6 >= 0) & (d5 <= d6)] = ones[2]
+
+    closest = a * barycentric[..., 0:1] + b * barycentric[..., 1:2] + c * barycentric[..., 2:3]
+
+    return closest, barycentric
+
+
+def barycentric_coordinates_2d(points, a, b, c):
+    """
+    Returns the barycentric coordinates of 2D points within 2D triangles
+    :param points: np.ndarray, points array of shape (count, 2)
+    :param a: np.ndarray, first vertex of each triangle, array of shape (count, 2)
+    :param b: np.ndarray, second vertex of each triangle, array of shape (count, 2)
+    :param c: np.ndarray, third vertex of each triangle, array of shape (count, 2)
+    :return: np.ndarray, barycentric coordinates array of shape (count, 3). Degenerated triangles return NaN.
+    """
+
+    v0 = b - a
+    v1 = c - a
+    v2 = points - a
+    denominator = v0[..., 0] * v1[..., 1] - v1[..., 0] * v0[..., 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = (v2[..., 0] * v1[..., 1] - v1[..., 0] * v2[..., 1]) / denominator
+        w = (v0[..., 0] * v2[..., 1] - v2[..., 0] * v0[..., 1]) / denominator
+
+    return np.column_stack((1.0 - v - w, v, w))
+
+
+def intersect_rays_triangles(origins, directions, a, b, c, epsilon=1e-12):
+    """
+    Intersects rays with triangles using Moller-Trumbore algorithm. Rays are intersected in both directions.
+    :param origins: np.ndarray, ray origins array of shape (count, 3)
+    :param directions: np.ndarray, ray directions array of shape (count, 3)
+    :param a: np.ndarray, first vertex of each triangle, array of shape (count, 3)
+    :param b: np.ndarray, second vertex of each triangle, array of shape (count, 3)
+    :param c: np.ndarray, third vertex of each triangle, array of shape (count, 3)
+    :param epsilon: float, tolerance used to discard rays parallel to the triangle
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray), hit mask, signed hit distances along the rays and
+        barycentric coordinates of the hits
+    """
+
+    edge1 = b - a
+    edge2 = c - a
+    p = np.cross(directions, edge2)
+    determinant = (edge1 * p).sum(axis=-1)
+    valid = np.abs(determinant) > epsilon
+    inverse = np.where(valid, 1.0 / np.where(valid, determinant, 1.0), 0.0)
+
+    t_vector = origins - a
+    u = (t_vector * p).sum(axis=-1) * inverse
+    q = np.cross(t_vector, edge1)
+    v = (directions * q).sum(axis=-1) * inverse
+    distances = (edge2 * q).sum(axis=-1) * inverse
+
+    hits = valid & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0)
+
+    return hits, distances, np.column_stack((1.0 - u - v, u, v))
+
+
+def fan_triangulate(poly_counts):
+    """
+    Returns fan triangulation of polygons as indices into the polygon vertices (face-vertices) list
+    :param poly_counts: np.ndarray, number of vertices of each polygon
+    :return: tuple(np.ndarray, np.ndarray), face-vertex indices array of shape (triangles_count, 3) and
+        polygon index of each triangle
+    """
+
+    poly_counts = np.asarray(poly_counts, dtype=np.int64)
+    triangles_per_poly = np.maximum(poly_counts - 2, 0)
+    poly_starts = np.concatenate(([0], np.cumsum(poly_counts)[:-1]))
+    poly_ids = np.repeat(np.arange(len(poly_counts)), triangles_per_poly)
+    first_triangles = np.concatenate(([0], np.cumsum(triangles_per_poly)[:-1]))
+    local_ids = np.arange(triangles_per_poly.sum()) - np.repeat(first_triangles, triangles_per_poly)
+    starts = poly_starts[poly_ids]
+    triangles = np.column_stack((starts, starts + local_ids + 1, starts + local_ids + 2))
+
+    return triangles, poly_ids
+
+
+def _brute_force_query(indexed_points, points, k, chunk_size=256):
+    """
+    Internal function that solves nearest neighbours queries comparing against all the indexed points
+    """
+
+    distances = np.empty((len(points), k))
+    indices = np.empty((len(points), k), dtype=np.int64)
+    for start in range(0, len(points), chunk_size):
+        end = min(start + chunk_size, len(points))
+        chunk_distances = np.sqrt(((points[start:end, None, :] - indexed_points[None, :, :]) ** 2).sum(axis=-1))
+        if k < len(indexed_points):
+            nearest = np.argpartition(chunk_distances, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.tile(np.arange(len(indexed_points)), (end - start, 1))
+        rows = np.arange(end - start)[:, None]
+        nearest_distances = chunk_distances[rows, nearest]
+        order = np.argsort(nearest_distances, axis=1)
+        distances[start:end] = nearest_distances[rows, order]
+        indices[start:end] = nearest[rows, order]
+
+    return distances, indices
+
+
+def _intersect_rays_boxes(origins, directions, boxes_min, boxes_max):
+    """
+    Internal function that returns the parametric interval of each ray (as an infinite line) inside each box
+    Rays miss their box when the near distance is greater than the far one
+    """
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        inverse = 1.0 / directions
+        t1 = (boxes_min - origins) * inverse
+        t2 = (boxes_max - origins) * inverse
+    parallel = directions == 0.0
+    inside = (origins >= boxes_min) & (origins <= boxes_max)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+
+    return near.max(axis=1), far.min(axis=1)
@@ -7,131 +7,205 @@ Module that contains functions and classes related with symmetry
 
 from __future__ import print_function, division, absolute_import
 
-import re
-import copy
+import os
+import hashlib
 import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
 
 import maya.cmds
 
-from tpDcc.dccs.maya.core import decorators
+from tpDcc.dccs.maya.api import mesh as api_mesh
+from tpDcc.dccs.maya.core import decorators, spatial, mesh as mesh_utils
 
 LOGGER = logging.getLogger('tpDcc-dccs-maya')
 
+# Offset from the symmetry plane used to classify vertices as positive (greater or equal) or negative
+_MID_OFFSET_TOLERANCE = -0.0000001
+
+# Environment variable that can be used to define the folder where symmetry tables are cached
+SYMMETRY_CACHE_ENV = 'TPDCC_MAYA_SYMMETRY_CACHE'
+
+# Maximum number of symmetry tables kept in memory
+SYMMETRY_CACHE_SIZE = 16
+
+# Minimum tolerance used by cached symmetry tables. Symmetry plane offsets are quantized by the tolerance
+_MIN_SYMMETRY_TOLERANCE = 1e-9
+
 
 class SymmetryTable(object):
     def __init__(self):
 
-        self.sym_table = list()
-        self.asym_table = list()
-        self.positive_vertex_list = list()
-        self.positive_index_list = list()
-        self.negative_vertex_list = list()
-        self.negative_index_list = list()
+        self.mesh = None
+        self.sym_table = np.zeros(0, dtype=np.int64)
+        self.asym_table = np.zeros(0, dtype=np.int64)
+        self.positive_index_list = np.zeros(0, dtype=np.int64)
+        self.negative_index_list = np.zeros(0, dtype=np.int64)
+
+    @property
+    def positive_vertex_list(self):
+        return ['{}.vtx[{}]'.format(self.mesh, i) for i in self.positive_index_list]
 
-    def build_symmetry_table(self, mesh, axis=0, tolerance=0.001, use_pivot=True):
+    @property
+    def negative_vertex_list(self):
+        return ['{}.vtx[{}]'.format(self.mesh, i) for i in self.negative_index_list]
+
+    def build_symmetry_table(self, mesh, axis=0, tolerance=0.001, use_pivot=True, use_topology=True):
         """
         Builds a symmetry table for the given mesh
+        Mesh points are read once and mirrored points are matched through a spatial index, so the table is built
+        in O(n log n). Vertices without spatial match can be matched walking the mesh topology.
         :param mesh: str, mesh to build symmetry table for
         :param axis: int, axis to check for symmetry across
         :param tolerance: float, distance tolerance for finding symmetry pairs
         :param use_pivot: bool, Whether to use object pivot or world pivot
+        :param use_topology: bool, Whether to match vertices without spatial match using mesh topology
+        :return: np.ndarray, symmetric vertex index of each vertex (-1 if the vertex has no symmetric vertex)
         """
 
-        negative_vertices = list()
-        positive_vertices = list()
-        non_symmetry_vertices = list()
-        positive_vertices_int = list()
-        positive_vertices_xform = list()
-        negative_vertices_int = list()
-        negative_vertices_xform = list()
-
-        axis_ind = axis
-        axis2_ind = (axis_ind + 1) % 3
-        axis3_ind = (axis_ind + 2) % 3
-        mid_offset_tolerance = -0.0000001
-
-        vertices_counter = 0
-
-        if use_pivot:
-            vertex_xform = maya.cmds.xform(mesh, query=True, ws=True, rp=True)
-            mid = vertex_xform[axis_ind]
-        else:
-            mesh_parent = mesh
-            if maya.cmds.objectType(mesh_parent) != 'transform':
-                mesh_parent = maya.cmds.listRelatives(mesh, p=True)[0]
-            bounding_box = maya.cmds.xform(mesh_parent, q=True, ws=True, boundingBox=True)
-            mid = bounding_box[axis_ind] + ((bounding_box[axis_ind + 3] - bounding_box[axis_ind]) / 2)
-
-        total_vertices = maya.cmds.polyEvaluate(mesh, v=True)
-        sym_table = range(int(total_vertices))
-
-        # Retrieve positive and negative vertices
-        for i in range(total_vertices):
-            vtx = mesh + '.vtx[{}]'.format(i)
-            vertex_xform = maya.cmds.xform(vtx, q=True, ws=True, translation=True)
-            mid_offset = vertex_xform[axis_ind] - mid
-            if mid_offset >= mid_offset_tolerance:
-                positive_vertices.append(vtx)
-                positive_vertices_int.append(i)
-                positive_vertices_xform.append(vertex_xform[axis_ind])
-            else:
-                if mid_offset < mid_offset_tolerance:
-                    negative_vertices.append(vtx)
-                    negative_vertices_int.append(i)
-                    negative_vertices_xform.append(vertex_xform[axis_ind])
-
-        self.positive_vertex_list = copy.deepcopy(positive_vertices)
-        self.positive_index_list = copy.deepcopy(positive_vertices_int)
-        self.negative_vertex_list = copy.deepcopy(negative_vertices)
-        self.negative_index_list = copy.deepcopy(negative_vertices_int)
-
-        # Find non-symmetrical vertices
-        for i in range(len(positive_vertices)):
-            vtx = positive_vertices[i]
-            positive_offset = positive_vertices_xform[i] - mid
-            if positive_offset < tolerance:
-                positive_vertices[i] = 'm'
-                vertices_counter += 1
-                continue
-
-            for j in range(len(negative_vertices)):
-                if negative_vertices[j] == 'm':
-                    continue
-                negative_offset = mid - negative_vertices_xform[j]
-                if negative_offset < tolerance:
-                    negative_vertices[j] = 'm'
-                    vertices_counter += 1
-                    continue
-
-                if abs(positive_offset - negative_offset) <= tolerance:
-                    vertex_xform = maya.cmds.xform(vtx, q=True, ws=True, t=True)
-                    vertex2_xform = maya.cmds.xform(negative_vertices[j], q=True, ws=True, t=True)
-                    test1 = vertex_xform[axis2_ind] - vertex2_xform[axis2_ind]
-                    test2 = vertex_xform[axis3_ind] - vertex2_xform[axis3_ind]
-                    if abs(test1) < tolerance and abs(test2) < tolerance:
-                        sym_table[negative_vertices_int[j]] = positive_vertices_int[i]
-                        sym_table[positive_vertices_int[i]] = negative_vertices_int[j]
-                        vertices_counter += 2
-                        positive_vertices[i] = negative_vertices[j] = 'm'
-                        break
-
-        # Determine asymmetrical vertices
-        for i, j in zip(positive_vertices, negative_vertices):
-            if i != 'm' and j != 'm':
-                non_symmetry_vertices.append((i, j))
-
-        # [non_symmetry_vertices.append(i) for i in positive_vertices if i != 'm']
-        # [non_symmetry_vertices.append(i) for i in negative_vertices if i != 'm']
-
-        if vertices_counter != total_vertices:
-            LOGGER.warning('Mesh object "{} is not symmetrical!'.format(mesh))
+        mid = get_symmetry_mid(mesh, axis=axis, use_pivot=use_pivot)
+        mesh_fn = api_mesh.get_mesh_fn(mesh)
+        points = api_mesh.get_mesh_points(mesh_fn, world_space=True)
+        adjacency = None
+        if use_topology:
+            adjacency = mesh_utils.get_mesh_adjacency(mesh)
+
+        sym_table = build_symmetry_arrays(points, axis=axis, mid=mid, tolerance=tolerance, adjacency=adjacency)
+        side_offsets = points[:, axis] - mid
 
+        self.mesh = mesh
         self.sym_table = sym_table
-        self.asym_table = non_symmetry_vertices
+        self.asym_table = np.flatnonzero(sym_table < 0)
+        self.positive_index_list = np.flatnonzero(side_offsets >= _MID_OFFSET_TOLERANCE)
+        self.negative_index_list = np.flatnonzero(side_offsets < _MID_OFFSET_TOLERANCE)
+
+        if len(self.asym_table):
+            LOGGER.warning('Mesh object "{}" is not symmetrical! {} vertices have no symmetric vertex'.format(
+                mesh, len(self.asym_table)))
 
         return self.sym_table
 
 
+def get_symmetry_mid(mesh, axis=0, use_pivot=True):
+    """
+    Returns the position, along the given axis, of the symmetry plane of the given mesh
+    :param mesh: str, mesh to get symmetry plane of
+    :param axis: int, symmetry axis
+    :param use_pivot: bool, Whether to use object pivot or the center of the object bounding box
+    :return: float
+    """
+
+    if use_pivot:
+        return maya.cmds.xform(mesh, query=True, ws=True, rp=True)[axis]
+
+    mesh_parent = mesh
+    if maya.cmds.objectType(mesh_parent) != 'transform':
+        mesh_parent = maya.cmds.listRelatives(mesh, p=True)[0]
+    bounding_box = maya.cmds.xform(mesh_parent, q=True, ws=True, boundingBox=True)
+
+    return bounding_box[axis] + ((bounding_box[axis + 3] - bounding_box[axis]) / 2)
+
+
+def build_symmetry_arrays(points, axis=0, mid=0.0, tolerance=0.001, adjacency=None):
+    """
+    Returns the symmetric vertex of each one of the given points
+    Points are mirrored across the symmetry plane and matched with their nearest point. Only mutual matches closer
+    than the tolerance are kept. Vertices on the symmetry plane are their own symmetric vertex.
+    :param points: np.ndarray, vertex positions array of shape (vertices_count, 3)
+    :param axis: int, symmetry axis
+    :param mid: float, position of the symmetry plane along the symmetry axis
+    :param tolerance: float, distance tolerance for finding symmetry pairs
+    :param adjacency: tuple(np.ndarray, np.ndarray) or None, CSR vertex adjacency (offsets, neighbours). If given,
+        vertices without spatial match are matched walking the mesh topology from their matched neighbours
+    :return: np.ndarray, int64 array with the symmetric vertex index of each vertex (-1 if not found)
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    mirrored_points = points.copy()
+    mirrored_points[:, axis] = 2.0 * mid - points[:, axis]
+    if not len(points):
+        return np.zeros(0, dtype=np.int64)
+
+    distances, matches = spatial.PointIndex(points).query(mirrored_points, k=1)
+    distances = distances[:, 0]
+    matches = np.minimum(matches[:, 0], len(points) - 1)
+    vertex_ids = np.arange(len(points))
+    valid = (distances <= tolerance) & (matches[matches] == vertex_ids)
+    sym_table = np.where(valid, matches, -1)
+
+    middle = np.abs(points[:, axis] - mid) < tolerance
+    sym_table[middle & (sym_table < 0)] = vertex_ids[middle & (sym_table < 0)]
+
+    if adjacency is not None:
+        sym_table = match_symmetry_by_topology(sym_table, mirrored_points, points, *adjacency)
+
+    return sym_table
+
+
+def match_symmetry_by_topology(sym_table, mirrored_points, points, offsets, neighbours, max_iterations=1000):
+    """
+    Matches the vertices without symmetric vertex walking the mesh topology from their matched neighbours
+    The symmetric vertex of an unmatched vertex is searched between the unmatched neighbours of the symmetric
+    vertices of its neighbours. Candidates shared by more neighbours win, ties are solved by the distance to the
+    mirrored position. Only mutual matches are accepted, so the process grows from the matched regions.
+    :param sym_table: np.ndarray, symmetric vertex index of each vertex (-1 if not found)
+    :param mirrored_points: np.ndarray, mirrored vertex positions array of shape (vertices_count, 3)
+    :param points: np.ndarray, vertex positions array of shape (vertices_count, 3)
+    :param offsets: np.ndarray, adjacency vertex offsets
+    :param neighbours: np.ndarray, adjacency neighbour vertex indices
+    :param max_iterations: int, maximum number of growing iterations
+    :return: np.ndarray, new symmetric table
+    """
+
+    sym_table = np.array(sym_table, dtype=np.int64)
+    vertices_count = len(sym_table)
+    rows = np.repeat(np.arange(vertices_count), np.diff(offsets))
+
+    for _ in range(max_iterations):
+        unmatched = sym_table < 0
+        front = unmatched[rows] & ~unmatched[neighbours]
+        if not np.any(front):
+            break
+
+        # Candidates are the neighbours of the symmetric vertices of the matched neighbours
+        front_rows = rows[front]
+        mirrored_neighbours = sym_table[neighbours[front]]
+        counts = offsets[mirrored_neighbours + 1] - offsets[mirrored_neighbours]
+        gather = np.repeat(offsets[mirrored_neighbours] - (np.cumsum(counts) - counts), counts) + np.arange(
+            counts.sum())
+        candidate_rows = np.repeat(front_rows, counts)
+        candidates = neighbours[gather]
+        valid = unmatched[candidates]
+        candidate_rows = candidate_rows[valid]
+        candidates = candidates[valid]
+        if not len(candidates):
+            break
+
+        keys, votes = np.unique(candidate_rows * vertices_count + candidates, return_counts=True)
+        candidate_rows = keys // vertices_count
+        candidates = keys % vertices_count
+        candidate_distances = ((mirrored_points[candidate_rows] - points[candidates]) ** 2).sum(axis=1)
+
+        # Best candidate of each vertex is the first one after sorting by vertex, votes and distance
+        order = np.lexsort((candidate_distances, -votes, candidate_rows))
+        candidate_rows = candidate_rows[order]
+        candidates = candidates[order]
+        first = np.concatenate(([True], candidate_rows[1:] != candidate_rows[:-1]))
+        best = np.full(vertices_count, -1, dtype=np.int64)
+        best[candidate_rows[first]] = candidates[first]
+
+        best_rows = np.flatnonzero(best >= 0)
+        mutual = best_rows[(best[best[best_rows]] == best_rows) | (best[best_rows] == best_rows)]
+        if not len(mutual):
+            break
+        sym_table[mutual] = best[mutual]
+
+    return sym_table
+
+
 def get_side_vertices(obj, axis=0, sel_negative=True, tolerance=0.001, use_pivot=False, base_obj=None):
     """
     Select a side of the object
@@ -144,128 +218,357 @@ def get_side_vertices(obj, axis=0, sel_negative=True, tolerance=0.001, use_pivot
     :return:
     """
 
-    axis_ind = axis
+    if sel_negative is None:
+        total_vertices = maya.cmds.polyEvaluate(obj, v=True)
+        return ['{}.vtx[{}]'.format(obj, i) for i in range(total_vertices)]
 
-    total_vertices = maya.cmds.polyEvaluate(obj, v=True)
+    base_obj = base_obj or obj
+    vertices_ids = get_side_vertices_ids(
+        obj, axis=axis, sel_negative=sel_negative, tolerance=tolerance, use_pivot=use_pivot, base_obj=base_obj)
 
+    return ['{}.vtx[{}]'.format(base_obj, i) for i in vertices_ids]
+
+
+def get_side_vertices_ids(obj, axis=0, sel_negative=True, tolerance=0.001, use_pivot=False, base_obj=None):
+    """
+    Returns the indices of the vertices of one side of the object, vertices on the symmetry plane are included
+    :param obj: str, mesh to get side vertices of
+    :param axis: int, symmetry axis
+    :param sel_negative: bool or None, True to get negative side; False to get positive side; None to get all vertices
+    :param tolerance: float, distance from the symmetry plane to consider vertices to be in the middle
+    :param use_pivot: bool, Whether to use object pivot or the center of the object bounding box as symmetry plane
+    :param base_obj: str or None, mesh whose vertex positions are classified. If None, obj is used
+    :return: np.ndarray
+    """
+
+    base_obj = base_obj or obj
+    points = api_mesh.get_mesh_points(base_obj, world_space=True)
     if sel_negative is None:
-        all_vtx = list()
-        for i in range(total_vertices):
-            vtx = obj + '.vtx[{}]'.format(i)
-            all_vtx.append(vtx)
-        return all_vtx
+        return np.arange(len(points))
 
-    if not base_obj:
-        base_obj = obj
+    sides = get_vertices_sides(points, axis=axis, mid=get_symmetry_mid(base_obj, axis, use_pivot), tolerance=tolerance)
 
-    if use_pivot:
-        vertex_xform = maya.cmds.xform(base_obj, query=True, ws=True, rp=True)
-        mid = vertex_xform[axis_ind]
+    return np.flatnonzero(sides <= 0) if sel_negative else np.flatnonzero(sides >= 0)
+
+
+def get_vertices_sides(points, axis=0, mid=0.0, tolerance=0.001):
+    """
+    Classifies the given points by their side of the symmetry plane
+    :param points: np.ndarray, vertex positions array of shape (vertices_count, 3)
+    :param axis: int, symmetry axis
+    :param mid: float, position of the symmetry plane along the symmetry axis
+    :param tolerance: float, distance from the symmetry plane to consider points to be in the middle
+    :return: np.ndarray, int8 array with -1 for negative side, 0 for middle and 1 for positive side points
+    """
+
+    offsets = np.asarray(points, dtype=np.float64)[:, axis] - mid
+    sides = np.sign(offsets).astype(np.int8)
+    sides[np.abs(offsets) < tolerance] = 0
+
+    return sides
+
+
+def mirror_points(points, sym_table, vertices_ids=None, axis=0, mid=0.0, neg_to_pos=False, tolerance=0.001,
+                  flip=False):
+    """
+    Mirrors the given points across the symmetry plane
+    :param points: np.ndarray, vertex positions array of shape (vertices_count, 3)
+    :param sym_table: np.ndarray, symmetric vertex index of each vertex (-1 if not found)
+    :param vertices_ids: np.ndarray or None, vertices to mirror. If None, all vertices are mirrored
+    :param axis: int, symmetry axis
+    :param mid: float, position of the symmetry plane along the symmetry axis
+    :param neg_to_pos: bool, Whether to mirror negative side into positive side or positive side into negative side
+    :param tolerance: float, distance from the symmetry plane to consider points to be in the middle
+    :param flip: bool, Whether to swap both sides instead of mirroring one side into the other one
+    :return: tuple(np.ndarray, np.ndarray), new points array and indices of the vertices that were modified
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    new_points = points.copy()
+    sym_table = np.asarray(sym_table, dtype=np.int64)
+    if vertices_ids is None:
+        vertices_ids = np.arange(len(points))
+    vertices_ids = np.asarray(vertices_ids, dtype=np.int64)
+
+    sides = get_vertices_sides(points[vertices_ids], axis=axis, mid=mid, tolerance=tolerance)
+    middle_ids = vertices_ids[sides == 0]
+    source_ids = vertices_ids[sides == (-1 if neg_to_pos else 1)]
+    target_ids = sym_table[source_ids]
+    source_ids = source_ids[target_ids >= 0]
+    target_ids = target_ids[target_ids >= 0]
+
+    mirrored = points[source_ids]
+    mirrored[:, axis] = 2.0 * mid - mirrored[:, axis]
+    new_points[target_ids] = mirrored
+    if flip:
+        flipped = points[target_ids]
+        flipped[:, axis] = 2.0 * mid - flipped[:, axis]
+        new_points[source_ids] = flipped
+        new_points[middle_ids, axis] = 2.0 * mid - points[middle_ids, axis]
     else:
-        mesh_parent = base_obj
-        if maya.cmds.objectType(mesh_parent) != 'transform':
-            mesh_parent = maya.cmds.listRelatives(base_obj, p=True)[0]
-        bounding_box = maya.cmds.xform(mesh_parent, q=True, ws=True, boundingBox=True)
-        mid = bounding_box[axis_ind] + ((bounding_box[axis_ind + 3] - bounding_box[axis_ind]) / 2)
-
-    side_vertices = list()
-    for i in range(total_vertices):
-        vtx = base_obj + '.vtx[{}]'.format(i)
-        vtx_xform = maya.cmds.xform(vtx, q=True, ws=True, t=True)
-        mid_offset = vtx_xform[axis_ind] - mid
-        if abs(mid_offset) < tolerance:
-            side_vertices.append(vtx)
-            continue
-        elif mid_offset > 0 and not sel_negative:
-            side_vertices.append(vtx)
-            continue
-        elif mid_offset < 0 and sel_negative:
-            side_vertices.append(vtx)
-            continue
-
-    return side_vertices
+        new_points[middle_ids, axis] = mid
+
+    modified_ids = np.unique(np.concatenate((target_ids, source_ids if flip else [], middle_ids)).astype(np.int64))
+
+    return new_points, modified_ids
+
+
+class SymmetryTableCache(object):
+    """
+    Caches symmetry tables in memory (LRU) and on disk (.npy files) so the same asset reuses its table across sessions
+    Tables are keyed by mesh topology, symmetry axis and tolerance, so meshes that share topology share tables
+    """
+
+    def __init__(self, cache_size=SYMMETRY_CACHE_SIZE, cache_directory=None):
+        """
+        :param cache_size: int, maximum number of tables kept in memory
+        :param cache_directory: str or None, folder where tables are stored. If None, tables are only kept in memory
+        """
+
+        self._cache_size = cache_size
+        self._cache_directory = cache_directory
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    @property
+    def cache_directory(self):
+        return self._cache_directory
+
+    @cache_directory.setter
+    def cache_directory(self, value):
+        self._cache_directory = value
+
+    def get(self, key):
+        """
+        Returns the symmetry table stored with the given key
+        :param key: str
+        :return: np.ndarray or None
+        """
+
+        with self._lock:
+            table = self._tables.pop(key, None)
+            if table is not None:
+                self._tables[key] = table
+                return table
+
+        file_path = self._get_file_path(key)
+        if not file_path or not os.path.isfile(file_path):
+            return None
+        try:
+            table = np.load(file_path)
+        except (IOError, OSError, ValueError) as exc:
+            LOGGER.warning('Impossible to load symmetry table from "{}": {}'.format(file_path, exc))
+            return None
+        table.setflags(write=False)
+        self._add(key, table)
+
+        return table
+
+    def set(self, key, table):
+        """
+        Stores the given symmetry table with the given key
+        :param key: str
+        :param table: np.ndarray, symmetric vertex index of each vertex
+        """
+
+        table = np.array(table, dtype=np.int64)
+        table.setflags(write=False)
+        self._add(key, table)
+
+        file_path = self._get_file_path(key)
+        if not file_path:
+            return
+        try:
+            if not os.path.isdir(self._cache_directory):
+                os.makedirs(self._cache_directory)
+            temp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+            with open(temp_path, 'wb') as fh:
+                np.save(fh, table)
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            os.rename(temp_path, file_path)
+        except (IOError, OSError) as exc:
+            LOGGER.warning('Impossible to save symmetry table into "{}": {}'.format(file_path, exc))
+
+    def clear(self, clear_disk=False):
+        """
+        Removes all cached symmetry tables
+        :param clear_disk: bool, Whether to remove the tables stored on disk too
+        """
+
+        with self._lock:
+            self._tables.clear()
+
+        if not clear_disk or not self._cache_directory or not os.path.isdir(self._cache_directory):
+            return
+        for file_name in os.listdir(self._cache_directory):
+            if file_name.endswith('.npy'):
+                os.remove(os.path.join(self._cache_directory, file_name))
+
+    def _add(self, key, table):
+        """
+        Internal function that adds a table to the memory cache
+        """
+
+        with self._lock:
+            self._tables.pop(key, None)
+            self._tables[key] = table
+            while len(self._tables) > self._cache_size:
+                self._tables.popitem(last=False)
+
+    def _get_file_path(self, key):
+        """
+        Internal function that returns the file where the table with given key is stored on disk
+        """
+
+        if not self._cache_directory:
+            return None
+
+        return os.path.join(self._cache_directory, '{}.npy'.format(key))
+
+
+SYMMETRY_CACHE = SymmetryTableCache(
+    cache_directory=os.environ.get(SYMMETRY_CACHE_ENV, os.path.join(tempfile.gettempdir(), 'tpDcc', 'symmetry')))
+
+
+def get_symmetry_table_key(topology_hash, axis=0, tolerance=0.001, use_topology=True, mid_offset=0.0):
+    """
+    Returns the key used to cache the symmetry table of a mesh
+    :param topology_hash: str, mesh topology hash
+    :param axis: int, symmetry axis
+    :param tolerance: float, distance tolerance for finding symmetry pairs
+    :param use_topology: bool, Whether topology fallback is used to match vertices
+    :param mid_offset: float, offset of the symmetry plane from the center of the mesh bounding box. It is
+        quantized by the tolerance, so meshes with the same topology and symmetry plane share their table
+    :return: str
+    """
+
+    key = '{}|{}|{!r}|{}|{}'.format(
+        topology_hash, int(axis), float(tolerance), int(bool(use_topology)), int(round(mid_offset / tolerance)))
+
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def get_symmetry_table(mesh, axis=0, tolerance=0.001, use_pivot=False, use_topology=True, use_cache=True):
+    """
+    Returns the symmetry table of the given mesh, reusing cached tables of meshes with the same topology and
+    symmetry plane
+    :param mesh: str, mesh to get symmetry table of
+    :param axis: int, symmetry axis
+    :param tolerance: float, distance tolerance for finding symmetry pairs. Tolerances lower than 1e-9 are clamped
+    :param use_pivot: bool, Whether to use object pivot or the center of the object bounding box as symmetry plane
+    :param use_topology: bool, Whether to match vertices without spatial match using mesh topology
+    :param use_cache: bool, Whether to use cached tables. New tables are always cached
+    :return: np.ndarray, read only array with the symmetric vertex index of each vertex (-1 if not found)
+    """
+
+    if tolerance < 0:
+        raise ValueError('Symmetry tolerance must be positive: {}'.format(tolerance))
+    tolerance = max(float(tolerance), _MIN_SYMMETRY_TOLERANCE)
+
+    mid_offset = 0.0
+    if use_pivot:
+        mid_offset = get_symmetry_mid(mesh, axis=axis, use_pivot=True) - get_symmetry_mid(
+            mesh, axis=axis, use_pivot=False)
+    key = get_symmetry_table_key(
+        api_mesh.get_mesh_topology_hash(mesh), axis=axis, tolerance=tolerance, use_topology=use_topology,
+        mid_offset=mid_offset)
+    if use_cache:
+        table = SYMMETRY_CACHE.get(key)
+        if table is not None:
+            return table
+
+    table = SymmetryTable().build_symmetry_table(
+        mesh, axis=axis, tolerance=tolerance, use_pivot=use_pivot, use_topology=use_topology)
+    SYMMETRY_CACHE.set(key, table)
+
+    return SYMMETRY_CACHE.get(key)
+
+
+def symmetry_pairs_to_table(sym_table_list, vertices_count=None):
+    """
+    Converts a flat list of symmetric vertex pairs ([a0, b0, a1, b1, ...]) into a symmetry table
+    :param sym_table_list: list(int), flat list of symmetric vertex pairs
+    :param vertices_count: int or None, number of vertices of the mesh. If None, the maximum pair index is used
+    :return: np.ndarray, symmetric vertex index of each vertex (-1 if not found)
+    """
+
+    pairs = np.asarray(sym_table_list, dtype=np.int64).reshape(-1, 2)
+    if vertices_count is None:
+        vertices_count = int(pairs.max()) + 1 if len(pairs) else 0
+    table = np.full(vertices_count, -1, dtype=np.int64)
+    table[pairs[:, 1]] = pairs[:, 0]
+    table[pairs[:, 0]] = pairs[:, 1]
+
+    return table
 
 
 def get_symmetric_vertex(vertex_index, sym_table_list):
     """
     Returns symmetric vertex or -1 if not symmetric vertex found
     :param vertex_index: int
-    :param sym_table_list: int
+    :param sym_table_list: np.ndarray or list(int), symmetry table (symmetric vertex index of each vertex) or legacy
+        flat list of symmetric vertex pairs. Lookups in symmetry tables are O(1), legacy lists are converted first.
+    :return: int
     """
 
-    for i in range(len(sym_table_list)):
-        if int(vertex_index) == int(sym_table_list[i]):
-            if i % 2 == 0:
-                sym_vtx = sym_table_list[i + 1]
-            else:
-                sym_vtx = sym_table_list[i - 1]
-            break
+    if not isinstance(sym_table_list, np.ndarray):
+        sym_table_list = symmetry_pairs_to_table(sym_table_list)
+
+    vertex_index = int(vertex_index)
+    if vertex_index < 0 or vertex_index >= len(sym_table_list):
+        return -1
 
-    return sym_vtx
+    return int(sym_table_list[vertex_index])
 
 
 @decorators.undo_chunk
 def mirror_vertices(obj, selected_vertices=None, axis=0, neg_to_pos=False, tolerance=0.001, use_pivot=False,
                     flip=False, base_obj=None, sym_table_list=None):
-    zero_vertices_int = list()
-    pos_vertices_int = list()
-    neg_vertices_int = list()
+    """
+    Mirrors the given vertices of the given mesh across the symmetry plane
+    Mesh points are read once and written back with a single undoable setPoints call
+    :param obj: str, mesh to mirror vertices of
+    :param selected_vertices: list(str) or np.ndarray or None, vertex components or indices. If None, current
+        selection is used
+    :param axis: int, symmetry axis
+    :param neg_to_pos: bool, Whether to mirror negative side into positive side or positive side into negative side
+    :param tolerance: float, distance from the symmetry plane to consider vertices to be in the middle
+    :param use_pivot: bool, Whether to use object pivot or the center of the object bounding box as symmetry plane
+    :param flip: bool, Whether to swap both sides instead of mirroring one side into the other one
+    :param base_obj: str or None, mesh used to compute the symmetry plane and symmetry table. If None, obj is used
+    :param sym_table_list: np.ndarray or list(int) or None, symmetry table or legacy flat list of symmetric vertex
+        pairs. If None, the cached symmetry table of the base mesh is used
+    :return: np.ndarray, indices of the vertices that were modified
+    """
 
-    axis_ind = axis
-
-    if use_pivot:
-        vertex_xform = maya.cmds.xform(base_obj, query=True, ws=True, rp=True)
-        mid = vertex_xform[axis_ind]
-    else:
-        mesh_parent = base_obj
-        if maya.cmds.objectType(mesh_parent) != 'transform':
-            mesh_parent = maya.cmds.listRelatives(base_obj, p=True)[0]
-        bounding_box = maya.cmds.xform(mesh_parent, q=True, ws=True, boundingBox=True)
-        mid = bounding_box[axis_ind] + ((bounding_box[axis_ind + 3] - bounding_box[axis_ind]) / 2)
+    base_obj = base_obj or obj
+    mid = get_symmetry_mid(base_obj, axis=axis, use_pivot=use_pivot)
 
     if selected_vertices is None:
         selected_vertices = maya.cmds.ls(sl=True)
-
-    for vtx in selected_vertices:
-        vtx_index = re.search(r'\[(.*?)\]', vtx).group(1)
-        vtx_xform = maya.cmds.xform(vtx, q=True, ws=True, t=True)
-        mid_offset = vtx_xform[axis_ind] - mid
-        if abs(mid_offset) < tolerance:
-            zero_vertices_int.append(vtx_index)
-            continue
-        if mid_offset > 0:
-            pos_vertices_int.append(vtx_index)
-            continue
-        if mid_offset < 0:
-            neg_vertices_int.append(vtx_index)
-            continue
-
-    if neg_to_pos:
-        pos_vertices_int = neg_vertices_int
-
-    for i in range(len(pos_vertices_int)):
-        vtx_num = get_symmetric_vertex(pos_vertices_int[i], sym_table_list)
-        vtx = obj + '.vtx[{}]'.format(pos_vertices_int[i])
-        vtx_sym = obj + '.vtx[{}]'.format(vtx_num)
-        if vtx_num != -1:
-            if not flip:
-                vtx_xform = maya.cmds.xform(vtx, q=True, ws=True, t=True)
-                vtx_xform[axis_ind] = 2 * mid - vtx_xform[axis_ind]
-                maya.cmds.xform(vtx_sym, t=(vtx_xform[0], vtx_xform[1], vtx_xform[2]), ws=True)
-            else:
-                vtx_xform = maya.cmds.xform(vtx, q=True, ws=True, t=True)
-                vtx_xform[axis_ind] = 2 * mid - vtx_xform[axis_ind]
-                flip_vtx_xform = maya.cmds.xform(vtx_sym, q=True, ws=True, t=True)
-                flip_vtx_xform[axis_ind] = 2 * mid - flip_vtx_xform[axis_ind]
-                maya.cmds.xform(vtx_sym, t=(vtx_xform[0], vtx_xform[1], vtx_xform[2]), ws=True)
-                maya.cmds.xform(vtx, t=(flip_vtx_xform[0], flip_vtx_xform[1], flip_vtx_xform[2]), ws=True)
-
-    # Middle verts
-    for i in range(len(zero_vertices_int)):
-        vtx = obj + '.vtx[{}]'.format(zero_vertices_int[i])
-        vtx_xform = maya.cmds.xform(vtx, q=True, ws=True, t=True)
-        if flip:
-            vtx_xform[axis_ind] = 2 * mid - vtx_xform[axis_ind]
-        else:
-            vtx_xform[axis_ind] = mid
-        maya.cmds.xform(vtx, t=(vtx_xform[0], vtx_xform[1], vtx_xform[2]), ws=True)
+    if isinstance(selected_vertices, np.ndarray):
+        vertices_ids = selected_vertices.astype(np.int64)
+    else:
+        selected_vertices = maya.cmds.polyListComponentConversion(selected_vertices, toVertex=True) or list()
+        vertices_ids = api_mesh.get_components_vertices_ids(selected_vertices)[1]
+    if not len(vertices_ids):
+        LOGGER.warning('No vertices to mirror!')
+        return vertices_ids
+
+    if sym_table_list is None:
+        sym_table_list = get_symmetry_table(base_obj, axis=axis, tolerance=tolerance, use_pivot=use_pivot)
+    elif not isinstance(sym_table_list, np.ndarray):
+        sym_table_list = symmetry_pairs_to_table(sym_table_list)
+
+    points = api_mesh.get_mesh_points(obj, world_space=True)
+    new_points, modified_ids = mirror_points(
+        points, sym_table_list, vertices_ids=vertices_ids, axis=axis, mid=mid, neg_to_pos=neg_to_pos,
+        tolerance=tolerance, flip=flip)
+    if len(modified_ids):
+        api_mesh.set_mesh_points(obj, new_points, world_space=True, undoable=True)
+
+    return modified_ids
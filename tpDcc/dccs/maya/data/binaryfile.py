@@ -0,0 +1,158 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the container shared by binary data files
+A binary data file starts with magic bytes and a little endian uint64 with the size of a JSON header, followed by the
+header and by a data section where arrays are stored aligned, so they can be memory-mapped
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import json
+import struct
+import logging
+
+import numpy as np
+
+LOGGER = logging.getLogger('tpDcc-dccs-maya')
+
+ALIGNMENT = 8
+
+
+class BinaryDataLayout(object):
+    """
+    Lays out the arrays stored in the data section of a binary data file
+    """
+
+    def __init__(self):
+        self._arrays = list()
+        self._size = 0
+
+    @property
+    def arrays(self):
+        """
+        Returns the arrays of the layout and their positions relative to the data section
+        :return: list(tuple(int, np.ndarray))
+        """
+
+        return self._arrays
+
+    @property
+    def size(self):
+        """
+        Returns the size in bytes of the data section
+        :return: int
+        """
+
+        return self._size
+
+    def add(self, array):
+        """
+        Adds the given array at the end of the data section
+        :param array: np.ndarray
+        :return: int, position of the array relative to the data section
+        """
+
+        position = self._size
+        self._arrays.append((position, array))
+        self._size = align(position + array.nbytes)
+
+        return position
+
+
+class BinaryDataFile(object):
+    """
+    Base class for binary data files. Subclasses define the magic bytes and the header and arrays they store
+    """
+
+    MAGIC = None
+    VERSION = 1
+    DESCRIPTION = 'binary data'
+
+    def __init__(self, file_path):
+        self._file_path = file_path
+        self._header = None
+        self._data_offset = 0
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    @property
+    def header(self):
+        """
+        Returns the header of the file. Header is read only once.
+        :return: dict
+        """
+
+        if self._header is None:
+            self._read_header()
+
+        return self._header
+
+    @classmethod
+    def _write_file(cls, file_path, header, layout):
+        """
+        Internal function that writes a new file with the given header and data section
+        :param file_path: str, path of the file to write
+        :param header: dict, file header. The file version is added to it
+        :param layout: BinaryDataLayout, arrays of the data section
+        :return: BinaryDataFile
+        """
+
+        header = dict(header)
+        header['version'] = cls.VERSION
+        header_data = json.dumps(header).encode('utf-8')
+        data_offset = align(len(cls.MAGIC) + 8 + len(header_data))
+
+        with open(file_path, 'wb') as fh:
+            fh.write(cls.MAGIC)
+            fh.write(struct.pack('<Q', len(header_data)))
+            fh.write(header_data)
+            for position, array in layout.arrays:
+                fh.seek(data_offset + position)
+                fh.write(array.tobytes())
+            fh.truncate(data_offset + layout.size)
+
+        return cls(file_path)
+
+    def _read_header(self):
+        """
+        Internal function that reads the header of the file
+        """
+
+        with open(self._file_path, 'rb') as fh:
+            magic = fh.read(len(self.MAGIC))
+            if magic != self.MAGIC:
+                raise IOError('File "{}" is not a valid {} file!'.format(self._file_path, self.DESCRIPTION))
+            header_size = struct.unpack('<Q', fh.read(8))[0]
+            self._header = json.loads(fh.read(header_size).decode('utf-8'))
+
+        self._data_offset = align(len(self.MAGIC) + 8 + header_size)
+
+    def _map_array(self, position, dtype, shape):
+        """
+        Internal function that memory-maps the array stored at the given position
+        :param position: int, array position relative to the data section
+        :param dtype: np.dtype
+        :param shape: int or tuple(int)
+        :return: np.memmap or np.ndarray
+        """
+
+        if not isinstance(shape, tuple):
+            shape = (int(shape),)
+        if not shape[0]:
+            return np.zeros(shape, dtype=dtype)
+
+        return np.memmap(self._file_path, dtype=dtype, mode='r', offset=self._data_offset + position, shape=shape)
+
+
+def align(position):
+    """
+    Returns given position aligned to the data alignment of binary data files
+    :param position: int
+    :return: int
+    """
+
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,219 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains binary blendShape target deltas data type
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+
+import numpy as np
+
+import maya.cmds
+
+from tpDcc import dcc
+from tpDcc.libs.python import path, osplatform, version
+from tpDcc.dccs.maya.api import blendshape as api_blendshape
+from tpDcc.dccs.maya.core import helpers, deformer, blendshape as blendshape_utils
+from tpDcc.dccs.maya.data import base, binaryfile
+
+LOGGER = logging.getLogger('tpDcc-dccs-maya')
+
+BLENDSHAPE_DELTAS_MAGIC = b'TPBSDLT1'
+BLENDSHAPE_DELTAS_VERSION = 1
+
+
+class BlendShapeDeltasFile(binaryfile.BinaryDataFile, object):
+    """
+    Binary blendShape target deltas file
+    The file contains a JSON header (targets and arrays layout) followed by the sparse deltas of each target item.
+    Each target item stores its component ids and its deltas. Arrays are memory-mapped, so loading a subset of
+    targets only touches the data of those targets.
+    """
+
+    MAGIC = BLENDSHAPE_DELTAS_MAGIC
+    VERSION = BLENDSHAPE_DELTAS_VERSION
+    DESCRIPTION = 'blendShape deltas'
+
+    @property
+    def targets(self):
+        """
+        Returns the aliases of the targets stored in the file, in stored order
+        :return: list(str)
+        """
+
+        aliases = list()
+        for item in self.header['items']:
+            if item['alias'] not in aliases:
+                aliases.append(item['alias'])
+
+        return aliases
+
+    @classmethod
+    def write(cls, file_path, items, values_dtype='float32', **metadata):
+        """
+        Writes given target items deltas into a new binary blendShape deltas file
+        :param file_path: str, path of the file to write
+        :param items: list(dict), target items. Each item contains "alias", "index", "item_index", "ids" and "deltas"
+        :param values_dtype: str, dtype used to store delta values ('float32' or 'float64')
+        :param metadata: dict, extra data stored in the file header
+        :return: BlendShapeDeltasFile
+        """
+
+        values_dtype = np.dtype(values_dtype)
+        header_items = list()
+        layout = binaryfile.BinaryDataLayout()
+        for item in items:
+            ids = np.asarray(item['ids'], dtype='<i4')
+            deltas = np.asarray(item['deltas'], dtype=values_dtype).reshape(-1, 3)
+            header_item = {
+                'alias': item['alias'], 'index': int(item['index']), 'item_index': int(item['item_index']),
+                'count': len(ids)}
+            for array_name, array in (('ids', ids), ('deltas', deltas)):
+                header_item[array_name] = layout.add(array)
+            header_items.append(header_item)
+
+        header = dict(metadata)
+        header.update({
+            'values_dtype': values_dtype.str,
+            'items': header_items
+        })
+
+        return cls._write_file(file_path, header, layout)
+
+    def read(self, targets=None):
+        """
+        Reads target items deltas from the file. Only the data of the requested targets is read.
+        :param targets: list(str) or None, aliases of the targets to read. If None, all targets are read.
+        :return: list(dict), target items. Each item contains "alias", "index", "item_index", "ids" and "deltas"
+        """
+
+        header = self.header
+        if targets is not None:
+            missing = set(targets).difference(self.targets)
+            if missing:
+                raise ValueError('Targets not found in file "{}": {}'.format(self._file_path, sorted(missing)))
+
+        values_dtype = np.dtype(header['values_dtype'])
+        items = list()
+        for header_item in header['items']:
+            if targets is not None and header_item['alias'] not in targets:
+                continue
+            item = dict((key, header_item[key]) for key in ('alias', 'index', 'item_index'))
+            item['ids'] = np.asarray(self._map_array(header_item['ids'], np.dtype('<i4'), (header_item['count'],)))
+            item['deltas'] = np.asarray(
+                self._map_array(header_item['deltas'], values_dtype, (header_item['count'], 3)), dtype=np.float64)
+            items.append(item)
+
+        return items
+
+
+class MayaBlendShapeDeltasData(base.MayaCustomData, object):
+    """
+    BlendShape target deltas data stored in binary blendShape deltas files
+    """
+
+    @staticmethod
+    def get_data_type():
+        return 'maya.blendshape_deltas'
+
+    @staticmethod
+    def get_data_extension():
+        return 'bsdelta'
+
+    @staticmethod
+    def get_data_title():
+        return 'BlendShape Deltas'
+
+    def export_data(self, comment='-', create_version=True, *args, **kwargs):
+        """
+        Exports the stored target deltas of the given blendShape into a binary blendShape deltas file
+        No target geometry is needed, deltas are read directly from the blendShape node
+        :param comment: str
+        :param create_version: bool
+        :param blendshape: str, name of the blendShape node to export deltas of
+        :param targets: list(str) or None, aliases of the targets to export. If None, all targets are exported.
+        :param base_geo: str, base geometry of the blendShape to export deltas of. If empty, first one is used.
+        :param tolerance: float or None, if given, deltas with a length lower or equal than this value are skipped
+        :param values_dtype: str, dtype used to store delta values ('float32' or 'float64')
+        :return: bool
+        """
+
+        if not dcc.is_maya():
+            LOGGER.warning('Maya data must be saved from within Maya!')
+            return False
+
+        blendshape = kwargs.get('blendshape', None)
+        if not blendshape or not blendshape_utils.is_blendshape(blendshape):
+            LOGGER.warning('BlendShape "{}" to export deltas from does not exist!'.format(blendshape))
+            return False
+
+        base_geo = kwargs.get('base_geo', '')
+        geo_index = deformer.get_geo_index(base_geo, blendshape) if base_geo else 0
+        target_map = api_blendshape.get_target_map(blendshape)
+        targets = kwargs.get('targets', None) or target_map.aliases
+
+        items = list()
+        for target in targets:
+            target_index = api_blendshape.get_target_index(blendshape, target)
+            for item_index in api_blendshape.get_target_item_indices(
+                    blendshape, target_index, geometry_index=geo_index):
+                ids, deltas = api_blendshape.get_target_deltas(
+                    blendshape, target_index, geometry_index=geo_index, item_index=item_index,
+                    tolerance=kwargs.get('tolerance', None))
+                items.append({
+                    'alias': target, 'index': target_index, 'item_index': item_index, 'ids': ids, 'deltas': deltas})
+
+        file_path = self.get_file()
+        osplatform.get_permission(file_path)
+        BlendShapeDeltasFile.write(
+            file_path, items, values_dtype=kwargs.get('values_dtype', 'float32'), blendshape=blendshape,
+            base_geo=base_geo)
+
+        if create_version:
+            version_file = version.VersionFile(file_path)
+            version_file.save(comment)
+
+        helpers.display_info('Saved {} data'.format(self.name))
+
+        return True
+
+    def import_data(self, file_path='', blendshape=None, targets=None, base_geo=''):
+        """
+        Loads target deltas from a binary blendShape deltas file into the given blendShape node
+        Targets that do not exist in the blendShape are created without creating any target geometry
+        :param file_path: str, file path of file to load
+        :param blendshape: str, name of the blendShape to load deltas into. If not given, blendShape stored in file
+            is used.
+        :param targets: list(str) or None, aliases of the targets to load. If None, all targets are loaded.
+        :param base_geo: str, base geometry of the blendShape to load deltas into. If empty, first one is used.
+        :return: bool
+        """
+
+        if not dcc.is_maya():
+            LOGGER.warning('Data must be accessed from within Maya!')
+            return False
+
+        import_file = file_path or self.get_file()
+        if not path.is_file(import_file):
+            LOGGER.warning('Impossible to import invalid data file: {}'.format(import_file))
+            return False
+
+        deltas_file = BlendShapeDeltasFile(import_file)
+        blendshape = blendshape or deltas_file.header.get('blendshape')
+        if not blendshape or not maya.cmds.objExists(blendshape):
+            LOGGER.warning('BlendShape "{}" to import deltas into does not exist!'.format(blendshape))
+            return False
+
+        # Full targets (item 6000) are created before their in-betweens
+        items = sorted(deltas_file.read(targets=targets), key=lambda x: x['item_index'] != 6000)
+        for item in items:
+            blendshape_utils.set_target_deltas(
+                blendshape, item['alias'], item['ids'], item['deltas'], base_geo=base_geo,
+                item_index=item['item_index'], create=True)
+
+        helpers.display_info('Loaded {} data'.format(self.name))
+
+        return True
@@ -4,84 +4,122 @@
 This module include base class for deformer data object
 """
 
-import copy
+from __future__ import print_function, division, absolute_import
+
 import logging
 
+import numpy as np
+
 import maya.cmds as cmds
 
-from tpDcc.libs.python import python
+from tpDcc import dcc
+from tpDcc.libs.python import python, path, osplatform, version
+from tpDcc.dccs.maya.api import mesh as api_mesh, deformer as api_deformer
+from tpDcc.dccs.maya.core import helpers, exceptions, deformer as deformer_utils
+from tpDcc.dccs.maya.data import base, binaryfile
 
 LOGGER = logging.getLogger('tpDcc-dccs-maya')
 
+DEFORMER_STACK_MAGIC = b'TPDEFST1'
+DEFORMER_STACK_VERSION = 1
+
+# Deformers whose weights are not stored in a per component weightList, their data is stored by their own data types
+NO_WEIGHTS_DEFORMERS = ('skinCluster', 'blendShape')
+
 
 class MayaDeformerData(object):
     """
     Base class for deformer data objects
-    This class contains functions to save and load deformers data
+    This class contains functions to snapshot and restore deformers data. Weights and membership of each affected
+    geometry are stored as arrays: member weights (float32) and a membership bitset.
     """
 
     def __init__(self, deformer=''):
         super(MayaDeformerData, self).__init__()
 
+        self._data = dict()
+        self.reset()
+
+        self._deformer = deformer
+        if deformer:
+            self.build_data()
+
+    @property
+    def name(self):
+        return self._data['name']
+
+    @property
+    def type(self):
+        return self._data['type']
+
+    @property
+    def data(self):
+        return self._data
+
+    def reset(self):
+        """
+        Resets deformer data
+        """
+
         # Common deformer data
         self._data['name'] = ''
         self._data['type'] = ''
         self._data['affectedGeometry'] = list()
+        self._data['geometries'] = dict()
 
         # Deformer definition attributes
         self._data['attrValueList'] = ['envelope']
-        self._data['attrConnectionList'] = []
+        self._data['attrConnectionList'] = list()
 
         # Deformer storage attributes
-        self._data['attrValueDict'] = {}
-        self._data['attrConnectionDict'] = {}
-
-        self._deformer = deformer
-        if deformer:
-            self.build_data()
+        self._data['attrValueDict'] = dict()
+        self._data['attrConnectionDict'] = dict()
 
     def build_data(self):
         """
         Builds deformer data
         """
 
-        from tpDcc.dccs.maya.data import mesh
-        from tpDcc.dccs.maya.core import deformer
-
         if not self._deformer:
             return
 
-        if not deformer.is_deformer(deformer=self._deformer):
+        if not deformer_utils.is_deformer(deformer=self._deformer):
             raise Exception(
                 'Object {} is not a valid deformer! Unable to instantiate MayaDeformerData() class object!'.format(
                     self._deformer))
 
         timer = cmds.timerX()
 
-        attr_value_list = copy.deepcopy(self._data['attrValueList'])
-        attr_connection_list = copy.deepcopy(self._data['attrConnectionList'])
         self.reset()
-        self._data['attrValueList'] = copy.deepcopy(attr_value_list)
-        self._data['attrConnectionList'] = copy.deepcopy(attr_connection_list)
-
         self._data['name'] = self._deformer
         self._data['type'] = cmds.objectType(self._deformer)
 
-        affected_geo = deformer.get_affected_geometry(self._deformer, return_shapes=False)
+        affected_geo = deformer_utils.get_affected_geometry(self._deformer, return_shapes=False)
         self._data['affectedGeometry'] = [str(i) for i in python.get_dict_ordered_keys_from_values(affected_geo)]
 
         # Build data for each affected geometry
         for geo in self._data['affectedGeometry']:
+            geo_index = affected_geo[geo]
             geo_shape = cmds.listRelatives(geo, s=True, ni=True, pa=True)[0]
-            self._data[geo] = dict()
-            self._data[geo]['index'] = affected_geo[geo]
-            self._data[geo]['geometryTypej'] = str(cmds.objectType(geo_shape))
-            self._data[geo]['membership'] = deformer.get_deformer_set_member_indices(
-                deformer=self._deformer, geometry=geo)
-            self._data[geo]['weights'] = deformer.get_weights(deformer=self._deformer, geometry=geo)
-
-            if self._data[geo]['geometryType'] == 'mesh':
-                self._data[geo]['mesh'] = mesh.MeshData(geo)
+            geo_data = {
+                'index': geo_index,
+                'geometryType': str(cmds.objectType(geo_shape)),
+                'componentsCount': api_deformer.get_components_count(self._deformer, geometry_index=geo_index),
+                'topologyHash': '',
+                'membership': None,
+                'weights': None
+            }
+            if geo_data['geometryType'] == 'mesh':
+                geo_data['topologyHash'] = api_mesh.get_mesh_topology_hash(geo_shape)
+            if self._data['type'] not in NO_WEIGHTS_DEFORMERS:
+                member_ids = api_deformer.get_membership_ids(self._deformer, geometry_index=geo_index)
+                weights = api_deformer.get_weights_array(
+                    self._deformer, geometry_index=geo_index, components_count=geo_data['componentsCount'])
+                membership = np.zeros(geo_data['componentsCount'], dtype=bool)
+                membership[member_ids] = True
+                geo_data['membership'] = np.packbits(membership)
+                geo_data['weights'] = weights[member_ids].astype(np.float32)
+            self._data['geometries'][geo] = geo_data
 
         # Add custom data
         self.custom_deformer_atributes(self._data['type'])
@@ -93,6 +131,81 @@ class MayaDeformerData(object):
 
         return self._deformer
 
+    def get_membership_mask(self, geometry):
+        """
+        Returns the stored membership of the given geometry as a boolean mask
+        :param geometry: str, name of the stored affected geometry
+        :return: np.ndarray or None
+        """
+
+        geo_data = self._data['geometries'][geometry]
+        if geo_data['membership'] is None:
+            return None
+
+        return np.unpackbits(np.asarray(geo_data['membership']))[:geo_data['componentsCount']].astype(bool)
+
+    def get_weights(self, geometry):
+        """
+        Returns the stored weights of all the components of the given geometry. Non member components weight 0.0
+        :param geometry: str, name of the stored affected geometry
+        :return: np.ndarray or None
+        """
+
+        membership = self.get_membership_mask(geometry)
+        if membership is None:
+            return None
+
+        weights = np.zeros(len(membership), dtype=np.float64)
+        weights[membership] = self._data['geometries'][geometry]['weights']
+
+        return weights
+
+    def rebuild(self, geometry_map=None, create=True, remap=None):
+        """
+        Restores the stored deformer data. Deformer is created if it does not exist
+        :param geometry_map: dict(str, str) or None, maps stored affected geometry names to the geometry to restore
+            data into. If None, data is restored into the stored geometry.
+        :param create: bool, Whether to create the deformer if it does not exist
+        :param remap: dict(str, np.ndarray) or None, maps stored affected geometry names to the stored component index
+            of each component of the geometry to restore data into. Geometries whose topology does not match the
+            stored one are only restored if they are remapped.
+        :return: str or None, restored deformer
+        """
+
+        timer = cmds.timerX()
+
+        geometry_map = geometry_map or dict()
+        geometries = [(geo, geometry_map.get(geo, geo)) for geo in self._data['affectedGeometry']]
+        geometries = [(geo, target_geo) for geo, target_geo in geometries if cmds.objExists(target_geo)]
+        if not geometries:
+            LOGGER.warning('No geometry found to restore deformer "{}" data into!'.format(self._data['name']))
+            return None
+
+        deformer = self._data['name']
+        if not cmds.objExists(deformer):
+            if not create:
+                LOGGER.warning('Deformer "{}" does not exist!'.format(deformer))
+                return None
+            if self._data['type'] in NO_WEIGHTS_DEFORMERS:
+                LOGGER.warning('Deformer "{}" of type "{}" must be restored with its own data type!'.format(
+                    deformer, self._data['type']))
+                return None
+            deformer = cmds.deformer([target_geo for _, target_geo in geometries], type=self._data['type'],
+                                     name=deformer)[0]
+
+        self._deformer = deformer
+        remap = remap or dict()
+        for geo, target_geo in geometries:
+            self._rebuild_geometry(deformer, geo, target_geo, remap=remap.get(geo))
+
+        self.set_deformer_attr_values()
+        self.set_deformer_attr_connections()
+
+        build_time = cmds.timerX(st=timer)
+        LOGGER.debug('MayaDeformerData: Data rebuild time for "{}" : "{}"'.format(deformer, str(build_time)))
+
+        return deformer
+
     def get_deformer_attr_values(self):
         """
         Get deformer attribute values based on the given deformer attribute list
@@ -100,9 +213,12 @@ class MayaDeformerData(object):
 
         deformer = self._data['name']
         for attr in self._data['attrValueList']:
+            if not cmds.objExists(deformer + '.' + attr):
+                continue
             if not cmds.getAttr(deformer + '.' + attr, se=True) and cmds.listConnections(
                     deformer + '.' + attr, s=True, d=False):
-                self._data['attrConnectionList'].append(attr)
+                if attr not in self._data['attrConnectionList']:
+                    self._data['attrConnectionList'].append(attr)
             else:
                 self._data['attrValueDict'][attr] = cmds.getAttr(deformer + '.' + attr)
 
@@ -113,11 +229,46 @@ class MayaDeformerData(object):
 
         deformer = self._data['name']
         for attr in self._data['attrConnectionList']:
+            if not cmds.objExists(deformer + '.' + attr):
+                continue
             attr_cnt = cmds.listConnections(
                 deformer + '.' + attr, s=True, d=False, p=True, sh=True, skipConversionNodes=True)
             if attr_cnt:
                 self._data['attrConnectionDict'][attr] = attr_cnt[0]
 
+    def set_deformer_attr_values(self):
+        """
+        Set deformer attribute values from the stored attribute values
+        """
+
+        for attr, value in self._data['attrValueDict'].items():
+            attr_name = self._deformer + '.' + attr
+            if not cmds.objExists(attr_name) or not cmds.getAttr(attr_name, se=True):
+                continue
+            try:
+                if isinstance(value, (list, tuple)):
+                    value = value[0] if len(value) == 1 and isinstance(value[0], (list, tuple)) else value
+                    cmds.setAttr(attr_name, *value)
+                elif python.is_string(value):
+                    cmds.setAttr(attr_name, value, type='string')
+                else:
+                    cmds.setAttr(attr_name, value)
+            except Exception as exc:
+                LOGGER.warning('Unable to restore attribute "{}" value: {}'.format(attr_name, exc))
+
+    def set_deformer_attr_connections(self):
+        """
+        Restores the stored deformer attribute connections
+        """
+
+        for attr, source in self._data['attrConnectionDict'].items():
+            attr_name = self._deformer + '.' + attr
+            if not cmds.objExists(source) or not cmds.objExists(attr_name):
+                LOGGER.warning('Unable to restore connection "{}" -> "{}"!'.format(source, attr_name))
+                continue
+            if not cmds.isConnected(source, attr_name):
+                cmds.connectAttr(source, attr_name, f=True)
+
     def custom_deformer_atributes(self, deformer_type):
         """
         Add custom attributes to data dictonary depending of the deformer type
@@ -148,5 +299,273 @@ class MayaDeformerData(object):
             self._data['attrValueList'].append('iterations')
             self._data['attrValueList'].append('bias')
             self._data['attrConnectionList'].append('refMesh')
+        elif deformer_type == 'cluster':
+            self._data['attrValueList'].append('relative')
+            self._data['attrValueList'].append('angleInterpolation')
+            self._data['attrConnectionList'].append('matrix')
+            self._data['attrConnectionList'].append('bindPreMatrix')
+        elif deformer_type == 'softMod':
+            self._data['attrValueList'].append('falloffRadius')
+            self._data['attrValueList'].append('falloffMode')
+            self._data['attrValueList'].append('falloffAroundSelection')
+            self._data['attrValueList'].append('relative')
+            self._data['attrConnectionList'].append('matrix')
+            self._data['attrConnectionList'].append('preMatrix')
+        elif deformer_type == 'deltaMush':
+            self._data['attrValueList'].append('smoothingIterations')
+            self._data['attrValueList'].append('smoothingStep')
+            self._data['attrValueList'].append('inwardConstraint')
+            self._data['attrValueList'].append('outwardConstraint')
+            self._data['attrValueList'].append('displacement')
+            self._data['attrValueList'].append('pinBorderVertices')
+        elif deformer_type == 'wire':
+            self._data['attrValueList'].append('crossingEffect')
+            self._data['attrValueList'].append('tension')
+            self._data['attrValueList'].append('localInfluence')
+            self._data['attrValueList'].append('rotation')
+            self._data['attrConnectionList'].append('deformedWire[0]')
+            self._data['attrConnectionList'].append('baseWire[0]')
         else:
             pass
+
+    def _rebuild_geometry(self, deformer, geo, target_geo, remap=None):
+        """
+        Internal function that restores the membership and weights of the given stored geometry
+        """
+
+        membership = self.get_membership_mask(geo)
+        if membership is None:
+            return
+
+        geo_data = self._data['geometries'][geo]
+        try:
+            geo_index = deformer_utils.get_geo_index(target_geo, deformer)
+        except exceptions.NotAffectByDeformerException:
+            # Existing deformer does not deform the geometry yet, so it is added to the deformer
+            try:
+                cmds.deformer(deformer, edit=True, geometry=target_geo)
+                geo_index = deformer_utils.get_geo_index(target_geo, deformer)
+            except (RuntimeError, exceptions.NotAffectByDeformerException):
+                LOGGER.warning('Geometry "{}" could not be added to deformer "{}". Skipping its weights!'.format(
+                    target_geo, deformer))
+                return
+        components_count = api_deformer.get_components_count(deformer, geometry_index=geo_index)
+        weights = self.get_weights(geo)
+        if remap is not None:
+            remap = np.asarray(remap, dtype=np.int64).ravel()
+            if len(remap) != components_count:
+                LOGGER.warning('Geometry "{}" has {} components but {} are remapped. Skipping "{}" weights!'.format(
+                    target_geo, components_count, len(remap), deformer))
+                return
+            membership = membership[remap]
+            weights = weights[remap]
+        elif components_count != geo_data['componentsCount']:
+            LOGGER.warning('Geometry "{}" has {} components but {} were stored. Skipping "{}" weights!'.format(
+                target_geo, components_count, geo_data['componentsCount'], deformer))
+            return
+        elif geo_data['topologyHash'] and geo_data['geometryType'] == 'mesh':
+            if api_mesh.get_mesh_topology_hash(target_geo) != geo_data['topologyHash']:
+                LOGGER.warning(
+                    'Geometry "{}" topology does not match stored topology. Skipping "{}" weights!'.format(
+                        target_geo, deformer))
+                return
+
+        if api_deformer.get_deformer_set_name(deformer):
+            current_membership = api_deformer.get_membership_mask(
+                deformer, geometry_index=geo_index, components_count=components_count)
+            api_deformer.add_membership(
+                deformer, np.flatnonzero(membership & ~current_membership), geometry_index=geo_index)
+            api_deformer.remove_membership(
+                deformer, np.flatnonzero(current_membership & ~membership), geometry_index=geo_index)
+
+        api_deformer.set_weights_array(deformer, weights, geometry_index=geo_index)
+
+
+class DeformerStackFile(binaryfile.BinaryDataFile, object):
+    """
+    Binary deformer stack file
+    The file contains a JSON header (deformers definitions, attribute values, connections and arrays layout) followed
+    by one chunk per deformer with the membership bitsets and member weights of each affected geometry.
+    Chunks are memory-mapped, so loading a deformer only touches its own data.
+    """
+
+    MAGIC = DEFORMER_STACK_MAGIC
+    VERSION = DEFORMER_STACK_VERSION
+    DESCRIPTION = 'deformer stack'
+
+    @property
+    def deformers(self):
+        """
+        Returns the names of the deformers stored in the file, in deformation history order
+        :return: list(str)
+        """
+
+        return [deformer_header['name'] for deformer_header in self.header['deformers']]
+
+    @classmethod
+    def write(cls, file_path, deformers_data, **metadata):
+        """
+        Writes given deformers data into a new binary deformer stack file
+        :param file_path: str, path of the file to write
+        :param deformers_data: list(MayaDeformerData), deformers data in deformation history order
+        :param metadata: dict, extra data stored in the file header
+        :return: DeformerStackFile
+        """
+
+        deformer_headers = list()
+        layout = binaryfile.BinaryDataLayout()
+        for deformer_data in deformers_data:
+            data = deformer_data.data
+            deformer_header = dict((key, value) for key, value in data.items() if key != 'geometries')
+            deformer_header['geometries'] = dict()
+            deformer_header['chunk'] = layout.size
+            for geo, geo_data in data['geometries'].items():
+                geo_header = dict((key, geo_data[key]) for key in (
+                    'index', 'geometryType', 'componentsCount', 'topologyHash'))
+                geo_header['membership'] = geo_header['weights'] = None
+                if geo_data['membership'] is not None:
+                    membership = np.asarray(geo_data['membership'], dtype=np.uint8)
+                    weights = np.asarray(geo_data['weights'], dtype='<f4')
+                    geo_header['weightsCount'] = len(weights)
+                    for array_name, array in (('membership', membership), ('weights', weights)):
+                        geo_header[array_name] = layout.add(array)
+                deformer_header['geometries'][geo] = geo_header
+            deformer_header['chunkSize'] = layout.size - deformer_header['chunk']
+            deformer_headers.append(deformer_header)
+
+        header = dict(metadata)
+        header.update({'deformers': deformer_headers})
+
+        return cls._write_file(file_path, header, layout)
+
+    def read(self, deformer):
+        """
+        Reads the data of the given deformer from the file. Only the chunk of the deformer is read.
+        :param deformer: str, name of the stored deformer
+        :return: MayaDeformerData
+        """
+
+        deformer_header = None
+        for stored_header in self.header['deformers']:
+            if stored_header['name'] == deformer:
+                deformer_header = stored_header
+                break
+        if not deformer_header:
+            raise ValueError('Deformer "{}" not found in file "{}"!'.format(deformer, self._file_path))
+
+        deformer_data = MayaDeformerData()
+        data = deformer_data.data
+        for key, value in deformer_header.items():
+            if key not in ('geometries', 'chunk', 'chunkSize'):
+                data[key] = value
+        for geo, geo_header in deformer_header['geometries'].items():
+            geo_data = dict((key, geo_header[key]) for key in (
+                'index', 'geometryType', 'componentsCount', 'topologyHash'))
+            geo_data['membership'] = geo_data['weights'] = None
+            if geo_header['membership'] is not None:
+                geo_data['membership'] = self._map_array(
+                    geo_header['membership'], np.uint8, (geo_header['componentsCount'] + 7) // 8)
+                geo_data['weights'] = self._map_array(
+                    geo_header['weights'], np.dtype('<f4'), geo_header['weightsCount'])
+            data['geometries'][geo] = geo_data
+
+        return deformer_data
+
+
+class MayaDeformerStackData(base.MayaCustomData, object):
+    """
+    Snapshot of all the deformers in the deformation history of a geometry, stored in binary deformer stack files
+    """
+
+    @staticmethod
+    def get_data_type():
+        return 'maya.deformer_stack'
+
+    @staticmethod
+    def get_data_extension():
+        return 'defstack'
+
+    @staticmethod
+    def get_data_title():
+        return 'Deformer Stack'
+
+    def export_data(self, comment='-', create_version=True, *args, **kwargs):
+        """
+        Exports all the deformers in the deformation history of the given geometry into a binary deformer stack file
+        :param comment: str
+        :param create_version: bool
+        :param geometry: str, name of the deformed geometry. If not given, first selected geometry is used.
+        :return: bool
+        """
+
+        if not dcc.is_maya():
+            LOGGER.warning('Maya data must be saved from within Maya!')
+            return False
+
+        geometry = kwargs.get('geometry', None) or (cmds.ls(sl=True, long=True) or [None])[0]
+        if not geometry:
+            LOGGER.warning('Select a deformed geometry to export deformers from!')
+            return False
+
+        deformers = deformer_utils.find_all_deformers(geometry)
+        if not deformers:
+            LOGGER.warning('Geometry "{}" has no deformers!'.format(geometry))
+            return False
+
+        file_path = self.get_file()
+        osplatform.get_permission(file_path)
+        DeformerStackFile.write(
+            file_path, [MayaDeformerData(deformer) for deformer in deformers], geometry=geometry)
+
+        if create_version:
+            version_file = version.VersionFile(file_path)
+            version_file.save(comment)
+
+        helpers.display_info('Saved {} data'.format(self.name))
+
+        return True
+
+    def import_data(self, file_path='', geometry=None, deformers=None, create=True, remap=None):
+        """
+        Restores deformers from a binary deformer stack file. Deformers are rebuilt in deformation order
+        :param file_path: str, file path of file to load
+        :param geometry: str, geometry to restore deformers into. If not given, geometry stored in file is used.
+        :param deformers: list(str) or None, names of the deformers to restore. If None, all deformers are restored.
+        :param create: bool, Whether to create deformers that do not exist
+        :param remap: np.ndarray or None, stored component index of each component of the geometry. Must be given
+            to restore weights into a geometry whose topology does not match the stored one
+        :return: bool
+        """
+
+        if not dcc.is_maya():
+            LOGGER.warning('Data must be accessed from within Maya!')
+            return False
+
+        import_file = file_path or self.get_file()
+        if not path.is_file(import_file):
+            LOGGER.warning('Impossible to import invalid data file: {}'.format(import_file))
+            return False
+
+        stack_file = DeformerStackFile(import_file)
+        stored_geometry = stack_file.header.get('geometry')
+        geometry = geometry or stored_geometry
+        if not geometry or not cmds.objExists(geometry):
+            LOGGER.warning('Geometry "{}" to import deformers into does not exist!'.format(geometry))
+            return False
+
+        # Deformers are stored from the geometry outwards, so the last one is the first one that was applied
+        for deformer in reversed(stack_file.deformers):
+            if deformers is not None and deformer not in deformers:
+                continue
+            deformer_data = stack_file.read(deformer)
+            affected_geometry = deformer_data.data['affectedGeometry']
+            single_geometry = len(affected_geometry) == 1
+            geometry_map = dict(
+                (geo, geometry) for geo in affected_geometry
+                if single_geometry or geo.split('|')[-1] == stored_geometry.split('|')[-1])
+            geometry_remap = None if remap is None else dict((geo, remap) for geo in geometry_map)
+            deformer_data.rebuild(geometry_map=geometry_map, create=create, remap=geometry_remap)
+
+        helpers.display_info('Loaded {} data'.format(self.name))
+
+        return True
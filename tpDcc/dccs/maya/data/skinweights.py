@@ -0,0 +1,308 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains binary skin weights data type
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+
+import numpy as np
+
+import maya.cmds
+import maya.api.OpenMayaAnim
+
+from tpDcc import dcc
+from tpDcc.libs.python import path, osplatform, version
+from tpDcc.dccs.maya.api import mesh as api_mesh, skin as api_skin
+from tpDcc.dccs.maya.core import helpers, node as node_utils, skin as skin_utils
+from tpDcc.dccs.maya.data import base, binaryfile
+
+LOGGER = logging.getLogger('tpDcc-dccs-maya')
+
+SKIN_WEIGHTS_MAGIC = b'TPSKINW1'
+SKIN_WEIGHTS_VERSION = 1
+SKIN_WEIGHTS_BLOCK_SIZE = 65536
+
+
+class SkinWeightsFile(binaryfile.BinaryDataFile, object):
+    """
+    Binary skin weights file
+    The file contains a JSON header (influence names, mesh topology hash and blocks layout) followed by sparse weight
+    blocks. Each block stores the CSR arrays (vertex offsets, influence indices and values) of a range of vertices.
+    Blocks are memory-mapped, so partial loads only touch the blocks of the requested vertices.
+    """
+
+    MAGIC = SKIN_WEIGHTS_MAGIC
+    VERSION = SKIN_WEIGHTS_VERSION
+    DESCRIPTION = 'skin weights'
+
+    @property
+    def influences(self):
+        """
+        Returns the names of the influences stored in the file
+        :return: list(str)
+        """
+
+        return self.header['influences']
+
+    @property
+    def vertices_count(self):
+        """
+        Returns the number of vertices stored in the file
+        :return: int
+        """
+
+        return self.header['vertices_count']
+
+    @property
+    def topology_hash(self):
+        """
+        Returns the topology hash of the mesh the weights were exported from
+        :return: str
+        """
+
+        return self.header['topology_hash']
+
+    @classmethod
+    def write(
+            cls, file_path, influences, offsets, influence_ids, values, topology_hash='', values_dtype='float64',
+            block_size=SKIN_WEIGHTS_BLOCK_SIZE, **metadata):
+        """
+        Writes given CSR sparse weights into a new binary skin weights file
+        :param file_path: str, path of the file to write
+        :param influences: list(str), influence names. Influence ids index this list
+        :param offsets: np.ndarray, vertex offsets array
+        :param influence_ids: np.ndarray, index within influences list of each stored value
+        :param values: np.ndarray, weight values
+        :param topology_hash: str, topology hash of the mesh the weights belong to
+        :param values_dtype: str, dtype used to store weight values ('float64' or 'float32')
+        :param block_size: int, number of vertices stored in each block
+        :param metadata: dict, extra data stored in the file header
+        :return: SkinWeightsFile
+        """
+
+        offsets = np.asarray(offsets, dtype=np.int64)
+        influence_ids = np.asarray(influence_ids, dtype=np.int32)
+        values = np.asarray(values, dtype=values_dtype)
+        vertices_count = len(offsets) - 1
+
+        blocks = list()
+        layout = binaryfile.BinaryDataLayout()
+        for vertex_start in range(0, vertices_count, block_size):
+            vertex_end = min(vertex_start + block_size, vertices_count)
+            start, end = int(offsets[vertex_start]), int(offsets[vertex_end])
+            block = {'vertex_start': vertex_start, 'vertex_count': vertex_end - vertex_start, 'nnz': end - start}
+            block_offsets = offsets[vertex_start:vertex_end + 1] - start
+            for array_name, array in (
+                    ('offsets', block_offsets.astype('<i8', copy=False)),
+                    ('influences', influence_ids[start:end].astype('<i4', copy=False)),
+                    ('values', values[start:end])):
+                block[array_name] = layout.add(array)
+            blocks.append(block)
+
+        header = dict(metadata)
+        header.update({
+            'influences': list(influences),
+            'topology_hash': topology_hash,
+            'vertices_count': vertices_count,
+            'block_size': block_size,
+            'values_dtype': values.dtype.str,
+            'blocks': blocks
+        })
+
+        return cls._write_file(file_path, header, layout)
+
+    def read(self, influences=None, vertices_ids=None):
+        """
+        Reads weights from the file. Only the blocks that contain the requested vertices are read.
+        :param influences: list(str) or None, names of the influences to read. If None, all influences are read.
+        :param vertices_ids: list(int) or np.ndarray or None, vertices to read. If None, all vertices are read.
+        :return: tuple(np.ndarray, np.ndarray, np.ndarray), vertex offsets, influence ids and values.
+            Influence ids index the file influences list and rows match given vertices order.
+        """
+
+        header = self.header
+        if vertices_ids is None:
+            vertices_ids = np.arange(header['vertices_count'], dtype=np.int64)
+        vertices_ids = np.asarray(vertices_ids, dtype=np.int64)
+        if len(vertices_ids) and (vertices_ids.min() < 0 or vertices_ids.max() >= header['vertices_count']):
+            raise ValueError('Vertices out of range. File "{}" contains {} vertices'.format(
+                self._file_path, header['vertices_count']))
+
+        influence_mask = None
+        if influences is not None:
+            missing = set(influences).difference(header['influences'])
+            if missing:
+                raise ValueError('Influences not found in file "{}": {}'.format(self._file_path, sorted(missing)))
+            influence_mask = np.zeros(len(header['influences']), dtype=bool)
+            influence_mask[[header['influences'].index(influence) for influence in influences]] = True
+
+        ids_list = list()
+        values_list = list()
+        rows_list = list()
+
+        block_indices = vertices_ids // header['block_size']
+        for block_index in np.unique(block_indices):
+            block = header['blocks'][block_index]
+            rows = np.flatnonzero(block_indices == block_index)
+            block_offsets, block_influences, block_values = self._map_block(block)
+            local_ids = vertices_ids[rows] - block['vertex_start']
+            starts = block_offsets[local_ids]
+            lengths = block_offsets[local_ids + 1] - starts
+            gather = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(
+                lengths.sum())
+            row_ids = np.repeat(rows, lengths)
+            gathered_influences = np.asarray(block_influences[gather])
+            gathered_values = np.asarray(block_values[gather], dtype=np.float64)
+            if influence_mask is not None:
+                keep = influence_mask[gathered_influences]
+                row_ids = row_ids[keep]
+                gathered_influences = gathered_influences[keep]
+                gathered_values = gathered_values[keep]
+            rows_list.append(row_ids)
+            ids_list.append(gathered_influences)
+            values_list.append(gathered_values)
+
+        if not rows_list:
+            return np.zeros(len(vertices_ids) + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        row_ids = np.concatenate(rows_list)
+        order = np.argsort(row_ids, kind='mergesort')
+        offsets = np.zeros(len(vertices_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_ids, minlength=len(vertices_ids)), out=offsets[1:])
+
+        return offsets, np.concatenate(ids_list)[order], np.concatenate(values_list)[order]
+
+    def _map_block(self, block):
+        """
+        Internal function that memory-maps the arrays of the given block
+        :param block: dict
+        :return: tuple(np.memmap, np.memmap, np.memmap)
+        """
+
+        values_dtype = np.dtype(self.header['values_dtype'])
+
+        return tuple(self._map_array(block[array_name], dtype, count) for array_name, dtype, count in (
+            ('offsets', np.dtype('<i8'), block['vertex_count'] + 1),
+            ('influences', np.dtype('<i4'), block['nnz']),
+            ('values', values_dtype, block['nnz'])))
+
+
+class MayaSkinWeightsData(base.MayaCustomData, object):
+    """
+    Skin weights data stored in binary skin weights files
+    """
+
+    @staticmethod
+    def get_data_type():
+        return 'maya.skin_weights'
+
+    @staticmethod
+    def get_data_extension():
+        return 'skinw'
+
+    @staticmethod
+    def get_data_title():
+        return 'Skin Weights'
+
+    def export_data(self, comment='-', create_version=True, *args, **kwargs):
+        """
+        Exports skin weights of the given mesh into a binary skin weights file
+        :param comment: str
+        :param create_version: bool
+        :param mesh: str, name of the skinned mesh to export weights of. If not given, first selected mesh is used.
+        :param values_dtype: str, dtype used to store weight values ('float64' or 'float32')
+        :return: bool
+        """
+
+        if not dcc.is_maya():
+            LOGGER.warning('Maya data must be saved from within Maya!')
+            return False
+
+        mesh = kwargs.get('mesh', None) or (maya.cmds.ls(sl=True, long=True) or [None])[0]
+        if not mesh:
+            LOGGER.warning('Select a skinned mesh to export skin weights from!')
+            return False
+
+        skin_cluster = skin_utils.find_related_skin_cluster(mesh)
+        if not skin_cluster:
+            LOGGER.warning('Mesh "{}" has no skin cluster attached to it!'.format(mesh))
+            return False
+
+        mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(node_utils.get_mobject(skin_cluster))
+        influence_paths = mf_skin.influenceObjects()
+        influence_names = [influence_paths[i].partialPathName() for i in range(len(influence_paths))]
+        influence_ids = np.array(api_skin.get_influence_indices(mf_skin), dtype=np.int32)
+        offsets, weights_influence_ids, values = api_skin.get_skin_weights_sparse(mf_skin)
+
+        file_path = self.get_file()
+        osplatform.get_permission(file_path)
+        SkinWeightsFile.write(
+            file_path, influence_names, offsets, api_skin.get_influence_columns(influence_ids, weights_influence_ids),
+            values, topology_hash=api_mesh.get_mesh_topology_hash(mesh),
+            values_dtype=kwargs.get('values_dtype', 'float64'), mesh=mesh, skin_cluster=skin_cluster)
+
+        if create_version:
+            version_file = version.VersionFile(file_path)
+            version_file.save(comment)
+
+        helpers.display_info('Saved {} data'.format(self.name))
+
+        return True
+
+    def import_data(self, file_path='', mesh=None, influences=None, vertices_ids=None, force=False):
+        """
+        Loads skin weights from a binary skin weights file into the given mesh skin cluster
+        :param file_path: str, file path of file to load
+        :param mesh: str, name of the skinned mesh to load weights into. If not given, mesh stored in file is used.
+        :param influences: list(str) or None, names of the influences to load. If None, all influences are loaded.
+        :param vertices_ids: list(int) or None, vertices to load. If None, all vertices are loaded.
+        :param force: bool, Whether to load weights even if the mesh topology does not match the stored one
+        :return: bool
+        """
+
+        if not dcc.is_maya():
+            LOGGER.warning('Data must be accessed from within Maya!')
+            return False
+
+        import_file = file_path or self.get_file()
+        if not path.is_file(import_file):
+            LOGGER.warning('Impossible to import invalid data file: {}'.format(import_file))
+            return False
+
+        weights_file = SkinWeightsFile(import_file)
+        mesh = mesh or weights_file.header.get('mesh')
+        if not mesh or not maya.cmds.objExists(mesh):
+            LOGGER.warning('Mesh "{}" to import skin weights into does not exist!'.format(mesh))
+            return False
+
+        if not force and api_mesh.get_mesh_topology_hash(mesh) != weights_file.topology_hash:
+            LOGGER.warning('Mesh "{}" topology does not match stored skin weights topology!'.format(mesh))
+            return False
+
+        skin_cluster = skin_utils.find_related_skin_cluster(mesh)
+        if not skin_cluster:
+            LOGGER.warning('Mesh "{}" has no skin cluster attached to it!'.format(mesh))
+            return False
+
+        mf_skin = maya.api.OpenMayaAnim.MFnSkinCluster(node_utils.get_mobject(skin_cluster))
+        skin_influences = skin_utils.get_skin_influences(skin_cluster, short_name=True, return_dict=True)
+        influences = weights_file.influences if influences is None else influences
+        missing = [influence for influence in influences if influence not in skin_influences]
+        if missing:
+            LOGGER.warning('Skin cluster "{}" is missing influences: {}'.format(skin_cluster, missing))
+            return False
+
+        offsets, file_influence_ids, values = weights_file.read(influences=influences, vertices_ids=vertices_ids)
+        logical_ids = np.array(
+            [skin_influences.get(influence, -1) for influence in weights_file.influences], dtype=np.int32)
+        api_skin.set_skin_weights_sparse(
+            mf_skin, offsets, logical_ids[file_influence_ids], values, vertices_ids=vertices_ids,
+            influences=[skin_influences[influence] for influence in influences])
+
+        helpers.display_info('Loaded {} data'.format(self.name))
+
+        return True
@@ -7,21 +7,321 @@ Manager to control current scene meta data values and nodes
 
 from __future__ import print_function, division, absolute_import
 
+import weakref
 import logging
+import functools
 import inspect
+import threading
+from collections import OrderedDict
 
 from Qt.QtCore import Qt
 from Qt.QtWidgets import QTableView
 
 import maya.cmds
+import maya.OpenMaya
 
 from tpDcc.libs.python import python, decorators, name as name_utils
 from tpDcc.libs.qt.widgets import layouts, label, models, views, window
 
 LOGGER = logging.getLogger('tpDcc-dccs-maya')
 
+# Maximum number of MetaNode instances kept in the MetaNodes cache
+METANODES_CACHE_SIZE = 10000
+
+
+class _MetaNodeCacheEntry(object):
+    """
+    Internal class that stores a cached MetaNode instance
+    """
+
+    __slots__ = ('uuid', 'handle', 'ref', 'callback_id')
+
+    def __init__(self, uuid, handle, ref, callback_id):
+        self.uuid = uuid
+        self.handle = handle
+        self.ref = ref
+        self.callback_id = callback_id
+
+
+class MetaNodeCache(object):
+    """
+    Cache of instantiated MetaNode objects
+    MetaNodes are stored as weak references keyed by the hash code of the MObjectHandle of their node, so looking for
+    the MetaNode of a node does not need any Maya command. UUIDs are a secondary index that maps each UUID to all
+    its cached nodes, because the copies of a node that is referenced several times share the same UUID.
+    Entries are removed when their node is deleted (node pre-removal callback), when their MetaNode is garbage
+    collected or when the cache is full (least recently used entries are removed first).
+    For compatibility, the cache can be used as a dictionary of UUIDs and MetaNodes.
+    """
+
+    def __init__(self, max_size=METANODES_CACHE_SIZE):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._keys_by_uuid = dict()
+        self._stale_callbacks = list()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, uuid):
+        return self.get_by_uuid(uuid) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, uuid):
+        meta_node = self.get_by_uuid(uuid)
+        if meta_node is None:
+            raise KeyError(uuid)
+
+        return meta_node
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        with self._lock:
+            self._max_size = value
+            self._trim()
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def get_stats(self):
+        """
+        Returns the usage statistics of the cache
+        :return: dict
+        """
+
+        return {'size': len(self._entries), 'max_size': self._max_size, 'hits': self._hits, 'misses': self._misses}
+
+    def reset_stats(self):
+        """
+        Resets hits and misses counters
+        """
+
+        self._hits = 0
+        self._misses = 0
+
+    def register(self, meta_node, uuid):
+        """
+        Adds the given MetaNode to the cache
+        :param meta_node: MetaNode
+        :param uuid: str, UUID of the MetaNode node
+        """
+
+        mobj = object.__getattribute__(meta_node, '_MObject')
+        handle = maya.OpenMaya.MObjectHandle(mobj)
+        key = handle.hashCode()
+
+        with self._lock:
+            self._remove_stale_callbacks()
+            self._remove(key)
+            ref = weakref.ref(meta_node, lambda ref, key=key: self._on_collected(key, ref))
+            callback_id = maya.OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+                mobj, functools.partial(self._on_node_removed, key))
+            self._entries[key] = _MetaNodeCacheEntry(uuid, handle, ref, callback_id)
+            self._keys_by_uuid.setdefault(uuid, list()).append(key)
+            self._trim()
+
+    def get(self, node, default=None):
+        """
+        Returns the cached MetaNode of the given node
+        :param node: str or MObject or MetaNode, node name, node MObject, MetaNode or UUID
+        :param default: variant, value returned if the node has no cached MetaNode
+        :return: MetaNode or None
+        """
+
+        if python.is_string(node) and node in self._keys_by_uuid:
+            meta_node = self.get_by_uuid(node)
+            if meta_node is not None:
+                self._hits += 1
+                return meta_node
+
+        mobj = _get_node_mobject(node)
+        if mobj is None:
+            self._misses += 1
+            return default
+
+        key = maya.OpenMaya.MObjectHandle(mobj).hashCode()
+        with self._lock:
+            meta_node = self._get_entry_meta_node(key, mobj)
+            if meta_node is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._entries[key] = self._entries.pop(key)
+
+        return meta_node
+
+    def get_by_uuid(self, uuid):
+        """
+        Returns the cached MetaNode of the node with the given UUID
+        If several nodes share the UUID (referenced several times), the last registered one is returned
+        :param uuid: str
+        :return: MetaNode or None
+        """
+
+        with self._lock:
+            for key in reversed(list(self._keys_by_uuid.get(uuid, ()))):
+                meta_node = self._get_entry_meta_node(key)
+                if meta_node is not None:
+                    return meta_node
+
+        return None
+
+    def remove(self, meta_node):
+        """
+        Removes the given MetaNode from the cache
+        :param meta_node: MetaNode
+        """
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.ref() is meta_node:
+                    self._remove(key)
+            self._remove_stale_callbacks()
+
+    def pop(self, uuid, *default):
+        """
+        Removes the MetaNodes of the nodes with the given UUID from the cache and returns the last registered one
+        :param uuid: str
+        :return: MetaNode
+        """
+
+        with self._lock:
+            meta_node = self.get_by_uuid(uuid)
+            for key in list(self._keys_by_uuid.get(uuid, ())):
+                self._remove(key)
+            self._remove_stale_callbacks()
+        if meta_node is None:
+            if default:
+                return default[0]
+            raise KeyError(uuid)
+
+        return meta_node
+
+    def clean(self):
+        """
+        Removes the entries whose node or MetaNode does not exist anymore
+        """
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if not entry.handle.isValid() or entry.ref() is None:
+                    LOGGER.debug('CACHE : {} being removed from the META NODE CACHE due to invalid MObject'.format(
+                        entry.uuid))
+                    self._remove(key)
+            self._remove_stale_callbacks()
+
+    def clear(self):
+        """
+        Removes all the entries of the cache
+        """
+
+        with self._lock:
+            for key in list(self._entries.keys()):
+                self._remove(key)
+            self._remove_stale_callbacks()
+
+    def keys(self):
+        return [uuid for uuid, _ in self.items()]
+
+    def values(self):
+        return [meta_node for _, meta_node in self.items()]
+
+    def items(self):
+        with self._lock:
+            items = [(entry.uuid, entry.ref()) for entry in self._entries.values() if entry.handle.isValid()]
+
+        return [(uuid, meta_node) for uuid, meta_node in items if meta_node is not None]
+
+    def _get_entry_meta_node(self, key, mobj=None):
+        """
+        Internal function that returns the MetaNode of the entry with the given key if it is still valid
+        Lock must be held by the caller
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        meta_node = entry.ref()
+        if meta_node is None or not entry.handle.isValid():
+            self._remove(key)
+            return None
+        if mobj is not None and not entry.handle.object() == mobj:
+            # Hash codes of different nodes can collide
+            return None
+
+        return meta_node
+
+    def _trim(self):
+        """
+        Internal function that removes the least recently used entries until cache size is under its maximum size
+        Lock must be held by the caller
+        """
+
+        while len(self._entries) > max(self._max_size, 0):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """
+        Internal function that removes the entry with the given key. Lock must be held by the caller
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_uuid.get(entry.uuid)
+        if keys and key in keys:
+            keys.remove(key)
+            if not keys:
+                self._keys_by_uuid.pop(entry.uuid)
+        self._stale_callbacks.append(entry.callback_id)
+
+    def _on_node_removed(self, key, *args):
+        """
+        Internal callback function called before the node of an entry is deleted
+        Callbacks are not removed while they are being executed, they are removed the next time the cache is used
+        """
+
+        with self._lock:
+            self._remove(key)
+
+    def _on_collected(self, key, ref):
+        """
+        Internal callback function called when the MetaNode of an entry is garbage collected
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.ref is ref:
+                self._remove(key)
+
+    def _remove_stale_callbacks(self):
+        """
+        Internal function that removes the callbacks of the removed entries. Lock must be held by the caller
+        """
+
+        while self._stale_callbacks:
+            try:
+                maya.OpenMaya.MMessage.removeCallback(self._stale_callbacks.pop())
+            except RuntimeError:
+                pass
+
+
 # ===================================================================================================================
-METANODES_CACHE = dict()
+METANODES_CACHE = MetaNodeCache()
 METANODE_CLASSES_REGISTER = dict()
 METANODE_TYPES_REGISTER = list()
 METANODE_CLASSES_INHERITANCE_MAP = list()
@@ -64,13 +364,10 @@ def register_metanode_to_cache(meta_node):
 
     from tpDcc.dccs.maya.meta import metanode
 
-    global METANODES_CACHE
-
     uuid = metanode.MetaNode.get_metanode_uuid(meta_node=meta_node)
-
-    if METANODES_CACHE or uuid not in METANODES_CACHE.keys():
+    if METANODES_CACHE.get_by_uuid(uuid) is not meta_node:
         LOGGER.debug('CACHE: Adding to MetaNode UUID Cache: {0} > {1}'.format(meta_node.meta_node, uuid))
-        METANODES_CACHE[uuid] = meta_node
+        METANODES_CACHE.register(meta_node, uuid)
 
     meta_node._lastUUID = uuid
 
@@ -81,17 +378,7 @@ def clean_metanodes_cache():
     MObjectHandles
     """
 
-    from tpDcc.dccs.maya.meta import metanode
-
-    for k, v in METANODES_CACHE.items():
-        try:
-            if not metanode.MetaNode.check_metanode_validity(v):
-                METANODES_CACHE.pop(k)
-                LOGGER.debug(
-                    'CACHE : {} being removed from the META NODE CACHE due to invalid MObject'.format(k))
-        except Exception as e:
-            LOGGER.debug('CACHE : Clean cache failed!')
-            LOGGER.debug(str(e))
+    METANODES_CACHE.clean()
 
 
 def get_metanode_from_cache(meta_node):
@@ -100,9 +387,7 @@ def get_metanode_from_cache(meta_node):
     :param meta_node: str, name of the node from DAG
     """
 
-    from tpDcc.dccs.maya.meta import metanode
-
-    return metanode.MetaNode.get_meta_from_cache(meta_node=meta_node)
+    return METANODES_CACHE.get(meta_node)
 
 
 def register_meta_classes():
@@ -187,8 +472,7 @@ def register_meta_types(node_types=None):
 
 
 def register_meta_nodes():
-    global METANODES_CACHE
-    METANODES_CACHE = dict()
+    METANODES_CACHE.clear()
 
 
 def clean_metanode_types_register():
@@ -233,17 +517,12 @@ def remove_metanodes_from_cache(meta_nodes):
     Removes instantiated MetaNodes from the cache of MetaNodes
     """
 
-    for k, v in METANODES_CACHE.items():
-        if not type(meta_nodes) == list:
-            meta_nodes = [meta_nodes]
+    if not type(meta_nodes) == list:
+        meta_nodes = [meta_nodes]
 
-        if v and v in meta_nodes:
-            try:
-                METANODES_CACHE.pop(k)
-                LOGGER.debug('METANODES CACHE: {0} being removed from the MetaNodes Cache >> {1}'.format(
-                    name_utils.strip_name(k), name_utils.strip_name(v.meta_node)))
-            except Exception as e:
-                LOGGER.debug('METANODES CACHE: Failed to remove {0} from cache >> {1}'.format(k, v.meta_node))
+    for meta_node in meta_nodes:
+        if meta_node:
+            METANODES_CACHE.remove(meta_node)
 
 
 def reset_metanodes_cache():
@@ -251,8 +530,8 @@ def reset_metanodes_cache():
     Reset the global MetaNodes cached
     """
 
-    global METANODES_CACHE
-    METANODES_CACHE = dict()
+    METANODES_CACHE.clear()
+    METANODES_CACHE.reset_stats()
 
 
 def reset_metanode_types_cache():
@@ -321,57 +600,87 @@ def get_meta_nodes(meta_types=[], meta_instances=[], meta_classes_grps=[], meta_
                    data_type='MetaNode', node_types=None, **kwargs):
     """
     Get all MetaNode nodes in the current scene and return as MetaNode objects if possible
+    Nodes are looked up in the scene MetaNode index, so scene nodes are not inspected one by one
     :param meta_types: list(str), if given, only will return the meta nodes of the given type
     :param meta_instances: list(str), if given the meta inheritance will be checked and child classes
         will be returned
-    :param meta_classes_grps:
+    :param meta_classes_grps: list(str), if given, only will return the meta nodes of the given meta class groups
     :param meta_attrs:
     :param data_type:
-    :param node_types:
+    :param node_types: list(str), if given, only will return meta nodes of the given node types. If not given, the
+        registered MetaNode types are used
     :param kwargs:
     :return:
     """
 
-    from tpDcc.dccs.maya.meta import metanode
+    from tpDcc.dccs.maya.meta import metanode, metaindex
 
-    meta_nodes = list()
+    if meta_attrs:
+        raise NotImplementedError('not implemented yet')
 
-    if not node_types:
-        nodes = maya.cmds.ls(type=get_metanode_types_registry(), long=True)
+    if meta_instances:
+        meta_keys = [meta_class.__name__ for meta_class in get_metanode_classes_instances(
+            [METANODE_CLASSES_REGISTER[key] for key in meta_types_to_registry_key(meta_instances)])]
+    elif meta_types:
+        meta_keys = meta_types_to_registry_key(meta_types)
     else:
-        nodes = maya.cmds.ls(type=node_types, long=True)
-    if not nodes:
-        return meta_nodes
-
-    for node in nodes:
-        meta_node = False
-        if not meta_instances:
-            if metanode.MetaNode.is_meta_node(node=node, meta_types=meta_types):
-                meta_node = True
-        else:
-            if metanode.MetaNode.is_meta_node_inherited(node=node, meta_instances=meta_instances):
-                meta_node = True
-        if meta_node:
-            if meta_classes_grps:
-                if not hasattr(meta_classes_grps, '__iter__'):
-                    meta_classes_grps = [meta_classes_grps]
-                if metanode.MetaNode.is_meta_node_class_grp(node, meta_classes_grps):
-                    meta_nodes.append(node)
-            else:
-                meta_nodes.append(node)
+        meta_keys = list(METANODE_CLASSES_REGISTER.keys())
+    if not meta_keys:
+        return list()
+
+    # Nodes are bound to the class stored in their meta_class attribute. If that class is not registered, they are
+    # bound to the class stored in their meta_class_group attribute
+    meta_index = metaindex.get_meta_index()
+    entries = meta_index.get_entries_by_class(meta_keys)
+    for entry in meta_index.get_entries_by_group(meta_keys):
+        if entry.meta_class not in METANODE_CLASSES_REGISTER:
+            entries.add(entry)
+    if meta_classes_grps:
+        meta_class_groups = python.force_list(meta_classes_grps)
+        entries = entries.intersection(meta_index.get_entries_by_group(meta_class_groups))
+
+    node_types = node_types or get_metanode_types_registry()
+    meta_nodes = sorted(meta_index.get_nodes(entries))
+    if meta_nodes:
+        meta_nodes = maya.cmds.ls(meta_nodes, type=node_types, long=True) or list()
+    if not meta_classes_grps:
+        meta_nodes.extend(_get_node_type_meta_nodes(meta_keys, node_types))
 
     if not meta_nodes:
         return meta_nodes
 
-    if meta_attrs:
-        raise NotImplementedError('not implemented yet')
-
     if data_type == 'MetaNode':
         return [metanode.MetaNode(node, **kwargs) for node in meta_nodes]
     else:
         return meta_nodes
 
 
+def _get_node_type_meta_nodes(meta_keys, node_types):
+    """
+    Internal function that returns the nodes without meta attributes that are bound to any of the given MetaNode
+    classes by their node type ("Meta{node_type}" or lower case class name equal to the node type)
+    :param meta_keys: list(str), registered MetaNode classes keys
+    :param node_types: list(str), node types to look for
+    :return: list(str)
+    """
+
+    from tpDcc.dccs.maya.meta import metaindex
+
+    meta_index = metaindex.get_meta_index()
+    lower_meta_keys = [key.lower() for key in meta_keys]
+    nodes = list()
+    for node_type in python.force_list(node_types):
+        if 'Meta{}'.format(node_type) not in meta_keys and node_type not in lower_meta_keys:
+            continue
+        type_nodes = maya.cmds.ls(exactType=node_type, long=True) or list()
+        if not type_nodes:
+            continue
+        type_uuids = maya.cmds.ls(type_nodes, uuid=True) or list()
+        nodes.extend([node for node, uuid in zip(type_nodes, type_uuids) if uuid not in meta_index])
+
+    return nodes
+
+
 class MetaDataManager(window.MainWindow, object):
     def __init__(self):
         super(MetaDataManager, self).__init__(
@@ -421,18 +730,40 @@ class MetaDataManager(window.MainWindow, object):
         classes = METANODE_CLASSES_INHERITANCE_MAP
         self._reg_mclasses_model.set_items(classes)
 
-        global METANODES_CACHE
-        nodes = METANODES_CACHE
-
-        if nodes:
-            items = list()
-            ids = list(METANODES_CACHE.keys())
-            nodes = list(METANODES_CACHE.values())
-            for id, node in zip(ids, nodes):
-                items.append([id, node.__class__.__name__])
+        items = list()
+        for id, node in METANODES_CACHE.items():
+            items.append([id, node.__class__.__name__])
+        if items:
             self._curr_mnodes_model.set_items(items)
 
 
+def _get_node_mobject(node):
+    """
+    Internal function that returns the MObject of the given node
+    :param node: str or MObject or MetaNode
+    :return: MObject or None, None if the node does not exist
+    """
+
+    if isinstance(node, maya.OpenMaya.MObject):
+        return node
+    try:
+        return object.__getattribute__(node, '_MObject') or None
+    except AttributeError:
+        pass
+    if not python.is_string(node):
+        return None
+
+    mobj = maya.OpenMaya.MObject()
+    selection_list = maya.OpenMaya.MSelectionList()
+    try:
+        selection_list.add(node)
+        selection_list.getDependNode(0, mobj)
+    except RuntimeError:
+        return None
+
+    return mobj
+
+
 def run():
     win = MetaDataManager()
     win.show()
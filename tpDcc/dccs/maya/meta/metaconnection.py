@@ -0,0 +1,333 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a builder that batches the message attributes and connections of a meta network into a single
+MDGModifier
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+
+import maya.cmds
+import maya.api.OpenMaya
+
+from tpDcc.core import command
+from tpDcc.dccs.maya.meta import metaindex
+
+LOGGER = logging.getLogger('tpDcc-dccs-maya')
+
+
+class MetaConnectionBuilder(object):
+    """
+    Collects message attribute creations, multi index allocations and message connections of a meta network and
+    applies all of them with a single MDGModifier.
+    Existing connections and array indices of each plug are read only once, the first time the plug is used, and
+    are kept up to date in Python while new connections are queued.
+    Operations are applied through an undoable command, so all of them are undone at once.
+    Locked nodes that get new attributes are unlocked by the modifier before their attributes are created and are
+    locked again once all the operations are applied, so undo and redo restore their lock state too.
+    """
+
+    def __init__(self):
+        self._modifier = maya.api.OpenMaya.MDGModifier()
+        self._nodes = dict()
+        self._new_attributes = dict()
+        self._indices = dict()
+        self._destinations = dict()
+        self._connections = list()
+        self._locked_nodes = dict()
+
+    def __len__(self):
+        return len(self._connections)
+
+    @property
+    def modifier(self):
+        """
+        Returns the modifier operations are applied with
+        :return: MDGModifier
+        """
+
+        return self._modifier
+
+    def get_node(self, node):
+        """
+        Returns the name and MObject of the given node
+        :param node: str or MObject
+        :return: tuple(str, MObject), name (full path for DAG nodes) and MObject of the node
+        """
+
+        if isinstance(node, maya.api.OpenMaya.MObject):
+            node_name = metaindex.get_node_name(node)
+            self._nodes.setdefault(node_name, (node_name, node))
+            return node_name, node
+
+        cached = self._nodes.get(node)
+        if cached:
+            return cached
+        mobj = maya.api.OpenMaya.MGlobal.getSelectionListByName(node).getDependNode(0)
+        node_name = metaindex.get_node_name(mobj)
+        self._nodes[node_name] = self._nodes[node] = (node_name, mobj)
+
+        return node_name, mobj
+
+    def has_attribute(self, node, attr):
+        """
+        Returns whether the given node has the given attribute or the attribute is queued to be created
+        :param node: str or MObject
+        :param attr: str
+        :return: bool
+        """
+
+        node_name, mobj = self.get_node(node)
+        if (node_name, attr) in self._new_attributes:
+            return True
+
+        return maya.api.OpenMaya.MFnDependencyNode(mobj).hasAttribute(attr)
+
+    def is_multi(self, node, attr):
+        """
+        Returns whether the given attribute of the given node is a multi attribute
+        :param node: str or MObject
+        :param attr: str
+        :return: bool
+        """
+
+        node_name, mobj = self.get_node(node)
+        new_attribute = self._new_attributes.get((node_name, attr))
+        if new_attribute:
+            return new_attribute[1]
+
+        if not maya.api.OpenMaya.MFnDependencyNode(mobj).hasAttribute(attr):
+            return False
+
+        return self._get_plug(mobj, attr).isArray
+
+    def add_message_attribute(self, node, attr, multi=True, index_matters=True, hidden=False):
+        """
+        Queues the creation of a message attribute in the given node. Nothing is done if the attribute already
+        exists or is already queued
+        :param node: str or MObject
+        :param attr: str, name of the attribute
+        :param multi: bool, whether the attribute is a multi attribute
+        :param index_matters: bool, whether the attribute indices matter
+        :param hidden: bool, whether the attribute is hidden
+        :return: bool, True if the attribute creation was queued
+        """
+
+        if self.has_attribute(node, attr):
+            return False
+
+        node_name, mobj = self.get_node(node)
+        self._unlock_node(node_name)
+        attr_fn = maya.api.OpenMaya.MFnMessageAttribute()
+        attr_obj = attr_fn.create(attr, attr)
+        attr_fn.array = multi
+        attr_fn.indexMatters = index_matters if multi else True
+        attr_fn.hidden = hidden
+        self._modifier.addAttribute(mobj, attr_obj)
+        self._new_attributes[(node_name, attr)] = (attr_obj, multi)
+
+        return True
+
+    def get_next_index(self, node, attr):
+        """
+        Reserves and returns the next available index of the given multi attribute
+        Unconnected existing indices are used first, as MetaNode.get_next_array_index does
+        :param node: str or MObject
+        :param attr: str
+        :return: int
+        """
+
+        node_name, mobj = self.get_node(node)
+        key = (node_name, attr)
+        indices = self._indices.get(key)
+        if indices is None:
+            free_indices = list()
+            next_index = 0
+            if key not in self._new_attributes:
+                plug = self._get_plug(mobj, attr)
+                existing_indices = plug.getExistingArrayAttributeIndices()
+                free_indices = [i for i in existing_indices if not plug.elementByLogicalIndex(i).isConnected]
+                next_index = existing_indices[-1] + 1 if len(existing_indices) else 0
+            indices = self._indices[key] = [free_indices, next_index]
+
+        if indices[0]:
+            return indices[0].pop(0)
+        index = indices[1]
+        indices[1] += 1
+
+        return index
+
+    def is_connected(self, source_node, source_attr, destination_node, destination_attr=None):
+        """
+        Returns whether the given source attribute (or any of its elements) is connected to the given destination
+        node, taking into account queued connections
+        :param source_node: str or MObject
+        :param source_attr: str
+        :param destination_node: str or MObject
+        :param destination_attr: str or None, if None, connections to any attribute of the destination are checked
+        :return: bool
+        """
+
+        destinations = self._get_destinations(source_node, source_attr)
+        destination_name = self.get_node(destination_node)[0]
+        if destination_attr:
+            return (destination_name, destination_attr) in destinations
+
+        return any(destination[0] == destination_name for destination in destinations)
+
+    def connect(self, source_node, source_attr, destination_node, destination_attr, source_index=None,
+                destination_index=None, force=True):
+        """
+        Queues a message connection
+        :param source_node: str or MObject
+        :param source_attr: str
+        :param destination_node: str or MObject
+        :param destination_attr: str
+        :param source_index: int or None, logical index of the source plug if it is a multi attribute
+        :param destination_index: int or None, logical index of the destination plug if it is a multi attribute
+        :param force: bool, whether to break the current incoming connection of the destination plug
+        """
+
+        source_name, source_obj = self.get_node(source_node)
+        destination_name, destination_obj = self.get_node(destination_node)
+        self._get_destinations(source_name, source_attr).add((destination_name, destination_attr))
+        self._connections.append(
+            (source_obj, source_attr, source_index, destination_obj, destination_attr, destination_index, force))
+
+    def connect_child(self, parent, attr, child, source_attr, source_simple=False, force=True):
+        """
+        Queues the connection of a child node to the given multi message attribute of the parent MetaNode node, using
+        the next available index of the parent attribute
+        :param parent: str or MObject, MetaNode node
+        :param attr: str, multi message attribute of the parent
+        :param child: str or MObject
+        :param source_attr: str, message attribute of the child
+        :param source_simple: bool, if True, child attribute index is not used
+        :param force: bool
+        :return: bool, True if the connection was queued or False if the child was already connected
+        """
+
+        if self.is_connected(parent, attr, child, source_attr):
+            return False
+
+        destination_index = None
+        if not source_simple and self.is_multi(child, source_attr):
+            destination_index = self.get_next_index(child, source_attr)
+        source_index = self.get_next_index(parent, attr) if self.is_multi(parent, attr) else None
+        self.connect(
+            parent, attr, child, source_attr, source_index=source_index, destination_index=destination_index,
+            force=force)
+
+        return True
+
+    def apply(self):
+        """
+        Applies all queued operations as a single undoable command
+        :return: int, number of applied connections
+        """
+
+        if not self._new_attributes and not self._connections:
+            return 0
+
+        runner = command.CommandRunner()
+
+        return runner.run('tpDcc-dccs-maya-commands-applyMetaConnections', builder=self) or 0
+
+    def apply_modifier(self):
+        """
+        Applies all queued operations with the modifier of the builder. Operations are not registered in the undo
+        queue, use apply instead
+        Queued attributes are created before the connection plugs are retrieved, since plugs of attributes that do
+        not exist yet cannot be retrieved. Both steps are done by the same modifier. A new modifier is used to queue
+        the next operations of the builder.
+        :return: int, number of applied connections
+        """
+
+        if self._new_attributes:
+            self._modifier.doIt()
+
+        connections_count = 0
+        for source_obj, source_attr, source_index, destination_obj, destination_attr, destination_index, force in \
+                self._connections:
+            source_plug = self._get_plug(source_obj, source_attr, source_index)
+            destination_plug = self._get_plug(destination_obj, destination_attr, destination_index)
+            if destination_plug.isDestination:
+                current_source = destination_plug.source()
+                if current_source == source_plug:
+                    continue
+                if not force:
+                    LOGGER.warning('Plug "{}" has incoming connection "{}"'.format(
+                        destination_plug.name(), current_source.name()))
+                    continue
+                self._modifier.disconnect(current_source, destination_plug)
+            self._modifier.connect(source_plug, destination_plug)
+            connections_count += 1
+        locked_nodes = [node_name for node_name, locked in self._locked_nodes.items() if locked]
+        for node_name in locked_nodes:
+            self._modifier.commandToExecute('lockNode -lock 1 "{}"'.format(node_name))
+        if self._connections or locked_nodes:
+            self._modifier.doIt()
+
+        self._locked_nodes.clear()
+        self._new_attributes.clear()
+        self._indices.clear()
+        self._destinations.clear()
+        self._connections = list()
+        self._modifier = maya.api.OpenMaya.MDGModifier()
+
+        return connections_count
+
+    def _unlock_node(self, node_name):
+        """
+        Internal function that queues the unlock of the given node if it is locked. Lock state of each node is
+        only queried once
+        """
+
+        if node_name in self._locked_nodes:
+            return
+
+        locked = bool((maya.cmds.lockNode(node_name, query=True, lock=True) or [False])[0])
+        self._locked_nodes[node_name] = locked
+        if locked:
+            self._modifier.commandToExecute('lockNode -lock 0 "{}"'.format(node_name))
+
+    def _get_plug(self, mobj, attr, index=None):
+        """
+        Internal function that returns the plug of the given attribute of the given node
+        """
+
+        plug = maya.api.OpenMaya.MFnDependencyNode(mobj).findPlug(attr, False)
+        if index is not None:
+            plug = plug.elementByLogicalIndex(index)
+
+        return plug
+
+    def _get_destinations(self, node, attr):
+        """
+        Internal function that returns the node names and attributes the given attribute, or any of its elements, is
+        connected to. Connections are read from the scene only the first time
+        """
+
+        node_name, mobj = self.get_node(node)
+        key = (node_name, attr)
+        destinations = self._destinations.get(key)
+        if destinations is not None:
+            return destinations
+
+        destinations = self._destinations[key] = set()
+        if key in self._new_attributes or not maya.api.OpenMaya.MFnDependencyNode(mobj).hasAttribute(attr):
+            return destinations
+
+        plug = self._get_plug(mobj, attr)
+        plugs = [plug.elementByLogicalIndex(i) for i in plug.getExistingArrayAttributeIndices()] if \
+            plug.isArray else [plug]
+        for element_plug in plugs:
+            for destination_plug in element_plug.destinations():
+                destinations.add((
+                    metaindex.get_node_name(destination_plug.node()),
+                    maya.api.OpenMaya.MFnAttribute(destination_plug.attribute()).name))
+
+        return destinations
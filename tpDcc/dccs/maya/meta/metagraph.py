@@ -0,0 +1,405 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains generator based traversal functions of the meta graph
+Traversal functions yield lightweight node handles. MetaNode instances are only created when the handle meta object
+is accessed.
+A node is considered parent of another one if any of its message attributes (other than "message") is connected
+to the other node or if the "message" attribute of the other node is connected to it.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+from collections import deque
+
+import maya.api.OpenMaya
+
+from tpDcc.dccs.maya.meta import metaindex
+from tpDcc.dccs.maya.managers import metadatamanager
+
+LOGGER = logging.getLogger('tpDcc-dccs-maya')
+
+CHILDREN = 'children'
+PARENTS = 'parents'
+CONNECTIONS = 'connections'
+
+_UNSET = object()
+
+
+class MetaNodeHandle(object):
+    """
+    Lightweight reference to a node found during a meta graph traversal
+    Meta class of the node is read from its plugs the first time is requested and the MetaNode instance is only
+    created when the meta object is accessed
+    """
+
+    __slots__ = ('_handle', '_meta_class', '_meta', 'depth', 'attr')
+
+    def __init__(self, mobj, depth=0, attr=None):
+        """
+        :param mobj: MObject
+        :param depth: int, traversal depth the node was found at
+        :param attr: str or None, name of the parent message attribute the node was found through
+        """
+
+        self._handle = maya.api.OpenMaya.MObjectHandle(mobj)
+        self._meta_class = _UNSET
+        self._meta = None
+        self.depth = depth
+        self.attr = attr
+
+    def __repr__(self):
+        return 'MetaNodeHandle(node: "{}", meta_class: "{}", depth: {})'.format(self.node, self.meta_class, self.depth)
+
+    def __eq__(self, other):
+        return isinstance(other, MetaNodeHandle) and self._handle == other._handle
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._handle.hashCode()
+
+    @property
+    def object(self):
+        """
+        Returns the MObject of the node
+        :return: MObject
+        """
+
+        return self._handle.object()
+
+    @property
+    def node(self):
+        """
+        Returns the current name of the node (full path for DAG nodes)
+        :return: str or None, None if the node does not exist anymore
+        """
+
+        if not self.is_valid():
+            return None
+
+        return metaindex.get_node_name(self._handle.object())
+
+    @property
+    def uuid(self):
+        """
+        Returns the UUID of the node
+        :return: str
+        """
+
+        return maya.api.OpenMaya.MFnDependencyNode(self._handle.object()).uuid().asString()
+
+    @property
+    def meta_class(self):
+        """
+        Returns the registered meta class the node is bound to
+        :return: str or None
+        """
+
+        if self._meta_class is _UNSET:
+            self._meta_class = get_meta_class(self._handle.object()) if self.is_valid() else None
+
+        return self._meta_class
+
+    @property
+    def meta(self):
+        """
+        Returns the MetaNode instance of the node. It is created the first time it is accessed
+        :return: MetaNode or None, None if the node is not bound to a registered meta class
+        """
+
+        return self.get_meta()
+
+    def is_valid(self):
+        """
+        Returns whether the node still exists
+        :return: bool
+        """
+
+        return self._handle.isValid() and self._handle.isAlive()
+
+    def is_meta_node(self):
+        """
+        Returns whether the node is bound to a registered meta class
+        :return: bool
+        """
+
+        return bool(self.meta_class)
+
+    def is_system_root(self):
+        """
+        Returns whether the node is flagged as system root MetaNode
+        :return: bool
+        """
+
+        if not self.is_valid():
+            return False
+
+        dep_node_fn = maya.api.OpenMaya.MFnDependencyNode(self._handle.object())
+        if not dep_node_fn.hasAttribute('meta_system_root'):
+            return False
+
+        return dep_node_fn.findPlug('meta_system_root', False).asBool()
+
+    def get_meta(self, force=False):
+        """
+        Returns the MetaNode instance of the node. It is created the first time it is requested
+        :param force: bool, whether to wrap nodes that are not bound to a registered meta class
+        :return: MetaNode or None
+        """
+
+        if self._meta is None and self.is_valid() and (force or self.meta_class):
+            from tpDcc.dccs.maya.meta import metanode
+            self._meta = metanode.MetaNode(self.node)
+
+        return self._meta
+
+
+def get_mobject(node):
+    """
+    Returns the MObject of the given node
+    :param node: str or MObject or MetaNode or MetaNodeHandle
+    :return: MObject
+    """
+
+    if isinstance(node, maya.api.OpenMaya.MObject):
+        return node
+    if isinstance(node, MetaNodeHandle):
+        return node.object
+
+    return maya.api.OpenMaya.MGlobal.getSelectionListByName(getattr(node, 'meta_node', node)).getDependNode(0)
+
+
+def get_meta_class(mobj):
+    """
+    Returns the registered meta class the given node is bound to, reading it from its plugs
+    Follows the same rules as MetaNode.get_meta_class_from_node
+    :param mobj: MObject
+    :return: str or None
+    """
+
+    classes_register = metadatamanager.METANODE_CLASSES_REGISTER
+    dep_node_fn = maya.api.OpenMaya.MFnDependencyNode(mobj)
+    if dep_node_fn.hasAttribute('meta_class'):
+        for attr in ('meta_class', 'meta_class_group'):
+            if not dep_node_fn.hasAttribute(attr):
+                continue
+            meta_class = dep_node_fn.findPlug(attr, False).asString()
+            if meta_class in classes_register:
+                return meta_class
+        return None
+
+    node_type = dep_node_fn.typeName
+    if 'Meta{0}'.format(node_type) in classes_register:
+        return 'Meta{0}'.format(node_type)
+    for key in classes_register.keys():
+        if key.lower() == node_type:
+            return key
+
+    return None
+
+
+def iter_linked_nodes(mobj, direction=CHILDREN, attrs=None):
+    """
+    Yields the nodes linked to the given one through message attributes
+    :param mobj: MObject
+    :param direction: str, CHILDREN, PARENTS or CONNECTIONS (both directions of the given node attributes)
+    :param attrs: list(str) or None, if given, only links through these parent attributes are followed. With
+        CONNECTIONS direction, attributes of the given node.
+    :return: generator(tuple(MObject, str)), linked node and name of the attribute it is linked through
+    """
+
+    try:
+        plugs = maya.api.OpenMaya.MFnDependencyNode(mobj).getConnections()
+    except RuntimeError:
+        return
+
+    for plug in plugs:
+        attr_obj = plug.attribute()
+        if not attr_obj.hasFn(maya.api.OpenMaya.MFn.kMessageAttribute):
+            continue
+        attr_name = maya.api.OpenMaya.MFnAttribute(attr_obj).name
+        source_plug = plug.source() if plug.isDestination else None
+        source_attr = _get_attr_name(source_plug) if source_plug is not None else None
+
+        if direction == CONNECTIONS:
+            if attrs and attr_name not in attrs:
+                continue
+            for destination_plug in plug.destinations():
+                yield destination_plug.node(), attr_name
+            if source_plug is not None:
+                yield source_plug.node(), attr_name
+        elif direction == CHILDREN:
+            if attr_name == 'message' or (attrs and attr_name not in attrs):
+                continue
+            for destination_plug in plug.destinations():
+                yield destination_plug.node(), attr_name
+            if source_attr == 'message':
+                yield source_plug.node(), attr_name
+        elif attr_name == 'message':
+            for destination_plug in plug.destinations():
+                destination_attr = _get_attr_name(destination_plug)
+                if not attrs or destination_attr in attrs:
+                    yield destination_plug.node(), destination_attr
+        elif source_attr and source_attr != 'message' and (not attrs or source_attr in attrs):
+            yield source_plug.node(), source_attr
+
+
+def iter_meta_graph(node, direction=CHILDREN, attrs=None, max_depth=1, meta_types=None, meta_only=True):
+    """
+    Walks the meta graph breadth first from the given node, yielding the linked nodes as they are found
+    Each node is visited once. Nodes that are not meta nodes are neither yielded nor walked through if meta_only is
+    True. Nodes whose meta class is not one of the given meta types are not yielded but they are walked through.
+    :param node: str or MObject or MetaNode or MetaNodeHandle, node to start the traversal from (not yielded)
+    :param direction: str, CHILDREN, PARENTS or CONNECTIONS
+    :param attrs: str or list(str) or None, only links through these attributes are followed, at every depth
+    :param max_depth: int or None, maximum traversal depth. If None, the whole graph is walked
+    :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+    :param meta_only: bool, whether to skip the nodes that are not bound to a registered meta class
+    :return: generator(MetaNodeHandle)
+    """
+
+    if attrs and not isinstance(attrs, (list, tuple, set)):
+        attrs = [attrs]
+    meta_keys = set(metadatamanager.meta_types_to_registry_key(meta_types)) if meta_types else None
+    if meta_types and not meta_keys:
+        return
+
+    start_obj = get_mobject(node)
+    visited = set([maya.api.OpenMaya.MObjectHandle(start_obj).hashCode()])
+    queue = deque([(start_obj, 0)])
+    while queue:
+        current_obj, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for linked_obj, attr in iter_linked_nodes(current_obj, direction=direction, attrs=attrs):
+            key = maya.api.OpenMaya.MObjectHandle(linked_obj).hashCode()
+            if key in visited:
+                continue
+            visited.add(key)
+            handle = MetaNodeHandle(linked_obj, depth=depth + 1, attr=attr)
+            if meta_only and not handle.meta_class:
+                continue
+            if not meta_keys or handle.meta_class in meta_keys:
+                yield handle
+            queue.append((linked_obj, depth + 1))
+
+
+def iter_children(node, attrs=None, max_depth=1, meta_types=None, meta_only=True):
+    """
+    Yields the meta children of the given node
+    :param node: str or MObject or MetaNode or MetaNodeHandle
+    :param attrs: str or list(str) or None, only children linked through these attributes are followed
+    :param max_depth: int or None, maximum traversal depth. If None, all descendants are yielded
+    :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+    :param meta_only: bool, whether to skip the nodes that are not bound to a registered meta class
+    :return: generator(MetaNodeHandle)
+    """
+
+    return iter_meta_graph(
+        node, direction=CHILDREN, attrs=attrs, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
+
+def iter_parents(node, attrs=None, max_depth=1, meta_types=None, meta_only=True):
+    """
+    Yields the meta parents of the given node
+    :param node: str or MObject or MetaNode or MetaNodeHandle
+    :param attrs: str or list(str) or None, only parents linking the node through these attributes are followed
+    :param max_depth: int or None, maximum traversal depth. If None, all ancestors are yielded
+    :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+    :param meta_only: bool, whether to skip the nodes that are not bound to a registered meta class
+    :return: generator(MetaNodeHandle)
+    """
+
+    return iter_meta_graph(
+        node, direction=PARENTS, attrs=attrs, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
+
+def iter_by_attribute(node, attr, max_depth=1, meta_types=None, meta_only=False):
+    """
+    Yields the nodes connected, in any direction, to the given message attribute of the given node
+    :param node: str or MObject or MetaNode or MetaNodeHandle
+    :param attr: str, name of the message attribute
+    :param max_depth: int or None, maximum traversal depth. Deeper nodes are found through the same attribute
+    :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+    :param meta_only: bool, whether to skip the nodes that are not bound to a registered meta class
+    :return: generator(MetaNodeHandle)
+    """
+
+    return iter_meta_graph(
+        node, direction=CONNECTIONS, attrs=attr, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
+
+def iter_systems(node=None, meta_types=None):
+    """
+    Yields the system root meta nodes the given node belongs to (itself included). If no node is given, all system
+    root meta nodes of the scene are yielded
+    :param node: str or MObject or MetaNode or MetaNodeHandle or None
+    :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+    :return: generator(MetaNodeHandle)
+    """
+
+    meta_keys = set(metadatamanager.meta_types_to_registry_key(meta_types)) if meta_types else None
+    if meta_types and not meta_keys:
+        return
+
+    if node is None:
+        meta_index = metaindex.get_meta_index()
+        for entry in meta_index.get_system_roots():
+            if not entry.handle.isValid():
+                continue
+            handle = MetaNodeHandle(entry.handle.object())
+            if not meta_keys or handle.meta_class in meta_keys:
+                yield handle
+        return
+
+    handle = MetaNodeHandle(get_mobject(node))
+    if handle.is_system_root() and (not meta_keys or handle.meta_class in meta_keys):
+        yield handle
+    for parent_handle in iter_parents(handle, max_depth=None, meta_types=meta_types):
+        if parent_handle.is_system_root():
+            yield parent_handle
+
+
+def iter_dag_descendents(node, max_depth=None, meta_types=None, meta_only=False):
+    """
+    Yields the transform descendants of the given DAG node, breadth first
+    :param node: str or MObject or MetaNode or MetaNodeHandle
+    :param max_depth: int or None, maximum hierarchy depth. If None, all descendants are yielded
+    :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+    :param meta_only: bool, whether to skip the nodes that are not bound to a registered meta class. Their
+        descendants are still walked
+    :return: generator(MetaNodeHandle)
+    """
+
+    meta_keys = set(metadatamanager.meta_types_to_registry_key(meta_types)) if meta_types else None
+    if meta_types and not meta_keys:
+        return
+
+    queue = deque([(get_mobject(node), 0)])
+    while queue:
+        current_obj, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        dag_node_fn = maya.api.OpenMaya.MFnDagNode(current_obj)
+        for i in range(dag_node_fn.childCount()):
+            child_obj = dag_node_fn.child(i)
+            if not child_obj.hasFn(maya.api.OpenMaya.MFn.kTransform):
+                continue
+            queue.append((child_obj, depth + 1))
+            handle = MetaNodeHandle(child_obj, depth=depth + 1)
+            if (meta_only or meta_keys) and not handle.meta_class:
+                continue
+            if not meta_keys or handle.meta_class in meta_keys:
+                yield handle
+
+
+def _get_attr_name(plug):
+    """
+    Internal function that returns the name of the attribute of the given plug
+    """
+
+    return maya.api.OpenMaya.MFnAttribute(plug.attribute()).name
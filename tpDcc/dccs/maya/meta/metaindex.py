@@ -0,0 +1,498 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a scene-wide index of MetaNode nodes used to query meta nodes without inspecting all scene nodes
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+import threading
+
+import maya.cmds
+import maya.api.OpenMaya
+
+LOGGER = logging.getLogger('tpDcc-dccs-maya')
+
+# Attributes that identify MetaNode nodes. Changes on any of them update the index entry of the node
+INDEXED_ATTRIBUTES = ('meta_class', 'meta_class_group', 'meta_system_root')
+
+
+class MetaIndexEntry(object):
+    """
+    Stores the meta data of an indexed MetaNode node
+    """
+
+    __slots__ = ('uuid', 'handle', 'meta_class', 'meta_class_group', 'system_root', 'callback_id')
+
+    def __init__(self, uuid, handle, meta_class, meta_class_group, system_root):
+        self.uuid = uuid
+        self.handle = handle
+        self.meta_class = meta_class
+        self.meta_class_group = meta_class_group
+        self.system_root = system_root
+        self.callback_id = None
+
+    def __repr__(self):
+        return 'MetaIndexEntry(uuid: "{}", meta_class: "{}", meta_class_group: "{}", system_root: {})'.format(
+            self.uuid, self.meta_class, self.meta_class_group, self.system_root)
+
+    @property
+    def node(self):
+        """
+        Returns the current name of the indexed node (full path for DAG nodes)
+        :return: str or None, None if the node does not exist anymore
+        """
+
+        if not self.handle.isValid():
+            return None
+
+        return get_node_name(self.handle.object())
+
+
+class MetaNodeIndex(object):
+    """
+    Keeps the meta_class, meta_class_group and meta_system_root values of each MetaNode node in the scene, so meta
+    nodes can be queried by class, class group, system root or UUID with dictionary lookups.
+    Entries are keyed by the MObjectHandle hash code of their node (compared with the stored handle, so hash
+    collisions are handled). UUIDs are only a secondary index, because the copies of a node that is referenced
+    several times share the same UUID.
+    Index is built once per scene and kept up to date using callbacks:
+        - Scene callbacks rebuild the index after a scene is opened, created, imported or referenced
+        - Node added callback stores new nodes as pending. Pending nodes are inspected the next time the index is
+            queried (nodes created from scratch do not have their meta attributes yet when the callback is called)
+        - Node removed callback removes the entry of deleted nodes
+        - Attribute changed callback of each indexed node flags its entry when its meta attributes change
+    """
+
+    def __init__(self):
+        self._entries = dict()
+        self._entries_by_uuid = dict()
+        self._entries_by_class = dict()
+        self._entries_by_group = dict()
+        self._scene_callbacks = list()
+        self._stale_callbacks = list()
+        self._pending = list()
+        self._dirty = set()
+        self._built = False
+        self._suspended = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            self._update()
+            return sum(len(entries) for entries in self._entries.values())
+
+    def __contains__(self, uuid):
+        with self._lock:
+            self._update()
+            return uuid in self._entries_by_uuid
+
+    @property
+    def installed(self):
+        return bool(self._scene_callbacks)
+
+    def install(self):
+        """
+        Registers the scene callbacks that keep the index up to date
+        """
+
+        with self._lock:
+            if self._scene_callbacks:
+                return
+            scene_message = maya.api.OpenMaya.MSceneMessage
+            for message in (scene_message.kBeforeOpen, scene_message.kBeforeNew):
+                self._scene_callbacks.append(scene_message.addCallback(message, self._on_scene_before_reset))
+            for message in (scene_message.kAfterOpen, scene_message.kAfterNew, scene_message.kAfterImport,
+                            scene_message.kAfterCreateReference, scene_message.kAfterLoadReference,
+                            scene_message.kAfterUnloadReference, scene_message.kAfterRemoveReference):
+                self._scene_callbacks.append(scene_message.addCallback(message, self._on_scene_reset))
+            self._scene_callbacks.append(
+                maya.api.OpenMaya.MDGMessage.addNodeAddedCallback(self._on_node_added, 'dependNode'))
+            self._scene_callbacks.append(
+                maya.api.OpenMaya.MDGMessage.addNodeRemovedCallback(self._on_node_removed, 'dependNode'))
+
+    def uninstall(self):
+        """
+        Removes all the callbacks of the index and clears it
+        """
+
+        with self._lock:
+            self._clear()
+            while self._scene_callbacks:
+                self._stale_callbacks.append(self._scene_callbacks.pop())
+            self._remove_stale_callbacks()
+
+    def rebuild(self):
+        """
+        Forces the rebuild of the index the next time it is queried
+        """
+
+        with self._lock:
+            self._built = False
+
+    def update_node(self, node):
+        """
+        Updates the index entry of the given node. Should be called after meta attributes are added to a node
+        that was not indexed yet
+        :param node: str or MObject
+        """
+
+        if not isinstance(node, maya.api.OpenMaya.MObject):
+            node = maya.api.OpenMaya.MGlobal.getSelectionListByName(node).getDependNode(0)
+
+        with self._lock:
+            if self._built:
+                self._index_node(node)
+
+    def get_entry(self, node):
+        """
+        Returns the index entry of the given MetaNode node
+        :param node: str or MObject
+        :return: MetaIndexEntry or None
+        """
+
+        if not isinstance(node, maya.api.OpenMaya.MObject):
+            node = maya.api.OpenMaya.MGlobal.getSelectionListByName(node).getDependNode(0)
+
+        with self._lock:
+            self._update()
+            return self._find_entry(maya.api.OpenMaya.MObjectHandle(node))
+
+    def get_entries(self, uuid=None):
+        """
+        Returns the index entries. Several entries can share the same UUID if a node is referenced several times
+        :param uuid: str or None, if given, only the entries of the nodes with this UUID are returned
+        :return: list(MetaIndexEntry)
+        """
+
+        with self._lock:
+            self._update()
+            if uuid is not None:
+                return list(self._entries_by_uuid.get(uuid, ()))
+            return [entry for entries in self._entries.values() for entry in entries]
+
+    def get_entries_by_class(self, meta_classes):
+        """
+        Returns the entries of the nodes whose meta_class attribute is any of the given ones
+        :param meta_classes: list(str)
+        :return: set(MetaIndexEntry)
+        """
+
+        with self._lock:
+            self._update()
+            return self._get_entries(self._entries_by_class, meta_classes)
+
+    def get_entries_by_group(self, meta_class_groups):
+        """
+        Returns the entries of the nodes whose meta_class_group attribute is any of the given ones
+        :param meta_class_groups: list(str)
+        :return: set(MetaIndexEntry)
+        """
+
+        with self._lock:
+            self._update()
+            return self._get_entries(self._entries_by_group, meta_class_groups)
+
+    def get_system_roots(self):
+        """
+        Returns the entries of the nodes flagged as system root MetaNodes
+        :return: list(MetaIndexEntry)
+        """
+
+        with self._lock:
+            self._update()
+            return [entry for entries in self._entries.values() for entry in entries if entry.system_root]
+
+    def get_nodes(self, entries):
+        """
+        Returns the current names of the nodes of the given entries. Nodes that do not exist anymore are skipped
+        :param entries: list(MetaIndexEntry)
+        :return: list(str)
+        """
+
+        nodes = list()
+        for entry in entries:
+            node = entry.node
+            if node:
+                nodes.append(node)
+
+        return nodes
+
+    def _get_entries(self, entries_map, keys):
+        """
+        Internal function that returns the union of the entries stored in the given map with the given keys
+        """
+
+        entries = set()
+        for key in keys:
+            entries.update(entries_map.get(key, ()))
+
+        return entries
+
+    def _find_entry(self, handle):
+        """
+        Internal function that returns the entry of the node of the given handle. Lock must be held by the caller
+        :param handle: MObjectHandle
+        :return: MetaIndexEntry or None
+        """
+
+        for entry in self._entries.get(handle.hashCode(), ()):
+            if entry.handle == handle:
+                return entry
+
+        return None
+
+    def _update(self):
+        """
+        Internal function that builds the index if necessary and inspects pending and dirty nodes
+        Lock must be held by the caller
+        """
+
+        self._remove_stale_callbacks()
+        if not self._scene_callbacks:
+            self.install()
+        if not self._built:
+            self._build()
+            return
+
+        while self._pending:
+            handle = self._pending.pop()
+            if handle.isValid():
+                self._index_node(handle.object())
+        while self._dirty:
+            entry = self._dirty.pop()
+            if entry.handle.isValid():
+                self._index_node(entry.handle.object())
+
+    def _build(self):
+        """
+        Internal function that indexes all the nodes of the scene that have meta attributes
+        Lock must be held by the caller
+        """
+
+        self._clear()
+        nodes = maya.cmds.ls(
+            ['*.{}'.format(attr) for attr in INDEXED_ATTRIBUTES[:2]], objectsOnly=True, recursive=True) or list()
+        selection_list = maya.api.OpenMaya.MSelectionList()
+        for node in set(nodes):
+            try:
+                selection_list.add(node)
+            except RuntimeError:
+                LOGGER.debug('MetaNodeIndex: Impossible to index node: "{}"'.format(node))
+        for i in range(selection_list.length()):
+            self._index_node(selection_list.getDependNode(i))
+
+        self._built = True
+        LOGGER.debug('MetaNodeIndex: {} MetaNode nodes indexed'.format(
+            sum(len(entries) for entries in self._entries.values())))
+
+    def _index_node(self, mobj):
+        """
+        Internal function that adds, updates or removes the index entry of the given node
+        Lock must be held by the caller
+        :param mobj: MObject
+        """
+
+        handle = maya.api.OpenMaya.MObjectHandle(mobj)
+        entry = self._find_entry(handle)
+        node_fn = maya.api.OpenMaya.MFnDependencyNode(mobj)
+        meta_class = _get_string_attribute(node_fn, 'meta_class')
+        meta_class_group = _get_string_attribute(node_fn, 'meta_class_group')
+        if not meta_class and not meta_class_group:
+            if entry:
+                self._remove_entry(entry)
+            return
+
+        system_root = False
+        if node_fn.hasAttribute('meta_system_root'):
+            system_root = node_fn.findPlug('meta_system_root', False).asBool()
+
+        # Entries are updated in place, so the attribute changed callback of the node is kept
+        if entry:
+            self._unregister_entry(entry)
+            entry.uuid = node_fn.uuid().asString()
+            entry.meta_class = meta_class
+            entry.meta_class_group = meta_class_group
+            entry.system_root = system_root
+        else:
+            entry = MetaIndexEntry(node_fn.uuid().asString(), handle, meta_class, meta_class_group, system_root)
+            entry.callback_id = maya.api.OpenMaya.MNodeMessage.addAttributeChangedCallback(
+                mobj, self._on_attribute_changed, entry)
+            self._entries.setdefault(handle.hashCode(), list()).append(entry)
+        for entries_map, key in ((self._entries_by_uuid, entry.uuid), (self._entries_by_class, entry.meta_class),
+                                 (self._entries_by_group, entry.meta_class_group)):
+            entries_map.setdefault(key, set()).add(entry)
+
+    def _unregister_entry(self, entry):
+        """
+        Internal function that removes the given entry from the UUID, class and class group maps
+        Lock must be held by the caller
+        """
+
+        for entries_map, key in ((self._entries_by_uuid, entry.uuid), (self._entries_by_class, entry.meta_class),
+                                 (self._entries_by_group, entry.meta_class_group)):
+            entries = entries_map.get(key)
+            if entries is not None:
+                entries.discard(entry)
+                if not entries:
+                    entries_map.pop(key)
+
+    def _remove_entry(self, entry):
+        """
+        Internal function that removes the given index entry and its callback. Lock must be held by the caller
+        """
+
+        self._unregister_entry(entry)
+        key = entry.handle.hashCode()
+        entries = self._entries.get(key, list())
+        if entry in entries:
+            entries.remove(entry)
+            if not entries:
+                self._entries.pop(key)
+        self._dirty.discard(entry)
+        if entry.callback_id is not None:
+            self._stale_callbacks.append(entry.callback_id)
+            entry.callback_id = None
+
+    def _clear(self):
+        """
+        Internal function that removes all the entries of the index. Lock must be held by the caller
+        """
+
+        for entries in self._entries.values():
+            self._stale_callbacks.extend(entry.callback_id for entry in entries if entry.callback_id is not None)
+        self._entries.clear()
+        self._entries_by_uuid.clear()
+        self._entries_by_class.clear()
+        self._entries_by_group.clear()
+        self._pending = list()
+        self._dirty.clear()
+        self._built = False
+
+    def _on_scene_before_reset(self, *args):
+        """
+        Internal callback function called before a scene is opened or created. Node callbacks are ignored until the
+        scene is loaded
+        """
+
+        with self._lock:
+            self._suspended = True
+            self._clear()
+
+    def _on_scene_reset(self, *args):
+        """
+        Internal callback function called after a scene is opened, created, imported or referenced
+        """
+
+        with self._lock:
+            self._suspended = False
+            self._clear()
+
+    def _on_node_added(self, mobj, *args):
+        """
+        Internal callback function called when a node is added to the scene
+        """
+
+        if self._suspended or not self._built:
+            return
+
+        with self._lock:
+            self._pending.append(maya.api.OpenMaya.MObjectHandle(mobj))
+
+    def _on_node_removed(self, mobj, *args):
+        """
+        Internal callback function called when a node is removed from the scene
+        Callbacks are not removed while they are being executed, they are removed the next time the index is used
+        """
+
+        if self._suspended or not self._built:
+            return
+
+        with self._lock:
+            entry = self._find_entry(maya.api.OpenMaya.MObjectHandle(mobj))
+            if entry:
+                self._remove_entry(entry)
+
+    def _on_attribute_changed(self, msg, plug, other_plug, entry):
+        """
+        Internal callback function called when an attribute of an indexed node changes
+        """
+
+        if plug.partialName(useLongNames=True).split('.')[-1] not in INDEXED_ATTRIBUTES:
+            return
+
+        with self._lock:
+            if entry.callback_id is not None:
+                self._dirty.add(entry)
+
+    def _remove_stale_callbacks(self):
+        """
+        Internal function that removes the callbacks of the removed entries. Lock must be held by the caller
+        """
+
+        while self._stale_callbacks:
+            try:
+                maya.api.OpenMaya.MMessage.removeCallback(self._stale_callbacks.pop())
+            except RuntimeError:
+                pass
+
+
+META_INDEX = MetaNodeIndex()
+
+
+def get_node_name(mobj):
+    """
+    Returns the name of the given node (full path for DAG nodes)
+    :param mobj: MObject
+    :return: str
+    """
+
+    if mobj.hasFn(maya.api.OpenMaya.MFn.kDagNode):
+        return maya.api.OpenMaya.MFnDagNode(mobj).fullPathName()
+
+    return maya.api.OpenMaya.MFnDependencyNode(mobj).name()
+
+
+def get_meta_index():
+    """
+    Returns the scene MetaNode index
+    :return: MetaNodeIndex
+    """
+
+    return META_INDEX
+
+
+def rebuild_meta_index():
+    """
+    Forces the rebuild of the scene MetaNode index the next time it is queried
+    """
+
+    META_INDEX.rebuild()
+
+
+def update_meta_index_node(node):
+    """
+    Updates the MetaNode index entry of the given node
+    :param node: str or MObject
+    """
+
+    META_INDEX.update_node(node)
+
+
+def _get_string_attribute(node_fn, attr):
+    """
+    Internal function that returns the value of the given string attribute or an empty string if it does not exist
+    :param node_fn: MFnDependencyNode
+    :param attr: str
+    :return: str
+    """
+
+    if not node_fn.hasAttribute(attr):
+        return ''
+
+    try:
+        return node_fn.findPlug(attr, False).asString() or ''
+    except RuntimeError:
+        return ''
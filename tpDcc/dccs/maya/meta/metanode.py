@@ -24,7 +24,7 @@ import maya.cmds
 import maya.OpenMaya
 
 from tpDcc.libs.python import python
-from tpDcc.dccs.maya.meta import metautils
+from tpDcc.dccs.maya.meta import metautils, metaindex, metaconnection, metagraph
 from tpDcc.dccs.maya.core import exceptions, helpers, name as name_utils, attribute as attr_utils
 from tpDcc.dccs.maya.managers import metadatamanager
 
@@ -144,6 +144,8 @@ class MetaNode(object):
         object.__setattr__(self, '_lastUUID', '')
         object.__setattr__(self, '_lockState', False)
         object.__setattr__(self, '_forceAsMeta', False)
+        object.__setattr__(self, '_attr_plugs', dict())
+        object.__setattr__(self, '_python_attrs', set())
 
         if not node:
             if not node_type == 'network' and node_type not in metadatamanager.METANODE_TYPES_REGISTER:
@@ -192,53 +194,96 @@ class MetaNode(object):
             self.__fill_attr_cache__(auto_fill)
 
     def __getattribute__(self, attr):
+
+        # Methods, properties, private members and Python only attributes never need to be read from the Maya node
+        if attr.startswith('_') or attr in MetaNode.UNMANAGED or attr in get_class_members(type(self)):
+            return object.__getattribute__(self, attr)
+        if _is_python_attr(self, attr):
+            return object.__getattribute__(self, attr)
+
         data = None
         object_attr = False
-
         try:
             data = object.__getattribute__(self, attr)
             object_attr = True
-        except Exception:
+        except AttributeError:
             LOGGER.debug('{} attr not yet seen - function call probably generated by Maya directly'.format(attr))
 
-        if data:
-            if isinstance(data, types.MethodType):
-                return data
+        try:
+            mobj_handle = object.__getattribute__(self, '_MObjectHandle')
+        except AttributeError:
+            mobj_handle = None
+        if not mobj_handle:
+            return data
 
         try:
-            if attr in MetaNode.UNMANAGED:
+            return self.__get_maya_attr__(attr)
+        except AttributeError:
+            if object_attr:
                 return data
+            raise AttributeError('Object instance "{}" : {} has no attribute : {}'.format(self.meta_node, self, attr))
 
-            meta_node = object.__getattribute__(self, 'meta_node')
-            if not meta_node or not maya.cmds.objExists(meta_node):
-                return data
-            else:
-                try:
-                    attr_type = maya.cmds.getAttr('{0}.{1}'.format(meta_node, attr), type=True)
-                    if attr_type == 'message':
-                        return self.__get_message_attr__(attr)
+    def __get_maya_attr__(self, attr):
+        """
+        Returns the value of the given attribute of the Maya node
+        The plug and the type of each attribute are cached the first time the attribute is read, so next reads go
+        straight to the plug. Attribute type is taken from the schema of the MetaNode class if available.
+        :param attr: str
+        :return: variant
+        :raises AttributeError: if the Maya node has no attribute with the given name
+        """
 
-                    attr_val = maya.cmds.getAttr('{0}.{1}'.format(meta_node, attr), silent=True)
-                    if attr_type == 'string':
-                        try:
-                            attr_val = deserialize_json_attr(attr_val)
-                            if type(attr_val) == dict:
-                                return attr_val
-                        except Exception:
-                            # LOGGER.debug('string is not JSON deserializable')
-                            pass
-                        return attr_val
-                    elif attr_type == 'double3' or attr_type == 'float3':
-                        return attr_val[0]
-                    return attr_val
-                except Exception:
-                    if object_attr:
-                        return data
-                    else:
-                        raise AttributeError(
-                            'Object instance "{}" : {} has no attribute : {}'.format(self.meta_node, self, attr))
-        except Exception as e:
-            raise Exception('{} | {}'.format(e, traceback.format_exc()))
+        meta_node = self.meta_node
+        dep_node_fn = object.__getattribute__(self, '_MFnDependencyNode')
+        attr_plugs = _get_instance_cache(self, '_attr_plugs', dict)
+        if not dep_node_fn.hasAttribute(attr):
+            # Aliases are not cached, they are read through their full attribute name
+            attr_plugs.pop(attr, None)
+            try:
+                attr_type = maya.cmds.getAttr('{0}.{1}'.format(meta_node, attr), type=True)
+            except Exception:
+                raise AttributeError(attr)
+            plug, reader = None, None
+        elif attr in attr_plugs:
+            plug, attr_type, reader = attr_plugs[attr]
+        else:
+            plug = dep_node_fn.findPlug(attr, False)
+            attr_type = MetaAttributeSchema.get_type(type(self), attr)
+            if not attr_type or not _attribute_matches_type(plug.attribute(), attr_type):
+                attr_type = maya.cmds.getAttr('{0}.{1}'.format(meta_node, attr), type=True)
+            reader = get_plug_reader(plug, attr_type)
+            attr_plugs[attr] = (plug, attr_type, reader)
+
+        if attr_type == 'message':
+            return self.__get_message_attr__(attr)
+
+        if reader:
+            attr_val = reader(plug)
+        else:
+            attr_val = maya.cmds.getAttr('{0}.{1}'.format(meta_node, attr), silent=True)
+            if attr_type == 'double3' or attr_type == 'float3':
+                return attr_val[0]
+        if attr_type == 'string' and attr_val and attr_val.lstrip().startswith('{'):
+            try:
+                json_val = deserialize_json_attr(attr_val)
+                if type(json_val) == dict:
+                    return json_val
+            except Exception:
+                pass
+
+        return attr_val
+
+    def __clear_attr_cache__(self, *attrs):
+        """
+        Removes the cached plugs of the given attributes. If no attributes are given, all cached plugs are removed
+        :param attrs: list(str)
+        """
+
+        attr_plugs = _get_instance_cache(self, '_attr_plugs', dict)
+        if not attrs:
+            attr_plugs.clear()
+        for attr in attrs:
+            attr_plugs.pop(attr, None)
 
     def __create_node__(self, node_type, name):
         """
@@ -345,6 +390,8 @@ class MetaNode(object):
         object.__setattr__(self, attr, value)
 
         if attr not in MetaNode.UNMANAGED and not attr == 'UNMANAGED':
+            if _is_python_attr(self, attr):
+                return
             if self.has_attr(attr):
                 locked = False
                 if self.attr_is_locked(attr) and force:
@@ -389,12 +436,15 @@ class MetaNode(object):
                     self.attr_set_locked(attr, True)
             else:
                 LOGGER.debug('attr : {0} does not exist on MayaNode > class attr only'.format(attr))
+                _get_instance_cache(self, '_python_attrs', set).add(attr)
 
     @node_lock_manager
     def __delattr__(self, attr):
         try:
             LOGGER.debug('Atribute delete : {0}, {1}'.format(self, attr))
             object.__delattr__(self, attr)
+            _get_instance_cache(self, '_python_attrs', set).discard(attr)
+            self.__clear_attr_cache__(attr)
             if self.has_attr(attr):
                 maya.cmds.setAttr('{0}.{1}'.format(self.meta_node, attr), lock=False)
                 maya.cmds.deleteAttr('{0}.{1}'.format(self.meta_node, attr))
@@ -578,6 +628,7 @@ class MetaNode(object):
                 object.__setattr__(self, '_MObject', mobj)
                 object.__setattr__(self, '_MObjectHandle', maya.OpenMaya.MObjectHandle(mobj))
                 object.__setattr__(self, '_MFnDependencyNode', maya.OpenMaya.MFnDependencyNode(mobj))
+                object.__setattr__(self, '_attr_plugs', dict())
             except Exception as e:
                 raise Exception(e)
         else:
@@ -727,17 +778,13 @@ class MetaNode(object):
 
         if issubclass(type(node), MetaNode):
             node = node.meta_node
-        if not hasattr(meta_class_grps, '__iter__'):
-            meta_class_grps = [meta_class_grps]
-        for grp in meta_class_grps:
-            LOGGER.debug('metaGroup testing: {0}'.format(node))
-            try:
-                # TODO: Finish
-                pass
-            except Exception:
-                pass
+        meta_class_grps = python.force_list(meta_class_grps)
+        try:
+            meta_class_grp = maya.cmds.getAttr('{0}.{1}'.format(node, 'meta_class_group'))
+        except Exception:
+            return False
 
-        return False
+        return meta_class_grp in meta_class_grps
 
     @staticmethod
     def register_metanode_to_cache(meta_node):
@@ -833,6 +880,9 @@ class MetaNode(object):
                 elif kw in set_cmd_edit_flags:
                     set_kwargs_to_edit[kw] = v
 
+        if attr_type in ADD_ATTRIBUTE_TYPES:
+            MetaAttributeSchema.register(type(self), attr, ADD_ATTRIBUTE_TYPES[attr_type])
+
         # ===================================================================  IF ATTR EXISTS, EDIT ATTR
         if self.has_attr(attr):
             LOGGER.debug('"{0}" : Attr already exists on the node'.format(attr))
@@ -863,6 +913,10 @@ class MetaNode(object):
                 if not attr_type:
                     LOGGER.warning('Attribute Type "{}" is not valid!'.format(attr_type))
                     return False
+                if attr_type in ADD_ATTRIBUTE_TYPES:
+                    MetaAttributeSchema.register(type(self), attr, ADD_ATTRIBUTE_TYPES[attr_type])
+                _get_instance_cache(self, '_python_attrs', set).discard(attr)
+                self.__clear_attr_cache__(attr)
 
                 DataTypeKwargs[attr_type].update(add_kwargs_to_edit)
                 LOGGER.debug('addAttr : {0} : value_type : {1} > data_type keywords: {2}'.format(
@@ -901,6 +955,10 @@ class MetaNode(object):
             except Exception:
                 LOGGER.error(traceback.format_exc())
 
+            # Nodes that were not MetaNodes are only indexed once their meta attributes are added
+            if added and attr in metaindex.INDEXED_ATTRIBUTES:
+                metaindex.update_meta_index_node(self.meta_node)
+
         return added
 
     @node_lock_manager
@@ -911,6 +969,7 @@ class MetaNode(object):
         """
 
         if self.has_attr(attr):
+            self.__clear_attr_cache__(attr)
             try:
                 maya.cmds.deleteAttr(self.meta_node, at=attr)
             except Exception as e:
@@ -924,6 +983,7 @@ class MetaNode(object):
         :param new_attr_name: str
         """
 
+        self.__clear_attr_cache__(attr, new_attr_name)
         maya.cmds.renameAttr('{0}.{1}'.format(self.meta_node, attr), new_attr_name)
 
     def do_store(self, *args, **kwargs):
@@ -1219,50 +1279,7 @@ class MetaNode(object):
         :param meta_node: str, name of the node from DAG
         """
 
-        LOGGER.debug('Getting Meta From Cache ...')
-
-        try:
-            uuid = MetaNode.get_metanode_uuid(meta_node=meta_node)
-            LOGGER.debug('MetaNode {} - UUID => {}'.format(meta_node, uuid))
-            LOGGER.debug('MetaNode UUID Cache => {}'.format(metadatamanager))
-
-            if uuid in metadatamanager.METANODES_CACHE.keys():
-                try:
-                    if MetaNode.check_metanode_validity(metadatamanager.METANODES_CACHE[uuid]):
-                        LOGGER.debug('CACHE: Cached MetaNode {} has a valid MObject'.format(
-                            metadatamanager.METANODES_CACHE[uuid]))
-                        if not metadatamanager.METANODES_CACHE[uuid]._MObject == get_mobject(meta_node):
-                            LOGGER.debug(
-                                'CACHE: {} : UUID is already registered but to a different node: {}'.format(
-                                    uuid, meta_node))
-                            return
-
-                        LOGGER.debug(
-                            'CACHE : {} : Returning MetaNode from UUID cache! => {}'.format(meta_node, uuid))
-                        return metadatamanager.METANODES_CACHE[uuid]
-                    else:
-                        LOGGER.debug('{} being removed from the cache due to invalid MObject'.format(meta_node))
-                        metadatamanager.clean_metanodes_cache()
-                except Exception as e:
-                    LOGGER.debug('CACHE: insepction fail!')
-                    LOGGER.debug(str(e))
-        except Exception:
-            if meta_node in metadatamanager.METANODES_CACHE.keys():
-                try:
-                    if MetaNode.check_metanode_validity(metadatamanager.METANODES_CACHE[meta_node]):
-                        if not metadatamanager.METANODES_CACHE[uuid]._MObject == get_mobject(meta_node):
-                            LOGGER.debug(
-                                'CACHE: {} : UUID is already registered but to a different node: {}'.format(
-                                    uuid, meta_node))
-                            return
-                        LOGGER.debug('CACHE: {0} : Returning MetaNode from nameBased cache!'.format(meta_node))
-                        return metadatamanager.METANODES_CACHE[meta_node]
-                    else:
-                        LOGGER.debug('{} being removed from the cache due to invalid MObject'.format(meta_node))
-                        metadatamanager.clean_metanodes_cache()
-                except Exception as e:
-                    LOGGER.debug('CACHE: inspection fail!')
-                    LOGGER.debug(str(e))
+        return metadatamanager.METANODES_CACHE.get(meta_node)
 
     @node_lock_manager
     def disconnect_current_attr_plugs(self, attr):
@@ -1453,57 +1470,30 @@ class MetaNode(object):
             # self.mymessagelink=None to clear all current connections
             return
 
+        # All the child attributes and connections are applied at once with a single modifier
+        builder = metaconnection.MetaConnectionBuilder()
         for node in nodes:
             is_meta = False
             if self.is_meta_node(node=node):
                 is_meta = True
-                if not issubclass(type(node), MetaNode):
-                    MetaNode(node).add_attribute(source_attr, attr_type='message')
-                else:
-                    node.add_attribute(source_attr, attr_type='message')
+                if issubclass(type(node), MetaNode):
+                    MetaAttributeSchema.register(type(node), source_attr, ADD_ATTRIBUTE_TYPES['message'])
+                    _get_instance_cache(node, '_python_attrs', set).discard(source_attr)
+                    node.__clear_attr_cache__(source_attr)
                     node = node.meta_node
-            elif not maya.cmds.objExists('{0}.{1}'.format(node, source_attr)):
-                if allow_incest:
-                    MetaNode(node).add_attribute(source_attr, attr_type='message')
-                else:
-                    maya.cmds.addAttr(node, longName=source_attr, at='message', m=True, im=False)
+            builder.add_message_attribute(node, source_attr, multi=True, index_matters=is_meta or allow_incest)
 
             try:
-                if not self.is_child_node(node=node, attr=attr, source_attr=source_attr):
-                    try:
-                        if is_meta or allow_incest:
-                            if is_meta:
-                                LOGGER.debug(
-                                    'Connecting MeatNode nodes via indices: {0}.{1} >> {2}.{3}'.format(
-                                        self.meta_node, attr, node, source_attr))
-                            elif allow_incest:
-                                LOGGER.debug(
-                                    'Connecting Standard Maya nodes via indices: {0}.{1} >> {2}.{3}'.format(
-                                        self.meta_node, attr, node, source_attr))
-                            if not source_simple:
-                                maya.cmds.connectAttr(
-                                    '%s.%s[%i]' % (
-                                        self.meta_node, attr, self.get_next_array_index(self.meta_node, attr)),
-                                    '%s.%s[%i]' % (node, source_attr, self.get_next_array_index(node, source_attr)),
-                                    f=force)
-                            else:
-                                maya.cmds.connectAttr('%s.%s[%i]' % (
-                                    self.meta_node, attr, self.get_next_array_index(
-                                        self.meta_node, attr)), '%s.%s' % (node, source_attr), f=force)
-                        else:
-                            LOGGER.debug(
-                                'Connecting {0}.{1} >> {2}.{3}'.format(self.meta_node, attr, node, source_attr))
-                            maya.cmds.connectAttr('{0}.{1}'.format(node, source_attr), f=force)
-                    except Exception:
-                        # If the add was originally a messageSimple, then this exception is a
-                        # back-up for the previous behaviour
-                        maya.cmds.connectAttr('{0}.{1}'.format(self.meta_node, attr),
-                                              '{0}.{1}'.format(node, source_attr), f=force)
-                else:
+                LOGGER.debug('Connecting {0} nodes via indices: {1}.{2} >> {3}.{4}'.format(
+                    'MetaNode' if is_meta else 'Standard Maya', self.meta_node, attr, node, source_attr))
+                if not builder.connect_child(
+                        self.meta_node, attr, node, source_attr, source_simple=source_simple, force=force):
                     raise Exception('"{0}" is already connected to MetaNode "{1}"'.format(node, self.meta_node))
             except Exception as e:
                 LOGGER.warning(e)
 
+        builder.apply()
+
     @node_lock_manager
     def disconnect_child(self, node, attr=None, delete_source_plug=True, delete_dst_plug=True):
         """
@@ -1637,6 +1627,69 @@ class MetaNode(object):
 
         return result
 
+    def iter_message(self, attr, max_depth=1, meta_types=None, meta_only=False):
+        """
+        Lazy version of get_message. Yields the nodes connected to the given message attribute
+        :param attr: str, name of the message attribute
+        :param max_depth: int or None, maximum traversal depth. Deeper nodes are found through the same attribute
+        :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+        :param meta_only: bool, whether to skip the nodes that are not MetaNodes
+        :return: generator(metagraph.MetaNodeHandle)
+        """
+
+        return metagraph.iter_by_attribute(
+            self.meta_node, attr, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
+    def iter_children(self, attrs=None, max_depth=1, meta_types=None, meta_only=True):
+        """
+        Yields the meta children of this MetaNode. MetaNode instances are only created when handles meta is accessed
+        :param attrs: str or list(str) or None, only children linked through these attributes are followed
+        :param max_depth: int or None, maximum traversal depth. If None, all descendants are yielded
+        :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+        :param meta_only: bool, whether to skip the nodes that are not MetaNodes
+        :return: generator(metagraph.MetaNodeHandle)
+        """
+
+        return metagraph.iter_children(
+            self.meta_node, attrs=attrs, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
+    def iter_parents(self, attrs=None, max_depth=1, meta_types=None, meta_only=True):
+        """
+        Yields the meta parents of this MetaNode. MetaNode instances are only created when handles meta is accessed
+        :param attrs: str or list(str) or None, only parents linking this node through these attributes are followed
+        :param max_depth: int or None, maximum traversal depth. If None, all ancestors are yielded
+        :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+        :param meta_only: bool, whether to skip the nodes that are not MetaNodes
+        :return: generator(metagraph.MetaNodeHandle)
+        """
+
+        return metagraph.iter_parents(
+            self.meta_node, attrs=attrs, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
+    def iter_systems(self, meta_types=None):
+        """
+        Yields the system root MetaNodes this MetaNode belongs to, itself included
+        :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+        :return: generator(metagraph.MetaNodeHandle)
+        """
+
+        return metagraph.iter_systems(self.meta_node, meta_types=meta_types)
+
+    def find_child(self, meta_types=None, attrs=None, max_depth=None):
+        """
+        Returns the first meta descendant of this MetaNode of the given meta types. Traversal stops as soon as it is
+        found, so only the found node is instantiated
+        :param meta_types: list(str or class) or None, meta classes of the node to find
+        :param attrs: str or list(str) or None, only children linked through these attributes are followed
+        :param max_depth: int or None, maximum traversal depth. If None, all descendants are checked
+        :return: MetaNode or None
+        """
+
+        for handle in self.iter_children(attrs=attrs, max_depth=max_depth, meta_types=meta_types):
+            return handle.meta
+
+        return None
+
     def message_list_get_message(self, *args, **kwargs):
         """
         Returns messageList
@@ -1794,6 +1847,244 @@ class MetaNode(object):
 # ==============================================================================================================
 
 
+# Maya attribute type of each add_attribute attribute type
+ADD_ATTRIBUTE_TYPES = {
+    'string': 'string',
+    'unicode': 'string',
+    'complex': 'string',
+    'int': 'long',
+    'bool': 'bool',
+    'float': 'double',
+    'float3': 'float3',
+    'double3': 'double3',
+    'doubleArray': 'doubleArray',
+    'enum': 'enum',
+    'message': 'message',
+    'messageSimple': 'message'
+}
+
+# Attribute function set each Maya attribute type is created with
+_ATTRIBUTE_TYPE_FNS = {
+    'message': maya.OpenMaya.MFn.kMessageAttribute,
+    'enum': maya.OpenMaya.MFn.kEnumAttribute
+}
+
+# Numeric data type of each numeric Maya attribute type
+_NUMERIC_ATTRIBUTE_TYPES = {
+    'bool': maya.OpenMaya.MFnNumericData.kBoolean,
+    'long': maya.OpenMaya.MFnNumericData.kLong,
+    'short': maya.OpenMaya.MFnNumericData.kShort,
+    'byte': maya.OpenMaya.MFnNumericData.kByte,
+    'char': maya.OpenMaya.MFnNumericData.kChar,
+    'double': maya.OpenMaya.MFnNumericData.kDouble,
+    'float': maya.OpenMaya.MFnNumericData.kFloat,
+    'double3': maya.OpenMaya.MFnNumericData.k3Double,
+    'float3': maya.OpenMaya.MFnNumericData.k3Float
+}
+
+# Numeric data type of the children of each compound Maya attribute type
+_COMPOUND_ATTRIBUTE_TYPES = {
+    'double3': maya.OpenMaya.MFnNumericData.kDouble,
+    'float3': maya.OpenMaya.MFnNumericData.kFloat
+}
+
+# Data type of each typed Maya attribute type
+_TYPED_ATTRIBUTE_TYPES = {
+    'string': maya.OpenMaya.MFnData.kString,
+    'doubleArray': maya.OpenMaya.MFnData.kDoubleArray,
+    'matrix': maya.OpenMaya.MFnData.kMatrix
+}
+
+# Functions that read the value of a plug of each Maya attribute type. Values are the same ones returned by getAttr.
+# Unit attributes (distance, angle and time) are not read from their plugs because getAttr converts them to UI units
+_PLUG_READERS = {
+    'string': lambda plug: plug.asString(),
+    'bool': lambda plug: plug.asBool(),
+    'long': lambda plug: plug.asInt(),
+    'short': lambda plug: plug.asInt(),
+    'byte': lambda plug: plug.asInt(),
+    'char': lambda plug: plug.asInt(),
+    'enum': lambda plug: plug.asInt(),
+    'double': lambda plug: plug.asDouble(),
+    'float': lambda plug: plug.asFloat(),
+    'double3': lambda plug: tuple(plug.child(i).asDouble() for i in range(3)),
+    'float3': lambda plug: tuple(plug.child(i).asFloat() for i in range(3))
+}
+
+# Names of the methods and properties of each MetaNode class
+_CLASS_MEMBERS = dict()
+
+
+class MetaAttributeSchema(object):
+    """
+    Stores the Maya type of the attributes added through add_attribute (usually from __bind_data__) to the nodes of
+    each MetaNode class. Attribute reads use it to know the type of an attribute without querying it from Maya.
+    Types are stored per class and inherited by subclasses.
+    """
+
+    _SCHEMAS = dict()
+
+    @classmethod
+    def register(cls, meta_class, attr, attr_type):
+        """
+        Stores the Maya type of the given attribute of the nodes of the given MetaNode class
+        :param meta_class: type
+        :param attr: str
+        :param attr_type: str, Maya attribute type
+        """
+
+        cls._SCHEMAS.setdefault(meta_class, dict())[attr] = attr_type
+
+    @classmethod
+    def get_type(cls, meta_class, attr):
+        """
+        Returns the stored Maya type of the given attribute of the nodes of the given MetaNode class
+        :param meta_class: type
+        :param attr: str
+        :return: str or None
+        """
+
+        for klass in meta_class.__mro__:
+            attr_type = cls._SCHEMAS.get(klass, dict()).get(attr)
+            if attr_type:
+                return attr_type
+
+        return None
+
+    @classmethod
+    def get_schema(cls, meta_class):
+        """
+        Returns all the attribute types stored for the given MetaNode class, including the inherited ones
+        :param meta_class: type
+        :return: dict(str, str)
+        """
+
+        schema = dict()
+        for klass in reversed(meta_class.__mro__):
+            schema.update(cls._SCHEMAS.get(klass, dict()))
+
+        return schema
+
+    @classmethod
+    def clear(cls):
+        """
+        Removes all stored attribute types
+        """
+
+        cls._SCHEMAS.clear()
+
+
+def get_class_members(meta_class):
+    """
+    Returns the names of the methods and properties of the given class. Those names are never read from Maya nodes
+    :param meta_class: type
+    :return: frozenset(str)
+    """
+
+    members = _CLASS_MEMBERS.get(meta_class)
+    if members is None:
+        members = set()
+        for klass in meta_class.__mro__:
+            for name, value in klass.__dict__.items():
+                if isinstance(value, (types.FunctionType, staticmethod, classmethod, property)):
+                    members.add(name)
+        members = _CLASS_MEMBERS[meta_class] = frozenset(members)
+
+    return members
+
+
+def get_plug_reader(plug, attr_type):
+    """
+    Returns the function used to read the value of the given plug
+    :param plug: MPlug
+    :param attr_type: str, Maya attribute type of the plug
+    :return: callable or None, None if the plug value must be read with getAttr
+    """
+
+    reader = _PLUG_READERS.get(attr_type)
+    if reader and attr_type in ('double3', 'float3'):
+        for i in range(plug.numChildren()):
+            if plug.child(i).attribute().hasFn(maya.OpenMaya.MFn.kUnitAttribute):
+                return None
+
+    return reader
+
+
+def _attribute_matches_type(attr_obj, attr_type):
+    """
+    Internal function that returns whether the given attribute is of the given Maya attribute type
+    Numeric and typed attributes are checked by their data type, so for example a long attribute does not match
+    the double type
+    :param attr_obj: MObject
+    :param attr_type: str
+    :return: bool
+    """
+
+    if attr_type in _NUMERIC_ATTRIBUTE_TYPES and attr_obj.hasFn(maya.OpenMaya.MFn.kNumericAttribute):
+        return maya.OpenMaya.MFnNumericAttribute(attr_obj).unitType() == _NUMERIC_ATTRIBUTE_TYPES[attr_type]
+    if attr_type in _COMPOUND_ATTRIBUTE_TYPES and attr_obj.hasFn(maya.OpenMaya.MFn.kCompoundAttribute):
+        compound_fn = maya.OpenMaya.MFnCompoundAttribute(attr_obj)
+        if compound_fn.numChildren() != 3:
+            return False
+        for i in range(3):
+            child = compound_fn.child(i)
+            if not child.hasFn(maya.OpenMaya.MFn.kNumericAttribute):
+                return False
+            if maya.OpenMaya.MFnNumericAttribute(child).unitType() != _COMPOUND_ATTRIBUTE_TYPES[attr_type]:
+                return False
+        return True
+    if attr_type in _TYPED_ATTRIBUTE_TYPES and attr_obj.hasFn(maya.OpenMaya.MFn.kTypedAttribute):
+        return maya.OpenMaya.MFnTypedAttribute(attr_obj).attrType() == _TYPED_ATTRIBUTE_TYPES[attr_type]
+
+    attribute_fn = _ATTRIBUTE_TYPE_FNS.get(attr_type)
+    if attribute_fn is None:
+        return False
+
+    return attr_obj.hasFn(attribute_fn)
+
+
+def _is_python_attr(meta_node, attr):
+    """
+    Internal function that returns whether the given attribute of the given MetaNode instance is a Python only
+    attribute. Attributes are no longer Python only once the Maya node has an attribute with the same name, even if
+    it was added without using the MetaNode instance (MetaAttributeUtils.add, set_message, addAttr, ...)
+    :param meta_node: MetaNode
+    :param attr: str
+    :return: bool
+    """
+
+    python_attrs = _get_instance_cache(meta_node, '_python_attrs', set)
+    if attr not in python_attrs:
+        return False
+
+    try:
+        has_attribute = object.__getattribute__(meta_node, '_MFnDependencyNode').hasAttribute(attr)
+    except Exception:
+        return True
+    if has_attribute:
+        python_attrs.discard(attr)
+        return False
+
+    return True
+
+
+def _get_instance_cache(meta_node, name, factory):
+    """
+    Internal function that returns the given cache stored in the given MetaNode instance, creating it if necessary
+    :param meta_node: MetaNode
+    :param name: str, name of the instance attribute the cache is stored in
+    :param factory: type, type of the cache
+    :return: variant
+    """
+
+    try:
+        return object.__getattribute__(meta_node, name)
+    except AttributeError:
+        cache = factory()
+        object.__setattr__(meta_node, name, cache)
+        return cache
+
+
 def get_mobject(meta_node):
     """
     Base method to get the MObject from node
@@ -10,7 +10,7 @@ from __future__ import print_function, division, absolute_import
 import maya.cmds
 
 from tpDcc import dcc
-from tpDcc.dccs.maya.meta import metanode, metautils
+from tpDcc.dccs.maya.meta import metanode, metautils, metagraph
 from tpDcc.dccs.maya.core import transform as transform_lib, shape as shape_lib, attribute as attr_utils
 
 
@@ -76,10 +76,23 @@ class MetaObject(metanode.MetaNode, object):
 
         result = metautils.MetaTransformUtils.get_children(self, full_path)
         if result and as_meta:
-            return metanode.valid_obj_list_arg(result)
+            return metanode.validate_obj_list_arg(result)
 
         return result
 
+    def iter_children(self, max_depth=1, meta_types=None, meta_only=False):
+        """
+        Lazy version of get_children. Yields the transform children of the MetaNode
+        MetaNode instances are only created when handles meta is accessed
+        :param max_depth: int or None, maximum hierarchy depth. If None, all descendants are yielded
+        :param meta_types: list(str or class) or None, meta classes of the yielded nodes
+        :param meta_only: bool, whether to skip the nodes that are not MetaNodes
+        :return: generator(metagraph.MetaNodeHandle)
+        """
+
+        return metagraph.iter_dag_descendents(
+            self.meta_node, max_depth=max_depth, meta_types=meta_types, meta_only=meta_only)
+
     def select(self):
         """
         Selects wrapped meta node in current scene
@@ -11,7 +11,9 @@ import logging
 import traceback
 
 import maya.cmds
+import maya.api.OpenMaya
 
+from tpDcc.dccs.maya.meta import metaindex, metaconnection
 from tpDcc.dccs.maya.core import common, attribute as attr_utils, name as name_utils, shape as shape_utils
 
 logger = logging.getLogger('tpDcc-dccs-maya')
@@ -511,6 +513,9 @@ class MetaAttributeUtils(object):
             else:
                 raise ValueError('Unknown attribute type: {}'.format(attr_type))
 
+            if attr_name in metaindex.INDEXED_ATTRIBUTES:
+                metaindex.update_meta_index_node(node)
+
             return combined
         except Exception as e:
             raise Exception(traceback.format_exc())
@@ -599,6 +604,10 @@ class MetaAttributeUtils(object):
         if was_locked or lock:
             maya.cmds.setAttr(combined, lock=True)
 
+        # Nodes that were not indexed yet do not have index callbacks, so they are indexed explicitly
+        if attr_name in metaindex.INDEXED_ATTRIBUTES:
+            metaindex.update_meta_index_node(obj)
+
         return
 
     @staticmethod
@@ -2516,18 +2525,48 @@ class MetaMessageListUtils(object):
         # TODO: as MetaNode class. Find a fix to this
         meta_node = metanode.MetaNode(node)
 
+        # Plain node messages are connected with a single modifier. Components, attributes, shapes and already
+        # existing attributes go through set_message, that handles their data dictionary and conversions
+        builder = metaconnection.MetaConnectionBuilder()
         for i, k in enumerate(data):
             str_attr = '{}_{}'.format(attr, i)
-            MetaAttributeUtils.set_message(node, str_attr, k, data_attr, i)
+            if '.' in k or builder.has_attribute(node, str_attr) or not MetaMessageListUtils._is_batchable_node(
+                    builder, k):
+                MetaAttributeUtils.set_message(node, str_attr, k, data_attr, i)
+            else:
+                builder.add_message_attribute(node, str_attr, multi=False)
+                builder.connect(k, 'message', node, str_attr)
             if connect_back is not None:
                 if '.' in k:
                     n = k.split('.')[0]
                 else:
                     n = k
-                MetaAttributeUtils.set_message(n, connect_back, node, simple=True)
+                if not MetaMessageListUtils._is_batchable_node(builder, n):
+                    MetaAttributeUtils.set_message(n, connect_back, node, simple=True)
+                elif not builder.is_connected(node, 'message', n, connect_back):
+                    if builder.has_attribute(n, connect_back):
+                        MetaAttributeUtils.set_message(n, connect_back, node, simple=True)
+                    else:
+                        builder.add_message_attribute(n, connect_back, multi=False)
+                        builder.connect(node, 'message', n, connect_back)
+        builder.apply()
 
         return True
 
+    @staticmethod
+    def _is_batchable_node(builder, node):
+        """
+        Internal function that returns whether messages to the given node can be connected by the given builder
+        :param builder: MetaConnectionBuilder
+        :param node: str
+        :return: bool
+        """
+
+        try:
+            return not builder.get_node(node)[1].hasFn(maya.api.OpenMaya.MFn.kShape)
+        except RuntimeError:
+            return False
+
     @staticmethod
     def message_list_set(node=None, attr=None, data=None, connect_back=None, data_attr=None):
         return MetaMessageListUtils.message_list_connect(node=node, attr=attr, data=data, connect_back=connect_back,
@@ -2701,6 +2740,23 @@ class MetaTransformUtils(object):
 
         return maya.cmds.listRelatives(node, allDescendents=True, type='transform', fullPath=full_path) or []
 
+    @staticmethod
+    def iter_descendents(node=None, full_path=False, max_depth=None):
+        """
+        Lazy version of get_descendents. Yields the transform descendants of a given node, breadth first
+        :param node: str, object to check
+        :param full_path: bool, whether you want long names or not
+        :param max_depth: int or None, maximum hierarchy depth. If None, all descendants are yielded
+        :return: generator(str)
+        """
+
+        from tpDcc.dccs.maya.meta import metagraph
+
+        node = MetaAttributeValidator.meta_node_string(node)
+
+        for handle in metagraph.iter_dag_descendents(node, max_depth=max_depth):
+            yield handle.node if full_path else maya.api.OpenMaya.MFnDagNode(handle.object).partialPathName()
+
     @staticmethod
     def get_shapes(node=None, full_path=False, intermediates=False, non_intermediates=True):
         """